@@ -3,11 +3,11 @@
 from datetime import datetime, timedelta
 import pandas as pd
 import numpy as np
+from .rolling_stats import rolling_mean_std, window_samples
 
 def calculate_moving_avg_and_stdev(data, window_seconds, sampling_rate):
-    window_size = int(window_seconds * sampling_rate)  # Calculate window size in number of samples
-    moving_avg = pd.Series(data).rolling(window=window_size, center=True, min_periods=1).mean().to_numpy()
-    moving_stdev = pd.Series(data).rolling(window=window_size, center=True, min_periods=1).std().to_numpy()
+    window_size = window_samples(window_seconds, sampling_rate)  # Calculate window size in number of samples
+    moving_avg, moving_stdev = rolling_mean_std(data, window_size)  # One pass for both
     return moving_avg, moving_stdev
 
 def calculate_boundaries_and_w_angle(bmag, times, min_idx, lower_bound):
@@ -39,10 +39,12 @@ def calculate_boundaries_and_w_angle(bmag, times, min_idx, lower_bound):
 current_time = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
 print(f'{current_time} - 📐 Hole Angle Calc Initialized')
 
-def calculate_hole_angle_and_boundaries(bmag, br, bt, bn, left_max_value_idx, right_max_value_idx, min_idx, sampling_rate, Bave_window_seconds, wide_angle_threshold, break_for_wide_angle):
-    # Calculate the moving average and standard deviation for the specific window
-    Bave, delta_B = calculate_moving_avg_and_stdev(bmag, Bave_window_seconds, sampling_rate)
-    lower_bound = Bave - delta_B  # Calculate the lower bound
+def calculate_hole_angle_and_boundaries(bmag, br, bt, bn, left_max_value_idx, right_max_value_idx, min_idx, sampling_rate, Bave_window_seconds, wide_angle_threshold, break_for_wide_angle, lower_bound=None):
+    # lower_bound (Bave - δB over all of bmag) can be passed in by callers that check many holes in the same array
+    if lower_bound is None:
+        # Calculate the moving average and standard deviation for the specific window
+        Bave, delta_B = calculate_moving_avg_and_stdev(bmag, Bave_window_seconds, sampling_rate)
+        lower_bound = Bave - delta_B  # Calculate the lower bound
     
     # Find the left boundary (tS) where bmag crosses Bave0 - δB starting from the left max and moving right
     for tS in range(left_max_value_idx, min_idx):
@@ -0,0 +1,129 @@
+# magnetic_hole_finder/hole_candidate_detection.py
+"""
+Vectorised candidate detection and numba per-hole refinement for the hole finder.
+
+_detect_magnetic_holes_logic used to walk bmag one sample at a time in Python
+while loops to find threshold crossings and fast-smooth plateaus. Those walks
+are replaced here by lookups into run-length encodings built once per scan:
+
+- threshold crossings come from np.diff of the ``bmag < bmag_slow_smooth`` mask
+- plateau bounds come from the runs of strictly falling / rising samples of
+  bmag_fast_smooth
+
+Each lookup is a binary search, so scanning a day of 293 Hz data costs
+O(candidates * log n) instead of O(n) Python iterations. The returned indices
+are exactly what the original loops produced, NaN handling included (a NaN
+sample opens a candidate but never extends one, and never extends a plateau).
+"""
+import numpy as np
+
+def _run_bounds(mask):
+    """Start (inclusive) and end (exclusive) indices of every run of True in mask."""
+    edges = np.diff(np.concatenate(([0], mask.astype(np.int8), [0])))
+    return np.flatnonzero(edges == 1), np.flatnonzero(edges == -1)
+
+def _run_containing(starts, ends, x):
+    """Index of the run containing sample x, or -1."""
+    k = np.searchsorted(ends, x, side='right')
+    return int(k) if k < len(starts) and starts[k] <= x else -1
+
+class HoleCandidateScanner:
+    """Run-length encoded threshold crossings and fast-smooth plateaus for one bmag array."""
+
+    def __init__(self, bmag, bmag_slow_smooth, bmag_fast_smooth):
+        bmag = np.asarray(bmag, dtype=np.float64)
+        slow = np.asarray(bmag_slow_smooth, dtype=np.float64)
+        fast = np.asarray(bmag_fast_smooth, dtype=np.float64)
+        self.n = len(bmag)
+        with np.errstate(invalid='ignore'):
+            # A candidate opens wherever bmag is not >= slow (NaN included) ...
+            self._open = _run_bounds(~(bmag >= slow))
+            # ... and extends while bmag < slow holds (never through NaN)
+            self._below = _run_bounds(bmag < slow)
+            # Left plateau: fast[k] > fast[k + 1]; right plateau: fast[k + 1] > fast[k]
+            self._falling = _run_bounds(fast[:-1] > fast[1:])
+            self._rising = _run_bounds(fast[1:] > fast[:-1])
+
+    def next_candidate(self, i):
+        """
+        (L_threshold_cross, R_threshold_cross) of the first candidate at or
+        after sample i, or None when the rest of the array stays above threshold.
+        """
+        starts, ends = self._open
+        k = np.searchsorted(ends, i, side='right')
+        if k >= len(starts):
+            return None
+        L = max(int(starts[k]), int(i))
+        return L, self.threshold_end(L)
+
+    def threshold_end(self, L):
+        """First index from L on where bmag < slow stops holding, capped at n - 1."""
+        k = _run_containing(*self._below, L)
+        return min(int(self._below[1][k]), self.n - 1) if k >= 0 else L
+
+    def left_plateau(self, L):
+        """Start of the run of falling bmag_fast_smooth samples that ends at L."""
+        k = _run_containing(*self._falling, L - 1) if L > 0 else -1
+        return int(self._falling[0][k]) if k >= 0 else L
+
+    def right_plateau(self, R):
+        """End of the run of rising bmag_fast_smooth samples that starts at R."""
+        k = _run_containing(*self._rising, R)
+        return int(self._rising[1][k]) if k >= 0 else R
+
+def _refine_hole_numpy(bmag, L, R, L_avg, R_avg):
+    """numpy version of _refine_hole_kernel (np.argmin/argmax already return the first NaN)."""
+    min_idx = np.argmin(bmag[L:R + 1]) + L if R >= L else -1
+    left_max_idx = np.argmax(bmag[L_avg:L + 1]) + L_avg if L >= L_avg else -1
+    right_max_idx = np.argmax(bmag[R:R_avg + 1]) + R if R_avg >= R else -1
+    return int(min_idx), int(left_max_idx), int(right_max_idx)
+
+try:
+    from numba import njit
+
+    @njit
+    def _nan_argmin(a, lo, hi):
+        best = lo
+        for k in range(lo, hi + 1):
+            if np.isnan(a[k]):
+                return k
+            if a[k] < a[best]:
+                best = k
+        return best
+
+    @njit
+    def _nan_argmax(a, lo, hi):
+        best = lo
+        for k in range(lo, hi + 1):
+            if np.isnan(a[k]):
+                return k
+            if a[k] > a[best]:
+                best = k
+        return best
+
+    @njit
+    def _refine_hole_kernel(bmag, L, R, L_avg, R_avg):
+        """Hole minimum in [L, R] and peak maxima in [L_avg, L] and [R, R_avg] (-1 for an empty range)."""
+        min_idx = _nan_argmin(bmag, L, R) if R >= L else -1
+        left_max_idx = _nan_argmax(bmag, L_avg, L) if L >= L_avg else -1
+        right_max_idx = _nan_argmax(bmag, R, R_avg) if R_avg >= R else -1
+        return min_idx, left_max_idx, right_max_idx
+
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+
+def refine_hole(bmag, L_threshold_cross, R_threshold_cross, L_avg_inflect, R_avg_inflect):
+    """
+    Index of the hole minimum and of the left / right peak maxima.
+
+    Matches np.argmin(bmag[L:R + 1]), np.argmax(bmag[L_avg:L + 1]) and
+    np.argmax(bmag[R:R_avg + 1]) (offset back into bmag); an empty range gives -1.
+    bmag must be a contiguous float64 array.
+    """
+    args = (bmag, int(L_threshold_cross), int(R_threshold_cross), int(L_avg_inflect), int(R_avg_inflect))
+    if NUMBA_AVAILABLE:
+        return tuple(int(v) for v in _refine_hole_kernel(*args))
+    return _refine_hole_numpy(*args)
+
+__all__ = ['HoleCandidateScanner', 'refine_hole']
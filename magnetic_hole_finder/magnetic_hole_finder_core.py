@@ -9,9 +9,10 @@ import re   # For regular expressions
 
 # Imports from your existing magnetic_hole_finder package
 from .asymmetry_calc import process_asymmetry 
-from .time_management import extend_time_range, clip_to_original_time_range, determine_sampling_rate, efficient_moving_average
+from .time_management import extend_time_range, clip_time_views, determine_sampling_rate, efficient_moving_average
 from .data_management import download_and_prepare_high_res_mag_data, setup_output_directory # Added setup_output_directory
-from .hole_angle_calc import calculate_hole_angle_and_boundaries
+from .hole_angle_calc import calculate_hole_angle_and_boundaries, calculate_moving_avg_and_stdev
+from .hole_candidate_detection import HoleCandidateScanner, refine_hole
 from .zero_crossing_analysis import analyze_derivative_zero_crossings
 from .plotting import plot_mag_data_with_holes_and_minimum # Assuming this is where your plot function is
 from .MH_format_output import output_magnetic_holes # Assuming this is where your marker output function is
@@ -61,6 +62,8 @@ class HoleFinderSettings:
         self.MARKER_FILES_WITH_ANNOTATED_MARKERS = False
         self.MARKER_FILES_WITH_HOLE_NUMBERS = False
 
+        self.SAVE_HOLE_CATALOGUE = True # Columnar magnetic_hole_catalogue.npz (see plotbot.hole_catalogue)
+
         self.EXPORT_AUDIO_FILES = True
         self.AUDIO_SAMPLING_RATE = 22000
 
@@ -81,20 +84,21 @@ def _detect_magnetic_holes_logic(trange, settings: HoleFinderSettings, current_i
     magnetic_hole_details = []
     i = 0
 
+    # Threshold crossings and plateaus are looked up in run-length encodings
+    # built once, instead of being walked sample by sample.
+    scanner = HoleCandidateScanner(bmag, bmag_slow_smooth, bmag_fast_smooth)
+    bmag_f64 = np.ascontiguousarray(bmag, dtype=np.float64)
+    # Loop invariants, hoisted out of the per-hole work
+    samples_for_1_sec = int(1 * determine_sampling_rate(times_clipped, current_instrument_sampling_rate, True)) if len(bmag) > 1 else 0
+    sampling_rate = determine_sampling_rate(times_clipped, current_instrument_sampling_rate, settings.use_calculated_sampling_rate) if len(bmag) > 1 else current_instrument_sampling_rate
+    angle_lower_bound = None
+
     while i < len(bmag):   
-        start_of_potential_hole = i
-        while start_of_potential_hole < len(bmag) and bmag[start_of_potential_hole] >= bmag_slow_smooth[start_of_potential_hole]:
-            start_of_potential_hole += 1
-        
-        if start_of_potential_hole >= len(bmag):
+        candidate = scanner.next_candidate(i)
+        if candidate is None:
             break    
-        L_threshold_cross = start_of_potential_hole
+        L_threshold_cross, R_threshold_cross = candidate
         hole_counter_core['potential'] += 1
-        
-        end_of_potential_hole = L_threshold_cross
-        while end_of_potential_hole < len(bmag) -1 and bmag[end_of_potential_hole] < bmag_slow_smooth[end_of_potential_hole]:
-            end_of_potential_hole += 1
-        R_threshold_cross = end_of_potential_hole
 
         if R_threshold_cross - L_threshold_cross <= settings.small_threshold_cross_flag_samples:
             hole_counter_core['small_threshold_cross'] += 1
@@ -112,40 +116,25 @@ def _detect_magnetic_holes_logic(trange, settings: HoleFinderSettings, current_i
             i = max(L_threshold_cross, R_threshold_cross) + 1 # Ensure forward progress
             continue
 
-        min_idx_relative = np.argmin(bmag[L_threshold_cross:R_threshold_cross + 1])
-        min_idx = min_idx_relative + L_threshold_cross
-        min_value = bmag[min_idx]
-        if settings.search_in_progress_output: print(f"Minimum initially identified at index {min_idx}")
-    
-        L_plateau_scan = L_threshold_cross
-        while L_plateau_scan > 0 and bmag_fast_smooth[L_plateau_scan-1] > bmag_fast_smooth[L_plateau_scan]:
-             L_plateau_scan -=1
-        L_avg_inflect = L_plateau_scan
-
-        samples_for_1_sec = int(1 * determine_sampling_rate(times_clipped, current_instrument_sampling_rate, True))
-
+        L_avg_inflect = scanner.left_plateau(L_threshold_cross)
         if L_threshold_cross - L_avg_inflect < samples_for_1_sec: 
             L_avg_inflect = max(0, L_threshold_cross - samples_for_1_sec)
-        
-        left_max_slice = bmag[L_avg_inflect : L_threshold_cross + 1]
+        R_avg_inflect = scanner.right_plateau(R_threshold_cross)
+
+        min_idx, left_max_value_idx, right_max_value_idx = refine_hole(
+            bmag_f64, L_threshold_cross, R_threshold_cross, L_avg_inflect, R_avg_inflect
+        )
+        min_value = bmag[min_idx]
+        if settings.search_in_progress_output: print(f"Minimum initially identified at index {min_idx}")
 
-        if len(left_max_slice) > 0:
-            left_max_value_idx = np.argmax(left_max_slice) + L_avg_inflect
+        if left_max_value_idx >= 0:
             left_max_value = bmag[left_max_value_idx]
         else:
             if settings.search_in_progress_output: print("Warning: Empty slice for finding the left maximum.")
             i = R_threshold_cross + 1
             continue
         
-        R_plateau_scan = R_threshold_cross
-        while R_plateau_scan < len(bmag_fast_smooth) - 1 and bmag_fast_smooth[R_plateau_scan+1] > bmag_fast_smooth[R_plateau_scan]:
-            R_plateau_scan += 1
-        R_avg_inflect = R_plateau_scan
-        
-        slice_bmag_right = bmag[R_threshold_cross : R_avg_inflect + 1]
-        
-        if len(slice_bmag_right) > 0:
-            right_max_value_idx = np.argmax(slice_bmag_right) + R_threshold_cross
+        if right_max_value_idx >= 0:
             right_max_value_idx = min(right_max_value_idx, len(bmag) - 1)
             right_max_value = bmag[right_max_value_idx]
         else:
@@ -202,7 +191,6 @@ def _detect_magnetic_holes_logic(trange, settings: HoleFinderSettings, current_i
         if hole_info_dict.get("complex_hole_flag", False):
              hole_counter_core['complex_holes_flagged'] +=1
 
-        sampling_rate = determine_sampling_rate(times_clipped, current_instrument_sampling_rate, settings.use_calculated_sampling_rate)
         half_second_samples = int(settings.Bave_scan_seconds * sampling_rate)
         
         L_before_idx = max(0, left_max_value_idx - half_second_samples)
@@ -233,9 +221,14 @@ def _detect_magnetic_holes_logic(trange, settings: HoleFinderSettings, current_i
                 continue
         if settings.search_in_progress_output: print(f"-----🕳️ Hole relative depth is {hole_percentage_depth:.1f}% (Threshold: {settings.depth_percentage_threshold*100}%)")
 
+        if angle_lower_bound is None:
+            # Rolling Bave - deltaB over the whole interval only depends on bmag; compute it once
+            Bave_rolling, delta_B_rolling = calculate_moving_avg_and_stdev(bmag, settings.Bave_window_seconds, sampling_rate)
+            angle_lower_bound = Bave_rolling - delta_B_rolling
         tS, tE, W_angle = calculate_hole_angle_and_boundaries(
             bmag, br, bt, bn, left_max_value_idx, right_max_value_idx, min_idx, 
-            sampling_rate, settings.Bave_window_seconds, settings.wide_angle_threshold, settings.break_for_wide_angle
+            sampling_rate, settings.Bave_window_seconds, settings.wide_angle_threshold, settings.break_for_wide_angle,
+            lower_bound=angle_lower_bound
         )
         
         if tS is None: 
@@ -292,14 +285,9 @@ def _detect_magnetic_holes_logic(trange, settings: HoleFinderSettings, current_i
 
     return magnetic_holes, hole_minima, hole_maxima_pairs, times_clipped, bmag, magnetic_hole_details, hole_counter_core
 
-def detect_magnetic_holes_and_generate_outputs(trange, base_save_dir: str, settings: HoleFinderSettings):
-    """Main orchestrator: detects holes and generates all standard outputs based on settings."""
-    global hole_counter_core
-    hole_counter_core.clear()
-
-    print(f"Starting analysis for trange: {trange}. Download_only mode: {settings.download_only}")
-    
-    # NEW CODE: Clean up the base_save_dir to ensure no duplication
+def resolve_output_directory(trange, base_save_dir):
+    """Output directory for a run over trange, after undoing a base_save_dir that already points into an encounter directory."""
+    # Clean up the base_save_dir to ensure no duplication
     # Check if we're reusing a path that already contains encounter-specific information
     # Look for encounter pattern like "/E15/E15_PSP_FIELDS_YYYY-MM-DD"
     encounter_pattern = r'/E\d+\/E\d+_PSP_FIELDS_\d{4}-\d{2}-\d{2}'
@@ -311,9 +299,72 @@ def detect_magnetic_holes_and_generate_outputs(trange, base_save_dir: str, setti
             clean_base_dir = base_parts[0]
             print(f"⚠️ Detected reused path. Cleaning base_save_dir from: {base_save_dir} to: {clean_base_dir}")
             base_save_dir = clean_base_dir
+    return setup_output_directory(trange, base_save_dir)
+
+def generate_hole_outputs(trange, settings: HoleFinderSettings, sub_save_dir, times_clipped, bmag_clipped,
+                          magnetic_hole_details, sampling_rate):
+    """Write the main plot, iZotope markers, hole catalogue and audio that settings ask for, for the given holes."""
+    magnetic_holes = [(d["L_threshold_cross"], d["R_threshold_cross"]) for d in magnetic_hole_details]
+    hole_minima = [d["min_idx"] for d in magnetic_hole_details]
+    hole_maxima_pairs = [(d["left_max_value_idx"], d["right_max_value_idx"]) for d in magnetic_hole_details]
+
+    if settings.OUTPUT_MAIN_PLOT and times_clipped is not None and bmag_clipped is not None:
+        print("Generating main plot...")
+        plot_mag_data_with_holes_and_minimum(
+            times_clipped, 
+            bmag_clipped, 
+            magnetic_holes, 
+            hole_minima, 
+            hole_maxima_pairs, 
+            settings.PLOT_HOLE_MINIMUM_ON_MAIN_PLOT, 
+            settings.PLOT_THRESH_CROSS_ON_MAIN_PLOT,
+            trange,
+            sub_save_dir, 
+            settings.SAVE_MAIN_PLOT 
+        )
+
+    if settings.IZOTOPE_MARKER_FILE_OUTPUT_MAX_AND_MIN or settings.IZOTOPE_MARKER_FILE_OUTPUT_GENERAL:
+        print("Generating iZotope marker file...")
+        output_magnetic_holes(
+            magnetic_holes,
+            hole_maxima_pairs, 
+            times_clipped,     
+            bmag_clipped, # Use the Bmag for the primary trange          
+            settings.IZOTOPE_MARKER_FILE_OUTPUT_GENERAL,
+            settings.IZOTOPE_MARKER_FILE_OUTPUT_MAX_AND_MIN, 
+            trange,
+            settings.MARKER_FILE_VERSION,
+            settings.search_in_progress_output, 
+            sub_save_dir, 
+            sampling_rate, 
+            settings.MARKER_FILES_WITH_ANNOTATED_MARKERS,
+            settings.MARKER_FILES_WITH_HOLE_NUMBERS,
+            magnetic_hole_details # This should contain all info, including angles using original br,bt,bn
+        )
+
+    if settings.SAVE_HOLE_CATALOGUE and times_clipped is not None:
+        from plotbot.hole_catalogue import HoleCatalogue
+        catalogue_path = os.path.join(sub_save_dir, 'magnetic_hole_catalogue.npz')
+        try:
+            HoleCatalogue.from_details(magnetic_hole_details, times_clipped,
+                                       sampling_rate=sampling_rate).save(catalogue_path)
+            print(f"Hole catalogue saved to: {catalogue_path}")
+        except Exception as e:
+            print(f"Error saving hole catalogue: {e}")
+
+    if settings.EXPORT_AUDIO_FILES:
+        print("Exporting audio files...")
+        audify_high_res_mag_data_without_plot(trange[0], trange[1], sub_save_dir, settings.AUDIO_SAMPLING_RATE, sub_save_dir)
+
+def detect_magnetic_holes_and_generate_outputs(trange, base_save_dir: str, settings: HoleFinderSettings):
+    """Main orchestrator: detects holes and generates all standard outputs based on settings."""
+    global hole_counter_core
+    hole_counter_core.clear()
+
+    print(f"Starting analysis for trange: {trange}. Download_only mode: {settings.download_only}")
     
     # 1. Setup output directory for this specific run
-    sub_save_dir = setup_output_directory(trange, base_save_dir)
+    sub_save_dir = resolve_output_directory(trange, base_save_dir)
     print(f"✅ Outputs for this run will be saved in: {sub_save_dir}")
 
     # 2. Perform Data Preparation 
@@ -360,12 +411,10 @@ def detect_magnetic_holes_and_generate_outputs(trange, base_save_dir: str, setti
     else:
         print(f"✳️ Using predefined SR of {current_instrument_sampling_rate} Hz for the run (or calculation failed).")
 
-    # Data for the hole detection algorithm (clipped to original trange)
-    times_clipped, bmag_clipped_main = clip_to_original_time_range(times_ext, bmag_ext, trange)
+    # Data for the hole detection algorithm (clipped to original trange), as views from one time search
     # Also clip br, bt, bn to original trange for potential use in outputs or if _detect_magnetic_holes_logic needs them
-    _, br_clipped = clip_to_original_time_range(times_ext, br_ext, trange)
-    _, bt_clipped = clip_to_original_time_range(times_ext, bt_ext, trange)
-    _, bn_clipped = clip_to_original_time_range(times_ext, bn_ext, trange)
+    times_clipped, (bmag_clipped_main, br_clipped, bt_clipped, bn_clipped) = clip_time_views(
+        times_ext, [bmag_ext, br_ext, bt_ext, bn_ext], trange)
 
     if settings.download_only:
         print("Download-only mode activated. Skipping hole detection and related outputs.")
@@ -392,8 +441,8 @@ def detect_magnetic_holes_and_generate_outputs(trange, base_save_dir: str, setti
     bmag_slow_smooth_extended = efficient_moving_average(times_ext, bmag_ext, settings.smoothing_window_seconds, sampling_rate_for_smoothing, settings.mean_threshold)
     bmag_fast_smooth_extended = efficient_moving_average(times_ext, bmag_ext, settings.min_max_finding_smooth_window, sampling_rate_for_smoothing, settings.mean_threshold)
     
-    _, bmag_slow_smooth_clipped = clip_to_original_time_range(times_ext, bmag_slow_smooth_extended, trange)
-    _, bmag_fast_smooth_clipped = clip_to_original_time_range(times_ext, bmag_fast_smooth_extended, trange)
+    _, (bmag_slow_smooth_clipped, bmag_fast_smooth_clipped) = clip_time_views(
+        times_ext, [bmag_slow_smooth_extended, bmag_fast_smooth_extended], trange)
 
     # 3. Perform the core hole detection
     results = _detect_magnetic_holes_logic(
@@ -404,43 +453,8 @@ def detect_magnetic_holes_and_generate_outputs(trange, base_save_dir: str, setti
     magnetic_holes, hole_minima, hole_maxima_pairs, _, _, magnetic_hole_details, returned_counter = results
 
     # 4. Generate outputs based on settings (if not in download_only mode)
-    if settings.OUTPUT_MAIN_PLOT and times_clipped is not None and bmag_clipped_main is not None:
-        print("Generating main plot...")
-        plot_mag_data_with_holes_and_minimum(
-            times_clipped, 
-            bmag_clipped_main, 
-            magnetic_holes, 
-            hole_minima, 
-            hole_maxima_pairs, 
-            settings.PLOT_HOLE_MINIMUM_ON_MAIN_PLOT, 
-            settings.PLOT_THRESH_CROSS_ON_MAIN_PLOT,
-            trange,
-            sub_save_dir, 
-            settings.SAVE_MAIN_PLOT 
-        )
-
-    if settings.IZOTOPE_MARKER_FILE_OUTPUT_MAX_AND_MIN or settings.IZOTOPE_MARKER_FILE_OUTPUT_GENERAL:
-        print("Generating iZotope marker file...")
-        output_magnetic_holes(
-            magnetic_holes,
-            hole_maxima_pairs, 
-            times_clipped,     
-            bmag_clipped_main, # Use the Bmag for the primary trange          
-            settings.IZOTOPE_MARKER_FILE_OUTPUT_GENERAL,
-            settings.IZOTOPE_MARKER_FILE_OUTPUT_MAX_AND_MIN, 
-            trange,
-            settings.MARKER_FILE_VERSION,
-            settings.search_in_progress_output, 
-            sub_save_dir, 
-            current_instrument_sampling_rate, 
-            settings.MARKER_FILES_WITH_ANNOTATED_MARKERS,
-            settings.MARKER_FILES_WITH_HOLE_NUMBERS,
-            magnetic_hole_details # This should contain all info, including angles using original br,bt,bn
-        )
-
-    if settings.EXPORT_AUDIO_FILES:
-        print("Exporting audio files...")
-        audify_high_res_mag_data_without_plot(trange[0], trange[1], sub_save_dir, settings.AUDIO_SAMPLING_RATE, sub_save_dir)
+    generate_hole_outputs(trange, settings, sub_save_dir, times_clipped, bmag_clipped_main,
+                          magnetic_hole_details, current_instrument_sampling_rate)
 
     # 5. Save all run settings to JSON
     settings_file_path = os.path.join(sub_save_dir, 'run_settings_and_summary.json')
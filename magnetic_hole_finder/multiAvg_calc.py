@@ -3,6 +3,7 @@
 from datetime import datetime, timedelta
 import pandas as pd
 import matplotlib.pyplot as plt
+from .rolling_stats import rolling_mean, window_samples
 
 # -------- Time Parsing Helper Function -------- #
 def parse_time_string(time_string):
@@ -17,13 +18,17 @@ def parse_time_string(time_string):
 #🔮 MultiAvg helper functions 🔮
 # -------- Smoothing Function -------- #
 def efficient_moving_average_multiAvg(times, data, window_size_seconds, sampling_rate):
-    window_size_samples = int(window_size_seconds * sampling_rate)  # Calculate window size in number of samples
+    window_size_samples = window_samples(window_size_seconds, sampling_rate)  # Calculate window size in number of samples
 
-    # Use rolling to apply the smoothing
-    smoothed_data = pd.Series(data).rolling(window=window_size_samples, center=True, min_periods=1).mean().to_numpy()
+    # Centred rolling mean
+    smoothed_data = rolling_mean(data, window_size_samples)
     
     return smoothed_data
 
+def efficient_moving_average_multiAvg_windows(times, data, window_sizes_seconds, sampling_rate):
+    """All efficient_moving_average_multiAvg results as one (window, time) array, in a single sweep."""
+    return rolling_mean(data, [window_samples(w, sampling_rate) for w in window_sizes_seconds])
+
 # -------- Time Range Extension Function -------- #
 def extend_time_range_multiAvg(trange, max_window_seconds):
     start_time = parse_time_string(trange[0]) - timedelta(seconds=max_window_seconds)
@@ -0,0 +1,184 @@
+# magnetic_hole_finder/rolling_stats.py
+"""
+Centred rolling mean / standard deviation over one or many window sizes.
+
+The smoothing helpers used to build a new ``pd.Series(data).rolling(...)``
+for every window, and the multi-window heatmap notebooks call them dozens of
+times on the same bmag. Here the NaN-aware prefix sums of the data are built
+once (with compensated summation, on data shifted by its mean to keep the
+sums small)
+and every output sample of every window is an O(1) difference of two prefix
+entries:
+
+    mean = rolling_mean(bmag, window_samples)                  # (n,)
+    means = rolling_mean(bmag, [w1, w2, w3])                    # (3, n)
+    means, stds = rolling_mean_std(bmag, [w1, w2, w3])          # (3, n) each
+
+Results follow ``pd.Series(data).rolling(window, center=True,
+min_periods=min_periods)`` exactly in layout: the same centring for odd and
+even windows, NaNs skipped, NaN where fewer than ``min_periods`` valid samples
+(or, for the std, no more than ``ddof``) fall in the window. Values agree with
+pandas to floating-point rounding. A 2-D result holds one row per window, so
+window x time threshold heatmaps come out of a single call.
+"""
+import math
+import numpy as np
+
+def window_samples(window_seconds, sampling_rate, rounding='int'):
+    """
+    Convert a window length in seconds to samples the way each caller did.
+
+    rounding: 'int' truncates, 'round' rounds and 'ceil' rounds up; 'round'
+    and 'ceil' never return less than one sample.
+    """
+    raw = window_seconds * sampling_rate
+    if rounding == 'round':
+        return max(1, int(round(raw)))
+    if rounding == 'ceil':
+        return max(1, math.ceil(raw))
+    return int(raw)
+
+def _as_windows(windows, min_periods):
+    scalar = np.ndim(windows) == 0
+    windows = np.atleast_1d(np.asarray(windows, dtype=np.int64))
+    if min_periods < 1:
+        raise ValueError(f"min_periods must be >= 1, got {min_periods}")
+    bad = windows[windows < min_periods]
+    if len(bad):
+        # Same condition pd.Series.rolling rejects
+        raise ValueError(f"min_periods {min_periods} must be <= window {int(bad[0])}")
+    return scalar, windows
+
+def _data_and_shift(data):
+    """float64 view of data plus its NaN-mean, subtracted before summing to keep the sums small."""
+    x = np.ascontiguousarray(data, dtype=np.float64)
+    shift = float(np.nanmean(x)) if x.size and not np.isnan(x).all() else 0.0
+    return x, shift
+
+def _prefix_sums_numpy(x, shift, want_sq):
+    # Extended precision stands in for the compensated sums of the numba kernel
+    valid = ~np.isnan(x)
+    values = np.where(valid, x - shift, 0.0).astype(np.longdouble)
+    zero = np.zeros(1, dtype=np.longdouble)
+    return (np.concatenate((zero, np.cumsum(values))),
+            np.concatenate((zero, np.cumsum(values * values))) if want_sq else None,
+            np.concatenate(([0], np.cumsum(valid, dtype=np.int64))))
+
+def _windowed_numpy(s, q, c, windows, min_periods, ddof, want_std, shift):
+    n = len(c) - 1
+    idx = np.arange(n)
+    means = np.empty((len(windows), n))
+    stds = np.empty((len(windows), n if want_std else 0))
+    for k, w in enumerate(windows):
+        end = np.minimum(idx + 1 + (w - 1) // 2, n)
+        start = np.maximum(idx + 1 + (w - 1) // 2 - w, 0)
+        cnt = c[end] - c[start]
+        total = s[end] - s[start]
+        with np.errstate(invalid='ignore', divide='ignore'):
+            means[k] = np.where(cnt >= min_periods, total / cnt + shift, np.nan)
+            if want_std:
+                var = (q[end] - q[start] - total * total / cnt) / (cnt - ddof)
+                ok = (cnt >= min_periods) & (cnt > ddof)
+                stds[k] = np.where(ok, np.sqrt(np.maximum(var, 0.0)), np.nan)
+    return means, stds
+
+try:
+    from numba import njit, prange
+
+    @njit
+    def _prefix_sums_kernel(x, shift, want_sq):
+        """
+        Running sums of x - shift (and its square) over valid samples, and their count.
+
+        The sums are kept as (high, low) pairs with the rounding error of
+        every addition accumulated in the low part (TwoSum), so a window
+        difference deep into a long array keeps its small-variance digits.
+        """
+        n = x.shape[0]
+        s = np.zeros((2, n + 1))
+        q = np.zeros((2, n + 1 if want_sq else 0))
+        c = np.zeros(n + 1, dtype=np.int64)
+        s_hi = 0.0
+        s_lo = 0.0
+        q_hi = 0.0
+        q_lo = 0.0
+        count = 0
+        for i in range(n):
+            v = x[i] - shift
+            if not np.isnan(v):
+                t = s_hi + v
+                b = t - s_hi
+                s_lo += (s_hi - (t - b)) + (v - b)
+                s_hi = t
+                if want_sq:
+                    v2 = v * v
+                    t = q_hi + v2
+                    b = t - q_hi
+                    q_lo += (q_hi - (t - b)) + (v2 - b)
+                    q_hi = t
+                count += 1
+            s[0, i + 1] = s_hi
+            s[1, i + 1] = s_lo
+            if want_sq:
+                q[0, i + 1] = q_hi
+                q[1, i + 1] = q_lo
+            c[i + 1] = count
+        return s, q, c
+
+    @njit(parallel=True)
+    def _windowed_kernel(s, q, c, windows, min_periods, ddof, want_std, shift):
+        """Centred mean (and std) for every window size from shared prefix sums."""
+        n = c.shape[0] - 1
+        n_windows = windows.shape[0]
+        means = np.empty((n_windows, n))
+        stds = np.empty((n_windows, n if want_std else 0))
+        for k in prange(n_windows):
+            w = windows[k]
+            offset = (w - 1) // 2
+            for i in range(n):
+                end = min(i + 1 + offset, n)
+                start = max(i + 1 + offset - w, 0)
+                cnt = c[end] - c[start]
+                total = (s[0, end] - s[0, start]) + (s[1, end] - s[1, start])
+                if cnt >= min_periods:
+                    means[k, i] = total / cnt + shift
+                else:
+                    means[k, i] = np.nan
+                if want_std:
+                    if cnt >= min_periods and cnt > ddof:
+                        sq = (q[0, end] - q[0, start]) + (q[1, end] - q[1, start])
+                        var = (sq - total * total / cnt) / (cnt - ddof)
+                        stds[k, i] = np.sqrt(var) if var > 0.0 else 0.0
+                    else:
+                        stds[k, i] = np.nan
+        return means, stds
+
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+
+def _rolling(data, windows, min_periods, ddof, want_std):
+    scalar, windows = _as_windows(windows, min_periods)
+    x, shift = _data_and_shift(data)
+    if NUMBA_AVAILABLE:
+        s, q, c = _prefix_sums_kernel(x, shift, want_std)
+        means, stds = _windowed_kernel(s, q, c, windows, int(min_periods), int(ddof), want_std, shift)
+    else:
+        means, stds = _windowed_numpy(*_prefix_sums_numpy(x, shift, want_std), windows, min_periods, ddof, want_std, shift)
+    if scalar:
+        return means[0], (stds[0] if want_std else None)
+    return means, (stds if want_std else None)
+
+def rolling_mean(data, windows, min_periods=1):
+    """
+    Centred rolling mean of data for one window (-> (n,)) or a list of windows (-> (len(windows), n)).
+
+    Windows are in samples. Raises ValueError if a window is smaller than min_periods.
+    """
+    return _rolling(data, windows, min_periods, 1, False)[0]
+
+def rolling_mean_std(data, windows, min_periods=1, ddof=1):
+    """Centred rolling mean and standard deviation; shapes as for rolling_mean."""
+    return _rolling(data, windows, min_periods, ddof, True)
+
+__all__ = ['rolling_mean', 'rolling_mean_std', 'window_samples']
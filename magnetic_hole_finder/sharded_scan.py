@@ -0,0 +1,349 @@
+# magnetic_hole_finder/sharded_scan.py
+"""
+Encounter-scale magnetic hole scanning split into overlapping time shards.
+
+    catalogue, summary = scan_magnetic_holes_sharded(
+        ['2023-09-22/00:00:00', '2023-10-02/00:00:00'], base_save_dir, settings,
+        shard_hours=24, workers=8)
+
+The range is cut into consecutive "core" shards (one day by default). Each
+shard is run through detect_magnetic_holes_and_generate_outputs on its core
+range widened by a halo of ``smoothing_window_seconds + Bave_window_seconds``
+on both sides (clamped to the full range), so the slow smoothing and the
+rolling Bave - deltaB used for the hole boundaries see the same data around a
+shard edge as a single long run would. Shards run in a process pool.
+
+A hole belongs to the shard whose core range contains its minimum; holes
+found only in a halo are dropped, and any two holes from different shards
+whose threshold crossings overlap are kept once. The merged catalogue (as
+JSON records and as a plotbot HoleCatalogue .npz) and an aggregate of the
+per-shard run summaries are written to the output directory of the full range.
+
+Detection runs with the per-run outputs (main plot, iZotope markers, hole
+catalogue, audio) switched off. Once the catalogue is merged, every shard
+writes those outputs for its core range only, marking just the holes it owns,
+so a hole near a shard edge is never plotted or marked twice. Shard output
+directories come from the core's resolve_output_directory, as for a single run.
+"""
+import os
+import io
+import copy
+import json
+import tempfile
+import contextlib
+import multiprocessing
+from collections import Counter
+from datetime import datetime, timedelta
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import numpy as np
+import pandas as pd
+from dateutil.parser import parse as dateutil_parse
+
+TIME_FORMAT = '%Y-%m-%d/%H:%M:%S.%f'
+
+# Hole detail fields that are sample indices into the shard's clipped arrays
+INDEX_FIELDS = ('L_threshold_cross', 'R_threshold_cross', 'min_idx', 'left_max_value_idx', 'right_max_value_idx', 'tS', 'tE')
+
+# HoleFinderSettings flags for the per-run outputs, written only after the merge
+OUTPUT_FLAGS = ('OUTPUT_MAIN_PLOT', 'IZOTOPE_MARKER_FILE_OUTPUT_MAX_AND_MIN', 'IZOTOPE_MARKER_FILE_OUTPUT_GENERAL',
+                'SAVE_HOLE_CATALOGUE', 'EXPORT_AUDIO_FILES')
+
+def shard_halo_seconds(settings):
+    """Overlap needed on each side of a shard so its smoothing and Bave windows are complete."""
+    return settings.smoothing_window_seconds + settings.Bave_window_seconds
+
+def split_trange_into_shards(trange, shard_seconds, halo_seconds):
+    """
+    Split trange into consecutive core shards of ``shard_seconds``.
+
+    Returns:
+        list of (core_trange, detect_trange) pairs of TIME_FORMAT strings; the
+        detect range is the core widened by ``halo_seconds`` but never beyond trange.
+    """
+    start, end = dateutil_parse(trange[0]), dateutil_parse(trange[1])
+    if end <= start:
+        raise ValueError(f"Invalid time range for sharding: {trange}")
+    if shard_seconds <= 0:
+        raise ValueError(f"shard_seconds must be positive, got {shard_seconds}")
+    step, halo = timedelta(seconds=shard_seconds), timedelta(seconds=halo_seconds)
+    shards = []
+    core_start = start
+    while core_start < end:
+        core_end = min(core_start + step, end)
+        detect = (max(start, core_start - halo), min(end, core_end + halo))
+        shards.append(([core_start.strftime(TIME_FORMAT), core_end.strftime(TIME_FORMAT)],
+                       [detect[0].strftime(TIME_FORMAT), detect[1].strftime(TIME_FORMAT)]))
+        core_start = core_end
+    return shards
+
+def _time_str(t):
+    return pd.Timestamp(t).strftime(TIME_FORMAT)
+
+def hole_records(times_clipped, magnetic_hole_details, shard_index):
+    """Convert per-shard hole details (sample indices) into time-stamped records."""
+    records = []
+    for details in magnetic_hole_details:
+        record = {'shard': shard_index}
+        for key, value in details.items():
+            if key in INDEX_FIELDS:
+                record[f"{key}_time"] = _time_str(times_clipped[value]) if value is not None else None
+            elif isinstance(value, (np.bool_, bool)):
+                record[key] = bool(value)
+            elif isinstance(value, (np.integer, int)):
+                record[key] = int(value)
+            elif isinstance(value, (np.floating, float)):
+                record[key] = float(value)
+            else:
+                record[key] = value
+        records.append(record)
+    return records
+
+def hole_details(times_clipped, records):
+    """
+    Convert hole records back into hole details with sample indices into times_clipped.
+
+    Record times are rounded down to the microsecond, so the first sample at
+    or after each time is the sample it came from; times outside the array
+    are clamped to its ends.
+    """
+    times_ns = np.asarray(times_clipped).astype('datetime64[ns]')
+    details = []
+    for record in records:
+        details_of_hole = {}
+        for key, value in record.items():
+            field = key[:-len('_time')] if key.endswith('_time') else None
+            if field in INDEX_FIELDS:
+                if value is not None:
+                    index = np.searchsorted(times_ns, np.datetime64(dateutil_parse(value), 'ns'))
+                    value = int(min(index, len(times_ns) - 1))
+                details_of_hole[field] = value
+            elif key != 'shard':
+                details_of_hole[key] = value
+        details.append(details_of_hole)
+    return details
+
+def merge_shard_holes(shard_results):
+    """
+    Merge per-shard hole records into one catalogue sorted by minimum time.
+
+    Each shard keeps the holes whose minimum lies inside its core range (the
+    last shard's end is inclusive); then a hole is dropped if its threshold
+    crossings overlap the previously kept hole from another shard.
+    """
+    owned = []
+    last_index = max((r['index'] for r in shard_results), default=-1)
+    for result in shard_results:
+        core_start = pd.Timestamp(dateutil_parse(result['core_trange'][0]))
+        core_end = pd.Timestamp(dateutil_parse(result['core_trange'][1]))
+        for record in result['holes']:
+            t_min = pd.Timestamp(dateutil_parse(record['min_idx_time']))
+            if core_start <= t_min and (t_min < core_end or (result['index'] == last_index and t_min == core_end)):
+                owned.append((t_min, record))
+    owned.sort(key=lambda item: item[0])
+
+    catalogue = []
+    for _, record in owned:
+        if catalogue:
+            previous = catalogue[-1]
+            if (previous['shard'] != record['shard']
+                    and record['L_threshold_cross_time'] <= previous['R_threshold_cross_time']
+                    and previous['L_threshold_cross_time'] <= record['R_threshold_cross_time']):
+                continue
+        catalogue.append(record)
+    return catalogue
+
+def _detection_settings(settings):
+    """Copy of settings with the per-run outputs switched off."""
+    detection_settings = copy.copy(settings)
+    for flag in OUTPUT_FLAGS:
+        setattr(detection_settings, flag, False)
+    return detection_settings
+
+def _run_shard(index, core_trange, detect_trange, base_save_dir, settings):
+    """Detect holes over one shard's detect range without writing outputs; runs in a worker."""
+    from .magnetic_hole_finder_core import detect_magnetic_holes_and_generate_outputs, resolve_output_directory
+
+    # The run summary the core writes is read back from a scratch directory; outputs come after the merge
+    with tempfile.TemporaryDirectory(prefix='magnetic_hole_shard_') as scratch_dir:
+        _, _, _, times_clipped, _, details, counter = detect_magnetic_holes_and_generate_outputs(
+            detect_trange, scratch_dir, _detection_settings(settings))
+        with contextlib.redirect_stdout(io.StringIO()):
+            summary_path = os.path.join(resolve_output_directory(detect_trange, scratch_dir), 'run_settings_and_summary.json')
+        summary = {}
+        if os.path.exists(summary_path):
+            with open(summary_path) as f:
+                summary = json.load(f)
+    summary.pop('sub_save_dir', None)
+    holes = hole_records(times_clipped, details, index) if times_clipped is not None and len(times_clipped) else []
+    return {'index': index, 'core_trange': core_trange, 'detect_trange': detect_trange,
+            'hole_counts': dict(counter), 'summary': summary, 'holes': holes}
+
+def _write_shard_outputs(core_trange, base_save_dir, settings, records, summary):
+    """
+    Write the per-run outputs for one shard's core range, marking only the
+    catalogue holes it owns, plus its run summary; runs in a worker.
+
+    Returns:
+        str: The shard's output directory.
+    """
+    from .magnetic_hole_finder_core import generate_hole_outputs, resolve_output_directory
+
+    sub_save_dir = resolve_output_directory(core_trange, base_save_dir)
+    if any(getattr(settings, flag, False) for flag in OUTPUT_FLAGS):
+        from .data_management import download_and_prepare_high_res_mag_data
+        from .time_management import clip_time_views, determine_sampling_rate
+
+        times, _, _, _, bmag = download_and_prepare_high_res_mag_data(core_trange)
+        if times is None or bmag is None:
+            raise RuntimeError(f"no data to write outputs for {core_trange}")
+        times_clipped, (bmag_clipped,) = clip_time_views(times, [bmag], core_trange)
+        sampling_rate = determine_sampling_rate(times_clipped, settings.INSTRUMENT_SAMPLING_RATE,
+                                                settings.use_calculated_sampling_rate)
+        generate_hole_outputs(core_trange, settings, sub_save_dir, times_clipped, bmag_clipped,
+                              hole_details(times_clipped, records), sampling_rate)
+
+    shard_summary = settings.__dict__.copy()
+    shard_summary.update({key: value for key, value in summary.items() if key not in shard_summary})
+    shard_summary.update({'trange_run': core_trange, 'sub_save_dir': sub_save_dir, 'holes_in_catalogue': len(records)})
+    with open(os.path.join(sub_save_dir, 'run_settings_and_summary.json'), 'w') as f:
+        json.dump(shard_summary, f, indent=4, default=str)
+    return sub_save_dir
+
+def _plotbot_config():
+    """The parent's plotbot data settings, passed to spawned workers (which start from the defaults)."""
+    from plotbot.config import config
+    return config.data_dir, config.data_server
+
+def _run_tasks(tasks, workers, collect):
+    """Run (index, func, args) tasks here (workers == 1) or in a spawned pool, passing each to collect(index, run)."""
+    if workers == 1:
+        for index, func, args in tasks:
+            collect(index, lambda: func(*args))
+        return
+    ctx = multiprocessing.get_context('spawn')
+    with ProcessPoolExecutor(max_workers=workers, mp_context=ctx,
+                             initializer=_init_worker, initargs=_plotbot_config()) as pool:
+        futures = {pool.submit(func, *args): index for index, func, args in tasks}
+        for future in as_completed(futures):
+            collect(futures[future], future.result)
+
+def _init_worker(data_dir=None, data_server=None):
+    import matplotlib
+    matplotlib.use('Agg', force=True)
+    from plotbot.config import config
+    with contextlib.redirect_stdout(io.StringIO()):
+        if data_dir is not None:
+            config.data_dir = data_dir
+        if data_server is not None:
+            config.data_server = data_server
+
+def aggregate_shard_summaries(trange, settings, shard_results, catalogue):
+    """Combine the per-shard run summaries into one run_settings_and_summary dict."""
+    total_counts = Counter()
+    shards = []
+    for result in sorted(shard_results, key=lambda r: r['index']):
+        total_counts.update(result.get('hole_counts', {}))
+        shards.append({
+            'index': result['index'],
+            'core_trange': result['core_trange'],
+            'detect_trange': result['detect_trange'],
+            'sub_save_dir': result.get('sub_save_dir'),
+            'status': result.get('summary', {}).get('status', 'ERROR' if result.get('error') else 'OK'),
+            'error': result.get('error'),
+            'output_error': result.get('output_error'),
+            'hole_counts': result.get('hole_counts', {}),
+            'holes_in_catalogue': sum(1 for record in catalogue if record['shard'] == result['index']),
+        })
+    aggregated = settings.__dict__.copy()
+    aggregated.update({
+        'trange_run': trange,
+        'sharded': True,
+        'shard_halo_seconds': shard_halo_seconds(settings),
+        'shards': shards,
+        'hole_counts': dict(total_counts),  # Summed over shards, halo candidates included
+        'holes_in_catalogue': len(catalogue),
+        'failed_shards': [s['index'] for s in shards if s['error']],
+    })
+    return aggregated
+
+#====================================================================
+# FUNCTION: scan_magnetic_holes_sharded, Parallel encounter-scale scan
+#====================================================================
+def scan_magnetic_holes_sharded(trange, base_save_dir, settings, shard_hours=24.0, workers=None, batch_save_dir=None):
+    """
+    Detect magnetic holes over a long range by scanning overlapping shards in parallel.
+
+    Args:
+        trange (list): [start, end] time strings for the whole sweep.
+        base_save_dir (str): Base output directory, as for detect_magnetic_holes_and_generate_outputs.
+        settings (HoleFinderSettings): Settings applied to every shard.
+        shard_hours (float): Core length of each shard in hours.
+        workers (int, optional): Worker processes. Defaults to the number of
+            CPUs; 1 runs the shards one after another in this process.
+        batch_save_dir (str, optional): Where the merged catalogue and summary
+            are written. Defaults to the output directory of the full range.
+
+    Returns:
+        tuple: (catalogue, summary) - the merged list of hole records and the
+        aggregated run summary.
+    """
+    shards = split_trange_into_shards(trange, shard_hours * 3600.0, shard_halo_seconds(settings))
+    n_shards = len(shards)
+    if workers is None:
+        workers = os.cpu_count() or 1
+    workers = max(1, min(int(workers), n_shards))
+    print(f"🧩 Scanning {trange[0]} to {trange[1]} in {n_shards} shard(s) with {workers} worker(s), "
+          f"halo {shard_halo_seconds(settings):.1f}s")
+
+    results = []
+    def _collect(index, run):
+        core_trange, detect_trange = shards[index]
+        try:
+            results.append(run())
+            print(f"✅ Shard {index + 1}/{n_shards} done ({core_trange[0]} to {core_trange[1]})")
+        except Exception as e:
+            print(f"⛔️ Shard {index + 1}/{n_shards} failed ({core_trange[0]} to {core_trange[1]}): {e}")
+            results.append({'index': index, 'core_trange': core_trange, 'detect_trange': detect_trange,
+                            'hole_counts': {}, 'holes': [], 'error': str(e)})
+
+    _run_tasks([(index, _run_shard, (index, core_trange, detect_trange, base_save_dir, settings))
+                for index, (core_trange, detect_trange) in enumerate(shards)], workers, _collect)
+    results.sort(key=lambda r: r['index'])
+
+    catalogue = merge_shard_holes([r for r in results if not r.get('error')])
+
+    # Per-shard outputs, each with only the holes the shard owns in the merged catalogue
+    succeeded = {r['index']: r for r in results if not r.get('error')}
+    def _collect_outputs(index, run):
+        try:
+            succeeded[index]['sub_save_dir'] = run()
+        except Exception as e:
+            print(f"⛔️ Shard {index + 1}/{n_shards} outputs failed: {e}")
+            succeeded[index]['output_error'] = str(e)
+
+    _run_tasks([(index, _write_shard_outputs,
+                 (result['core_trange'], base_save_dir, settings,
+                  [record for record in catalogue if record['shard'] == index], result.get('summary', {})))
+                for index, result in succeeded.items()], workers, _collect_outputs)
+    summary = aggregate_shard_summaries(trange, settings, results, catalogue)
+
+    if batch_save_dir is None:
+        from .magnetic_hole_finder_core import resolve_output_directory
+        batch_save_dir = resolve_output_directory(trange, base_save_dir)
+    os.makedirs(batch_save_dir, exist_ok=True)
+    summary['sub_save_dir'] = batch_save_dir
+    catalogue_path = os.path.join(batch_save_dir, 'magnetic_hole_catalogue.json')
+    with open(catalogue_path, 'w') as f:
+        json.dump(catalogue, f, indent=4, default=str)
+    if getattr(settings, 'SAVE_HOLE_CATALOGUE', True):
+        from plotbot.hole_catalogue import HoleCatalogue
+        HoleCatalogue.from_records(catalogue).save(os.path.join(batch_save_dir, 'magnetic_hole_catalogue.npz'))
+    summary_path = os.path.join(batch_save_dir, 'run_settings_and_summary.json')
+    with open(summary_path, 'w') as f:
+        json.dump(summary, f, indent=4, default=str)
+    print(f"🕳️ {len(catalogue)} magnetic holes in merged catalogue: {catalogue_path}")
+    print(f"Run settings and summary saved to: {summary_path}")
+    return catalogue, summary
+
+__all__ = ['scan_magnetic_holes_sharded', 'split_trange_into_shards', 'merge_shard_holes', 'shard_halo_seconds', 'hole_details']
@@ -2,12 +2,14 @@
 
 from datetime import datetime, timedelta
 from datetime import datetime, timedelta
+import numpy as np
 import pandas as pd
 import matplotlib.pyplot as plt
+from .rolling_stats import rolling_mean_std, window_samples
 
 #Standard Deviation Helper Functions!
 def calculate_moving_stdev(data, window_seconds, sampling_rate):
-    window_size = int(window_seconds * sampling_rate)  # Calculate window size in number of samples
+    window_size = window_samples(window_seconds, sampling_rate)  # Calculate window size in number of samples
     # print(f"Window size (in samples): {window_size} for {window_seconds}s window")
     
     # Ensure the window size is smaller than the data length
@@ -15,8 +17,8 @@ def calculate_moving_stdev(data, window_seconds, sampling_rate):
         # print(f"Window size {window_size} is larger than data length; returning NaN array.")
         return np.full(len(data), np.nan)
     
-    # Use rolling with min_periods=1 to handle edge cases
-    moving_stdev = pd.Series(data).rolling(window=window_size, center=True, min_periods=1).std().to_numpy()
+    # Centred rolling std with min_periods=1 to handle edge cases
+    moving_stdev = rolling_mean_std(data, window_size)[1]
     
     return moving_stdev
 
@@ -42,11 +44,16 @@ def clip_to_original_time_range_stdev(times, data, trange):
 # -------- Calculate Stdev and Bounds Function -------- #
 def calculate_stdev_and_bounds(bmag, smoothing_windows, sampling_rate):
     stdev_bounds_dict = {}
-    
-    for window_seconds in smoothing_windows:
+
+    # Mean and stdev for every window in one sweep over bmag
+    windows = [window_samples(w, sampling_rate) for w in smoothing_windows]
+    moving_avgs, moving_stdevs = rolling_mean_std(bmag, windows)
+
+    for k, window_seconds in enumerate(smoothing_windows):
         print(f"\nProcessing window: {window_seconds}s")
-        moving_stdev = calculate_moving_stdev(bmag, window_seconds, sampling_rate)
-        moving_avg = pd.Series(bmag).rolling(window=int(window_seconds * sampling_rate), center=True, min_periods=1).mean().to_numpy()
+        moving_avg = moving_avgs[k]
+        # Windows at least as long as the data have no stdev (see calculate_moving_stdev)
+        moving_stdev = np.full(len(bmag), np.nan) if windows[k] >= len(bmag) else moving_stdevs[k]
 
         # Calculate the upper and lower bounds
         upper_bound = moving_avg + moving_stdev
@@ -5,6 +5,7 @@ import sys
 import math
 from dateutil.parser import parse as dateutil_parse # Import dateutil parser
 import numpy as np
+from .rolling_stats import rolling_mean, window_samples
 
 
 def time_check(trange):
@@ -129,20 +130,40 @@ def extend_time_range(trange, max_window_seconds):
     return [start_time_extended.strftime('%Y-%m-%d/%H:%M:%S.%f'), 
             end_time_extended.strftime('%Y-%m-%d/%H:%M:%S.%f')]
 
-def clip_to_original_time_range(times, data, trange):
+def _parse_trange_bounds(trange, caller):
     try:
         # Use dateutil.parser.parse for flexibility and convert to pandas Timestamp for comparison
-        trange_start_dt = pd.Timestamp(dateutil_parse(trange[0]))
-        trange_end_dt = pd.Timestamp(dateutil_parse(trange[1]))
+        return pd.Timestamp(dateutil_parse(trange[0])), pd.Timestamp(dateutil_parse(trange[1]))
     except Exception as e:
-        print(f"⛔️ Error parsing time range in clip_to_original_time_range: {trange}. Error: {e}")
-        raise ValueError(f"Invalid time range format for clip_to_original_time_range: {trange}") from e
+        print(f"⛔️ Error parsing time range in {caller}: {trange}. Error: {e}")
+        raise ValueError(f"Invalid time range format for {caller}: {trange}") from e
+
+def time_slice(times, trange):
+    """
+    Index selecting trange[0] <= times <= trange[1].
 
+    For a sorted datetime64 array this is a slice found by binary search, so
+    indexing with it gives views rather than copies; otherwise (unsorted or
+    overlapping merged times) a boolean mask.
+    """
+    trange_start_dt, trange_end_dt = _parse_trange_bounds(trange, 'time_slice')
+    if isinstance(times, np.ndarray) and times.dtype.kind == 'M' and np.all(times[1:] >= times[:-1]):
+        unit = np.datetime_data(times.dtype)[0]
+        start = np.searchsorted(times, np.datetime64(trange_start_dt.to_datetime64(), unit), side='left')
+        stop = np.searchsorted(times, np.datetime64(trange_end_dt.to_datetime64(), unit), side='right')
+        return slice(int(start), int(max(start, stop)))
     # Assuming 'times' is already a pandas Series of Timestamps or numpy array of datetime64
-    # If 'times' is not already datetime-like, it needs conversion: times_dt = pd.to_datetime(times)
-    mask = (times >= trange_start_dt) & (times <= trange_end_dt)
-    times_clipped = times[mask]
-    data_clipped = data[mask]
+    return (times >= trange_start_dt) & (times <= trange_end_dt)
+
+def clip_time_views(times, arrays, trange):
+    """Clip times and every array in ``arrays`` to trange in one search; returns (times, [arrays])."""
+    index = time_slice(times, trange)
+    return times[index], [None if data is None else data[index] for data in arrays]
+
+def clip_to_original_time_range(times, data, trange):
+    index = time_slice(times, trange)
+    times_clipped = times[index]
+    data_clipped = data[index]
     return times_clipped, data_clipped
 
 
@@ -170,30 +191,30 @@ def efficient_moving_average(times, data, window_size_seconds, sampling_rate, me
         return data # Or raise error, or return None, or np.full_like(data, np.nan)
 
     # Calculate window size in number of samples
-    # Ensure that window_size_samples is at least 1 for pd.rolling if min_periods is 1
+    # Ensure that window_size_samples is at least 1 since min_periods is 1
     calculated_raw_samples = window_size_seconds * sampling_rate
-    window_size_samples = max(1, int(round(calculated_raw_samples))) # Round before int, ensure at least 1
+    window_size_samples = window_samples(window_size_seconds, sampling_rate, 'round') # Round before int, ensure at least 1
 
     # Debug output to understand values
     print(f"EFFICIENT_MOVING_AVG_DEBUG: window_sec={window_size_seconds}, sr={sampling_rate:.2f}, raw_samples_calc={calculated_raw_samples:.2f}, rolling_window_arg={window_size_samples}")
 
     if len(data) < window_size_samples:
         print(f"Warning: Data length ({len(data)}) is less than rolling window size ({window_size_samples}). Result may be all NaNs or affect edge cases.")
-        # Pandas rolling with min_periods=1 will handle this by producing what it can.
+        # The rolling mean with min_periods=1 will handle this by producing what it can.
 
     half_window_size = window_size_samples // 2
 
     # print(f"Calculating {window_size_seconds}-second moving average with window size: {window_size_samples} samples")
 
-    # Use rolling to apply the smoothing - ensure window is at least 1
+    # Centred rolling mean (same windows as pd.Series.rolling(center=True, min_periods=1)) - ensure window is at least 1
     try:
-        smoothed_data = pd.Series(data).rolling(window=window_size_samples, center=True, min_periods=1).mean().to_numpy()
+        smoothed_data = rolling_mean(data, window_size_samples)
     except ValueError as ve:
-        print(f"Error in pd.Series.rolling: {ve}")
+        print(f"Error in rolling_mean: {ve}")
         print(f"  Inputs were: data len={len(data)}, window={window_size_samples}, center=True, min_periods=1")
         # Fallback to using a window of 1 with warning
         print(f"  Falling back to minimum window size of 1")
-        smoothed_data = pd.Series(data).rolling(window=1, center=True, min_periods=1).mean().to_numpy()
+        smoothed_data = rolling_mean(data, 1)
 
     # Apply the mean threshold multiplier
     smoothed_data = smoothed_data * mean_threshold
@@ -205,16 +226,26 @@ def efficient_moving_average(times, data, window_size_seconds, sampling_rate, me
 
 def efficient_moving_average_for_heatmap(times, data, window_size_seconds, sampling_rate):
     # Ensure that window_size_samples is at least 1 sample
-    window_size_samples = max(1, math.ceil(window_size_seconds * sampling_rate))  # Use math.ceil to avoid window size 0
+    window_size_samples = window_samples(window_size_seconds, sampling_rate, 'ceil')  # Use math.ceil to avoid window size 0
 
     # Debugging print to verify window size
     print(f"Window size (seconds): {window_size_seconds}, Window size (samples): {window_size_samples}")
 
-    # Use rolling to apply the smoothing
-    smoothed_data = pd.Series(data).rolling(window=window_size_samples, center=True, min_periods=1).mean().to_numpy()
+    # Centred rolling mean
+    smoothed_data = rolling_mean(data, window_size_samples)
 
     return smoothed_data
 
+def efficient_moving_average_for_heatmap_windows(times, data, window_sizes_seconds, sampling_rate):
+    """
+    efficient_moving_average_for_heatmap for many window sizes in one sweep.
+
+    Returns a (len(window_sizes_seconds), len(data)) array, one smoothed row per window.
+    """
+    windows = [window_samples(w, sampling_rate, 'ceil') for w in window_sizes_seconds]
+    print(f"Window sizes (seconds): {list(window_sizes_seconds)}, Window sizes (samples): {windows}")
+    return rolling_mean(data, windows)
+
 
 
 
@@ -79,82 +79,116 @@ with time_block("core_components"):
 # Import helper functions needed for export
 from .plotbot_helpers import time_clip
 
-# Import data classes and their instances (Updated Paths)
-with time_block("psp_data_classes"):
-    from .data_classes.psp_mag_rtn_4sa import mag_rtn_4sa, mag_rtn_4sa_class
-    from .data_classes.psp_mag_rtn import mag_rtn, mag_rtn_class
-    from .data_classes.psp_mag_sc_4sa import mag_sc_4sa, mag_sc_4sa_class
-    from .data_classes.psp_mag_sc import mag_sc, mag_sc_class
-    from .data_classes.psp_electron_classes import epad, epad_hr, epad_strahl_class, epad_strahl_high_res_class
-    from .data_classes.psp_proton import proton, proton_class
-    from .data_classes.psp_proton_hr import proton_hr, proton_hr_class
-    from .data_classes.psp_proton_fits_classes import proton_fits # Import the FITS class
-    from .data_classes.psp_alpha_fits_classes import alpha_fits, alpha_fits_class # Import the alpha FITS class
-    from .data_classes.psp_ham_classes import ham, ham_class # ADDED: Import the HAM class instance and class
-
-# WIND satellite data classes
-with time_block("wind_data_classes"):
-    from .data_classes.wind_mfi_classes import wind_mfi_h2, wind_mfi_h2_class
-    from .data_classes.wind_3dp_classes import wind_3dp_elpd, wind_3dp_elpd_class
-    from .data_classes.wind_swe_h5_classes import wind_swe_h5, wind_swe_h5_class
-    from .data_classes.wind_swe_h1_classes import wind_swe_h1, wind_swe_h1_class
-    from .data_classes.wind_3dp_pm_classes import wind_3dp_pm, wind_3dp_pm_class
-    from .data_classes.psp_alpha_classes import psp_alpha, psp_alpha_class
-    from .data_classes.psp_qtn_classes import psp_qtn, psp_qtn_class
-    from .data_classes.psp_dfb_classes import psp_dfb, psp_dfb_class
-    from .data_classes.psp_orbit import psp_orbit, psp_orbit_class
-    from .data_classes.psp_span_vdf import psp_span_vdf, psp_span_vdf_class
-
-# ==============================================================================
-# Custom Class Imports (auto-generated)
-# To add new classes: run cdf_to_plotbot('path/to/file.cdf') and this will be updated
-# ------------------------------------------------------------------------------
-# ✨ Custom classes now load DYNAMICALLY via _auto_register_custom_classes()
-# ✨ No manual imports needed! Just run cdf_to_plotbot() and classes appear automatically.
-# ------------------------------------------------------------------------------
-# ==============================================================================
-
-# Import custom generated classes explicitly for type hinting and IDE support
-# (psp_waves_timeseries and psp_waves_spectral removed - will regenerate with auto-naming)
-
-
-# --- Explicitly Register Global Instances with DataCubby --- #
+# --- Data class singletons, loaded on first access --- #
+# Importing a data class module builds its singleton and plot_manager scaffolding,
+# so instead of importing every module here each instance is registered with
+# data_cubby as a LazyDataClass. plotbot.<name> (see __getattr__ below),
+# data_cubby.grab() and type lookups import the module and stash the instance.
+_DATA_CLASS_INSTANCES = {
+    # instance name: (module, class name)
+    'mag_rtn_4sa': ('.data_classes.psp_mag_rtn_4sa', 'mag_rtn_4sa_class'),
+    'mag_rtn': ('.data_classes.psp_mag_rtn', 'mag_rtn_class'),
+    'mag_sc_4sa': ('.data_classes.psp_mag_sc_4sa', 'mag_sc_4sa_class'),
+    'mag_sc': ('.data_classes.psp_mag_sc', 'mag_sc_class'),
+    'epad': ('.data_classes.psp_electron_classes', 'epad_strahl_class'),
+    'epad_hr': ('.data_classes.psp_electron_classes', 'epad_strahl_high_res_class'),
+    'proton': ('.data_classes.psp_proton', 'proton_class'),
+    'proton_hr': ('.data_classes.psp_proton_hr', 'proton_hr_class'),
+    'proton_fits': ('.data_classes.psp_proton_fits_classes', 'proton_fits_class'),
+    'alpha_fits': ('.data_classes.psp_alpha_fits_classes', 'alpha_fits_class'),
+    'ham': ('.data_classes.psp_ham_classes', 'ham_class'),
+    # WIND satellite data classes
+    'wind_mfi_h2': ('.data_classes.wind_mfi_classes', 'wind_mfi_h2_class'),
+    'wind_3dp_elpd': ('.data_classes.wind_3dp_classes', 'wind_3dp_elpd_class'),
+    'wind_3dp_pm': ('.data_classes.wind_3dp_pm_classes', 'wind_3dp_pm_class'),
+    'wind_swe_h5': ('.data_classes.wind_swe_h5_classes', 'wind_swe_h5_class'),
+    'wind_swe_h1': ('.data_classes.wind_swe_h1_classes', 'wind_swe_h1_class'),
+    'psp_alpha': ('.data_classes.psp_alpha_classes', 'psp_alpha_class'),
+    'psp_qtn': ('.data_classes.psp_qtn_classes', 'psp_qtn_class'),
+    'psp_dfb': ('.data_classes.psp_dfb_classes', 'psp_dfb_class'),
+    'psp_orbit': ('.data_classes.psp_orbit', 'psp_orbit_class'),
+    'psp_span_vdf': ('.data_classes.psp_span_vdf', 'psp_span_vdf_class'),
+}
+
+# Individual DFB data types share the psp_dfb instance
+_DATA_CLASS_ALIASES = {
+    'dfb_ac_spec_dv12hg': 'psp_dfb',
+    'dfb_ac_spec_dv34hg': 'psp_dfb',
+    'dfb_dc_spec_dv12hg': 'psp_dfb',
+}
+
+# Heavy functions and modules, imported on first access: name -> (module, attribute; None for the module itself)
+_LAZY_ATTRIBUTES = {
+    'plotbot_interactive_vdf': ('.plotbot_interactive_vdf', 'plotbot_interactive_vdf'),
+    'multiplot': ('.multiplot', 'multiplot'),
+    'multiplot_batch': ('.multiplot_batch', 'multiplot_batch'),
+    'vdyes': ('.vdyes', 'vdyes'),
+    'render_vdf_frames': ('.vdf_batch', 'render_vdf_frames'),
+    'prefetch': ('.prefetch', 'prefetch'),
+    'data_snapshot': ('.data_snapshot', None),
+    'showda_holes': ('.showda_holes', 'showda_holes'),
+    'HoleCatalogue': ('.hole_catalogue', 'HoleCatalogue'),
+    'memory_report': ('.memory_inspector', 'memory_report'),
+    'format_memory_report': ('.memory_inspector', 'format_memory_report'),
+    'track_peak': ('.memory_inspector', 'track_peak'),
+    'cdf_to_plotbot': ('.data_import_cdf', 'cdf_to_plotbot'),
+    'scan_cdf_directory': ('.data_import_cdf', 'scan_cdf_directory'),
+}
+# Data class types (mag_rtn_4sa_class, ...) come from the same modules as their instances
+for _module_path, _class_name in _DATA_CLASS_INSTANCES.values():
+    _LAZY_ATTRIBUTES[_class_name] = (_module_path, _class_name)
+
+import sys
+import types
+import importlib
+
 with time_block("data_cubby_registration"):
-    data_cubby.stash(mag_rtn_4sa, class_name='mag_rtn_4sa')
-    data_cubby.stash(mag_rtn, class_name='mag_rtn')
-    data_cubby.stash(mag_sc_4sa, class_name='mag_sc_4sa')
-    data_cubby.stash(mag_sc, class_name='mag_sc')
-    data_cubby.stash(epad, class_name='epad')
-    data_cubby.stash(epad_hr, class_name='epad_hr')
-    data_cubby.stash(proton, class_name='proton')
-    data_cubby.stash(proton_hr, class_name='proton_hr')
-    data_cubby.stash(proton_fits, class_name='proton_fits')
-    data_cubby.stash(alpha_fits, class_name='alpha_fits')
-    data_cubby.stash(ham, class_name='ham')
-    # Register WIND satellite instances
-    data_cubby.stash(wind_mfi_h2, class_name='wind_mfi_h2')
-    data_cubby.stash(wind_3dp_elpd, class_name='wind_3dp_elpd')
-    data_cubby.stash(wind_3dp_pm, class_name='wind_3dp_pm')
-    data_cubby.stash(psp_alpha, class_name='psp_alpha')
-    data_cubby.stash(wind_swe_h5, class_name='wind_swe_h5')
-    data_cubby.stash(wind_swe_h1, class_name='wind_swe_h1')
-    data_cubby.stash(psp_span_vdf, class_name='psp_span_vdf')
-    data_cubby.stash(psp_qtn, class_name='psp_qtn')
-    data_cubby.stash(psp_dfb, class_name='psp_dfb')
-    data_cubby.stash(psp_orbit, class_name='psp_orbit')
-    # Register individual DFB data types to the same psp_dfb instance
-    data_cubby.stash(psp_dfb, class_name='dfb_ac_spec_dv12hg')
-    data_cubby.stash(psp_dfb, class_name='dfb_ac_spec_dv34hg')
-    data_cubby.stash(psp_dfb, class_name='dfb_dc_spec_dv12hg')
+    from .lazy_loader import LazyDataClass, register_lazy_object
+    for _name, (_module_path, _class_name) in _DATA_CLASS_INSTANCES.items():
+        _lazy_instance = LazyDataClass(__name__ + _module_path, _class_name, _name)
+        register_lazy_object(_name, _lazy_instance)
+        data_cubby.register_lazy(_name, _lazy_instance)
+    for _alias, _name in _DATA_CLASS_ALIASES.items():
+        data_cubby.register_lazy(_alias, data_cubby._LAZY_INSTANCES[_name])
+
+class _PlotbotModule(types.ModuleType):
+    """plotbot's module type: keeps submodule imports from shadowing lazy functions."""
+    def __setattr__(self, name, value):
+        # Importing plotbot.multiplot binds the submodule to plotbot.multiplot;
+        # skip that so __getattr__ still returns the multiplot() function.
+        if isinstance(value, types.ModuleType) and _LAZY_ATTRIBUTES.get(name, (None, None))[1] is not None:
+            return
+        super().__setattr__(name, value)
+
+sys.modules[__name__].__class__ = _PlotbotModule
+
+def __getattr__(name):
+    """Import data class singletons, heavy functions and CLASS_NAME_MAPPING on first access."""
+    if name in _DATA_CLASS_INSTANCES or name in _CUSTOM_CLASS_NAMES:
+        value = data_cubby.load_lazy(name)
+    elif name in _LAZY_ATTRIBUTES:
+        module_path, attribute = _LAZY_ATTRIBUTES[name]
+        with time_block(f"lazy_{name}"):
+            module = importlib.import_module(module_path, __name__)
+        value = module if attribute is None else getattr(module, attribute)
+    elif name == 'CLASS_NAME_MAPPING':
+        value = _class_name_mapping()
+    else:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    globals()[name] = value  # Later lookups skip __getattr__
+    return value
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
 
 # --- Auto-register Custom CDF Classes --- #
 # Initialize __all__ early so custom classes can be added
 __all__ = []
 
+_CUSTOM_CLASS_NAMES = set()
+
 def _auto_register_custom_classes():
-    """Automatically scan and register all classes in data_classes/custom_classes/"""
-    import os
-    import importlib
+    """Expose the classes in data_classes/custom_classes/ (registered lazily by data_cubby)"""
     from pathlib import Path
     
     custom_classes_dir = Path(__file__).parent / "data_classes" / "custom_classes"
@@ -168,26 +202,13 @@ def _auto_register_custom_classes():
             continue  # Skip __init__.py etc.
             
         module_name = py_file.stem
-        try:
-            # Import the module
-            module = importlib.import_module(f"plotbot.data_classes.custom_classes.{module_name}")
-            
-            # Look for class instance (follows pattern: module_name = module_name_class(None))
-            if hasattr(module, module_name):
-                class_instance = getattr(module, module_name)
-                data_cubby.stash(class_instance, class_name=module_name)
-                print_manager.datacubby(f"Auto-registered custom class: {module_name}")
-
-                # --- THIS IS THE CRITICAL FIX ---
-                # Inject the class instance into the main plotbot module's globals
-                globals()[module_name] = class_instance
-                # Also add to __all__ so it can be imported with `from plotbot import *`
-                if module_name not in __all__:
-                    __all__.append(module_name)
-                print_manager.debug(f"Exposed '{module_name}' as a global plotbot class.")
-                
-        except Exception as e:
-            print_manager.warning(f"Failed to auto-register {module_name}: {e}")
+        # The instance (module_name = module_name_class(None)) is imported and stashed
+        # on first access through __getattr__ or data_cubby.grab()
+        _CUSTOM_CLASS_NAMES.add(module_name)
+        # Also add to __all__ so it can be imported with `from plotbot import *`
+        if module_name not in __all__:
+            __all__.append(module_name)
+        print_manager.debug(f"Exposed '{module_name}' as a global plotbot class.")
 
 # Auto-register any custom CDF classes BEFORE the rest of __all__ is populated
 with time_block("auto_register_custom_classes"):
@@ -285,6 +306,12 @@ audifier = _LazyAudifier()
 # Import ploptions for figure control
 from .ploptions import ploptions
 
+# Structured tracing spans (off unless tracer.enabled = True or PLOTBOT_TRACE=1)
+from .tracing import tracer, traced
+
+# Per-data_type pipeline counters: plotbot.metrics(), plotbot.metrics.report(), plotbot.metrics.reset()
+from .metrics import metrics
+
 # Import our enhanced plt with options support
 with time_block("enhanced_plt"):
     from .multiplot_options import plt
@@ -294,117 +321,112 @@ with time_block("main_plotting_functions"):
     from .plotbot_main import plotbot
     from .plotbot_interactive import plotbot_interactive
     from .plotbot_interactive_options import pbi
-    from .plotbot_interactive_vdf import plotbot_interactive_vdf
     from .showdahodo import showdahodo
-    from .multiplot import multiplot
     from .multiplot_options import MultiplotOptions
     from .get_data import get_data
-    from .vdyes import vdyes
-    from . import data_snapshot  # Import data_snapshot
     from .simple_snapshot import save_simple_snapshot, load_simple_snapshot
-
-# --- Import the function from showda_holes.py ---
-from .showda_holes import showda_holes
-
-# --- Import CDF functions for direct access ---
-with time_block("cdf_functions"):
-    from .data_import_cdf import cdf_to_plotbot, scan_cdf_directory
-    from .vdyes import vdyes
+    # multiplot, multiplot_batch, vdyes, render_vdf_frames, prefetch, plotbot_interactive_vdf,
+    # data_snapshot, showda_holes, HoleCatalogue, the memory inspector and the CDF functions load on first access (_LAZY_ATTRIBUTES)
 
 # --- CLASS_NAME_MAPPING for test utilities and data integrity checks ---
-CLASS_NAME_MAPPING = {
-    'mag_rtn_4sa': {
-        'data_type': 'mag_RTN_4sa',
-        'class_type': mag_rtn_4sa_class,
-        'components': ['br', 'bt', 'bn', 'bmag', 'pmag', 'all'],
-        'primary_component': 'br'
-    },
-    'mag_rtn': {
-        'data_type': 'mag_RTN',
-        'class_type': mag_rtn_class,
-        'components': ['br', 'bt', 'bn', 'bmag', 'pmag', 'all'],
-        'primary_component': 'br'
-    },
-    'mag_sc_4sa': {
-        'data_type': 'mag_SC_4sa',
-        'class_type': mag_sc_4sa_class,
-        'components': ['bx', 'by', 'bz', 'bmag', 'pmag', 'all'],
-        'primary_component': 'bx'
-    },
-    'mag_sc': {
-        'data_type': 'mag_SC',
-        'class_type': mag_sc_class,
-        'components': ['bx', 'by', 'bz', 'bmag', 'pmag', 'all'],
-        'primary_component': 'bx'
-    },
-    'epad_strahl': {
-        'data_type': 'spe_sf0_pad',
-        'class_type': epad_strahl_class,
-        'components': ['strahl'],
-        'primary_component': 'strahl'
-    },
-    'epad_strahl_high_res': {
-        'data_type': 'spe_af0_pad',
-        'class_type': epad_strahl_high_res_class,
-        'components': ['strahl'],
-        'primary_component': 'strahl'
-    },
-    'proton': {
-        'data_type': 'spi_sf00_l3_mom',
-        'class_type': proton_class,
-        'components': ['anisotropy'],
-        'primary_component': 'anisotropy'
-    },
-    'proton_hr': {
-        'data_type': 'spi_af00_L3_mom',
-        'class_type': proton_hr_class,
-        'components': ['anisotropy'],
-        'primary_component': 'anisotropy'
-    },
-    'ham': {
-        'data_type': 'ham',
-        'class_type': ham_class,
-        'components': ['hamogram_30s'],
-        'primary_component': 'hamogram_30s'
-    },
-    'psp_qtn': {
-        'data_type': 'sqtn_rfs_v1v2',
-        'class_type': psp_qtn_class,
-        'components': ['density', 'temperature'],
-        'primary_component': 'density'
-    },
-    'psp_orbit': {
-        'data_type': 'psp_orbit_data',
-        'class_type': psp_orbit_class,
-        'components': ['r_sun', 'carrington_lon', 'carrington_lat', 'heliocentric_distance_au', 'orbital_speed'],
-        'primary_component': 'r_sun'
-    },
-    'psp_dfb': {
-        'data_type': 'dfb_ac_spec_dv12hg',  # Primary data type (AC spectra dv12)
-        'class_type': psp_dfb_class,
-        'components': ['ac_spec_dv12', 'ac_spec_dv34', 'dc_spec_dv12'],
-        'primary_component': 'ac_spec_dv12'
-    },
-    # Map all DFB data types to the same psp_dfb class instance
-    'dfb_ac_spec_dv12hg': {
-        'data_type': 'dfb_ac_spec_dv12hg',
-        'class_type': psp_dfb_class,
-        'components': ['ac_spec_dv12'],
-        'primary_component': 'ac_spec_dv12'
-    },
-    'dfb_ac_spec_dv34hg': {
-        'data_type': 'dfb_ac_spec_dv34hg',
-        'class_type': psp_dfb_class,
-        'components': ['ac_spec_dv34'],
-        'primary_component': 'ac_spec_dv34'
-    },
-    'dfb_dc_spec_dv12hg': {
-        'data_type': 'dfb_dc_spec_dv12hg',
-        'class_type': psp_dfb_class,
-        'components': ['dc_spec_dv12'],
-        'primary_component': 'dc_spec_dv12'
-    },
-}
+# Built on first access (see __getattr__) so the class types don't import every data class
+def _class_name_mapping():
+    from . import (mag_rtn_4sa_class, mag_rtn_class, mag_sc_4sa_class, mag_sc_class, epad_strahl_class,
+                   epad_strahl_high_res_class, proton_class, proton_hr_class, ham_class, psp_qtn_class,
+                   psp_orbit_class, psp_dfb_class)
+    return {
+        'mag_rtn_4sa': {
+            'data_type': 'mag_RTN_4sa',
+            'class_type': mag_rtn_4sa_class,
+            'components': ['br', 'bt', 'bn', 'bmag', 'pmag', 'all'],
+            'primary_component': 'br'
+        },
+        'mag_rtn': {
+            'data_type': 'mag_RTN',
+            'class_type': mag_rtn_class,
+            'components': ['br', 'bt', 'bn', 'bmag', 'pmag', 'all'],
+            'primary_component': 'br'
+        },
+        'mag_sc_4sa': {
+            'data_type': 'mag_SC_4sa',
+            'class_type': mag_sc_4sa_class,
+            'components': ['bx', 'by', 'bz', 'bmag', 'pmag', 'all'],
+            'primary_component': 'bx'
+        },
+        'mag_sc': {
+            'data_type': 'mag_SC',
+            'class_type': mag_sc_class,
+            'components': ['bx', 'by', 'bz', 'bmag', 'pmag', 'all'],
+            'primary_component': 'bx'
+        },
+        'epad_strahl': {
+            'data_type': 'spe_sf0_pad',
+            'class_type': epad_strahl_class,
+            'components': ['strahl'],
+            'primary_component': 'strahl'
+        },
+        'epad_strahl_high_res': {
+            'data_type': 'spe_af0_pad',
+            'class_type': epad_strahl_high_res_class,
+            'components': ['strahl'],
+            'primary_component': 'strahl'
+        },
+        'proton': {
+            'data_type': 'spi_sf00_l3_mom',
+            'class_type': proton_class,
+            'components': ['anisotropy'],
+            'primary_component': 'anisotropy'
+        },
+        'proton_hr': {
+            'data_type': 'spi_af00_L3_mom',
+            'class_type': proton_hr_class,
+            'components': ['anisotropy'],
+            'primary_component': 'anisotropy'
+        },
+        'ham': {
+            'data_type': 'ham',
+            'class_type': ham_class,
+            'components': ['hamogram_30s'],
+            'primary_component': 'hamogram_30s'
+        },
+        'psp_qtn': {
+            'data_type': 'sqtn_rfs_v1v2',
+            'class_type': psp_qtn_class,
+            'components': ['density', 'temperature'],
+            'primary_component': 'density'
+        },
+        'psp_orbit': {
+            'data_type': 'psp_orbit_data',
+            'class_type': psp_orbit_class,
+            'components': ['r_sun', 'carrington_lon', 'carrington_lat', 'heliocentric_distance_au', 'orbital_speed'],
+            'primary_component': 'r_sun'
+        },
+        'psp_dfb': {
+            'data_type': 'dfb_ac_spec_dv12hg',  # Primary data type (AC spectra dv12)
+            'class_type': psp_dfb_class,
+            'components': ['ac_spec_dv12', 'ac_spec_dv34', 'dc_spec_dv12'],
+            'primary_component': 'ac_spec_dv12'
+        },
+        # Map all DFB data types to the same psp_dfb class instance
+        'dfb_ac_spec_dv12hg': {
+            'data_type': 'dfb_ac_spec_dv12hg',
+            'class_type': psp_dfb_class,
+            'components': ['ac_spec_dv12'],
+            'primary_component': 'ac_spec_dv12'
+        },
+        'dfb_ac_spec_dv34hg': {
+            'data_type': 'dfb_ac_spec_dv34hg',
+            'class_type': psp_dfb_class,
+            'components': ['ac_spec_dv34'],
+            'primary_component': 'ac_spec_dv34'
+        },
+        'dfb_dc_spec_dv12hg': {
+            'data_type': 'dfb_dc_spec_dv12hg',
+            'class_type': psp_dfb_class,
+            'components': ['dc_spec_dv12'],
+            'primary_component': 'dc_spec_dv12'
+        },
+    }
 
 # Add the rest of the exports to __all__ (custom classes already added above)
 __all__.extend([
@@ -417,7 +439,16 @@ __all__.extend([
     'ploptions',     # Global plotbot figure control options
     'showdahodo', 
     'multiplot',
+    'multiplot_batch', # Parallel batch export of many multiplot figures
     'vdyes',         # PSP SPAN-I VDF plotting function
+    'render_vdf_frames', # Parallel VDF frame/movie rendering
+    'prefetch',      # Bulk download of a time range's data files up front
+    'tracer',        # Structured tracing spans (Chrome trace / speedscope export)
+    'traced',        # Decorator running a function inside a tracer span
+    'metrics',       # Per-data_type cache, download, import, merge and clip counters
+    'memory_report', # Bytes held per data class and component, shared buffers counted once
+    'format_memory_report',
+    'track_peak',    # tracemalloc peak around a block (e.g. get_data / plotbot calls)
     'MultiplotOptions',
     'get_data',      # New function to get data without plotting
     'print_manager', 
@@ -460,6 +491,7 @@ __all__.extend([
     'scan_cdf_directory',   # CDF directory scanning function
     'CLASS_NAME_MAPPING',  # Add CLASS_NAME_MAPPING to __all__
     'showda_holes',      # Add showda_holes to __all__
+    'HoleCatalogue',     # Columnar magnetic hole catalogue
     
     # --- AUTO-GENERATED CUSTOM CLASS __all__ ENTRIES ---
     # ✨ Custom classes dynamically added to __all__ by _auto_register_custom_classes()
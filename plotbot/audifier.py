@@ -7,6 +7,8 @@ import numpy as np
 import pandas as pd
 from scipy.io import wavfile
 from dateutil.parser import parse
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from .get_encounter import get_encounter_number
 from .data_cubby import data_cubby
 from .data_tracker import global_tracker
@@ -14,6 +16,7 @@ from .data_download_berkeley import download_berkeley_data
 from .data_import import import_data_function
 from .print_manager import print_manager
 from .plotbot_helpers import time_clip
+from .audio_stream import StreamingWavWriter, NanFiller, scan_ranges, normalize_chunk_to_int16
 
 def open_directory(directory):
     """Open directory in system file explorer."""
@@ -97,6 +100,8 @@ class Audifier:
         self.quantize_markers = False  # Can be False or number of minutes (10, 60, etc)
         self._channels = 1
         self._fade_samples = 0
+        self.streaming = False  # Write WAVs chunk by chunk with bounded memory (see audio_stream)
+        self.stream_chunk_hours = 24  # Length of each imported chunk in streaming mode
     
     def _parse_and_format_trange(self, trange):
         """Parses trange and returns datetime objects and formatted strings, handling multi-day ranges."""
@@ -316,47 +321,47 @@ class Audifier:
             return None # Error already printed by helper
         # ================================================
 
+        marker_times = self._marker_times(time_info)
+        
+        # Convert times to datetime
+        times_datetime = pd.to_datetime(times)
+        
+        print(f"Data time range: {times_datetime.min()} to {times_datetime.max()}")
+        
+        # Find closest indices for each marker time
+        closest_indices = np.searchsorted(times_datetime, marker_times)
+        return self._write_marker_file(marker_times, closest_indices, len(times), time_info, output_dir)
+
+    def _marker_times(self, time_info):
+        """Marker datetimes for the parsed time range, as a DatetimeIndex."""
         # Generate marker times based on parsed datetimes
         start_datetime = time_info['start_dt'] # Use parsed object
         stop_datetime = time_info['end_dt']   # Use parsed object
-        marker_times = []
         
         if self.quantize_markers:
-            # Calculate hours between markers
-            hours_interval = 1.0 / self.markers_per_hour
-            
-            # Find the first marker time before our data
+            # Markers every 1/markers_per_hour hours counted from midnight of the start date
+            step = timedelta(hours=1.0 / self.markers_per_hour)
             first_marker = start_datetime.replace(hour=0, minute=0, second=0, microsecond=0)
-            
-            # Generate markers at the specified interval
-            current = first_marker
-            while current <= stop_datetime:  # Just check against stop_datetime
-                if current >= start_datetime:
-                    marker_times.append(current)
-                current += timedelta(hours=hours_interval)
         else:
-            # Original behavior
+            # Original behavior: markers_per_hour evenly spaced steps across the range
             duration = (stop_datetime - start_datetime).total_seconds() / 3600.0
-            interval = duration / self.markers_per_hour
-            
-            current = start_datetime
-            while current <= stop_datetime:
-                marker_times.append(current)
-                current += timedelta(hours=interval)
-        
-        # Convert marker times to pandas DatetimeIndex
-        marker_times = pd.DatetimeIndex(marker_times)
-        
-        # Convert times to datetime
-        times_datetime = pd.to_datetime(times)
-        
-        print(f"Data time range: {times_datetime.min()} to {times_datetime.max()}")
+            step = timedelta(hours=duration / self.markers_per_hour)
+            first_marker = start_datetime
         
-        # Find closest indices for each marker time
-        closest_indices = np.searchsorted(times_datetime, marker_times)
+        if step <= timedelta(0):
+            return pd.DatetimeIndex([start_datetime])
+        # Same microsecond-rounded step the old per-marker timedelta loop added
+        count = (stop_datetime - first_marker) // step + 1
+        marker_times = np.datetime64(first_marker, 'us') + np.arange(max(count, 0)) * np.timedelta64(step)
+        marker_times = marker_times[marker_times >= np.datetime64(start_datetime, 'us')]
         
+        # Convert marker times to pandas DatetimeIndex
+        return pd.DatetimeIndex(marker_times.astype('datetime64[ns]'))
+
+    def _write_marker_file(self, marker_times, closest_indices, n_samples, time_info, output_dir):
+        """Write the marker file for markers whose sample index falls inside the data."""
         # Filter out markers that fall outside the data range
-        valid_markers = closest_indices < len(times)
+        valid_markers = closest_indices < n_samples
         marker_times = marker_times[valid_markers]
         closest_indices = closest_indices[valid_markers]
         print(f"Total markers generated: {len(marker_times)}")
@@ -380,14 +385,14 @@ class Audifier:
         filename = os.path.join(output_dir,
             f"{encounter}_PSP_FIELDS_MARKER_SET_{time_info['range_str_hyphen']}_{freq_str}.txt")
         
+        # Whole-second markers drop the fraction; others keep milliseconds
+        time_strs = np.where(marker_times.microsecond != 0,
+                             marker_times.strftime('%H:%M:%S.%f').str[:12],
+                             marker_times.strftime('%H:%M:%S'))
+        date_strs = marker_times.strftime('(%Y-%m-%d)')
         with open(filename, 'w') as f:
-            for marker_time, sample_number in zip(marker_times, closest_indices):
-                if marker_time.microsecond:
-                    time_str = marker_time.strftime('%H:%M:%S.%f')[:12]
-                else:
-                    time_str = marker_time.strftime('%H:%M:%S')
-                date_str = marker_time.strftime('('+'%Y-%m-%d'+')')
-                f.write(f"{time_str} {date_str}\t{sample_number}\n")
+            f.writelines(f"{time_str} {date_str}\t{sample_number}\n"
+                         for time_str, date_str, sample_number in zip(time_strs, date_strs, closest_indices))
         
         print(f"Marker file created: {filename}")
         return filename
@@ -404,7 +409,7 @@ class Audifier:
         return formatted
     
     def audify(self, trange, *components, filename=None, channels=None, markers_per_hour=None,
-               sample_rate=None, norm_percentile=None):
+               sample_rate=None, norm_percentile=None, stream=None, norm_range=None):
         """
         Create a WAV file from the magnetometer time series.
         
@@ -426,6 +431,12 @@ class Audifier:
             Sample rate. Default is 44100.
         norm_percentile : float, optional
             Percentile for normalization. Default is 99.9.
+        stream : bool, optional
+            Import trange in chunks of stream_chunk_hours and write the WAV files
+            incrementally, keeping memory bounded for long ranges. Defaults to self.streaming.
+        norm_range : tuple or dict, optional
+            Streaming only: (min, max) used to normalize every component, or a dict of
+            them keyed by subclass name. Skips the first pass that finds the data range.
         """
         channels = channels if channels is not None else self._channels
         self.channels = channels
@@ -448,9 +459,150 @@ class Audifier:
         from .time_utils import TimeRangeTracker
         TimeRangeTracker.set_current_trange(trange)
 
+        if stream if stream is not None else self.streaming:
+            return self._audify_streaming(trange, components, time_info, norm_range)
+
+        processed_components = self._load_components(trange, time_info, components)
+        
+        if not processed_components:
+            print("No components available after processing")
+            return
+        
+        # Get time range indices using the processed components
+        indices = self.clip_data_to_range(processed_components, trange)
+        
+        if len(indices) == 0:
+            print("No data points found within the specified time range.")
+            return
+        
+        # Setup directories
+        output_dir = self._setup_output_dir(time_info)
+        
+        file_names = {}
+        
+        # Generate markers using the raw datetime array to match how indices were computed
+        raw_datetime_array = processed_components[0].plot_config.datetime_array
+        marker_file = self.generate_markers(
+            raw_datetime_array[indices],
+            trange,
+            output_dir
+        )
+        file_names['markers'] = marker_file
+        
+        # Generate audio files if not markers_only
+        if not self.markers_only:
+            for key, filename, arrays in self._audio_jobs(processed_components, indices, output_dir, time_info):
+                file_names[key] = self._write_audio_job(filename, arrays)
+        
+        # Show access buttons
+        show_directory_button(output_dir)
+        show_file_buttons(file_names)
+        
+        return file_names
+
+    def audify_batch(self, tranges, *components, workers=None, max_in_flight=2):
+        """
+        Audify the same components over many time ranges (e.g. every day of an encounter).
+
+        Each range is fetched once, then its components are normalized and written
+        by a thread pool while the next range is being fetched. Encounter folders
+        are shared between ranges as in audify. With self.streaming set, each range
+        goes through the streaming writer instead (one range at a time, in chunks).
+        The current TimeRangeTracker range is restored afterwards.
+
+        Parameters
+        ----------
+        tranges : list of two element lists
+            Time ranges to audify, one set of WAV and marker files each.
+        components : list
+            Components as for audify (mono files, or a stereo pair plus mono files
+            when channels == 2).
+        workers : int, optional
+            Threads normalizing and writing WAV files. Defaults to the number of CPUs.
+        max_in_flight : int, optional
+            Ranges whose WAV files may still be waiting to be written. Each holds a
+            copy of its data, so fetching pauses until the oldest range is written.
+            Default is 2.
+
+        Returns
+        -------
+        list of dict
+            Manifest with one entry per range: 'trange', 'output_dir', 'files'
+            (as returned by audify) and 'error' (None on success).
+        """
+        if self.channels == 2 and len(components) < 2:
+            print("Warning: Stereo mode requires at least 2 components. Setting to mono.")
+            self.channels = 1
+        workers = max(1, int(workers or os.cpu_count() or 1))
+        max_in_flight = max(1, int(max_in_flight))
+        from .time_utils import TimeRangeTracker
+
+        manifest = []
+        in_flight = deque() # (manifest entry, [(key, future)]) per range still being written
+
+        def finish_oldest():
+            entry, jobs = in_flight.popleft()
+            for key, future in jobs:
+                try:
+                    entry['files'][key] = future.result()
+                except Exception as e:
+                    entry['error'] = str(e)
+                    print(f"Error writing {key} for {entry['trange'][0]} to {entry['trange'][1]}: {e}")
+
+        saved_trange = (TimeRangeTracker._current_trange, TimeRangeTracker._last_updated)
+        try:
+            with ThreadPoolExecutor(max_workers=workers) as pool:
+                for trange in tranges:
+                    entry = {'trange': list(trange), 'output_dir': None, 'files': {}, 'error': None}
+                    manifest.append(entry)
+                    time_info = self._parse_and_format_trange(trange)
+                    if time_info is None:
+                        entry['error'] = 'Could not parse time range'
+                        continue
+                    while len(in_flight) >= max_in_flight:
+                        finish_oldest()
+                    try:
+                        TimeRangeTracker.set_current_trange(trange)
+                        if self.streaming:
+                            entry['output_dir'] = self._setup_output_dir(time_info)
+                            entry['files'] = self._audify_streaming(trange, components, time_info,
+                                                                    output_dir=entry['output_dir']) or {}
+                            if not entry['files']:
+                                entry['error'] = 'No data points found within the specified time range'
+                            continue
+                        processed_components = self._load_components(trange, time_info, components)
+                        indices = self.clip_data_to_range(processed_components, trange) if processed_components else []
+                        if len(indices) == 0:
+                            entry['error'] = 'No data points found within the specified time range'
+                            print(f"No data points found within {trange[0]} to {trange[1]}.")
+                            continue
+                        entry['output_dir'] = self._setup_output_dir(time_info)
+                        raw_datetime_array = processed_components[0].plot_config.datetime_array
+                        entry['files']['markers'] = self.generate_markers(raw_datetime_array[indices], trange, entry['output_dir'])
+                        if not self.markers_only:
+                            # Arrays are copied out here, before the next range updates the data classes
+                            jobs = self._audio_jobs(processed_components, indices, entry['output_dir'], time_info)
+                            in_flight.append((entry, [(key, pool.submit(self._write_audio_job, filename, arrays))
+                                                      for key, filename, arrays in jobs]))
+                    except Exception as e:
+                        entry['error'] = str(e)
+                        print(f"Error audifying {trange[0]} to {trange[1]}: {e}")
+
+                while in_flight:
+                    finish_oldest()
+        finally:
+            TimeRangeTracker._current_trange, TimeRangeTracker._last_updated = saved_trange
+
+        written = sum(len(entry['files']) for entry in manifest)
+        print(f"Batch audification complete: {written} files for {len(manifest)} time ranges.")
+        return manifest
+
+    def _load_components(self, trange, time_info, components):
+        """Download/import each data type once for trange and return the requested subclass instances."""
         # ====================================================================
         # DOWNLOAD AND PROCESS DATA FOR EACH COMPONENT
         # ====================================================================
+        class_instances = {}
         processed_components = []
         
         for component in components:
@@ -461,63 +613,114 @@ class Audifier:
             
             print_manager.debug(f"\nProcessing {data_type} - {subclass_name}")
             
-            # Download data if needed
-            download_berkeley_data(trange, data_type)
-            
-            # Get class instance from data_cubby
-            class_instance = data_cubby.grab(class_name)
-            
-            # Check if we need to import data
-            needs_import = global_tracker.is_import_needed(trange, data_type)
-            needs_refresh = False
-            
-            # Check if cached data covers our time range
-            if hasattr(class_instance, 'datetime_array') and class_instance.datetime_array is not None:
-                try:
-                    # Compare using numpy datetime64 which should handle different input formats
-                    cached_start = np.datetime64(class_instance.datetime_array[0], 's')
-                    cached_end = np.datetime64(class_instance.datetime_array[-1], 's')
-                    # Use parsed start/end from helper for comparison
-                    requested_start = np.datetime64(time_info['start_dt'], 's') 
-                    requested_end = np.datetime64(time_info['end_dt'], 's')
-                    
-                    # Add buffer for timing differences
-                    buffered_start = cached_start - np.timedelta64(10, 's')
-                    buffered_end = cached_end + np.timedelta64(10, 's')
-                    
-                    if buffered_start > requested_start or buffered_end < requested_end:
-                        needs_refresh = True
-                except Exception as e:
-                    print(f"Error checking data range: {e}")
-                    needs_refresh = True
-            else:
-                needs_refresh = True
-            
-            # Import data if needed
-            if needs_import or needs_refresh:
-                print_manager.debug(f"Importing data for {data_type}")
-                data_obj = import_data_function(trange, data_type)
-                if data_obj is not None:
-                    class_instance.update(data_obj)
-                    if needs_import:
-                        global_tracker.update_imported_range(trange, data_type)
+            if class_name not in class_instances:
+                class_instances[class_name] = self._load_class_instance(trange, time_info, data_type, class_name)
             
             # Get the specific subclass instance
-            processed_component = class_instance.get_subclass(subclass_name)
+            processed_component = class_instances[class_name].get_subclass(subclass_name)
             processed_components.append(processed_component)
+        return processed_components
+
+    def _load_class_instance(self, trange, time_info, data_type, class_name):
+        """Make sure the data_cubby instance of class_name covers trange, importing if needed."""
+        # Download data if needed
+        download_berkeley_data(trange, data_type)
+        
+        # Get class instance from data_cubby
+        class_instance = data_cubby.grab(class_name)
+        
+        # Check if we need to import data
+        needs_import = global_tracker.is_import_needed(trange, data_type)
+        needs_refresh = False
+        
+        # Check if cached data covers our time range
+        if hasattr(class_instance, 'datetime_array') and class_instance.datetime_array is not None:
+            try:
+                # Compare using numpy datetime64 which should handle different input formats
+                cached_start = np.datetime64(class_instance.datetime_array[0], 's')
+                cached_end = np.datetime64(class_instance.datetime_array[-1], 's')
+                # Use parsed start/end from helper for comparison
+                requested_start = np.datetime64(time_info['start_dt'], 's') 
+                requested_end = np.datetime64(time_info['end_dt'], 's')
+                
+                # Add buffer for timing differences
+                buffered_start = cached_start - np.timedelta64(10, 's')
+                buffered_end = cached_end + np.timedelta64(10, 's')
+                
+                if buffered_start > requested_start or buffered_end < requested_end:
+                    needs_refresh = True
+            except Exception as e:
+                print(f"Error checking data range: {e}")
+                needs_refresh = True
+        else:
+            needs_refresh = True
+        
+        # Import data if needed
+        if needs_import or needs_refresh:
+            print_manager.debug(f"Importing data for {data_type}")
+            data_obj = import_data_function(trange, data_type)
+            if data_obj is not None:
+                class_instance.update(data_obj)
+                if needs_import:
+                    global_tracker.update_imported_range(trange, data_type)
+        return class_instance
+
+    def _wav_filename(self, output_dir, time_info, data_type, suffix):
+        encounter = get_encounter_number(time_info['start_date_str'])
+        # Use pre-formatted date string with dashes for filenames from helper
+        return os.path.join(output_dir,
+            f"{encounter}_PSP_"
+            f"{data_type.upper()}_"
+            f"{time_info['range_str_hyphen']}_"
+            f"{self.sample_rate}SR_"
+            f"{suffix}.wav")
+
+    def _audio_jobs(self, processed_components, indices, output_dir, time_info):
+        """
+        (file key, WAV path, [channel data]) for every WAV audify writes: one mono
+        file per component, or in stereo mode the first two components as L/R and
+        the rest mono. Channel data is copied out of the components.
+        """
+        jobs = []
+        mono_components = processed_components
+        if self.channels == 2:  # Stereo mode - first two components as left/right
+            if len(processed_components) >= 2:
+                left_name = processed_components[0].subclass_name.capitalize()
+                right_name = processed_components[1].subclass_name.capitalize()
+                filename = self._wav_filename(output_dir, time_info, processed_components[0].data_type,
+                                              f"{left_name}_L_{right_name}_R")
+                jobs.append((f"stereo_{left_name}_{right_name}", filename,
+                             [np.array(processed_components[0][indices]), np.array(processed_components[1][indices])]))
+                # Process any remaining components as mono files
+                mono_components = processed_components[2:]
+            else:
+                print("Not enough components for stereo. Need at least 2.")
+                mono_components = []
+        for component in mono_components:
+            filename = self._wav_filename(output_dir, time_info, component.data_type, component.subclass_name.capitalize())
+            jobs.append((component.subclass_name, filename, [np.array(component[indices])]))
+        return jobs
+
+    def _write_audio_job(self, filename, arrays):
+        """Normalize each channel, interleave, fade and write one WAV file; returns its path."""
+        channels = [self.normalize_to_int16(data) for data in arrays]
+        if len(channels) == 1:
+            audio_data = channels[0]
+        else:
+            # Make sure both channels have the same length
+            min_length = min(len(channel) for channel in channels)
+            audio_data = np.column_stack([channel[:min_length] for channel in channels])
         
-        if not processed_components:
-            print("No components available after processing")
-            return
-        
-        # Get time range indices using the processed components
-        indices = self.clip_data_to_range(processed_components, trange)
-        
-        if len(indices) == 0:
-            print("No data points found within the specified time range.")
-            return
+        # Apply fade if enabled
+        if self._fade_samples > 0:
+            audio_data = self.apply_fade(audio_data)
         
-        # Setup directories
+        wavfile.write(filename, self.sample_rate, audio_data)
+        print(f"Saved {'stereo' if len(channels) == 2 else 'mono'} audio file: {filename}")
+        return filename
+
+    def _setup_output_dir(self, time_info):
+        """Create (if needed) and return the encounter/range output folder inside save_dir."""
         encounter = get_encounter_number(time_info['start_date_str'])
         
         # Check if save_dir already ends with the encounter name
@@ -535,105 +738,122 @@ class Audifier:
         os.makedirs(output_dir, exist_ok=True)
         
         print(f"Output directory: {output_dir}")
-        
+        return output_dir
+
+    def _stream_chunks(self, trange, components):
+        """
+        Yield (times, [data per component]) for consecutive stream_chunk_hours
+        slices of trange. Each slice is imported into a throwaway instance of the
+        components' data class, so only one chunk is held in memory; the global
+        data_cubby instance is left untouched.
+        """
+        start = np.datetime64(parse(trange[0]), 'us')
+        stop = np.datetime64(parse(trange[1]), 'us') + np.timedelta64(1, 'us') # Same end as clip_data_to_range
+        step = np.timedelta64(max(1, int(self.stream_chunk_hours * 3600e6)), 'us')
+        data_type, class_name = components[0].data_type, components[0].class_name
+        class_type = type(data_cubby.grab(class_name))
+        chunk_start = start
+        while chunk_start < stop:
+            chunk_stop = min(chunk_start + step, stop)
+            chunk_trange = [pd.Timestamp(t).strftime('%Y-%m-%d/%H:%M:%S.%f') for t in (chunk_start, chunk_stop)]
+            print_manager.debug(f"Streaming chunk {chunk_trange[0]} to {chunk_trange[1]}")
+            download_berkeley_data(chunk_trange, data_type)
+            data_obj = import_data_function(chunk_trange, data_type)
+            if data_obj is not None:
+                instance = class_type(data_obj)
+                subclasses = [instance.get_subclass(component.subclass_name) for component in components]
+                times = np.asarray(subclasses[0].plot_config.datetime_array)
+                # Imports cover whole files; keep only this chunk so samples are not repeated
+                first, last = np.searchsorted(times, [chunk_start, chunk_stop], side='left')
+                if last > first:
+                    yield times[first:last], [np.asarray(sub.view(np.ndarray))[first:last] for sub in subclasses]
+                del instance, subclasses
+            chunk_start = chunk_stop
+
+    def _audify_streaming(self, trange, components, time_info, norm_range=None, output_dir=None):
+        """
+        Streaming counterpart of audify: same files, written one chunk at a time.
+
+        Components are grouped by data class (one time axis per group). Unless
+        norm_range is given, a first pass over the chunks finds each component's
+        min/max; the second pass fills NaNs, normalizes with that global range,
+        interleaves stereo frames and appends them to the WAV files. When the
+        caller passes output_dir (audify_batch) it also reports the files, so no
+        buttons are shown.
+        """
+        if not components:
+            print("No components available after processing")
+            return
+        stereo = self.channels == 2
+        if stereo and components[0].class_name != components[1].class_name:
+            print("Warning: Stereo streaming needs both channels from the same data class. Writing mono files.")
+            stereo = False
+
+        show_buttons = output_dir is None
+        if output_dir is None:
+            output_dir = self._setup_output_dir(time_info)
+        def wav_name(component, suffix):
+            return self._wav_filename(output_dir, time_info, component.data_type, suffix)
+
+        groups = {}
+        for component in components:
+            groups.setdefault(component.class_name, []).append(component)
+
         file_names = {}
-        
-        # Generate markers using the raw datetime array to match how indices were computed
-        raw_datetime_array = processed_components[0].plot_config.datetime_array
-        marker_file = self.generate_markers(
-            raw_datetime_array[indices],
-            trange,
-            output_dir
-        )
-        file_names['markers'] = marker_file
-        
-        # Generate audio files if not markers_only
-        if not self.markers_only:
-            # Use pre-formatted date string with dashes for filenames from helper
-            sample_rate_str = f"{self.sample_rate}SR"
-            
-            if self.channels == 1:  # Mono mode - each component gets its own file
-                # Process each component as a separate mono file
-                for component in processed_components:
-                    data = np.array(component[indices])
-                    audio_data = self.normalize_to_int16(data)
-                    
-                    # Apply fade if enabled
-                    if self._fade_samples > 0:
-                        audio_data = self.apply_fade(audio_data)
-                    
-                    filename = os.path.join(output_dir,
-                        f"{encounter}_PSP_"
-                        f"{component.data_type.upper()}_"
-                        f"{time_info['range_str_hyphen']}_"
-                        f"{sample_rate_str}_"
-                        f"{component.subclass_name.capitalize()}.wav")
-                    
-                    wavfile.write(filename, self.sample_rate, audio_data)
-                    print(f"Saved mono audio file: {filename}")
-                    file_names[component.subclass_name] = filename
-            else:  # Stereo mode (self.channels == 2)
-                # Process first two components as stereo
-                if len(processed_components) >= 2:
-                    left_data = np.array(processed_components[0][indices])
-                    right_data = np.array(processed_components[1][indices])
-                    
-                    # Normalize each channel separately
-                    left_normalized = self.normalize_to_int16(left_data)
-                    right_normalized = self.normalize_to_int16(right_data)
-                    
-                    # Make sure both channels have the same length
-                    min_length = min(len(left_normalized), len(right_normalized))
-                    left_normalized = left_normalized[:min_length]
-                    right_normalized = right_normalized[:min_length]
-                    
-                    # Combine into stereo array
-                    stereo_data = np.column_stack((left_normalized, right_normalized))
-                    
-                    # Apply fade if enabled
-                    if self._fade_samples > 0:
-                        stereo_data = self.apply_fade(stereo_data)
-                    
-                    # Create stereo filename using both component names
-                    left_name = processed_components[0].subclass_name.capitalize()
-                    right_name = processed_components[1].subclass_name.capitalize()
-                    
-                    filename = os.path.join(output_dir,
-                        f"{encounter}_PSP_"
-                        f"{processed_components[0].data_type.upper()}_"
-                        f"{time_info['range_str_hyphen']}_"
-                        f"{sample_rate_str}_"
-                        f"{left_name}_L_{right_name}_R.wav")
-                    
-                    wavfile.write(filename, self.sample_rate, stereo_data)
-                    print(f"Saved stereo audio file: {filename}")
-                    file_names[f"stereo_{left_name}_{right_name}"] = filename
-                    
-                    # Process any remaining components as mono files
-                    for component in processed_components[2:]:
-                        data = np.array(component[indices])
-                        audio_data = self.normalize_to_int16(data)
-                        
-                        # Apply fade if enabled
-                        if self._fade_samples > 0:
-                            audio_data = self.apply_fade(audio_data)
-                        
-                        filename = os.path.join(output_dir,
-                            f"{encounter}_PSP_"
-                            f"{component.data_type.upper()}_"
-                            f"{time_info['range_str_hyphen']}_"
-                            f"{sample_rate_str}_"
-                            f"{component.subclass_name.capitalize()}.wav")
-                        
-                        wavfile.write(filename, self.sample_rate, audio_data)
-                        print(f"Saved mono audio file: {filename}")
-                        file_names[component.subclass_name] = filename
-                else:
-                    print("Not enough components for stereo. Need at least 2.")
-        
+        marker_times = self._marker_times(time_info)
+        for group_index, group in enumerate(groups.values()):
+            if self.markers_only:
+                ranges = [None] * len(group)
+            elif norm_range is None:
+                ranges = scan_ranges(self._stream_chunks(trange, group))
+                if not ranges:
+                    print(f"No data points found within the specified time range for {group[0].class_name}.")
+                    continue
+            else:
+                ranges = [norm_range.get(c.subclass_name) if isinstance(norm_range, dict) else norm_range for c in group]
+
+            # (writer, positions in group) - stereo pairs the first two components
+            outputs = []
+            if not self.markers_only:
+                positions = list(range(len(group)))
+                if stereo and group_index == 0:
+                    left_name, right_name = group[0].subclass_name.capitalize(), group[1].subclass_name.capitalize()
+                    path = wav_name(group[0], f"{left_name}_L_{right_name}_R")
+                    outputs.append((StreamingWavWriter(path, self.sample_rate, 2, self._fade_samples), [0, 1]))
+                    file_names[f"stereo_{left_name}_{right_name}"] = path
+                    positions = positions[2:]
+                for k in positions:
+                    path = wav_name(group[k], group[k].subclass_name.capitalize())
+                    outputs.append((StreamingWavWriter(path, self.sample_rate, 1, self._fade_samples), [k]))
+                    file_names[group[k].subclass_name] = path
+
+            fillers = [NanFiller() for _ in group]
+            marker_counts = np.zeros(len(marker_times), dtype=np.int64)
+            n_samples = 0
+            try:
+                for times, arrays in self._stream_chunks(trange, group):
+                    n_samples += len(times)
+                    marker_counts += np.searchsorted(times, marker_times.values.astype(times.dtype), side='left')
+                    if outputs:
+                        audio = [normalize_chunk_to_int16(filler.push(data), *rng) for filler, data, rng in zip(fillers, arrays, ranges)]
+                        for writer, ks in outputs:
+                            writer.write(*(audio[k] for k in ks))
+                if outputs:
+                    audio = [normalize_chunk_to_int16(filler.flush(), *rng) for filler, rng in zip(fillers, ranges)]
+                    for writer, ks in outputs:
+                        writer.write(*(audio[k] for k in ks))
+            finally:
+                for writer, _ in outputs:
+                    writer.close()
+                    print(f"Saved {'stereo' if writer.channels == 2 else 'mono'} audio file: {writer.path}")
+
+            if group_index == 0:
+                file_names['markers'] = self._write_marker_file(marker_times, marker_counts, n_samples, time_info, output_dir)
+
         # Show access buttons
-        show_directory_button(output_dir)
-        show_file_buttons(file_names)
+        if show_buttons:
+            show_directory_button(output_dir)
+            show_file_buttons(file_names)
         
         return file_names
 
@@ -32,6 +32,8 @@ class Audifier:
     markers_per_hour: Union[int, float]
     markers_only: bool
     quantize_markers: Union[bool, int, float] # Can be bool or number of minutes
+    streaming: bool
+    stream_chunk_hours: Union[int, float]
     # Private attributes managed by properties
     _channels: int
     _fade_samples: int
@@ -46,7 +48,8 @@ class Audifier:
     def apply_fade(self, audio_data: np.ndarray) -> np.ndarray: ...
     def generate_markers(self, times: Union[np.ndarray, pd.DatetimeIndex], trange: List[str], output_dir: str) -> Optional[str]: ...
     def format_time_for_filename(self, time_str: str) -> str: ...
-    def audify(self, trange: List[str], *components: ComponentType, filename: Optional[str] = ..., channels: Optional[int] = ..., markers_per_hour: Optional[Union[int, float]] = ..., sample_rate: Optional[int] = ..., norm_percentile: Optional[float] = ...) -> Optional[Dict[str, Optional[str]]]: ... # Returns dict of filenames or None
+    def audify(self, trange: List[str], *components: ComponentType, filename: Optional[str] = ..., channels: Optional[int] = ..., markers_per_hour: Optional[Union[int, float]] = ..., sample_rate: Optional[int] = ..., norm_percentile: Optional[float] = ..., stream: Optional[bool] = ..., norm_range: Optional[Union[Tuple[float, float], Dict[str, Tuple[float, float]]]] = ...) -> Optional[Dict[str, Optional[str]]]: ... # Returns dict of filenames or None
+    def audify_batch(self, tranges: List[List[str]], *components: ComponentType, workers: Optional[int] = ...) -> List[Dict[str, Any]]: ... # Manifest: trange, output_dir, files, error per range
 
     # --- Properties ---
     @property
@@ -62,6 +65,16 @@ class Audifier:
     # def _parse_and_format_trange(self, trange: List[str]) -> Optional[Dict[str, Any]]: ...
     # def _process_and_save_mono_component(self, component: ComponentType, trange: List[str], filename: Optional[str], markers_per_hour: Optional[Union[int, float]], sample_rate: int, norm_percentile: Optional[float]) -> None: ...
     # def _process_component(self, component: ComponentType, trange: List[str], sample_rate: int, norm_percentile: Optional[float]) -> Optional[np.ndarray]: ...
+    # def _marker_times(self, time_info: Dict[str, Any]) -> pd.DatetimeIndex: ...
+    # def _write_marker_file(self, marker_times: pd.DatetimeIndex, closest_indices: np.ndarray, n_samples: int, time_info: Dict[str, Any], output_dir: str) -> Optional[str]: ...
+    # def _load_components(self, trange: List[str], time_info: Dict[str, Any], components: Tuple[ComponentType, ...]) -> List[ComponentType]: ...
+    # def _load_class_instance(self, trange: List[str], time_info: Dict[str, Any], data_type: str, class_name: str) -> Any: ...
+    # def _wav_filename(self, output_dir: str, time_info: Dict[str, Any], data_type: str, suffix: str) -> str: ...
+    # def _audio_jobs(self, processed_components: List[ComponentType], indices: np.ndarray, output_dir: str, time_info: Dict[str, Any]) -> List[Tuple[str, str, List[np.ndarray]]]: ...
+    # def _write_audio_job(self, filename: str, arrays: List[np.ndarray]) -> str: ...
+    # def _setup_output_dir(self, time_info: Dict[str, Any]) -> str: ...
+    # def _stream_chunks(self, trange: List[str], components: List[ComponentType]) -> Iterator[Tuple[np.ndarray, List[np.ndarray]]]: ...
+    # def _audify_streaming(self, trange: List[str], components: Tuple[ComponentType, ...], time_info: Dict[str, Any], norm_range: Any = ...) -> Optional[Dict[str, Optional[str]]]: ...
     # def _create_filename(self, base_filename: Optional[str], component_suffix: str) -> str: ...
     # @staticmethod def normalize_to_int16(data: np.ndarray) -> np.ndarray: ...
 
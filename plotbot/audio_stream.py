@@ -0,0 +1,175 @@
+# plotbot/audio_stream.py
+"""
+Bounded-memory building blocks for writing long audifications.
+
+Audifier.normalize_to_int16 needs the whole component in memory (plus a
+float32 copy, the interpolation index arrays and the int16 result), which for
+an encounter of native-cadence MAG data runs to several GB. The pieces here do
+the same job one chunk at a time:
+
+    ranges = scan_ranges(chunks())                       # pass 1: global min/max per channel
+    with StreamingWavWriter(path, 44100, channels=2, fade_samples=0) as wav:
+        fillers = [NanFiller(), NanFiller()]
+        for times, (left, right) in chunks():            # pass 2
+            wav.write(*(normalize_chunk_to_int16(f.push(x), *r) for f, x, r in zip(fillers, (left, right), ranges)))
+
+NaNs are filled by linear interpolation on the sample index across chunk
+boundaries and the int16 mapping uses the global range, so the samples match
+normalize_to_int16 on the full array.
+"""
+import wave
+import numpy as np
+
+WAV_MAX_DATA_BYTES = 0xFFFFFFFF - 36  # RIFF sizes are 32 bit
+
+def normalize_chunk_to_int16(data, min_val, max_val):
+    """Map data (NaN-free) to int16 with a fixed range, as normalize_to_int16 does for a whole array."""
+    data = np.asarray(data, dtype=np.float32)
+    if not max_val > min_val:  # Flat or all-NaN channel
+        return np.zeros(data.shape, dtype=np.int16)
+    min_val, max_val = np.float32(min_val), np.float32(max_val)
+    return ((2 * (data - min_val) / (max_val - min_val) - 1) * 32767).astype(np.int16)
+
+def scan_ranges(chunks):
+    """
+    First pass over (times, [arrays]) chunks.
+
+    Returns:
+        list of (min, max) per channel over the non-NaN samples (float32, as
+        normalize_to_int16 computes them); (nan, nan) for an all-NaN channel.
+    """
+    lows, highs = None, None
+    for _, arrays in chunks:
+        if lows is None:
+            lows, highs = [np.inf] * len(arrays), [-np.inf] * len(arrays)
+        for k, data in enumerate(arrays):
+            data = np.asarray(data, dtype=np.float32)
+            valid = data[~np.isnan(data)]
+            if valid.size:
+                lows[k] = min(lows[k], valid.min())
+                highs[k] = max(highs[k], valid.max())
+    if lows is None:
+        return []
+    return [(np.float32(lo), np.float32(hi)) if np.isfinite(lo) else (np.nan, np.nan) for lo, hi in zip(lows, highs)]
+
+class NanFiller:
+    """
+    Fill NaNs of a stream by linear interpolation on the sample index.
+
+    A trailing NaN run is held back until the next valid sample arrives (so
+    push() can return fewer samples than it was given); flush() releases it
+    filled with the last valid value. Leading NaNs take the first valid value,
+    matching np.interp's constant extrapolation in normalize_to_int16.
+    """
+
+    def __init__(self):
+        self._pending = np.empty(0, dtype=np.float32)
+        self._last = None  # Last valid value emitted
+
+    def push(self, data):
+        data = np.concatenate((self._pending, np.asarray(data, dtype=np.float32)))
+        nan_mask = np.isnan(data)
+        if not nan_mask.any():
+            self._pending = data[:0]
+            if len(data):
+                self._last = data[-1]
+            return data
+        valid_idx = np.flatnonzero(~nan_mask)
+        if len(valid_idx) == 0:
+            self._pending = data
+            return data[:0]
+        cut = valid_idx[-1] + 1
+        out, self._pending = data[:cut], data[cut:]
+        out_nan = nan_mask[:cut]
+        if out_nan.any():
+            xp, fp = valid_idx, out[valid_idx]
+            if self._last is not None:
+                # Anchor leading NaNs on the previous chunk's last valid sample
+                xp, fp = np.concatenate(([-1], xp)), np.concatenate(([self._last], fp))
+            out[out_nan] = np.interp(np.flatnonzero(out_nan), xp, fp)
+        self._last = out[-1]
+        return out
+
+    def flush(self):
+        """Remaining held-back samples, filled with the last valid value (zeros if there was none)."""
+        tail, self._pending = self._pending, self._pending[:0]
+        return np.full(len(tail), self._last if self._last is not None else 0.0, dtype=np.float32)
+
+class StreamingWavWriter:
+    """
+    16-bit PCM WAV written frame block by frame block.
+
+    write() takes one int16 array per channel and interleaves them (samples
+    beyond the shortest channel wait for the next write, and are dropped at
+    close, as the in-memory stereo path truncates to the shorter channel); with
+    fade_samples the first samples are faded in as they pass and the last
+    fade_samples are held back so close() can fade them out, as apply_fade does.
+    """
+
+    def __init__(self, path, sample_rate, channels=1, fade_samples=0):
+        self.path = path
+        self.channels = channels
+        self.frames_written = 0
+        self._fade_samples = int(fade_samples)
+        self._tail = np.empty((0, channels), dtype=np.int16)
+        self._leftover = [np.empty(0, dtype=np.int16)] * channels
+        self._wav = wave.open(path, 'wb')
+        self._wav.setnchannels(channels)
+        self._wav.setsampwidth(2)
+        self._wav.setframerate(int(sample_rate))
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def _fade(self, frames, positions, ramp_up):
+        fade = np.linspace(0, 1, self._fade_samples) if ramp_up else np.linspace(1, 0, self._fade_samples)
+        faded = frames.astype(np.float32) * fade[positions][:, None]
+        return faded.astype(np.float32).astype(np.int16)
+
+    def _emit(self, frames):
+        if not len(frames):
+            return
+        if self._fade_samples:
+            head = self._fade_samples - self.frames_written
+            if head > 0:
+                frames = frames.copy()
+                n = min(head, len(frames))
+                frames[:n] = self._fade(frames[:n], np.arange(self.frames_written, self.frames_written + n), True)
+        if (self.frames_written + len(frames)) * 2 * self.channels > WAV_MAX_DATA_BYTES:
+            raise ValueError(f"Audio too long for a WAV file: {self.path}")
+        self._wav.writeframes(np.ascontiguousarray(frames, dtype='<i2').tobytes())
+        self.frames_written += len(frames)
+
+    def write(self, *channel_data):
+        if len(channel_data) != self.channels:
+            raise ValueError(f"Expected {self.channels} channel arrays, got {len(channel_data)}")
+        # Channels may arrive with different lengths; frames are cut to the shortest and the rest kept
+        channel_data = [np.concatenate((left, np.asarray(c, dtype=np.int16))) for left, c in zip(self._leftover, channel_data)]
+        n = min(len(c) for c in channel_data)
+        self._leftover = [c[n:] for c in channel_data]
+        frames = np.column_stack([c[:n] for c in channel_data])
+        if self._fade_samples:
+            frames = np.concatenate((self._tail, frames))
+            keep = min(self._fade_samples, len(frames))
+            frames, self._tail = frames[:len(frames) - keep], frames[len(frames) - keep:]
+        self._emit(frames)
+
+    def close(self):
+        if self._wav is None:
+            return
+        if len(self._tail):
+            tail = self._tail
+            # Everything still held back belongs to the fade-out (or to a file shorter than one fade)
+            total = self.frames_written + len(tail)
+            fade_positions = np.arange(len(tail)) + (self._fade_samples - len(tail))
+            if total >= self._fade_samples:
+                tail = self._fade(tail, fade_positions, False)
+            self._tail = tail[:0]
+            self._emit(tail)
+        self._wav.close()
+        self._wav = None
+
+__all__ = ['StreamingWavWriter', 'NanFiller', 'scan_ranges', 'normalize_chunk_to_int16']
@@ -37,10 +37,49 @@ Options:
     'berkeley': Use Berkeley server exclusively. No pyspedas calls.
 """
 
+        # --- Berkeley Downloads ---
+        self.download_workers = 8
+        """Number of files downloaded concurrently from the Berkeley server (1 = serial)."""
+
+        self.download_per_host = 4
+        """Maximum concurrent transfers against any one server host."""
+
+        self.listing_cache_ttl = 300
+        """Seconds a remote directory listing is reused without asking the server again;
+after that it is revalidated with a conditional request (0 = always revalidate)."""
+
+        self.listing_cache_on_disk = False
+        """If True, directory listings are also kept under {data_dir}/listing_cache/ for later sessions."""
+
+        # --- Local File Lookup ---
+        self.local_file_index = True
+        """Look up local data files in the SQLite index at {data_dir}/file_index.sqlite
+(rescanned per directory when its mtime changes) instead of listing directories on every call."""
+
         # --- Plot Display Control ---
         self.suppress_plots = False
         """If True, plotbot() will skip calling plt.show(). Useful for tests."""
 
+        # --- FITS CSV Loading ---
+        self.fits_csv_cache = True
+        """If True, FITS sf00/sf01 CSVs are cached next to the CSV as binary .npz
+sidecars (rebuilt when the CSV changes) so later loads skip CSV parsing."""
+
+        self.fits_read_workers = 4
+        """Number of threads used to read per-day FITS files concurrently (1 = serial)."""
+
+        # --- Long-Range Plotting ---
+        self.summary_pyramid_data_types = []
+        """Data types (e.g. ['mag_RTN']) for which min/max/mean summaries are built on the
+first plot where a pixel spans more time than the native cadence, and used for such plots."""
+
+        self.summary_pyramid_cadences = (1, 10, 60, 600)
+        """Summary pyramid bin widths in seconds."""
+
+        self.decimation = True
+        """Reduce lines (M4/LTTB) and spectrograms to the plot's pixel width before drawing.
+Individual variables can opt out with `var.decimate = False`."""
+
     @property
     def data_dir(self):
         """
@@ -8,7 +8,17 @@ class PlotbotConfig:
     # --- Public Attributes (with type hints) ---
     data_server: str # Options: 'dynamic', 'spdf', 'berkeley'
     data_dir: str # Configurable data directory path
+    download_workers: int # Concurrent Berkeley file downloads
+    download_per_host: int # Concurrent transfers per server host
+    listing_cache_ttl: float # Seconds a directory listing is reused
+    listing_cache_on_disk: bool # Keep directory listings on disk
+    local_file_index: bool # SQLite index of local data files
     suppress_plots: bool # Plot display control
+    fits_csv_cache: bool # Binary sidecar cache for FITS CSVs
+    fits_read_workers: int # Concurrent per-day FITS reads
+    summary_pyramid_data_types: list # Data types with min/max/mean summary pyramids
+    summary_pyramid_cadences: tuple # Summary pyramid bin widths (seconds)
+    decimation: bool # Pixel-aware line/spectrogram decimation when rendering
     pyspedas_data_dir: str # Legacy property for backwards compatibility
     # Add hints for any other future config attributes here
     # Example: default_plot_style: Optional[str]
@@ -6,13 +6,14 @@ import cdflib
 from datetime import datetime, timedelta, timezone
 import logging
 from typing import Optional, List
-import bisect
+from collections import OrderedDict
 
 # Import our custom managers
 from plotbot.print_manager import print_manager
 from plotbot.plot_manager import plot_manager
 from plotbot.plot_config import plot_config, retrieve_plot_config_snapshot
 from plotbot.time_utils import TimeRangeTracker
+from plotbot.vdf_processing import to_epoch_ns, nearest_time_indices
 from ._utils import _format_setattr_debug
 
 class psp_span_vdf_class:
@@ -58,12 +59,15 @@ class psp_span_vdf_class:
         object.__setattr__(self, 'datetime', [])
         object.__setattr__(self, 'datetime_array', None)
         object.__setattr__(self, 'time', None)
+        object.__setattr__(self, '_epoch_ns', np.empty(0, dtype=np.int64))  # Sorted int64 ns index of self.datetime
         object.__setattr__(self, '_current_operation_trange', None)
         
         # VDF-specific attributes
         object.__setattr__(self, '_mass_p', 0.010438870)    # Proton mass in eV/c^2 (Jaye's constant)
         object.__setattr__(self, '_charge_p', 1)           # Proton charge in eV (Jaye's constant)
         object.__setattr__(self, '_current_timeslice_index', None)  # For single-time plotting
+        object.__setattr__(self, '_slice_cache', OrderedDict())     # LRU of per-slice plane grids + bounds
+        object.__setattr__(self, 'vdf_slice_cache_size', 256)      # Slices kept in the LRU (slider scrubbing)
         
         # ⭐ PLOTBOT-STYLE PARAMETER SYSTEM ⭐
         # Direct attributes following Plotbot pattern (like epad.strahl.colorbar_limits)
@@ -175,6 +179,8 @@ class psp_span_vdf_class:
                 return
         
         self.datetime_array = np.array(self.datetime)
+        self._epoch_ns = to_epoch_ns(self.datetime) if len(self.datetime) else np.empty(0, dtype=np.int64)
+        self._slice_cache.clear()
         
         # Reshape data to (8φ × 32E × 8θ) structure for all time points (Jaye's Cell 15 approach)
         n_times = len(self.datetime)
@@ -217,28 +223,15 @@ class psp_span_vdf_class:
         else:
             print_manager.error("No theta/phi data found for VDF processing.")
     
+    def find_closest_timeslices(self, target_times):
+        """Nearest time slice index for each target (strings, datetimes or datetime64), in one vectorised lookup."""
+        if len(self._epoch_ns) == 0:
+            raise ValueError("No VDF time slices loaded")
+        return nearest_time_indices(self._epoch_ns, to_epoch_ns(target_times))
+
     def find_closest_timeslice(self, target_time):
-        """Find closest time slice using Jaye's bisect approach (Cell 11)."""
-        if isinstance(target_time, str):
-            # Parse plotbot time string format
-            from dateutil.parser import parse
-            target_datetime = parse(target_time.replace('/', ' '))
-        else:
-            target_datetime = target_time
-            
-        # Use Jaye's exact bisect approach
-        tSliceIndex = bisect.bisect_left(self.datetime, target_datetime)
-        
-        # Handle edge cases
-        if tSliceIndex >= len(self.datetime):
-            tSliceIndex = len(self.datetime) - 1
-        elif tSliceIndex > 0:
-            # Check if previous time is actually closer
-            time_diff_current = abs((self.datetime[tSliceIndex] - target_datetime).total_seconds())
-            time_diff_previous = abs((self.datetime[tSliceIndex-1] - target_datetime).total_seconds()) 
-            if time_diff_previous < time_diff_current:
-                tSliceIndex -= 1
-        
+        """Find closest time slice (same choice as Jaye's bisect approach, Cell 11)."""
+        tSliceIndex = int(self.find_closest_timeslices(target_time))
         self._current_timeslice_index = tSliceIndex
         return tSliceIndex
     
@@ -555,6 +548,40 @@ class psp_span_vdf_class:
             
             return vx_plane, vy_plane, vdf_plane
     
+    def _bounds_key(self):
+        """Parameters the cached axis limits depend on."""
+        values = [self.enable_smart_padding, self.vdf_threshold_percentile, self.theta_smart_padding,
+                  self.phi_x_smart_padding, self.phi_y_smart_padding, self.phi_peak_centered,
+                  self.enable_zero_clipping, self.theta_x_axis_limits, self.theta_y_axis_limits,
+                  self.phi_x_axis_limits, self.phi_y_axis_limits]
+        return tuple(tuple(v) if isinstance(v, list) else v for v in values)
+
+    def get_slice_products(self, time_index):
+        """
+        Theta/phi plane grids and axis limits for one time slice, kept in an LRU cache.
+        
+        Returns:
+            dict with 'theta' (vx, vz, vdf), 'phi' (vx, vy, vdf), 'theta_limits'
+            and 'phi_limits' ((xlim, ylim) from get_axis_limits).
+        """
+        key = (int(time_index), self._bounds_key())
+        cache = self._slice_cache
+        if key in cache:
+            cache.move_to_end(key)
+            return cache[key]
+        theta = self.generate_velocity_grids(time_index, 'theta')
+        phi = self.generate_velocity_grids(time_index, 'phi')
+        products = {
+            'theta': theta,
+            'phi': phi,
+            'theta_limits': self.get_axis_limits('theta', *theta),
+            'phi_limits': self.get_axis_limits('phi', *phi),
+        }
+        cache[key] = products
+        while len(cache) > max(int(self.vdf_slice_cache_size), 0):
+            cache.popitem(last=False)
+        return products
+    
     def plot_vdf_2d_contour(self, target_time, plane_type='theta', ax=None, **plot_kwargs):
         """
         Create 2D VDF contour plot using the parameter system.
@@ -575,12 +602,15 @@ class psp_span_vdf_class:
         time_index = self.find_closest_timeslice(target_time)
         selected_time = self.datetime[time_index]
         
+        products = self.get_slice_products(time_index)
         if plane_type == 'theta':
-            vx_plane, vy_plane, vdf_plane = self.generate_velocity_grids(time_index, 'theta')
+            vx_plane, vy_plane, vdf_plane = products['theta']
+            xlim, ylim = products['theta_limits']
             default_title = f'VDF θ-plane: {selected_time.strftime("%Y-%m-%d %H:%M:%S")}'
             x_label, y_label = 'Vx (km/s)', 'Vz (km/s)'
         else:  # phi plane
-            vx_plane, vy_plane, vdf_plane = self.generate_velocity_grids(time_index, 'phi')
+            vx_plane, vy_plane, vdf_plane = products['phi']
+            xlim, ylim = products['phi_limits']
             default_title = f'VDF φ-plane: {selected_time.strftime("%Y-%m-%d %H:%M:%S")}'
             x_label, y_label = 'Vx (km/s)', 'Vy (km/s)'
         
@@ -590,9 +620,6 @@ class psp_span_vdf_class:
         else:
             fig = ax.figure
         
-        # Get axis limits using parameter hierarchy
-        xlim, ylim = self.get_axis_limits(plane_type, vx_plane, vy_plane, vdf_plane)
-        
         # Create contour plot with robust logarithmic scaling
         vdf_plot = vdf_plane.copy()
         vdf_plot[vdf_plot <= 0] = np.nan  # Remove zeros/negatives for log scale
@@ -812,6 +839,7 @@ class psp_span_vdf_class:
         allowed_attrs = [
             'raw_data', 'datetime', 'datetime_array', 'plot_config', 
             '_current_operation_trange', '_current_timeslice_index',
+            '_epoch_ns', '_slice_cache', 'vdf_slice_cache_size',
             'class_name', 'data_type', 'subclass_name', '_mass_p', '_charge_p',
             # VDF parameters now as direct attributes
             'enable_smart_padding', 'vdf_threshold_percentile', 
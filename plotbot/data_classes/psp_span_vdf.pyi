@@ -17,6 +17,9 @@ class psp_span_vdf_class:
     subclass_name: Optional[str]
     _current_operation_trange: Optional[List[str]]
     _current_timeslice_index: Optional[int]
+    _epoch_ns: np.ndarray               # Sorted int64 ns index of datetime
+    _slice_cache: Any                   # OrderedDict LRU of get_slice_products results
+    vdf_slice_cache_size: int           # Slices kept in the LRU cache
     
     # Physical constants
     _mass_p: float  # Proton mass in eV/c^2
@@ -55,6 +58,7 @@ class psp_span_vdf_class:
     def calculate_variables(self, imported_data: Union[DataObject, Dict[str, Any]]) -> None: ...
     
     # Time slice methods
+    def find_closest_timeslices(self, target_times: Union[str, datetime, np.datetime64, List[Any], np.ndarray]) -> np.ndarray: ...
     def find_closest_timeslice(self, target_time: Union[str, datetime]) -> int: ...
     def get_timeslice_data(self, target_time: Union[str, datetime]) -> Dict[str, Any]: ...
     
@@ -71,6 +75,8 @@ class psp_span_vdf_class:
     
     # Velocity and plotting methods
     def generate_velocity_grids(self, time_index: int, plane_type: str = 'theta') -> Tuple[np.ndarray, np.ndarray, np.ndarray]: ...
+    def _bounds_key(self) -> Tuple[Any, ...]: ...
+    def get_slice_products(self, time_index: int) -> Dict[str, Any]: ...
     def plot_vdf_2d_contour(self, target_time: Union[str, datetime], plane_type: str = 'theta', ax: Optional[Any] = None, **plot_kwargs: Any) -> Tuple[Any, Any]: ...
     def _add_velocity_circles(self, ax: Any, xlim: Tuple[float, float], ylim: Tuple[float, float]) -> None: ...
     
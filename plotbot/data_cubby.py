@@ -10,22 +10,11 @@ import copy
 import cdflib
 from typing import Optional, List, Dict, Tuple, Any
 import time as timer
-from functools import wraps
 import gc
 from numba import jit, prange
 
-def timer_decorator(timer_name):
-    def decorator(func):
-        @wraps(func)
-        def wrapper(*args, **kwargs):
-            start_time = timer.perf_counter()
-            result = func(*args, **kwargs)
-            end_time = timer.perf_counter()
-            duration_ms = (end_time - start_time) * 1000
-            print_manager.speed_test(f"⏱️ [{timer_name}] {func.__name__}: {duration_ms:.2f}ms")
-            return result
-        return wrapper
-    return decorator
+from .tracing import tracer, timer_decorator # Spans (and speed_test timings) for decorated functions
+from .metrics import metrics
 
 # ✨ Class imports removed - types now auto-register via stash() in __init__.py
 # This eliminates ~0.9s of import time by deferring class initialization
@@ -425,16 +414,19 @@ class data_cubby:
         'spi_sf0a_l3_mom': 'psp_alpha',
     }
 
+    # Data class singletons imported on first lookup: class_name -> LazyDataClass (see register_lazy)
+    _LAZY_INSTANCES = {}
+
     @classmethod
     def _add_cdf_classes_to_map(cls):
         """
-        Dynamically add CDF classes from custom_classes to the _CLASS_TYPE_MAP.
-        This is called during module initialization to register auto-generated CDF classes.
+        Register the auto-generated CDF classes in custom_classes for lazy loading.
+        Only the file names are scanned here; a class module is imported (and its
+        type added to _CLASS_TYPE_MAP) the first time it is looked up.
         """
         try:
-            import os
             from pathlib import Path
-            import importlib
+            from .lazy_loader import LazyDataClass
             
             # Get path to custom_classes directory
             current_dir = Path(__file__).parent
@@ -449,26 +441,40 @@ class data_cubby:
             
             for py_file in cdf_class_files:
                 class_name = py_file.stem  # e.g., 'psp_waves_auto'
-                
-                try:
-                    # Import the module dynamically
-                    module = importlib.import_module(f"plotbot.data_classes.custom_classes.{class_name}")
-                    
-                    # Get the class (follows pattern: class_name + '_class')
-                    class_type = getattr(module, f"{class_name}_class", None)
-                    
-                    if class_type:
-                        # Add to the class type map
-                        cls._CLASS_TYPE_MAP[class_name] = class_type
-                        print_manager.datacubby(f"[CDF_REGISTRATION_DEBUG] Added CDF class to type map: {class_name} -> {class_type.__name__}")
-                        print_manager.datacubby(f"[CDF_REGISTRATION_DEBUG] Full map now has {len(cls._CLASS_TYPE_MAP)} entries")
-                    
-                except Exception as e:
-                    print_manager.warning(f"Failed to add CDF class {class_name} to type map: {e}")
+                # Class follows pattern: class_name + '_class', instance: class_name
+                cls.register_lazy(class_name, LazyDataClass(
+                    f"plotbot.data_classes.custom_classes.{class_name}", f"{class_name}_class", class_name))
+                print_manager.datacubby(f"[CDF_REGISTRATION_DEBUG] Registered lazy CDF class: {class_name}")
                     
         except Exception as e:
             print_manager.warning(f"Failed to scan for CDF classes: {e}")
 
+    @classmethod
+    def register_lazy(cls, class_name, lazy_instance):
+        """
+        Register a data class singleton that is imported on first lookup.
+
+        grab(), _get_class_type_from_string() and plotbot.<name> load it via
+        load_lazy(), which stashes the instance under class_name.
+
+        Args:
+            class_name (str): Cubby key, e.g. 'mag_rtn_4sa'.
+            lazy_instance (LazyDataClass): Proxy for the module's singleton.
+        """
+        cls._LAZY_INSTANCES[class_name.lower()] = lazy_instance
+
+    @classmethod
+    def load_lazy(cls, class_name):
+        """Import a registered lazy singleton, stash it if needed and return it (None if not registered)."""
+        lazy_instance = cls._LAZY_INSTANCES.get(class_name.lower())
+        if lazy_instance is None:
+            return None
+        instance = lazy_instance._load_instance()
+        if class_name.lower() not in cls.class_registry:
+            cls.stash(instance, class_name=class_name.lower())
+            print_manager.datacubby(f"Lazy-loaded and stashed {class_name}")
+        return instance
+
     def __init__(self):
         """
         Initialize the DataCubby instance.
@@ -503,6 +509,9 @@ class data_cubby:
             print_manager.datacubby(f"[CLASS_TYPE_DEBUG] Resolved legacy alias '{data_type_str}' -> '{normalized}'")
         
         result = cls._CLASS_TYPE_MAP.get(normalized)
+        if result is None and normalized in cls._LAZY_INSTANCES:
+            cls.load_lazy(normalized)  # stash() adds the type to the map
+            result = cls._CLASS_TYPE_MAP.get(normalized)
         print_manager.datacubby(f"[CLASS_TYPE_DEBUG] Looking up '{data_type_str}' -> '{normalized}' -> {result}")
         if not result:
             print_manager.datacubby(f"[CLASS_TYPE_DEBUG] Available keys in _CLASS_TYPE_MAP: {list(cls._CLASS_TYPE_MAP.keys())}")
@@ -735,6 +744,8 @@ class data_cubby:
                   cls.class_registry.get(identifier_lower) or
                   cls.subclass_registry.get(identifier) or
                   cls.subclass_registry.get(identifier_lower))
+        if result is None and isinstance(identifier_lower, str) and identifier_lower in cls._LAZY_INSTANCES:
+            result = cls.load_lazy(identifier_lower)  # Data class not imported yet
         
         if result is not None:
             print_manager.datacubby(f"GRAB SUCCESS - Retrieved {identifier} with type {type(result)}")
@@ -1066,6 +1077,7 @@ class data_cubby:
                     print_manager.datacubby(f"Calling update() on global instance of {data_type_str} (ID: {id(global_instance)}). is_segment_merge={is_segment_merge}")
                     
                     start_time = timer.perf_counter()
+                    update_span = tracer.start_span('calculate', data_type=data_type_str, path='update')
                     try:
                         # Try the new signature first (with original_requested_trange)
                         global_instance.update(imported_data_obj, original_requested_trange=original_requested_trange)
@@ -1080,6 +1092,9 @@ class data_cubby:
                             # Re-raise if it's a different TypeError
                             raise te
                     end_time = timer.perf_counter()
+                    metrics.add_time(data_type_str, 'calculate', end_time - start_time)
+                    if update_span:
+                        update_span.end(records=len(global_instance.datetime_array) if getattr(global_instance, 'datetime_array', None) is not None else 0)
                     duration_ms = (end_time - start_time) * 1000
                     print_manager.speed_test(f"[TIMER_INSTANCE_UPDATE] global_instance.update() for {data_type_str}: {duration_ms:.2f}ms")
                     
@@ -1168,7 +1183,8 @@ class data_cubby:
             # We need to simulate the update process to get calculated vars
             if hasattr(temp_new_processed, 'calculate_variables'):
                 pm.dependency_management(f"[CUBBY_UPDATE_DEBUG Merge Path - Pre-calc]: imported_data_obj ID: {id(imported_data_obj)}, .data ID: {id(imported_data_obj.data) if hasattr(imported_data_obj, 'data') else 'N/A'}, .data keys: {list(imported_data_obj.data.keys()) if hasattr(imported_data_obj, 'data') else 'N/A'} ***")
-                temp_new_processed.calculate_variables(imported_data_obj)
+                with tracer.span('calculate', data_type=data_type_str, path='merge'), metrics.timed(data_type_str, 'calculate'):
+                    temp_new_processed.calculate_variables(imported_data_obj)
             else:
                 pm.warning(f"Temp instance for {data_type_str} lacks 'calculate_variables'. Merge might be incomplete.")
                 # Attempt basic assignment if possible (might fail)
@@ -1196,11 +1212,17 @@ class data_cubby:
         # Perform the array merge
         pm.datacubby("Calling _merge_arrays...")
         start_time = timer.perf_counter()
-        merged_times, merged_raw_data = cls._merge_arrays(
-            global_instance.datetime_array, global_instance.raw_data,
-            new_times, new_raw_data
-        )
+        with tracer.span('merge', data_type=data_type_str) as merge_span:
+            merged_times, merged_raw_data = cls._merge_arrays(
+                global_instance.datetime_array, global_instance.raw_data,
+                new_times, new_raw_data
+            )
         end_time = timer.perf_counter()
+        merged_bytes = sum(getattr(v, 'nbytes', 0) for v in (merged_raw_data or {}).values()) + getattr(merged_times, 'nbytes', 0)
+        metrics.add_time(data_type_str, 'merge', end_time - start_time)
+        metrics.count(data_type_str, 'merge_bytes', merged_bytes)
+        if merge_span and merged_times is not None:
+            merge_span.set(records=len(merged_times), bytes=merged_bytes)
         duration_ms = (end_time - start_time) * 1000
         print_manager.speed_test(f"[TIMER_MERGE_ARRAYS] _merge_arrays for {data_type_str}: {duration_ms:.2f}ms")
         
@@ -1354,4 +1376,4 @@ print('initialized data_cubby')
 
 # Add CDF classes to the type map after initialization
 data_cubby._add_cdf_classes_to_map()
-print('CDF classes added to data_cubby type map.')
\ No newline at end of file
+print('CDF classes registered with data_cubby.')
\ No newline at end of file
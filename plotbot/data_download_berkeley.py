@@ -6,7 +6,9 @@ from datetime import datetime, timezone, timedelta
 from bs4 import BeautifulSoup
 from dateutil.parser import parse
 from .print_manager import print_manager
-from .data_download_helpers import check_local_files, create_pattern_string, process_directory
+from .data_download_helpers import check_local_files, create_pattern_string, resolve_download
+from .download_engine import download_files
+from .config import config as plotbot_config
 from .server_access import server_access
 from .time_utils import daterange, get_needed_6hour_blocks
 from .data_classes.data_types import data_types, get_local_path
@@ -101,6 +103,8 @@ def download_berkeley_data(trange, data_type):
     #====================================================================
     # PROCESS FILES (6-HOUR OR DAILY)
     #====================================================================
+    # Latest versions are looked up first, then all missing files are downloaded together
+    download_jobs = []
     if config['file_time_format'] == '6-hour':
         blocks_to_download = get_needed_6hour_blocks(start_time, end_time)
         for block_date, block in blocks_to_download:
@@ -115,12 +119,14 @@ def download_berkeley_data(trange, data_type):
                 dir_url = f"{config['url'].format(data_level=config['data_level'])}{block_date.year}/{block_date.month:02d}/"
                 pattern_str = create_pattern_string(config['file_pattern'], config['data_level'], date_info)
                 
-                process_directory(
+                job = resolve_download(
                     dir_url=dir_url,
                     pattern_str=pattern_str,
                     date_info=date_info,
                     base_local_path=get_local_path(data_type).format(data_level=config['data_level'])
                 )
+                if job is not None:
+                    download_jobs.append(job)
             except Exception as e:
                 print("🤷🏾‍♂️ The data you're looking for can't be retrieved from the server, friend!")
                 print(f'An error occurred: {e}')
@@ -142,17 +148,27 @@ def download_berkeley_data(trange, data_type):
                 dir_url = f"{config['url'].format(data_level=config['data_level'])}{single_date.year}/{single_date.month:02d}/"
                 pattern_str = create_pattern_string(config['file_pattern'], config['data_level'], date_info)
                 
-                process_directory(
+                job = resolve_download(
                     dir_url=dir_url,
                     pattern_str=pattern_str,
                     date_info=date_info,
                     base_local_path=get_local_path(data_type).format(data_level=config['data_level'])
                 )
+                if job is not None:
+                    download_jobs.append(job)
             except Exception as e:
                 print("🤷🏾‍♂️ The data you're looking for can't be retrieved from the server, friend!")
                 print(f'An error occurred: {e}')
                 continue
 
+    #====================================================================
+    # DOWNLOAD FILES CONCURRENTLY
+    #====================================================================
+    download_files(server_access.session, download_jobs,
+                   workers=plotbot_config.download_workers,
+                   per_host=plotbot_config.download_per_host,
+                   data_type=data_type)
+
     # Add at the end of the function before returning
     print_manager.time_output("download_berkeley_data", [str(start_time), str(end_time)])
     print_manager.time_tracking(f"Completed download for time range: {start_time} to {end_time}")
@@ -1,13 +1,15 @@
 #plotbot/data_download_helpers.py
 import os
-import re
+import glob
 from datetime import datetime, timezone, timedelta
 from dateutil.parser import parse
-from bs4 import BeautifulSoup
 from .print_manager import print_manager, format_datetime_for_log
 from .time_utils import daterange, get_needed_6hour_blocks
 from .data_classes.data_types import data_types, get_local_path
 from .server_access import server_access
+from .download_engine import download_files
+from .listing_cache import listing_cache, compiled_pattern, parse_listing
+from .local_file_index import local_file_index
 
 #====================================================================
 # FUNCTION: check_local_files, Verifies data file availability locally
@@ -199,28 +201,20 @@ def check_local_files(trange: tuple, data_type: str) -> tuple[bool, list, list]:
 # FUNCTION: case_insensitive_file_search, Finds files ignoring case
 #====================================================================
 def case_insensitive_file_search(directory, pattern_base):
-    """Perform a case-insensitive file search in the given directory."""
+    """Perform a case-insensitive file search in the given directory (via the local file index)."""
     try:
         if not os.path.exists(directory):
             print_manager.debug(f"Directory does not exist: {directory}")
             return []
             
         print_manager.debug(f"\nSearching directory: {directory}")
-        dir_contents = os.listdir(directory)                        # Get list of files in directory
-        print_manager.debug(f"Found {len(dir_contents)} total files in directory")
-        if len(dir_contents) > 0:
-            print_manager.debug(f"First few files: {dir_contents[:3]}")
-        
         print_manager.debug(f"Searching for pattern: {pattern_base}")
         
         pattern_base = pattern_base.replace('_v*.cdf', '_v')      # Remove version wildcard for matching
         print_manager.debug(f"Modified pattern for matching: {pattern_base}")
         
-        matching_files = [                                         # Create list of matching files
-            os.path.join(directory, filename)                     # Include full path in results
-            for filename in dir_contents                          # Check each file in directory
-            if filename.lower().startswith(pattern_base.lower())         # Compare lowercase versions
-        ]
+        # Files whose names start with pattern_base (compared in lowercase)
+        matching_files = local_file_index.find(directory, glob.escape(pattern_base) + '*')
         
         print_manager.debug(f"Found {len(matching_files)} matching files")
         for file in matching_files:
@@ -257,18 +251,42 @@ def process_directory(dir_url, pattern_str, date_info, base_local_path):
         or the file already existed locally, None if the directory or file was 
         not found on the server.
     """
-    response = authenticate_session(dir_url)  # Attempt to access the directory, handling login if needed.
+    job = resolve_download(dir_url, pattern_str, date_info, base_local_path)
+    if job is None: # Directory or file not found, or the file is already local.
+        return None # Step out of function.
+    
+    # Initiate the actual download process.
+    return download_file(server_access.session, *job) # Return True on success, False on download failure.
+
+#====================================================================
+# FUNCTION: resolve_download, Finds the latest remote file and its local destination
+#====================================================================
+def resolve_download(dir_url, pattern_str, date_info, base_local_path):
+    """
+    Find the latest version of a needed file in a remote directory without 
+    downloading it, so many files can be gathered and fetched together by 
+    `download_engine.download_files`.
+
+    Args:
+        Same as `process_directory`.
+
+    Returns:
+        A `(file_url, local_file_path)` tuple, or None if the directory or file 
+        was not found on the server or the file already exists locally.
+    """
+    # Access the directory (handling login if needed), or reuse its cached listing.
+    status_code, filenames = listing_cache.get(dir_url, authenticate_session)
     
-    if response.status_code == 404: # Check if the directory itself wasn't found.
+    if status_code == 404: # Check if the directory itself wasn't found.
         print(f"\nERROR: No data available at {dir_url}") # Indicate directory not found.
         return None # Step out of function.
     
-    if response.status_code != 200: # Check for other access errors (like permission denied after auth).
-        print(f"Failed to access {dir_url} with status code {response.status_code}") # Indicate generic access failure.
+    if status_code != 200: # Check for other access errors (like permission denied after auth).
+        print(f"Failed to access {dir_url} with status code {status_code}") # Indicate generic access failure.
         return None # Step out of function.
         
-    # If directory accessed successfully, parse the HTML listing.
-    latest_file = process_file_listing(response.text, pattern_str, date_info) # Find the filename with the highest version number.
+    # If directory accessed successfully, pick from its listing.
+    latest_file = latest_file_version(filenames, pattern_str, date_info) # Find the filename with the highest version number.
     
     if not latest_file: # Check if any matching file was found in the listing.
         return None # Step out of function.
@@ -280,10 +298,7 @@ def process_directory(dir_url, pattern_str, date_info, base_local_path):
         return None # Step out of function.
         
     # Construct the full URL for the specific file to download.
-    file_url = dir_url + latest_file
-    
-    # Initiate the actual download process.
-    return download_file(server_access.session, file_url, local_file_path) # Return True on success, False on download failure.
+    return dir_url + latest_file, local_file_path
 
 #====================================================================
 # FUNCTION: download_file, ✨ Downloads a single file and saves it locally ✨
@@ -292,7 +307,9 @@ def download_file(session, file_url, local_file_path):
     """
     Download a single file from a URL and save it locally.
 
-    Uses the provided requests session to perform the download.
+    Streams the file in chunks to `local_file_path + '.part'` (resuming a 
+    partial file left by an interrupted download with an HTTP Range request), 
+    checks its size, and renames it into place.
 
     Args:
         session: The `requests.Session` object to use for the download 
@@ -301,26 +318,14 @@ def download_file(session, file_url, local_file_path):
         local_file_path: The full local path where the file should be saved.
 
     Returns:
-        True if the download and saving were successful (HTTP status 200), 
-        False otherwise.
+        True if the download and saving were successful, False otherwise.
     """
-    print_manager.status(f'Downloading {file_url}')
-    # Send the HTTP GET request to download the file content:
-    file_response = session.get(file_url) #<--- ✨This is where the download happens ✨
-    
-    if file_response.status_code == 200:
-        with open(local_file_path, 'wb') as f:
-            f.write(file_response.content)
-        print_manager.status(f'File {local_file_path} downloaded successfully.')
-        return True
-    else:
-        print_manager.status(f'Error downloading {file_url}, status code {file_response.status_code}')
-        return False
+    return download_files(session, [(file_url, local_file_path)], workers=1)[0] #<--- ✨This is where the download happens ✨
 
 #====================================================================
 # FUNCTION: authenticate_session, Handles authentication for accessing URLs
 #====================================================================
-def authenticate_session(dir_url):
+def authenticate_session(dir_url, headers=None):
     """
     Attempt to access a directory URL, handling authentication if required.
 
@@ -330,17 +335,20 @@ def authenticate_session(dir_url):
 
     Args:
         dir_url: The URL of the remote directory to access.
+        headers: Optional extra request headers (e.g. the conditional 
+                 `If-None-Match`/`If-Modified-Since` sent by the listing cache).
 
     Returns:
-        The `requests.Response` object from the successful GET request, or 
-        the response object from the final failed attempt (e.g., 401, 404).
+        The `requests.Response` object from the successful GET request (200, 
+        or 304 for an unchanged conditional request), or the response object 
+        from the final failed attempt (e.g., 401, 404).
     """
     print_manager.debug("🔍 Starting authentication attempt")
     print_manager.debug(f"🔑 Password type: {server_access._password_type}")
-    response = server_access.session.get(dir_url)
+    response = server_access.session.get(dir_url, headers=headers)
     print_manager.debug(f"📡 Initial response code: {response.status_code}")
     
-    if response.status_code == 200:
+    if response.status_code in (200, 304):
         return response
         
     if response.status_code == 401:
@@ -357,10 +365,10 @@ def authenticate_session(dir_url):
             password = server_access.password  # This should trigger the password prompt
             server_access.session.auth = (username, password)
             
-            response = server_access.session.get(dir_url)
+            response = server_access.session.get(dir_url, headers=headers)
             print_manager.debug(f"📡 Response code after auth attempt: {response.status_code}")
             
-            if response.status_code == 200:
+            if response.status_code in (200, 304):
                 return response
                 
             if response.status_code == 401 and attempt < 1:
@@ -389,11 +397,25 @@ def process_file_listing(html_content, pattern_str, date_info):
         A string containing the filename of the latest version found, or None if 
         no matching files are found.
     """
-    soup = BeautifulSoup(html_content, 'html.parser')
-    links = soup.find_all('a')
-    filenames = [link.get('href') for link in links if link.get('href')]
-    
-    pattern = re.compile(pattern_str)
+    return latest_file_version(parse_listing(html_content), pattern_str, date_info)
+
+#====================================================================
+# FUNCTION: latest_file_version, Finds latest file version among listed filenames
+#====================================================================
+def latest_file_version(filenames, pattern_str, date_info):
+    """
+    Find the latest version of a file among already parsed listing filenames.
+
+    Args:
+        filenames: Link targets from a directory listing (see `listing_cache`).
+        pattern_str: The regex pattern string capturing the version number 
+                     (compiled once and reused).
+        date_info: As for `process_file_listing`.
+
+    Returns:
+        The filename of the latest version found, or None.
+    """
+    pattern = compiled_pattern(pattern_str)
     files_with_versions = [(fname, int(m.group(1)))
                           for fname in filenames
                           if (m := pattern.match(fname))]
@@ -15,6 +15,7 @@ from dateutil.parser import parse
 
 from .print_manager import print_manager
 from .data_classes.data_types import data_types, get_local_path # To get pyspedas datatype mapping
+from .local_file_index import local_file_index
 from .time_utils import daterange
 from pathlib import Path
 from datetime import timedelta
@@ -92,8 +93,6 @@ def smart_check_local_pyspedas_files(plotbot_key, trange):
         found_files = []
         missing_dates = []
 
-        import glob as glob_module
-
         if file_time_format == 'daily':
             # Daily files - one file per day
             current_date = start_dt.date()
@@ -106,11 +105,8 @@ def smart_check_local_pyspedas_files(plotbot_key, trange):
                 # Construct filename pattern (may contain wildcards like v*.cdf)
                 filename_pattern = file_pattern.format(data_level=data_level, date_str=date_str)
 
-                # Full glob pattern
-                glob_pattern = str(base_path / year_str / filename_pattern)
-
-                # Use glob to find matching files (handles wildcards like v*)
-                matching_files = glob_module.glob(glob_pattern)
+                # Indexed lookup of the year directory (handles wildcards like v*)
+                matching_files = local_file_index.find(str(base_path / year_str), filename_pattern, latest_only=True)
 
                 if matching_files:
                     found_files.extend(matching_files)
@@ -133,11 +129,8 @@ def smart_check_local_pyspedas_files(plotbot_key, trange):
                 # Construct filename pattern (may contain wildcards)
                 filename_pattern = file_pattern.format(data_level=data_level, date_hour_str=date_hour_str)
 
-                # Full glob pattern
-                glob_pattern = str(base_path / year_str / filename_pattern)
-
-                # Use glob to find matching files
-                matching_files = glob_module.glob(glob_pattern)
+                # Indexed lookup of the year directory
+                matching_files = local_file_index.find(str(base_path / year_str), filename_pattern, latest_only=True)
 
                 if matching_files:
                     found_files.extend(matching_files)
@@ -9,25 +9,14 @@ from datetime import datetime, timezone, timedelta
 from dateutil.parser import parse
 from fnmatch import fnmatch # Import for wildcard matching
 import time as timer
-from functools import wraps
-
-def timer_decorator(timer_name):
-    def decorator(func):
-        @wraps(func)
-        def wrapper(*args, **kwargs):
-            start_time = timer.perf_counter()
-            result = func(*args, **kwargs)
-            end_time = timer.perf_counter()
-            duration_ms = (end_time - start_time) * 1000
-            print_manager.speed_test(f"⏱️ [{timer_name}] {func.__name__}: {duration_ms:.2f}ms")
-            return result
-        return wrapper
-    return decorator
+
+from .tracing import tracer, timer_decorator # Spans (and speed_test timings) for decorated functions
 
 from .print_manager import print_manager, format_datetime_for_log
 from .time_utils import daterange
 from .data_tracker import global_tracker
 from .data_classes.data_types import data_types, get_local_path # UPDATED PATH
+from .local_file_index import local_file_index, latest_versions
 # from .data_cubby import data_cubby # MOVED inside import_data_function
 # from .plotbot_helpers import find_local_fits_csvs # This function is defined locally below
 
@@ -416,10 +405,13 @@ def import_data_function(trange, data_type):
             # Add any other raw columns identified as necessary from calculate_proton_fits_vars
         ]
 
-        all_raw_data_list = [] # List to store DataFrames from each file
+        all_raw_data_list = [] # List of (tt2000, data dict) tuples, one per file
         dates_processed = []
         dates_missing_files = []
 
+        # Locate one sf00 file per day first so the reads can run concurrently
+        sf00_paths = []
+        sf00_dates = []
         for single_date in daterange(start_time, end_time):
             date_str = single_date.strftime('%Y%m%d')
             print_manager.debug(f"Searching for SF00 FITS CSV for date: {date_str}")
@@ -432,55 +424,50 @@ def import_data_function(trange, data_type):
                 # Assuming only one match per pattern per day is expected
                 if len(sf00_files) > 1:
                      print_manager.warning(f"Multiple sf00 files found for {date_str}, using first: {sf00_files[0]}")
+                print_manager.debug(f"  Found sf00 file: '{os.path.basename(sf00_files[0])}'")
+                sf00_paths.append(sf00_files[0])
+                sf00_dates.append(date_str)
+            else:
+                print_manager.debug(f"  ✗ Missing sf00 file for date {date_str}")
+                dates_missing_files.append(date_str)
 
-                sf00_path = sf00_files[0]
-                print_manager.debug(f"  Found sf00 file: '{os.path.basename(sf00_path)}'")
+        # Only rows inside the requested range are returned by the cache reader
+        tt2000_range = tuple(
+            cdflib.cdfepoch.compute_tt2000(
+                [t.year, t.month, t.day, t.hour, t.minute, t.second, int(t.microsecond/1000)]
+            )
+            for t in (start_time, end_time)
+        )
 
-                try:
-                    print_manager.processing(f"Loading raw FITS data from {os.path.basename(sf00_path)}...")
-                    # --- Read CSV file, selecting only needed columns ---
-                    try:
-                        # Use 'usecols' to load only necessary data
-                        df_sf00_raw = pd.read_csv(sf00_path, usecols=lambda col: col in raw_cols_needed)
-                        # Check if all needed columns were actually present
-                        missing_cols = [col for col in raw_cols_needed if col not in df_sf00_raw.columns]
-                        if missing_cols:
-                             print_manager.warning(f"  ! Missing required columns in {os.path.basename(sf00_path)}: {missing_cols}. Skipping file.")
-                             dates_missing_files.append(date_str)
-                             continue
-                    except FileNotFoundError:
-                         print_manager.error(f"  ✗ Could not find CSV file: {sf00_path}")
-                         dates_missing_files.append(date_str)
-                         continue # Skip to next date
-                    except pd.errors.EmptyDataError:
-                         print_manager.warning(f"  ✗ CSV file is empty: {sf00_path}")
-                         dates_missing_files.append(date_str)
-                         continue # Skip to next date
-                    except ValueError as ve: # Catches errors from usecols if a required col doesn't exist
-                         print_manager.error(f"  ✗ Error reading specific columns from {sf00_path}: {ve}. Check if required columns exist.")
-                         dates_missing_files.append(date_str)
-                         continue
-                    except Exception as read_e:
-                         print_manager.error(f"  ✗ Error reading CSV file {sf00_path}: {read_e}")
-                         dates_missing_files.append(date_str)
-                         continue # Skip to next date
-
-                    if not df_sf00_raw.empty:
-                        all_raw_data_list.append(df_sf00_raw)
-                        dates_processed.append(date_str)
-                        print_manager.processing(f"  ✓ Raw data loaded for {date_str}")
-                    else:
-                        print_manager.warning(f"  ✗ DataFrame empty after loading {sf00_path}")
-                        dates_missing_files.append(date_str)
+        from .config import config as plotbot_config
+        from .fits_csv_cache import read_fits_csvs_parallel
+        print_manager.processing(f"Loading raw FITS data from {len(sf00_paths)} file(s)...")
+        read_results = read_fits_csvs_parallel(
+            sf00_paths, raw_cols_needed, tt2000_range,
+            use_cache=plotbot_config.fits_csv_cache,
+            max_workers=plotbot_config.fits_read_workers,
+        )
 
-                except Exception as e:
-                    print_manager.error(f"  ✗ Error during FITS data loading for {date_str}: {e}")
-                    import traceback
-                    print_manager.debug(traceback.format_exc())
-                    dates_missing_files.append(date_str)
-            else:
-                print_manager.debug(f"  ✗ Missing sf00 file for date {date_str}")
+        for date_str, sf00_path, result in zip(sf00_dates, sf00_paths, read_results):
+            if isinstance(result, KeyError):
+                print_manager.warning(f"  ! Missing required columns in {os.path.basename(sf00_path)}: {result.args[0]}. Skipping file.")
+                dates_missing_files.append(date_str)
+            elif isinstance(result, FileNotFoundError):
+                print_manager.error(f"  ✗ Could not find CSV file: {sf00_path}")
                 dates_missing_files.append(date_str)
+            elif isinstance(result, pd.errors.EmptyDataError):
+                print_manager.warning(f"  ✗ CSV file is empty: {sf00_path}")
+                dates_missing_files.append(date_str)
+            elif isinstance(result, Exception):
+                print_manager.error(f"  ✗ Error reading CSV file {sf00_path}: {result}")
+                dates_missing_files.append(date_str)
+            elif len(result[0]) == 0:
+                print_manager.debug(f"  ✗ No rows inside {trange} in {os.path.basename(sf00_path)}")
+                dates_missing_files.append(date_str)
+            else:
+                all_raw_data_list.append(result)
+                dates_processed.append(date_str)
+                print_manager.processing(f"  ✓ Raw data loaded for {date_str}")
 
         if not all_raw_data_list:
             print_manager.warning(f"No raw FITS data could be loaded for the time range {trange}. Missing files for dates: {dates_missing_files}")
@@ -488,71 +475,25 @@ def import_data_function(trange, data_type):
             end_step(step_key, step_start, {"error": "no raw data loaded"})
             return None
 
-        # Consolidate raw data
+        # Consolidate raw data (times are already TT2000 from the cache reader)
         print_manager.debug("Consolidating raw FITS data...")
         try:
-            final_raw_df = pd.concat(all_raw_data_list, ignore_index=True)
+            tt2000_array = np.concatenate([times for times, _ in all_raw_data_list])
+            final_data = {
+                col: np.concatenate([data[col] for _, data in all_raw_data_list])
+                for col in raw_cols_needed if col != 'time'
+            }
+            print_manager.debug(f"Converted final times to TT2000 (Length: {len(tt2000_array)})")
         except Exception as concat_e:
-            print_manager.error(f"Error concatenating raw FITS DataFrames: {concat_e}")
+            print_manager.error(f"Error concatenating raw FITS data: {concat_e}")
             end_step(step_key, step_start, {"error": "concatenation error"})
             return None
 
-        # Convert time to datetime objects, then to TT2000
-        try:
-            # Assuming 'time' column contains Unix epoch seconds
-            # Using to_numpy() to directly get numpy arrays, avoiding to_pydatetime() completely
-            datetime_series = pd.to_datetime(final_raw_df['time'], unit='s', utc=True)
-            # Convert to numpy array of datetime64 objects
-            datetime_objs = datetime_series.to_numpy()
-            # Convert to Python datetime objects for components extraction
-            datetime_components_list = [
-                [dt.year, dt.month, dt.day, dt.hour, dt.minute, dt.second, int(dt.microsecond / 1000)]
-                for dt in datetime_objs
-            ]
-            tt2000_array = cdflib.cdfepoch.compute_tt2000(datetime_components_list)
-            print_manager.debug(f"Converted final times to TT2000 (Length: {len(tt2000_array)})")
-        except Exception as time_e:
-            print_manager.error(f"Error converting FITS time column to TT2000: {time_e}")
-            end_step(step_key, step_start, {"error": "time conversion error"})
-            return None
-
-        # Create final data dictionary with NumPy arrays
-        final_data = {}
-        for col in raw_cols_needed:
-            if col != 'time': # Exclude the original time column
-                try:
-                    # Convert column to numpy array, handling potential errors
-                    final_data[col] = final_raw_df[col].to_numpy()
-                except KeyError:
-                    print_manager.warning(f"Column '{col}' not found during final conversion, filling with NaNs.")
-                    final_data[col] = np.full(len(tt2000_array), np.nan)
-                except Exception as np_e:
-                    print_manager.error(f"Error converting column '{col}' to NumPy array: {np_e}")
-                    final_data[col] = np.full(len(tt2000_array), np.nan)
-
-
-        # Sort based on TT2000 times
+        # Sort based on TT2000 times (each file is already sorted; this orders the days)
         try:
-            sort_indices = np.argsort(tt2000_array)
+            sort_indices = np.argsort(tt2000_array, kind='stable')
             times_sorted = tt2000_array[sort_indices]
-            data_sorted = {}
-            for var_name in final_data:
-                 if final_data[var_name] is not None:
-                     # Ensure the data array exists and is not empty before trying to sort
-                     if isinstance(final_data[var_name], np.ndarray) and final_data[var_name].size > 0:
-                         try:
-                             data_sorted[var_name] = final_data[var_name][sort_indices]
-                         except IndexError as ie:
-                             print_manager.error(f"Sorting IndexError for '{var_name}': {ie}")
-                             print_manager.error(f"  Data shape: {final_data[var_name].shape}, Sort indices length: {len(sort_indices)}")
-                             # Fill with NaNs as a fallback
-                             data_sorted[var_name] = np.full(len(times_sorted), np.nan)
-                     else:
-                          # Handle cases where data might be None or empty after potential errors
-                          print_manager.warning(f"Data for '{var_name}' is empty or None before sorting, filling with NaNs.")
-                          data_sorted[var_name] = np.full(len(times_sorted), np.nan)
-                 else:
-                     data_sorted[var_name] = None # Keep None if it was None
+            data_sorted = {var_name: values[sort_indices] for var_name, values in final_data.items()}
         except Exception as sort_e:
             print_manager.error(f"Error during sorting of raw FITS data: {sort_e}")
             end_step(step_key, step_start, {"error": "sorting error"})
@@ -1273,11 +1214,8 @@ def import_data_function(trange, data_type):
                         data_level=config['data_level'],
                         date_hour_str=date_hour_str # Use combined date_hour_str
                     )
-                    if os.path.exists(local_dir):
-                        pattern = file_pattern.replace('*', '.*') # Glob to regex
-                        regex = re.compile(pattern, re.IGNORECASE)
-                        matching = [os.path.join(local_dir, f) for f in os.listdir(local_dir) if regex.match(f)]
-                        found_files.extend(matching)
+                    # Indexed, case-insensitive lookup; only the highest _vNN of each file
+                    found_files.extend(local_file_index.find(local_dir, file_pattern, latest_only=True))
 
             elif config['file_time_format'] == 'daily':
                 file_pattern_template = config['file_pattern_import']
@@ -1287,15 +1225,10 @@ def import_data_function(trange, data_type):
                 )
                 print_manager.debug(f"    Searching for DAILY pattern: '{file_pattern}' in dir: '{local_dir}'")
                 if os.path.exists(local_dir):
-                    # list_dir_files = os.listdir(local_dir) # Keep for debug if needed
-                    # print_manager.debug(f"      Files in dir: {list_dir_files[:10]} ... (total {len(list_dir_files)})") # ADDED - potentially long
-                    pattern_for_re = file_pattern.replace('*', '.*') # Glob to regex
-                    regex = re.compile(pattern_for_re, re.IGNORECASE)
-                    current_dir_matches = []
-                    for f_name in os.listdir(local_dir):
-                        if regex.match(f_name):
-                            current_dir_matches.append(os.path.join(local_dir, f_name))
-                            print_manager.debug(f"      MATCHED file: {f_name} with pattern {pattern_for_re}") # ADDED
+                    # Indexed, case-insensitive lookup; only the highest _vNN of each file
+                    current_dir_matches = local_file_index.find(local_dir, file_pattern, latest_only=True)
+                    for f_path in current_dir_matches:
+                        print_manager.debug(f"      MATCHED file: {os.path.basename(f_path)} with pattern {file_pattern}") # ADDED
                     found_files.extend(current_dir_matches)
                 else:
                     print_manager.debug(f"    Local directory does not exist: {local_dir}") # ADDED
@@ -1310,26 +1243,8 @@ def import_data_function(trange, data_type):
 
         # 🐛 FIX: Keep only the highest version of each file (e.g., v04 instead of v00)
         # This prevents duplicate data from multiple file versions being loaded
-        def get_file_base_and_version(filepath):
-            """Extract base name (without version) and version number from CDF filename."""
-            filename = os.path.basename(filepath)
-            # Match pattern like: name_v00.cdf, name_v04.cdf, etc.
-            import re
-            match = re.search(r'(.+)_v(\d+)\.cdf$', filename, re.IGNORECASE)
-            if match:
-                return match.group(1), int(match.group(2))
-            return filename, 0  # No version found, treat as version 0
-
-        # Group files by their base name (without version)
-        file_versions = {}
-        for filepath in found_files:
-            base, version = get_file_base_and_version(filepath)
-            if base not in file_versions or version > file_versions[base][1]:
-                file_versions[base] = (filepath, version)
-
-        # Keep only the highest version of each file
         original_count = len(found_files)
-        found_files = sorted([fv[0] for fv in file_versions.values()])
+        found_files = latest_versions(found_files)
         if len(found_files) < original_count:
             print_manager.status(f"📁 Filtered to highest versions: {original_count} -> {len(found_files)} files (removed {original_count - len(found_files)} older versions)")
 
@@ -486,8 +486,8 @@ def save_data_snapshot(filename: Optional[str] = None,
     filename : str or 'auto', optional
         Desired filename (CAN include .pkl or compression extension, these will be handled).
         If 'auto' or None, a timestamped filename is generated.
-        Path component: if filename includes 'data_snapshots/', it's used as is (minus extension for re-adding).
-        Otherwise, it's treated as a base name to be placed in 'data_snapshots/'.
+        Path component: if filename includes 'data_snapshots/' or is an absolute path, it's used as is
+        (minus extension for re-adding). Otherwise, it's treated as a base name to be placed in 'data_snapshots/'.
     classes : list of Plotbot data class instances, optional
         Specific global Plotbot class instances (e.g., [plotbot.mag_rtn, plotbot.proton]) to save.
         If None or empty, attempts to save all from data_cubby (behavior might need refinement for this case).
@@ -506,8 +506,8 @@ def save_data_snapshot(filename: Optional[str] = None,
 
     Returns
     -------
-    Optional[str]
-        The full path to the saved snapshot file if successful, otherwise None.
+    str or bool
+        The path of the saved snapshot file (extension included) if successful, otherwise False.
     """
     pm = print_manager
 
@@ -829,7 +829,6 @@ def save_data_snapshot(filename: Optional[str] = None,
          final_filepath = None # Ensure final_filepath is None if nothing to save
     else:
         output_dir = "data_snapshots"
-        os.makedirs(output_dir, exist_ok=True)
         
         # Determine the base name (without extension) and the directory to save in.
         _name_to_use_for_file = ""
@@ -844,8 +843,8 @@ def save_data_snapshot(filename: Optional[str] = None,
                  _vars_str = '+'.join(sorted(list(set(type(inst).__name__ for inst in classes))))
             _name_to_use_for_file = f"snapshot_{_timestamp}_{_vars_str}"
             # _dir_to_save_in is already output_dir
-        elif filename.startswith(output_dir + os.sep):
-            # Filename already contains "data_snapshots/" prefix.
+        elif filename.startswith(output_dir + os.sep) or os.path.isabs(filename):
+            # Filename already contains "data_snapshots/" prefix, or is an absolute path elsewhere.
             _dir_to_save_in = os.path.dirname(filename) # This should effectively be output_dir or a subdir within it
             _name_to_use_for_file = os.path.basename(filename)
         else:
@@ -886,6 +885,7 @@ def save_data_snapshot(filename: Optional[str] = None,
         #          _dir_to_save_in becomes "data_snapshots"
         #          _name_to_use_for_file becomes "test_advanced_snapshot_mag_rtn_4sa"
         #          final_filepath = "data_snapshots/test_advanced_snapshot_mag_rtn_4sa.pkl" - CORRECT!
+        os.makedirs(os.path.dirname(final_filepath), exist_ok=True)
 
         try:
             if actual_compression_format == "gzip":
@@ -940,7 +940,7 @@ def save_data_snapshot(filename: Optional[str] = None,
         # Add more details from your original summary if desired, e.g., number of classes/tranges
         if classes: pm.status(f"   Included data for types: {[type(inst).__name__ for inst in classes]}")
         if trange_list: pm.status(f"   Processed {len(trange_list)} time range(s).")
-        return True # Return True if final_filepath is not None
+        return final_filepath # The written path (truthy) if final_filepath is not None
     else:
         pm.error("⚠️ SNAPSHOT CREATION FAILED or nothing to save (check logs above for specific errors).") # Unified failure message
         return False # Return False if final_filepath is None
@@ -3,6 +3,7 @@
 from datetime import datetime, timezone, timedelta
 from dateutil.parser import parse
 from .print_manager import print_manager
+from .metrics import metrics
 import pandas as pd
 import numpy as np # Ensure numpy is imported
 
@@ -19,6 +20,7 @@ class DataTracker:
     def is_import_needed(self, trange, data_type):
         """Check if import is needed based on trange and cached data"""
         if data_type not in self.imported_ranges:
+            metrics.count(data_type, 'tracker_misses')
             return True
 
         # Convert request times to datetime using flexible parser
@@ -32,8 +34,10 @@ class DataTracker:
         # Check if any stored range covers our request
         for stored_start, stored_end in self.imported_ranges[data_type]:
             if start_time >= stored_start and end_time <= stored_end:
+                metrics.count(data_type, 'tracker_hits')
                 return False  # Found a range that covers our request
                 
+        metrics.count(data_type, 'tracker_misses')
         return True  # No stored range covers our request
 
     #====================================================================
@@ -62,7 +66,9 @@ class DataTracker:
         
         if not self._is_action_needed(trange, cache_key, self.calculated_ranges, "calculated"):
             print_manager.status(f"{cache_key} already calculated for the time range: {trange[0]} to {trange[1]}")
+            metrics.count(data_type, 'tracker_hits')
             return False
+        metrics.count(data_type, 'tracker_misses')
         return True
 
     #====================================================================
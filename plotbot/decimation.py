@@ -0,0 +1,288 @@
+#plotbot/decimation.py
+"""
+Pixel-aware decimation for line and spectrogram rendering.
+
+A figure a couple of thousand pixels wide cannot show more than a few points
+per pixel column, yet a day of mag_RTN is millions of samples. Before handing
+arrays to matplotlib or Plotly, renderers call:
+
+    decimate_line(times, values, pixel_width)       # M4 (default) or LTTB
+    decimate_spectrogram(times, data, pixel_width)  # time-bin mean
+
+M4 keeps the first, last, minimum and maximum sample of every pixel column,
+plus the first and last NaN of a column that contains a gap, so the rasterised
+line matches drawing all samples: it still breaks at NaN gaps (only segments
+inside one column, between several gaps there, may be joined). LTTB (Largest
+Triangle Three Buckets) keeps a fixed number of visually significant points
+and is used for Plotly traces where point count matters more than an exact
+raster. Both kernels are numba-compiled single passes over the data.
+
+Decimation is skipped for short arrays and for variables whose plot_config has
+``decimate = False``; ``config.decimation`` turns it off globally.
+"""
+import numpy as np
+
+from .print_manager import print_manager
+
+# Below this many samples per pixel, drawing everything is already cheap
+MIN_POINTS_PER_PIXEL = 4
+
+try:
+    from numba import njit
+
+    @njit
+    def _m4_kernel(x, y, n_bins):
+        """Indices of first/min/max/last sample, plus first/last NaN, in each of n_bins equal-width x bins."""
+        n = x.shape[0]
+        out = np.empty(6 * n_bins, dtype=np.int64)
+        count = 0
+        x0 = x[0]
+        span = x[n - 1] - x[0]
+        if span <= 0:
+            out[0] = 0
+            out[1] = n - 1
+            return out[:2]
+        picks = np.empty(6, dtype=np.int64)
+        i = 0
+        while i < n:
+            b = np.int64((x[i] - x0) * n_bins // span)
+            if b >= n_bins:
+                b = n_bins - 1
+            first = i
+            imin = -1
+            imax = -1
+            inan_first = -1
+            inan_last = -1
+            while i < n:
+                bi = np.int64((x[i] - x0) * n_bins // span)
+                if bi >= n_bins:
+                    bi = n_bins - 1
+                if bi != b:
+                    break
+                v = y[i]
+                if np.isnan(v):
+                    if inan_first < 0:
+                        inan_first = i
+                    inan_last = i
+                else:
+                    if imin < 0 or v < y[imin]:
+                        imin = i
+                    if imax < 0 or v > y[imax]:
+                        imax = i
+                i += 1
+            last = i - 1
+            # Gather this bin's picks, then emit them sorted and without repeats
+            m = 0
+            for idx in (first, imin, imax, inan_first, inan_last, last):
+                if idx >= 0:
+                    picks[m] = idx
+                    m += 1
+            for a in range(1, m):
+                v_idx = picks[a]
+                c = a - 1
+                while c >= 0 and picks[c] > v_idx:
+                    picks[c + 1] = picks[c]
+                    c -= 1
+                picks[c + 1] = v_idx
+            for a in range(m):
+                if a == 0 or picks[a] != picks[a - 1]:
+                    out[count] = picks[a]
+                    count += 1
+        return out[:count]
+
+    @njit
+    def _lttb_kernel(x, y, n_out):
+        """Largest-Triangle-Three-Buckets selection of n_out indices (NaNs never selected as pivots)."""
+        n = x.shape[0]
+        out = np.empty(n_out, dtype=np.int64)
+        out[0] = 0
+        every = (n - 2) / (n_out - 2)
+        a = 0
+        for k in range(n_out - 2):
+            # Average of the next bucket
+            s = np.int64(np.floor((k + 1) * every)) + 1
+            e = np.int64(np.floor((k + 2) * every)) + 1
+            if e > n:
+                e = n
+            avg_x = 0.0
+            avg_y = 0.0
+            m = 0
+            for j in range(s, e):
+                if not np.isnan(y[j]):
+                    avg_x += x[j]
+                    avg_y += y[j]
+                    m += 1
+            if m > 0:
+                avg_x /= m
+                avg_y /= m
+            else:
+                avg_x = x[min(s, n - 1)]
+                avg_y = y[a]
+            # Current bucket: point forming the largest triangle with a and the average
+            rs = np.int64(np.floor(k * every)) + 1
+            re = np.int64(np.floor((k + 1) * every)) + 1
+            best = rs
+            best_area = -1.0
+            for j in range(rs, re):
+                if np.isnan(y[j]):
+                    continue
+                area = abs((x[a] - avg_x) * (y[j] - y[a]) - (x[a] - x[j]) * (avg_y - y[a]))
+                if area > best_area:
+                    best_area = area
+                    best = j
+            out[k + 1] = best
+            a = best
+        out[n_out - 1] = n - 1
+        return out
+
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+    print_manager.debug("Numba not available - decimation will use the numpy M4 fallback")
+
+def _m4_numpy(x, y, n_bins):
+    """Vectorised numpy M4 used when numba is unavailable."""
+    span = x[-1] - x[0]
+    if span <= 0:
+        return np.array([0, len(x) - 1])
+    bins = np.minimum(((x - x[0]) * n_bins // span).astype(np.int64), n_bins - 1)
+    starts = np.concatenate(([0], np.flatnonzero(np.diff(bins)) + 1))
+    ends = np.append(starts[1:], len(x)) - 1
+    # argmin/argmax per bin via lexsort on (value, bin); NaNs sort last
+    y_min = np.where(np.isnan(y), np.inf, y)
+    y_max = np.where(np.isnan(y), -np.inf, y)
+    order_min = np.lexsort((y_min, bins))
+    order_max = np.lexsort((-y_max, bins))
+    first_in_group = np.concatenate(([0], np.flatnonzero(np.diff(bins[order_min])) + 1))
+    mins = order_min[first_in_group]
+    maxs = order_max[first_in_group]
+    # First and last NaN of each bin, so the line breaks at gaps
+    nans = np.flatnonzero(np.isnan(y))
+    nan_bin_edges = np.flatnonzero(np.diff(bins[nans])) + 1
+    nan_firsts = nans[np.concatenate(([0], nan_bin_edges))] if len(nans) else nans
+    nan_lasts = nans[np.append(nan_bin_edges, len(nans)) - 1] if len(nans) else nans
+    return np.unique(np.concatenate((starts, ends, mins, maxs, nan_firsts, nan_lasts)))
+
+def _as_float_axis(times):
+    """Return a float64 x axis for datetime64, datetime object or numeric times."""
+    times = np.asarray(times)
+    if np.issubdtype(times.dtype, np.datetime64):
+        return times.astype('datetime64[ns]').astype(np.int64).astype(np.float64)
+    if times.dtype == object:
+        return np.asarray(times, dtype='datetime64[ns]').astype(np.int64).astype(np.float64)
+    return times.astype(np.float64)
+
+def is_enabled(var=None):
+    """Global switch plus per-variable ``plot_config.decimate`` opt-out."""
+    from .config import config
+    if not getattr(config, 'decimation', True):
+        return False
+    if var is not None:
+        pc = getattr(var, 'plot_config', None)
+        if pc is not None and getattr(pc, 'decimate', True) is False:
+            return False
+    return True
+
+def m4_indices(times, values, pixel_width):
+    """
+    Sorted indices to keep so a line drawn ``pixel_width`` pixels wide looks
+    like the full-resolution line, including the breaks at NaN gaps.
+
+    ``values`` may be 1-D (n,) or 2-D (components, n); for vectors the union of
+    every component's indices is returned so all components share one x axis.
+    """
+    x = _as_float_axis(times)
+    values = np.asarray(values, dtype=np.float64)
+    n_bins = max(int(pixel_width), 1)
+    rows = values.reshape(-1, values.shape[-1])
+    kernel = _m4_kernel if NUMBA_AVAILABLE else _m4_numpy
+    keep = [kernel(x, np.ascontiguousarray(row), n_bins) for row in rows]
+    return keep[0] if len(keep) == 1 else np.unique(np.concatenate(keep))
+
+def lttb_indices(times, values, n_out):
+    """Indices chosen by Largest-Triangle-Three-Buckets (1-D values only)."""
+    x = _as_float_axis(times)
+    y = np.ascontiguousarray(values, dtype=np.float64)
+    n_out = int(n_out)
+    if n_out >= len(x) or n_out < 3:
+        return np.arange(len(x))
+    if NUMBA_AVAILABLE:
+        return _lttb_kernel(x, y, n_out)
+    # Without numba fall back to M4 at a comparable point budget
+    return m4_indices(times, values, max(n_out // 4, 1))
+
+def decimate_line(times, values, pixel_width, method='m4', var=None):
+    """
+    Reduce a line to what can be seen at ``pixel_width`` pixels.
+
+    Args:
+        times: 1-D time (datetime64/object datetimes) or numeric x axis.
+        values: 1-D (n,) or 2-D (components, n) array.
+        pixel_width: Width of the plot area in pixels.
+        method: 'm4' (exact raster) or 'lttb' (fixed point budget of 2 x width).
+        var: Optional plot_manager, used for the per-variable opt-out.
+
+    Returns:
+        (times, values) either unchanged or decimated.
+    """
+    n = len(times)
+    if pixel_width is None or pixel_width <= 0 or not is_enabled(var):
+        return times, values
+    if n <= MIN_POINTS_PER_PIXEL * pixel_width or np.shape(values)[-1] != n:
+        return times, values
+    if np.any(np.diff(_as_float_axis(times)) < 0):
+        # Pixel bins assume a monotonic x axis (e.g. not wrapped longitudes)
+        return times, values
+    if method == 'lttb' and np.ndim(values) == 1:
+        keep = lttb_indices(times, values, 2 * int(pixel_width))
+    else:
+        keep = m4_indices(times, values, pixel_width)
+    print_manager.debug(f"Decimated line ({method}): {n} -> {len(keep)} points for {int(pixel_width)} px")
+    return np.asarray(times)[keep], np.asarray(values)[..., keep]
+
+def decimate_spectrogram(times, data, pixel_width, additional_data=None, var=None):
+    """
+    Average a spectrogram down to at most ``pixel_width`` time columns.
+
+    Args:
+        times: Time axis, 1-D (n,) or a 2-D mesh (n, n_freq).
+        data: 2-D array (n, n_freq).
+        pixel_width: Width of the plot area in pixels.
+        additional_data: Optional y axis, 1-D (n_freq,) or 2-D (n, n_freq).
+        var: Optional plot_manager, used for the per-variable opt-out.
+
+    Returns:
+        (times, data, additional_data), decimated along time if worthwhile.
+        Each output column is the NaN-aware mean of its input columns and is
+        placed at the first time of its group.
+    """
+    n = np.shape(data)[0] if np.ndim(data) == 2 else 0
+    if pixel_width is None or pixel_width <= 0 or n == 0 or not is_enabled(var):
+        return times, data, additional_data
+    n_cols = int(pixel_width)
+    if n <= 2 * n_cols:
+        return times, data, additional_data
+
+    starts = np.unique(np.linspace(0, n, n_cols, endpoint=False).astype(np.int64))
+    data = np.asarray(data, dtype=np.float64)
+    valid = ~np.isnan(data)
+    sums = np.add.reduceat(np.where(valid, data, 0.0), starts, axis=0)
+    counts = np.add.reduceat(valid, starts, axis=0)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        reduced = sums / counts
+
+    times_out = np.asarray(times)[starts]
+    if additional_data is not None and np.ndim(additional_data) == 2 and np.shape(additional_data)[0] == n:
+        additional_data = np.asarray(additional_data)[starts]
+    print_manager.debug(f"Decimated spectrogram: {n} -> {len(starts)} time columns for {n_cols} px")
+    return times_out, reduced, additional_data
+
+def axes_pixel_width(ax):
+    """Width of a matplotlib Axes in device pixels (respects figure DPI)."""
+    try:
+        return float(ax.get_window_extent().width)
+    except Exception:
+        fig = ax.get_figure()
+        return float(fig.get_size_inches()[0] * fig.dpi)
+
+__all__ = ['decimate_line', 'decimate_spectrogram', 'm4_indices', 'lttb_indices', 'axes_pixel_width']
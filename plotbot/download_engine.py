@@ -0,0 +1,232 @@
+#plotbot/download_engine.py
+"""
+Streaming, resumable, concurrent file downloads over a pooled requests session.
+
+    jobs = [(file_url, local_file_path), ...]
+    results = download_files(server_access.session, jobs, workers=8, per_host=4)
+
+Each transfer streams into `<local_file_path>.part` in fixed-size chunks, so a
+file is never held in memory. If a `.part` file is left over from an
+interrupted run the download continues from its size with an HTTP Range
+request (servers that ignore Range get a full restart). The finished `.part`
+is checked against the size the server reported before it is renamed into
+place, so a truncated transfer never looks like a complete CDF, and the new
+file is recorded in the local file index.
+
+Transfers run on a thread pool sharing one session; its HTTPAdapter pool is
+sized for the worker count and a per-host semaphore caps how many requests
+hit the same server at once. max_bytes_per_sec caps the combined rate of all
+transfers (e.g. a long prefetch on a shared link).
+"""
+import os
+import time
+import threading
+from urllib.parse import urlsplit
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from .print_manager import print_manager
+from .tracing import tracer
+from .metrics import metrics
+from .local_file_index import local_file_index
+
+CHUNK_SIZE = 1024 * 1024  # Bytes written per streamed chunk
+PART_SUFFIX = '.part'
+
+class DownloadSizeError(IOError):
+    """The bytes on disk do not match the size the server reported."""
+
+def configure_session(session, pool_size):
+    """Mount HTTP(S) adapters that keep up to pool_size connections per host open on the session."""
+    pool_size = max(1, int(pool_size))
+    for prefix in ('http://', 'https://'):
+        adapter = session.get_adapter(prefix)
+        if getattr(adapter, '_pool_maxsize', 0) >= pool_size:
+            continue
+        session.mount(prefix, HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size))
+    return session
+
+def _expected_size(response, offset):
+    """Full file size from Content-Range (206) or Content-Length (200), or None if the server did not say."""
+    content_range = response.headers.get('Content-Range', '')
+    if response.status_code == 206 and '/' in content_range:
+        total = content_range.rsplit('/', 1)[1].strip()
+        return int(total) if total.isdigit() else None
+    length = response.headers.get('Content-Length')
+    if length is None or not length.isdigit():
+        return None
+    return int(length) + (offset if response.status_code == 206 else 0)
+
+def _move_into_place(part_path, local_file_path):
+    """Rename a finished .part file to its final name and add it to the local file index."""
+    directory = os.path.dirname(os.path.abspath(local_file_path))
+    mtime_before = os.stat(directory).st_mtime_ns
+    os.replace(part_path, local_file_path)
+    local_file_index.add(local_file_path, mtime_before, os.stat(directory).st_mtime_ns)
+
+class RateLimiter:
+    """Token bucket shared by all transfers: consume(n) sleeps so the combined rate stays at bytes_per_sec."""
+
+    def __init__(self, bytes_per_sec):
+        self.bytes_per_sec = float(bytes_per_sec)
+        self._lock = threading.Lock()
+        self._next_free = time.monotonic()
+
+    def consume(self, n_bytes):
+        with self._lock:
+            now = time.monotonic()
+            # Each chunk books the next n_bytes / rate seconds of the link
+            self._next_free = max(self._next_free, now) + n_bytes / self.bytes_per_sec
+            delay = self._next_free - now
+        if delay > 0:
+            time.sleep(delay)
+
+def stream_to_file(session, file_url, local_file_path, chunk_size=CHUNK_SIZE, timeout=60, rate_limiter=None):
+    """
+    Stream one URL to local_file_path through a resumable .part file.
+
+    Args:
+        session: requests.Session to download with (authenticated if needed).
+        file_url: Full URL of the file.
+        local_file_path: Final path; the partial download lives at local_file_path + '.part'.
+        chunk_size: Bytes per streamed chunk.
+        timeout: Connect/read timeout in seconds.
+        rate_limiter: Optional RateLimiter shared with other transfers.
+
+    Returns:
+        int: Size of the completed file in bytes.
+
+    Raises:
+        requests.HTTPError: The server answered with an error status.
+        DownloadSizeError: The finished file does not match the reported size
+            (the .part file is kept so the next attempt can resume).
+    """
+    part_path = local_file_path + PART_SUFFIX
+    offset = os.path.getsize(part_path) if os.path.exists(part_path) else 0
+    headers = {'Range': f'bytes={offset}-'} if offset else {}
+
+    with session.get(file_url, stream=True, headers=headers, timeout=timeout) as response:
+        if response.status_code == 416 and offset:
+            # Range starts at or past the end: the .part may already be the whole file
+            total = response.headers.get('Content-Range', '').rsplit('/', 1)[-1].strip()
+            if total.isdigit() and int(total) == offset:
+                _move_into_place(part_path, local_file_path)
+                return offset
+            os.remove(part_path)  # Stale .part larger than the file; start over
+            return stream_to_file(session, file_url, local_file_path, chunk_size, timeout, rate_limiter)
+        response.raise_for_status()
+        if response.status_code != 206:
+            offset = 0  # Server ignored the Range header and sent the whole file
+        expected = _expected_size(response, offset)
+        if offset:
+            print_manager.debug(f'Resuming {file_url} at byte {offset}')
+
+        with open(part_path, 'ab' if offset else 'wb') as f:
+            for chunk in response.iter_content(chunk_size=chunk_size):
+                if chunk:
+                    if rate_limiter is not None:
+                        rate_limiter.consume(len(chunk))
+                    f.write(chunk)
+
+    size = os.path.getsize(part_path)
+    if expected is not None and size != expected:
+        raise DownloadSizeError(f'{file_url}: got {size} of {expected} bytes')
+    _move_into_place(part_path, local_file_path)
+    return size
+
+class _HostLimiter:
+    """One semaphore per host so no server gets more than per_host concurrent transfers."""
+
+    def __init__(self, per_host):
+        self.per_host = max(1, int(per_host))
+        self._lock = threading.Lock()
+        self._semaphores = {}
+
+    def __call__(self, url):
+        host = urlsplit(url).netloc
+        with self._lock:
+            if host not in self._semaphores:
+                self._semaphores[host] = threading.BoundedSemaphore(self.per_host)
+            return self._semaphores[host]
+
+def _download_job(session, file_url, local_file_path, limiter, retries, chunk_size, rate_limiter=None, data_type=None):
+    """Download with retries (each retry resumes from the .part); returns True/False like download_file."""
+    print_manager.status(f'Downloading {file_url}')
+    for attempt in range(retries + 1):
+        try:
+            with limiter(file_url):
+                size = stream_to_file(session, file_url, local_file_path, chunk_size=chunk_size,
+                                      rate_limiter=rate_limiter)
+            tracer.annotate(bytes=size, attempts=attempt + 1)
+            metrics.count(data_type, 'files_downloaded')
+            metrics.count(data_type, 'bytes_downloaded', size)
+            print_manager.status(f'File {local_file_path} downloaded successfully ({size} bytes).')
+            return True
+        except requests.HTTPError as e:
+            # Error statuses do not get better on retry
+            print_manager.status(f'Error downloading {file_url}, status code {e.response.status_code}')
+            metrics.count(data_type, 'download_failures')
+            return False
+        except (requests.RequestException, OSError) as e:
+            if attempt < retries:
+                print_manager.debug(f'Retrying {file_url} after {type(e).__name__}: {e}')
+            else:
+                print_manager.status(f'Error downloading {file_url}: {e}')
+    metrics.count(data_type, 'download_failures')
+    return False
+
+#====================================================================
+# FUNCTION: download_files, Download many files concurrently
+#====================================================================
+def download_files(session, jobs, workers=8, per_host=4, retries=2, chunk_size=CHUNK_SIZE,
+                   max_bytes_per_sec=None, progress=None, data_type=None):
+    """
+    Download (file_url, local_file_path) pairs concurrently.
+
+    Args:
+        session: requests.Session shared by all transfers; its connection pool
+            is enlarged to fit the workers.
+        jobs: Iterable of (file_url, local_file_path).
+        workers: Concurrent transfers overall (1 = one after another).
+        per_host: Concurrent transfers against any one host.
+        retries: Extra attempts per file after a connection error or short
+            read; each one resumes from the .part file.
+        chunk_size: Bytes per streamed chunk.
+        max_bytes_per_sec: Combined bandwidth cap for all transfers (None = unlimited).
+        progress: Optional callable, called as progress(job_index, success) as each file finishes.
+        data_type: Key for the download counters in plotbot.metrics: one data_type
+            for every job, or a list with one per job.
+
+    Returns:
+        list: True/False per job, in job order.
+    """
+    jobs = list(jobs)
+    if not jobs:
+        return []
+    workers = max(1, min(int(workers), len(jobs)))
+    configure_session(session, max(workers, per_host))
+    limiter = _HostLimiter(per_host)
+    rate_limiter = RateLimiter(max_bytes_per_sec) if max_bytes_per_sec else None
+
+    parent_span = tracer.current()  # Transfers on pool threads nest under the caller's span
+
+    def _run(index):
+        url, path = jobs[index]
+        job_data_type = data_type[index] if isinstance(data_type, (list, tuple)) else data_type
+        with tracer.span('download_file', parent=parent_span, file=os.path.basename(path)) as span:
+            success = _download_job(session, url, path, limiter, retries, chunk_size, rate_limiter, job_data_type)
+            span.set(success=success)
+        if progress is not None:
+            progress(index, success)
+        return success
+
+    if workers == 1:
+        return [_run(index) for index in range(len(jobs))]
+
+    print_manager.status(f'Downloading {len(jobs)} files on {workers} connections...')
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        return list(pool.map(_run, range(len(jobs))))
+
+__all__ = ['download_files', 'stream_to_file', 'configure_session', 'RateLimiter', 'DownloadSizeError']
@@ -0,0 +1,205 @@
+#plotbot/fits_csv_cache.py
+"""
+Binary sidecar cache for the FITS (sf00/sf01) CSV files.
+
+The first time a FITS CSV is read, every numeric column is parsed once and
+written next to the CSV as an uncompressed ``.npz`` file, together with a
+TT2000 time index that is already sorted. Later reads load only the requested
+columns from the sidecar and slice the rows to the requested time range,
+skipping CSV parsing and time conversion entirely. A sidecar is rebuilt
+automatically whenever the CSV's mtime or size changes.
+"""
+import os
+import numpy as np
+import pandas as pd
+import cdflib
+from concurrent.futures import ThreadPoolExecutor
+
+from .print_manager import print_manager
+
+CACHE_SUFFIX = '.plotbot_cache.npz'
+CACHE_FORMAT_VERSION = 1
+
+# Reserved keys inside the sidecar (cannot collide with CSV column names)
+_TT2000_KEY = '__tt2000__'
+_MTIME_KEY = '__source_mtime_ns__'
+_SIZE_KEY = '__source_size__'
+_VERSION_KEY = '__format_version__'
+_META_KEYS = (_TT2000_KEY, _MTIME_KEY, _SIZE_KEY, _VERSION_KEY)
+
+#====================================================================
+# FUNCTION: get_sidecar_path, Path of the binary cache for a CSV
+#====================================================================
+def get_sidecar_path(csv_path):
+    """Return the path of the binary sidecar cache for ``csv_path``."""
+    root, _ = os.path.splitext(csv_path)
+    return root + CACHE_SUFFIX
+
+def unix_seconds_to_tt2000(unix_seconds):
+    """
+    Convert Unix epoch seconds to TT2000 with millisecond resolution.
+
+    Matches the conversion historically done in import_data_function
+    (components truncated to milliseconds, leap seconds handled by cdflib),
+    but builds the component table with vectorised pandas accessors instead
+    of a Python loop over datetime objects.
+    """
+    if len(unix_seconds) == 0:
+        return np.array([], dtype=np.int64)
+    dt = pd.DatetimeIndex(pd.to_datetime(unix_seconds, unit='s', utc=True))
+    components = np.column_stack([
+        dt.year, dt.month, dt.day, dt.hour, dt.minute, dt.second,
+        dt.microsecond // 1000
+    ]).astype(np.int64)
+    return np.asarray(cdflib.cdfepoch.compute_tt2000(components), dtype=np.int64)
+
+def _sidecar_is_valid(sidecar, csv_stat):
+    """Check that an opened sidecar matches the current CSV on disk."""
+    try:
+        return (int(sidecar[_VERSION_KEY]) == CACHE_FORMAT_VERSION and
+                int(sidecar[_MTIME_KEY]) == csv_stat.st_mtime_ns and
+                int(sidecar[_SIZE_KEY]) == csv_stat.st_size)
+    except (KeyError, ValueError):
+        return False
+
+#====================================================================
+# FUNCTION: build_sidecar, Parse a CSV once and persist it as columns
+#====================================================================
+def build_sidecar(csv_path, time_column='time'):
+    """
+    Parse ``csv_path`` and write its numeric columns to the binary sidecar.
+
+    Rows are sorted by time so that later range queries are a binary search.
+
+    Args:
+        csv_path (str): Path to the FITS CSV file.
+        time_column (str): Name of the Unix-seconds time column.
+
+    Returns:
+        dict: Column name -> numpy array (including the TT2000 index under
+              the reserved key), or None if the CSV could not be parsed.
+    """
+    csv_stat = os.stat(csv_path)
+    df = pd.read_csv(csv_path)
+    if time_column not in df.columns:
+        raise ValueError(f"Time column '{time_column}' not found in {csv_path}")
+
+    tt2000 = unix_seconds_to_tt2000(df[time_column].to_numpy())
+    order = np.argsort(tt2000, kind='stable')
+
+    columns = {_TT2000_KEY: tt2000[order]}
+    for col in df.columns:
+        values = df[col].to_numpy()
+        if values.dtype.kind in 'biuf' and not col.startswith('__'):
+            columns[col] = values[order]
+
+    sidecar_path = get_sidecar_path(csv_path)
+    tmp_path = sidecar_path + '.tmp'
+    try:
+        with open(tmp_path, 'wb') as f:
+            np.savez(f, **columns,
+                     **{_MTIME_KEY: np.int64(csv_stat.st_mtime_ns),
+                        _SIZE_KEY: np.int64(csv_stat.st_size),
+                        _VERSION_KEY: np.int64(CACHE_FORMAT_VERSION)})
+        os.replace(tmp_path, sidecar_path)
+        print_manager.debug(f"Wrote FITS CSV cache: {os.path.basename(sidecar_path)}")
+    except OSError as e:
+        # Read-only data directories are fine, we just don't get the speedup
+        print_manager.debug(f"Could not write FITS CSV cache for {os.path.basename(csv_path)}: {e}")
+        if os.path.exists(tmp_path):
+            try:
+                os.remove(tmp_path)
+            except OSError:
+                pass
+    return columns
+
+#====================================================================
+# FUNCTION: read_fits_csv, Load selected columns and rows of a FITS CSV
+#====================================================================
+def read_fits_csv(csv_path, columns, tt2000_range=None, use_cache=True):
+    """
+    Load ``columns`` of a FITS CSV, optionally restricted to a time range.
+
+    Args:
+        csv_path (str): Path to the FITS CSV file.
+        columns (list): Column names to return (the 'time' column is implied
+            by the returned TT2000 index and may be omitted).
+        tt2000_range (tuple, optional): (start, end) TT2000 bounds, inclusive.
+        use_cache (bool): Read/write the binary sidecar. If False the CSV is
+            parsed directly every time.
+
+    Returns:
+        tuple: (tt2000 array sorted ascending, dict of column -> array).
+
+    Raises:
+        KeyError: If any requested column is missing from the file.
+    """
+    wanted = [col for col in columns if col != 'time']
+    csv_stat = os.stat(csv_path)
+    sidecar_path = get_sidecar_path(csv_path)
+
+    data = None
+    if use_cache and os.path.exists(sidecar_path):
+        try:
+            with np.load(sidecar_path, allow_pickle=False) as sidecar:
+                if _sidecar_is_valid(sidecar, csv_stat):
+                    missing = [col for col in wanted if col not in sidecar.files]
+                    if missing:
+                        raise KeyError(missing)
+                    # NpzFile only decompresses/reads the members we touch
+                    data = {col: sidecar[col] for col in wanted}
+                    data[_TT2000_KEY] = sidecar[_TT2000_KEY]
+                    print_manager.debug(f"FITS CSV cache hit: {os.path.basename(sidecar_path)}")
+                else:
+                    print_manager.debug(f"FITS CSV cache stale: {os.path.basename(sidecar_path)}")
+        except KeyError:
+            raise
+        except Exception as e:
+            print_manager.debug(f"Ignoring unreadable FITS CSV cache {os.path.basename(sidecar_path)}: {e}")
+            data = None
+
+    if data is None:
+        if use_cache:
+            all_columns = build_sidecar(csv_path)
+        else:
+            df = pd.read_csv(csv_path, usecols=lambda col: col in wanted or col == 'time')
+            tt2000 = unix_seconds_to_tt2000(df['time'].to_numpy())
+            order = np.argsort(tt2000, kind='stable')
+            all_columns = {_TT2000_KEY: tt2000[order]}
+            all_columns.update({col: df[col].to_numpy()[order] for col in df.columns if col != 'time'})
+        missing = [col for col in wanted if col not in all_columns]
+        if missing:
+            raise KeyError(missing)
+        data = {col: all_columns[col] for col in wanted}
+        data[_TT2000_KEY] = all_columns[_TT2000_KEY]
+
+    tt2000 = data.pop(_TT2000_KEY)
+    if tt2000_range is not None:
+        i0 = np.searchsorted(tt2000, tt2000_range[0], side='left')
+        i1 = np.searchsorted(tt2000, tt2000_range[1], side='right')
+        tt2000 = tt2000[i0:i1]
+        data = {col: values[i0:i1] for col, values in data.items()}
+    return tt2000, data
+
+def read_fits_csvs_parallel(csv_paths, columns, tt2000_range=None, use_cache=True, max_workers=4):
+    """
+    Read several FITS CSVs (typically one per day) concurrently.
+
+    Results are returned in the same order as ``csv_paths``. Each entry is
+    either the ``(tt2000, data)`` tuple from read_fits_csv or the exception
+    raised while reading that file, so callers can report per-file problems
+    without losing the other days.
+    """
+    def _read(path):
+        try:
+            return read_fits_csv(path, columns, tt2000_range, use_cache)
+        except Exception as e:
+            return e
+
+    if max_workers is None or max_workers <= 1 or len(csv_paths) <= 1:
+        return [_read(path) for path in csv_paths]
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(csv_paths))) as pool:
+        return list(pool.map(_read, csv_paths))
+
+__all__ = ['get_sidecar_path', 'build_sidecar', 'read_fits_csv', 'read_fits_csvs_parallel',
+           'unix_seconds_to_tt2000']
@@ -8,20 +8,9 @@ from typing import List, Union, Optional, Dict, Any, Tuple
 from dateutil.parser import parse
 import pandas as pd
 import time as timer
-from functools import wraps
 
-def timer_decorator(timer_name):
-    def decorator(func):
-        @wraps(func)
-        def wrapper(*args, **kwargs):
-            start_time = timer.perf_counter()
-            result = func(*args, **kwargs)
-            end_time = timer.perf_counter()
-            duration_ms = (end_time - start_time) * 1000
-            print_manager.speed_test(f"⏱️ [{timer_name}] {func.__name__}: {duration_ms:.2f}ms")
-            return result
-        return wrapper
-    return decorator
+from .tracing import tracer, timer_decorator # Spans (and speed_test timings) for decorated functions
+from .metrics import metrics
 
 from .print_manager import print_manager
 from .data_tracker import global_tracker
@@ -37,30 +26,28 @@ from .time_utils import TimeRangeTracker
 # Add global step counter for dynamic numbering
 _global_step_counter = 0
 def next_step(step_name: str, data_type: str = None) -> tuple:
-    """Generate next step number and start timing."""
+    """
+    Generate next step number and start timing. Returns (step_key, step_start):
+    step_start is a tracing Span while tracer.enabled, else perf_counter().
+    """
     global _global_step_counter
     _global_step_counter += 1
     step_key = f"Step {_global_step_counter}: {step_name}"
     if data_type:
         step_key += f" ({data_type})"
-    step_start = timer.perf_counter()
+    step_start = tracer.start_span(step_name, data_type=data_type) if tracer.enabled else timer.perf_counter()
     print_manager.speed_test(f"🚀 {step_key}")
     return step_key, step_start
 
-def end_step(step_key: str, step_start: float, metadata: dict = None) -> None:
-    """End timing for a step."""
-    duration_ms = (timer.perf_counter() - step_start) * 1000
+def end_step(step_key: str, step_start, metadata: dict = None) -> None:
+    """End timing for a step; metadata becomes the span's attributes."""
+    if isinstance(step_start, float):
+        duration_ms = (timer.perf_counter() - step_start) * 1000
+    else:
+        duration_ms = step_start.end(**(metadata or {})) * 1000
     metadata_str = f" - {metadata}" if metadata else ""
     print_manager.speed_test(f"✅ {step_key}: {duration_ms:.2f}ms{metadata_str}")
 
-# Import specific data classes as needed
-from . import mag_rtn_4sa, mag_rtn, mag_sc_4sa, mag_sc
-from .data_classes.psp_electron_classes import epad, epad_hr
-from .data_classes.psp_proton import proton
-from .data_classes.psp_proton_hr import proton_hr
-from .data_classes.psp_proton_fits_classes import proton_fits_class, proton_fits
-from .data_classes.psp_ham_classes import ham_class, ham
-
 def debug_object(obj, prefix=""):
     """Helper function to debug object attributes"""
     if not print_manager.show_variable_testing:
@@ -117,7 +104,12 @@ def get_data(trange: List[str], *variables, skip_refresh_check=False):
     get_data(trange, pb.proton_fits.abs_qz_p, skip_refresh_check=True)
     """
     pm = print_manager # Local alias
+    # Data classes are imported on first use (plotbot loads them lazily)
+    from .data_classes.psp_proton_fits_classes import proton_fits_class, proton_fits
+    from .data_classes.psp_ham_classes import ham_class
     
+    tracer.annotate(trange=list(trange) if isinstance(trange, (list, tuple)) else trange, variables=len(variables))
+
     # Step: Initialize get_data
     step_key, step_start = next_step("Initialize get_data", "get_data")
     
@@ -498,7 +490,10 @@ def get_data(trange: List[str], *variables, skip_refresh_check=False):
             duration_ms = (end_time - start_time) * 1000
             print_manager.speed_test(f"[TIMER_IMPORT_DATA_FUNCTION] import_data_function ({data_type}): {duration_ms:.2f}ms")
             
-            end_step(import_step_key, import_step_start, {"duration_ms": duration_ms, "success": data_obj is not None})
+            records = len(data_obj.times) if getattr(data_obj, 'times', None) is not None else 0
+            metrics.add_time(data_type, 'import', duration_ms / 1000)
+            metrics.count(data_type, 'records_decoded', records)
+            end_step(import_step_key, import_step_start, {"duration_ms": duration_ms, "success": data_obj is not None, "records": records})
 
             if data_obj is None:
                 print_manager.warning(f"Import returned no data for {data_type}, skipping update.")
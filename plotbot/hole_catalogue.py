@@ -0,0 +1,269 @@
+#plotbot/hole_catalogue.py
+"""
+Columnar catalogue of magnetic holes.
+
+The hole finder used to hand its results on only as iZotope marker text files,
+which showda_holes and the analysis notebooks re-parsed with regexes. A
+HoleCatalogue holds every ``magnetic_hole_details`` field as a numpy column,
+sorted by the time of the hole minimum, plus a few derived columns used for
+filtering:
+
+    cat = HoleCatalogue.load('magnetic_hole_catalogue.npz')
+    deep = cat.filter(trange=['2023-09-27', '2023-09-29'], min_depth=40,
+                      max_asymmetry=0.25, encounters=['E17'])
+    deep.to_dataframe()
+
+Catalogues are stored as a single ``.npz`` (no pickling), concatenate across
+runs and encounters with ``HoleCatalogue.concat``, and can still be exported
+as marker files with ``to_marker_file``.
+"""
+import os
+import numpy as np
+import pandas as pd
+from datetime import timezone
+from dateutil.parser import parse as dateutil_parse
+
+from .print_manager import print_manager
+
+NAT = np.datetime64('NaT', 'ns')
+
+# magnetic_hole_details fields that are sample indices; each also gets a
+# '<field>_time' column holding the timestamp of that sample
+INDEX_FIELDS = ('L_threshold_cross', 'R_threshold_cross', 'min_idx',
+                'left_max_value_idx', 'right_max_value_idx', 'tS', 'tE')
+VALUE_FIELDS = ('min_value', 'left_max_value', 'right_max_value', 'W_angle')
+COUNT_FIELDS = ('zero_crossings',)
+FLAG_FIELDS = ('asymmetrical_initial_peaks_flag', 'complex_hole_flag')
+# Derived from the fields above when a catalogue is built
+DERIVED_FIELDS = ('depth_percent', 'width_s', 'width_samples', 'asymmetry')
+
+def _to_ns(t):
+    """String / datetime / datetime64 -> datetime64[ns] (UTC, naive)."""
+    if t is None:
+        return NAT
+    if isinstance(t, str):
+        t = dateutil_parse(t)
+    if getattr(t, 'tzinfo', None) is not None:
+        t = t.astimezone(timezone.utc).replace(tzinfo=None)
+    return np.datetime64(t, 'ns')
+
+def _time_column(values):
+    return np.array([_to_ns(v) for v in values], dtype='datetime64[ns]')
+
+def times_in_intervals(times, starts, ends):
+    """
+    Boolean mask of which ``times`` fall inside any [start, end] interval.
+
+    One binary search per time against the interval starts, with the running
+    maximum of the ends so overlapping or nested intervals are handled.
+    """
+    times = np.asarray(times).astype('datetime64[ns]')
+    starts = np.asarray(starts).astype('datetime64[ns]')
+    ends = np.asarray(ends).astype('datetime64[ns]')
+    valid = ~(np.isnat(starts) | np.isnat(ends))
+    starts, ends = starts[valid], ends[valid]
+    if len(starts) == 0:
+        return np.zeros(len(times), dtype=bool)
+    order = np.argsort(starts, kind='stable')
+    starts = starts[order]
+    reach = np.maximum.accumulate(ends[order])  # Latest end among intervals starting at or before each start
+    k = np.searchsorted(starts, times, side='right') - 1
+    return (k >= 0) & (reach[np.maximum(k, 0)] >= times)
+
+class HoleCatalogue:
+    """Magnetic holes as numpy columns, sorted by the time of the hole minimum."""
+
+    def __init__(self, columns):
+        self.columns = dict(columns)
+        order = np.argsort(self.columns['min_idx_time'], kind='stable') if self.columns else []
+        if len(order) and np.any(np.diff(order) != 1):
+            self.columns = {name: col[order] for name, col in self.columns.items()}
+
+    # --- Construction ---------------------------------------------------
+    @classmethod
+    def empty(cls):
+        return cls._from_rows([], encounter=[])
+
+    @classmethod
+    def from_details(cls, magnetic_hole_details, times, encounter=None, sampling_rate=None):
+        """
+        Build a catalogue from one hole finder run.
+
+        Args:
+            magnetic_hole_details: List of dicts from _detect_magnetic_holes_logic.
+            times: The clipped time array the detail indices refer to.
+            encounter (str, optional): Encounter label, e.g. 'E17'. Looked up
+                from each hole's time when omitted.
+            sampling_rate (float, optional): Samples per second of ``times``.
+        """
+        times = np.asarray(times).astype('datetime64[ns]')
+        rows = []
+        for details in magnetic_hole_details:
+            row = dict(details)
+            for field in INDEX_FIELDS:
+                idx = details.get(field)
+                row[f'{field}_time'] = times[idx] if idx is not None else NAT
+            rows.append(row)
+        catalogue = cls._from_rows(rows, encounter=encounter)
+        if sampling_rate is not None:
+            catalogue.columns['sampling_rate'] = np.full(len(catalogue), float(sampling_rate))
+        return catalogue
+
+    @classmethod
+    def from_records(cls, records):
+        """Build a catalogue from time-stamped hole records (e.g. the sharded scan's merged list)."""
+        return cls._from_rows([dict(r) for r in records], encounter=None)
+
+    @classmethod
+    def _from_rows(cls, rows, encounter=None):
+        n = len(rows)
+        columns = {}
+        for field in INDEX_FIELDS:
+            columns[field] = np.array([-1 if r.get(field) is None else int(r[field]) for r in rows], dtype=np.int64)
+            columns[f'{field}_time'] = _time_column([r.get(f'{field}_time') for r in rows])
+        for field in VALUE_FIELDS:
+            columns[field] = np.array([np.nan if r.get(field) is None else float(r[field]) for r in rows], dtype=np.float64)
+        for field in COUNT_FIELDS:
+            columns[field] = np.array([-1 if r.get(field) is None else int(r[field]) for r in rows], dtype=np.int64)
+        for field in FLAG_FIELDS:
+            columns[field] = np.array([bool(r.get(field, False)) for r in rows], dtype=bool)
+
+        left, right, minimum = columns['left_max_value'], columns['right_max_value'], columns['min_value']
+        with np.errstate(invalid='ignore', divide='ignore'):
+            columns['depth_percent'] = (1 - minimum / ((left + right) / 2)) * 100
+            columns['asymmetry'] = np.abs(left - right) / np.minimum(left, right)
+        columns['width_s'] = ((columns['right_max_value_idx_time'] - columns['left_max_value_idx_time'])
+                              / np.timedelta64(1, 'ns') / 1e9)
+        columns['width_samples'] = np.where((columns['left_max_value_idx'] >= 0) & (columns['right_max_value_idx'] >= 0),
+                                            columns['right_max_value_idx'] - columns['left_max_value_idx'], -1)
+
+        if encounter is None or isinstance(encounter, str):
+            from .get_encounter import get_encounter_number
+            labels = [encounter or get_encounter_number(pd.Timestamp(t).to_pydatetime())
+                      if not np.isnat(t) else 'Unknown_Encounter' for t in columns['min_idx_time']]
+        else:
+            labels = list(encounter)
+        columns['encounter'] = np.array(labels if n else [], dtype='<U24')
+        return cls(columns)
+
+    @classmethod
+    def concat(cls, catalogues):
+        """Combine catalogues (e.g. from several runs or encounters) into one."""
+        catalogues = [c for c in catalogues if c is not None and len(c)]
+        if not catalogues:
+            return cls.empty()
+        names = set.intersection(*(set(c.columns) for c in catalogues))
+        return cls({name: np.concatenate([c.columns[name] for c in catalogues]) for name in names})
+
+    # --- Persistence ----------------------------------------------------
+    def save(self, path):
+        """Write the catalogue to a .npz file (atomically)."""
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        tmp_path = path + '.tmp'
+        with open(tmp_path, 'wb') as f:
+            np.savez(f, **self.columns)
+        os.replace(tmp_path, path)
+        print_manager.debug(f"Saved hole catalogue ({len(self)} holes) to {path}")
+        return path
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path, allow_pickle=False) as f:
+            return cls({name: f[name] for name in f.files})
+
+    # --- Queries --------------------------------------------------------
+    def __len__(self):
+        return len(self.columns.get('min_idx_time', ()))
+
+    def __getitem__(self, name):
+        return self.columns[name]
+
+    def _take(self, mask):
+        return HoleCatalogue({name: col[mask] for name, col in self.columns.items()})
+
+    def between(self, start, end):
+        """Holes whose minimum lies in [start, end], found by binary search on the time index."""
+        times = self.columns['min_idx_time']
+        i0 = np.searchsorted(times, _to_ns(start), side='left')
+        i1 = np.searchsorted(times, _to_ns(end), side='right')
+        return self._take(slice(i0, i1))
+
+    def filter(self, trange=None, min_depth=None, max_depth=None, min_width=None, max_width=None,
+               min_asymmetry=None, max_asymmetry=None, encounters=None, complex_hole=None):
+        """
+        Subset of holes matching every given condition.
+
+        Args:
+            trange (list, optional): [start, end]; applied first via the time index.
+            min_depth / max_depth (float, optional): Depth in percent of the mean peak.
+            min_width / max_width (float, optional): Peak-to-peak width in seconds.
+            min_asymmetry / max_asymmetry (float, optional): |left - right| / min(left, right).
+            encounters (list, optional): Encounter labels to keep, e.g. ['E17', 'E18'].
+            complex_hole (bool, optional): Keep only complex (True) or simple (False) holes.
+        """
+        catalogue = self.between(*trange) if trange is not None else self
+        c = catalogue.columns
+        mask = np.ones(len(catalogue), dtype=bool)
+        for column, low, high in (('depth_percent', min_depth, max_depth), ('width_s', min_width, max_width),
+                                  ('asymmetry', min_asymmetry, max_asymmetry)):
+            if low is not None:
+                mask &= c[column] >= low
+            if high is not None:
+                mask &= c[column] <= high
+        if encounters is not None:
+            mask &= np.isin(c['encounter'], [encounters] if isinstance(encounters, str) else list(encounters))
+        if complex_hole is not None:
+            mask &= c['complex_hole_flag'] == bool(complex_hole)
+        return catalogue if mask.all() else catalogue._take(mask)
+
+    def intervals(self, start_field='left_max_value_idx_time', end_field='right_max_value_idx_time'):
+        """(start, end) datetime64[ns] arrays of each hole, peak to peak by default (as in marker files)."""
+        return self.columns[start_field], self.columns[end_field]
+
+    def contains(self, times, start_field='left_max_value_idx_time', end_field='right_max_value_idx_time'):
+        """Boolean mask: which of ``times`` fall inside any hole interval (inclusive)."""
+        return times_in_intervals(times, *self.intervals(start_field, end_field))
+
+    def to_dataframe(self):
+        """pandas DataFrame indexed by the time of the hole minimum."""
+        frame = pd.DataFrame({name: col for name, col in self.columns.items() if name != 'min_idx_time'})
+        frame.index = pd.DatetimeIndex(self.columns['min_idx_time'], name='min_time')
+        return frame
+
+    # --- Export ---------------------------------------------------------
+    def to_marker_file(self, filepath, trange, sampling_rate, with_minima=True):
+        """
+        Export holes in ``trange`` as an iZotope marker file readable by
+        showda_holes' marker parser; sample numbers count from trange[0].
+        """
+        start = _to_ns(trange[0])
+        subset = self.between(trange[0], trange[1])
+        c = subset.columns
+        to_sample = lambda t: int(round((t - start) / np.timedelta64(1, 'ns') / 1e9 * sampling_rate))
+        lines = [f"[Metadata/trange]\t0\t\ttrange = {list(trange)}",
+                 f"[Metadata/Holes]\t0\t\tHoles Found: {len(subset)}",
+                 f"[Metadata/InstrSR]\t0\t\tInstr Sampling Rate: {sampling_rate:.2f} s/s", ""]
+        for i in range(len(subset)):
+            complex_flag = "Complex" if c['complex_hole_flag'][i] else ""
+            lines.append(f"MH\t{to_sample(c['left_max_value_idx_time'][i])}\t{to_sample(c['right_max_value_idx_time'][i])}\t{complex_flag}")
+            if with_minima:
+                lines.append(f"MH_MIN\t{to_sample(c['min_idx_time'][i])}")
+        with open(filepath, 'w') as f:
+            f.write('\n'.join(lines) + '\n')
+        return filepath
+
+_loaded = {}
+
+def load_hole_catalogue(catalogue):
+    """Return a HoleCatalogue from an instance or a .npz path (cached until the file changes)."""
+    if isinstance(catalogue, HoleCatalogue):
+        return catalogue
+    path = os.path.abspath(catalogue)
+    mtime = os.path.getmtime(path)
+    cached = _loaded.get(path)
+    if cached is None or cached[0] != mtime:
+        cached = (mtime, HoleCatalogue.load(path))
+        _loaded[path] = cached
+    return cached[1]
+
+__all__ = ['HoleCatalogue', 'load_hole_catalogue', 'times_in_intervals']
@@ -133,7 +133,10 @@ class LazyModule:
 class LazyDataClass:
     """
     A proxy that defers data class instantiation until first access.
-    
+
+    If the module already defines a singleton named instance_name, that
+    instance is used; otherwise class_name is instantiated with None.
+
     Usage:
         mag_rtn_4sa = LazyDataClass('plotbot.data_classes.psp_mag_rtn_4sa', 'mag_rtn_4sa_class')
         # Class not instantiated yet
@@ -161,11 +164,14 @@ class LazyDataClass:
                 # Import the module
                 module = importlib.import_module(self.module_path)
                 
-                # Get the class
-                class_type = getattr(module, self.class_name)
-                
-                # Instantiate with None (plotbot pattern)
-                self._instance = class_type(None)
+                # Use the singleton the module creates on import (plotbot pattern),
+                # so the proxy and direct module imports share one instance
+                instance = getattr(module, self.instance_name, None)
+                if instance is None:
+                    # Get the class and instantiate with None
+                    class_type = getattr(module, self.class_name)
+                    instance = class_type(None)
+                self._instance = instance
                 self._loaded = True
                 
                 # Optional: Print lazy loading info
@@ -0,0 +1,146 @@
+#plotbot/listing_cache.py
+"""
+TTL cache of remote directory listings (Berkeley server index pages).
+
+A multi-day download looks up the same month folder once per day, and several
+data types share folders, so without a cache the same index page is fetched
+many times within seconds. Listings are kept by directory URL as the list of
+hrefs on the page:
+
+    status, filenames = listing_cache.get(dir_url, fetch)
+
+where fetch(dir_url, headers) returns a requests.Response. Within
+config.listing_cache_ttl seconds a cached listing is returned without any
+request. After that it is revalidated with If-None-Match / If-Modified-Since,
+so an unchanged directory costs a 304 with no body. With
+config.listing_cache_on_disk the listings are also written as JSON under
+{data_dir}/listing_cache/ and reused (and revalidated) by later sessions.
+"""
+import os
+import re
+import json
+import time
+import hashlib
+import threading
+from functools import lru_cache
+
+from bs4 import BeautifulSoup
+
+from .print_manager import print_manager
+
+@lru_cache(maxsize=256)
+def compiled_pattern(pattern_str):
+    """re.compile with the compiled filename patterns kept between lookups."""
+    return re.compile(pattern_str)
+
+def parse_listing(html_content):
+    """All link targets on an HTML directory index page."""
+    soup = BeautifulSoup(html_content, 'html.parser')
+    return [link.get('href') for link in soup.find_all('a') if link.get('href')]
+
+class DirectoryListingCache:
+    """In-memory (optionally on-disk) listings keyed by directory URL."""
+
+    def __init__(self):
+        self._entries = {}
+        self._lock = threading.Lock()
+        self._url_locks = {}
+        self.requests_made = 0    # Listing requests sent (including revalidations)
+        self.not_modified = 0     # Revalidations answered with 304
+
+    def _settings(self):
+        from .config import config
+        return config.listing_cache_ttl, config.listing_cache_on_disk, config.data_dir
+
+    @staticmethod
+    def _disk_path(data_dir, dir_url):
+        key = hashlib.sha1(dir_url.encode()).hexdigest()
+        return os.path.join(data_dir, 'listing_cache', f"{key}.json")
+
+    def _load_from_disk(self, data_dir, dir_url):
+        try:
+            with open(self._disk_path(data_dir, dir_url)) as f:
+                entry = json.load(f)
+        except (OSError, ValueError):
+            return None
+        return entry if entry.get('url') == dir_url else None
+
+    def _save_to_disk(self, data_dir, entry):
+        path = self._disk_path(data_dir, entry['url'])
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+            with open(tmp_path, 'w') as f:
+                json.dump(entry, f)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            print_manager.debug(f"Could not write listing cache {path}: {e}")
+
+    def _url_lock(self, dir_url):
+        with self._lock:
+            return self._url_locks.setdefault(dir_url, threading.Lock())
+
+    def get(self, dir_url, fetch):
+        """
+        Listing of dir_url, from the cache when fresh.
+
+        Args:
+            dir_url: Directory URL (the cache key).
+            fetch: Callable fetch(dir_url, headers) -> requests.Response.
+
+        Returns:
+            tuple: (status_code, filenames). filenames is None unless the status is 200;
+            only successful listings are cached.
+        """
+        ttl, on_disk, data_dir = self._settings()
+        # Concurrent lookups of the same directory wait for one request instead of each sending one
+        with self._url_lock(dir_url):
+            entry = self._entries.get(dir_url)
+            if entry is None and on_disk:
+                entry = self._load_from_disk(data_dir, dir_url)
+                if entry is not None:
+                    self._entries[dir_url] = entry
+            if entry is not None and time.time() - entry['fetched_at'] < ttl:
+                print_manager.debug(f"📂 Using cached listing for {dir_url}")
+                return 200, entry['filenames']
+
+            headers = {}
+            if entry is not None:
+                if entry.get('etag'):
+                    headers['If-None-Match'] = entry['etag']
+                if entry.get('last_modified'):
+                    headers['If-Modified-Since'] = entry['last_modified']
+            response = fetch(dir_url, headers)
+            self.requests_made += 1
+
+            if response.status_code == 304 and entry is not None:
+                self.not_modified += 1
+                entry['fetched_at'] = time.time()
+            elif response.status_code == 200:
+                entry = {'url': dir_url,
+                         'filenames': parse_listing(response.text),
+                         'etag': response.headers.get('ETag'),
+                         'last_modified': response.headers.get('Last-Modified'),
+                         'fetched_at': time.time()}
+                self._entries[dir_url] = entry
+            else:
+                return response.status_code, None
+            if on_disk:
+                self._save_to_disk(data_dir, entry)
+            return 200, entry['filenames']
+
+    def clear(self, on_disk=False):
+        """Forget all cached listings (and delete the on-disk copies if on_disk)."""
+        with self._lock:
+            self._entries.clear()
+        if on_disk:
+            cache_dir = os.path.join(self._settings()[2], 'listing_cache')
+            if os.path.isdir(cache_dir):
+                for name in os.listdir(cache_dir):
+                    if name.endswith('.json'):
+                        os.remove(os.path.join(cache_dir, name))
+
+# Create global instance
+listing_cache = DirectoryListingCache()
+
+__all__ = ['listing_cache', 'DirectoryListingCache', 'compiled_pattern', 'parse_listing']
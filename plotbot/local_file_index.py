@@ -0,0 +1,236 @@
+#plotbot/local_file_index.py
+"""
+Persistent SQLite index of the local data files.
+
+check_local_files, smart_check_local_pyspedas_files and import_data_function
+all answer the same question, "which files for this data type and date are on
+disk (and which is the newest _vNN)?", and used to answer it by listing and
+pattern-matching whole year directories on every call. On network filesystems
+with years of data that costs seconds per call.
+
+The index keeps one row per file in {data_dir}/file_index.sqlite, keyed by
+(directory, lowercase filename), with the base name and version already split
+out. Since data file names start with the data level and date, a lookup
+
+    local_file_index.find(local_dir, 'psp_fld_l2_mag_rtn_20200101_v*.cdf', latest_only=True)
+
+is one os.stat of the directory plus a B-tree range query on the literal
+prefix of the pattern. A directory is rescanned only when its mtime changes,
+and download_engine adds each finished download directly. Matching is
+case-insensitive (as the previous scans were) and ignores in-progress .part
+downloads. Set config.local_file_index = False to scan directories directly.
+"""
+import os
+import re
+import sqlite3
+import threading
+from fnmatch import fnmatch
+
+from .print_manager import print_manager
+
+INDEX_FILENAME = 'file_index.sqlite'
+PART_SUFFIX = '.part'  # In-progress downloads (download_engine) are never indexed
+_VERSION_RE = re.compile(r'(.+)_v(\d+)\.cdf$', re.IGNORECASE)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS dirs (path TEXT PRIMARY KEY, mtime_ns INTEGER NOT NULL);
+CREATE TABLE IF NOT EXISTS files (
+    dir TEXT NOT NULL,
+    name_lower TEXT NOT NULL,
+    name TEXT NOT NULL,
+    base_lower TEXT NOT NULL,
+    version INTEGER NOT NULL,
+    PRIMARY KEY (dir, name_lower)
+) WITHOUT ROWID;
+"""
+
+def split_version(filename):
+    """(lowercase base name, version) of a data file name; files without _vNN.cdf are version 0."""
+    match = _VERSION_RE.match(filename)
+    if match:
+        return match.group(1).lower(), int(match.group(2))
+    return filename.lower(), 0
+
+def latest_versions(paths):
+    """Keep only the highest _vNN of each file in paths, sorted."""
+    best = {}
+    for path in paths:
+        directory, filename = os.path.split(path)
+        base, version = split_version(filename)
+        key = (directory, base)
+        if key not in best or version > best[key][1]:
+            best[key] = (path, version)
+    return sorted(path for path, _ in best.values())
+
+def _literal_prefix(pattern):
+    """Lowercase part of a glob pattern before its first wildcard."""
+    match = re.search(r'[*?\[]', pattern)
+    return (pattern[:match.start()] if match else pattern).lower()
+
+class LocalFileIndex:
+    """Directory listings of the data tree cached in SQLite and revalidated by directory mtime."""
+
+    def __init__(self, db_path=None):
+        self._db_path = db_path  # None: {config.data_dir}/file_index.sqlite
+        self._lock = threading.RLock()
+        self._conn = None
+        self._conn_path = None
+
+    @property
+    def db_path(self):
+        if self._db_path is not None:
+            return self._db_path
+        from .config import config
+        return os.path.join(config.data_dir, INDEX_FILENAME)
+
+    def _connection(self):
+        path = self.db_path
+        if self._conn is None or self._conn_path != path:  # data_dir may change between calls
+            if self._conn is not None:
+                self._conn.close()
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+            self._conn = sqlite3.connect(path, timeout=30, check_same_thread=False, isolation_level=None)
+            self._conn.executescript(_SCHEMA)
+            self._conn_path = path
+        return self._conn
+
+    @staticmethod
+    def _enabled():
+        from .config import config
+        return config.local_file_index
+
+    @staticmethod
+    def _dir_key(directory):
+        return os.path.abspath(directory)
+
+    def _scan(self, conn, directory, mtime_ns):
+        rows = []
+        with os.scandir(directory) as entries:
+            for entry in entries:
+                if entry.name.endswith(PART_SUFFIX) or not entry.is_file():
+                    continue
+                base, version = split_version(entry.name)
+                rows.append((directory, entry.name.lower(), entry.name, base, version))
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            conn.execute('DELETE FROM files WHERE dir = ?', (directory,))
+            conn.executemany('INSERT OR REPLACE INTO files VALUES (?, ?, ?, ?, ?)', rows)
+            conn.execute('INSERT OR REPLACE INTO dirs VALUES (?, ?)', (directory, mtime_ns))
+            conn.execute('COMMIT')
+        except Exception:
+            conn.execute('ROLLBACK')
+            raise
+        print_manager.debug(f"📇 Indexed {len(rows)} files in {directory}")
+
+    def _refresh(self, conn, directory):
+        """Rescan directory if its mtime changed since it was indexed; False if it does not exist."""
+        try:
+            mtime_ns = os.stat(directory).st_mtime_ns
+        except OSError:
+            return False
+        row = conn.execute('SELECT mtime_ns FROM dirs WHERE path = ?', (directory,)).fetchone()
+        if row is None or row[0] != mtime_ns:
+            self._scan(conn, directory, mtime_ns)
+        return True
+
+    def find(self, directory, pattern, latest_only=False):
+        """
+        Files in directory whose names match a glob pattern (case-insensitive).
+
+        Args:
+            directory: Directory to look in (not recursive).
+            pattern: Filename glob, e.g. 'psp_fld_l2_mag_rtn_20200101_v*.cdf'.
+            latest_only: Keep only the highest _vNN of each matching file.
+
+        Returns:
+            list: Sorted full paths (empty if the directory does not exist).
+        """
+        if not self._enabled():
+            return self._scan_directly(directory, pattern, latest_only)
+        pattern_lower = pattern.lower()
+        prefix = _literal_prefix(pattern)
+        try:
+            with self._lock:
+                conn = self._connection()
+                if not self._refresh(conn, self._dir_key(directory)):
+                    return []
+                rows = conn.execute(
+                    'SELECT name, name_lower, base_lower, version FROM files '
+                    'WHERE dir = ? AND name_lower >= ? AND name_lower < ?',
+                    (self._dir_key(directory), prefix, prefix + '\U0010ffff')).fetchall()
+        except (sqlite3.Error, OSError) as e:
+            # An unwritable data_dir or a locked index must not stop data loading
+            print_manager.debug(f"Local file index unavailable ({e}), scanning {directory}")
+            return self._scan_directly(directory, pattern, latest_only)
+        matches = [row for row in rows if fnmatch(row[1], pattern_lower)]
+        if latest_only:
+            best = {}
+            for row in matches:
+                if row[2] not in best or row[3] > best[row[2]][3]:
+                    best[row[2]] = row
+            matches = best.values()
+        return sorted(os.path.join(directory, row[0]) for row in matches)  # Paths keep the caller's directory form
+
+    @staticmethod
+    def _scan_directly(directory, pattern, latest_only):
+        if not os.path.isdir(directory):
+            return []
+        pattern_lower = pattern.lower()
+        paths = [os.path.join(directory, name) for name in os.listdir(directory)
+                 if not name.endswith(PART_SUFFIX) and fnmatch(name.lower(), pattern_lower)]
+        return latest_versions(paths) if latest_only else sorted(paths)
+
+    def add(self, path, dir_mtime_before=None, dir_mtime_after=None):
+        """
+        Record a newly written file (e.g. a finished download) without rescanning its directory.
+
+        With the directory mtimes from just before and after the file was moved in,
+        the directory stays marked current when that move was its only change;
+        otherwise it is rescanned on the next lookup.
+        """
+        if not self._enabled() or not os.path.exists(self.db_path):
+            return  # Nothing indexed yet: the first find() scans the directory anyway
+        directory, name = os.path.split(self._dir_key(path))
+        base, version = split_version(name)
+        try:
+            with self._lock:
+                conn = self._connection()
+                indexed = conn.execute('SELECT mtime_ns FROM dirs WHERE path = ?', (directory,)).fetchone()
+                if indexed is None:
+                    return  # Not indexed yet: the first find() scans the directory anyway
+                conn.execute('BEGIN IMMEDIATE')
+                try:
+                    conn.execute('INSERT OR REPLACE INTO files VALUES (?, ?, ?, ?, ?)',
+                                 (directory, name.lower(), name, base, version))
+                    if dir_mtime_before is not None and indexed[0] == dir_mtime_before:
+                        conn.execute('UPDATE dirs SET mtime_ns = ? WHERE path = ?', (dir_mtime_after, directory))
+                    conn.execute('COMMIT')
+                except Exception:
+                    conn.execute('ROLLBACK')
+                    raise
+        except (sqlite3.Error, OSError) as e:
+            print_manager.debug(f"Could not add {path} to the local file index: {e}")
+
+    def invalidate(self, directory=None):
+        """Force a rescan of one directory on its next lookup, or of every directory."""
+        with self._lock:
+            conn = self._connection()
+            if directory is None:
+                conn.execute('DELETE FROM dirs')
+                conn.execute('DELETE FROM files')
+            else:
+                directory = self._dir_key(directory)
+                conn.execute('DELETE FROM dirs WHERE path = ?', (directory,))
+                conn.execute('DELETE FROM files WHERE dir = ?', (directory,))
+
+    def close(self):
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+            self._conn = None
+            self._conn_path = None
+
+# Create global instance
+local_file_index = LocalFileIndex()
+
+__all__ = ['local_file_index', 'LocalFileIndex', 'latest_versions', 'split_version']
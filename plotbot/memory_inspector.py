@@ -0,0 +1,258 @@
+#plotbot/memory_inspector.py
+"""
+Memory accounting for loaded data classes, plus tracemalloc peak tracking.
+
+memory_report() walks every instance in data_cubby.class_registry: its
+ndarray attributes (datetime_array, time, times_mesh, calculated products),
+raw_data and other dicts/lists of arrays, and every plot_manager with its
+plot_config arrays and _clipped_* copies. Views are resolved to the buffer
+that owns the memory, so each buffer is counted once: against the component
+holding the owning array itself, or else the first view of it found. Other
+references to it are listed in the component's shared_with.
+
+    import plotbot
+    from plotbot.memory_inspector import memory_report, format_memory_report, track_peak
+
+    print(format_memory_report(memory_report()))   # Classes, largest components, duplicates
+
+    with track_peak('get_data') as peak:
+        plotbot.get_data(trange, plotbot.mag_rtn_4sa.br)
+    print(peak['peak_bytes'], peak['retained_bytes'])
+
+Python lists of scalars (e.g. a class's `datetime` list) are estimated from
+the list size and its first element. Copies that hold the same values as
+another buffer are listed as duplicates with the bytes they waste.
+"""
+import sys
+import time
+import tracemalloc
+from contextlib import contextmanager
+
+import numpy as np
+
+from .print_manager import print_manager
+
+_MAX_DEPTH = 4
+_MIN_DUPLICATE_BYTES = 1024  # Smaller equal buffers are not worth reporting
+
+def _owner(array):
+    """The ndarray at the bottom of array's chain of views."""
+    while isinstance(array.base, np.ndarray):
+        array = array.base
+    return array
+
+def _object_bytes(array):
+    """Estimated size of the Python objects an object-dtype array points to."""
+    if array.dtype != object or array.size == 0:
+        return 0
+    return array.size * sys.getsizeof(array.flat[0])
+
+def _list_bytes(values):
+    """Estimated size of a list of scalars (datetimes, floats, ...)."""
+    return sys.getsizeof(values) + (len(values) * sys.getsizeof(values[0]) if len(values) else 0)
+
+class _Accountant:
+    """Collects per-component bytes while buffers are deduplicated across every class walked."""
+
+    def __init__(self):
+        self.owners = {}  # Buffer address -> (class_name, component, owning ndarray)
+        self.classes = {}
+        self.arrays = []  # (class_name, component, array) found by walk(), counted by account()
+
+    def _component(self, class_name, component):
+        components = self.classes.setdefault(class_name, {})
+        return components.setdefault(component, {'bytes': 0, 'view_bytes': 0, 'arrays': 0, 'shared_with': []})
+
+    def account(self):
+        """Count the walked arrays: owning arrays first, so a buffer is charged to its owner rather than a view."""
+        self.arrays.sort(key=lambda item: _owner(item[2]) is not item[2])
+        for class_name, component, array in self.arrays:
+            self._add_array(class_name, component, array)
+        self.arrays = []
+
+    def _add_array(self, class_name, component, array):
+        owner = _owner(array)
+        if owner.nbytes == 0:
+            return
+        entry = self._component(class_name, component)
+        entry['arrays'] += 1
+        entry['view_bytes'] += array.nbytes
+        address = owner.__array_interface__['data'][0]
+        first = self.owners.get(address)
+        if first is None:
+            self.owners[address] = (class_name, component, owner)
+            entry['bytes'] += owner.nbytes + _object_bytes(owner)
+        elif first[:2] != (class_name, component) and f"{first[0]}.{first[1]}" not in entry['shared_with']:
+            entry['shared_with'].append(f"{first[0]}.{first[1]}")
+
+    def add_list(self, class_name, component, values):
+        entry = self._component(class_name, component)
+        entry['arrays'] += 1
+        size = _list_bytes(values)
+        entry['bytes'] += size
+        entry['view_bytes'] += size
+
+    def walk(self, class_name, component, value, depth=0):
+        from .plot_manager import plot_manager
+        if depth > _MAX_DEPTH or value is None:
+            return
+        if isinstance(value, plot_manager):
+            self.arrays.append((class_name, component, value.view(np.ndarray)))
+            config = getattr(value, 'plot_config', None)
+            for name in ('_datetime_array', '_time', 'additional_data'):
+                self.walk(class_name, f"{component}.plot_config.{name.lstrip('_')}", getattr(config, name, None), depth + 1)
+            for name in ('_clipped_data', '_clipped_datetime_array', '_clipped_time'):
+                self.walk(class_name, f"{component}.{name}", getattr(value, name, None), depth + 1)
+        elif isinstance(value, np.ndarray):
+            self.arrays.append((class_name, component, value))
+        elif isinstance(value, dict):
+            for key, item in value.items():
+                self.walk(class_name, f"{component}.{key}", item, depth + 1)
+        elif isinstance(value, (list, tuple)) and len(value):
+            if any(isinstance(item, (np.ndarray, dict, list, tuple)) for item in value):
+                for index, item in enumerate(value):
+                    self.walk(class_name, f"{component}[{index}]", item, depth + 1)
+            elif depth == 0:
+                self.add_list(class_name, component, value)
+
+    def duplicates(self):
+        """Separately allocated buffers with equal dtype, shape and values."""
+        groups = {}
+        for class_name, component, owner in self.owners.values():
+            if owner.nbytes >= _MIN_DUPLICATE_BYTES and owner.dtype != object:
+                groups.setdefault((owner.dtype.str, owner.shape), []).append((f"{class_name}.{component}", owner))
+        found = []
+        for candidates in groups.values():
+            while len(candidates) > 1:
+                name, owner = candidates.pop(0)
+                equal_nan = owner.dtype.kind in 'fc'
+                same = [other for other in candidates if np.array_equal(owner, other[1], equal_nan=equal_nan)]
+                if same:
+                    found.append({'components': [name] + [other_name for other_name, _ in same],
+                                  'bytes': owner.nbytes, 'wasted_bytes': owner.nbytes * len(same)})
+                    candidates = [other for other in candidates if all(other is not match for match in same)]
+        return sorted(found, key=lambda duplicate: -duplicate['wasted_bytes'])
+
+#====================================================================
+# FUNCTION: memory_report, Per-class and per-component memory use
+#====================================================================
+def memory_report(classes=None, registry=None, find_duplicates=True):
+    """
+    Bytes held by each loaded data class, by component, with shared buffers counted once.
+
+    Args:
+        classes (list, optional): Class names (e.g. ['mag_rtn_4sa', 'proton']) to
+            include. Defaults to every loaded class.
+        registry (dict, optional): {class_name: instance} to walk instead of
+            data_cubby.class_registry.
+        find_duplicates (bool): Also compare buffers of the same dtype and shape
+            and list the equal ones.
+
+    Returns:
+        dict: {'total_bytes': int, 'view_bytes': int,
+               'classes': {class_name: {'bytes', 'view_bytes', 'components': {component: {...}}}},
+               'duplicates': [{'components', 'bytes', 'wasted_bytes'}, ...]}
+        'bytes' is memory counted against a component (each buffer once);
+        'view_bytes' adds up every array referenced, views included.
+    """
+    if registry is None:
+        from .data_cubby import data_cubby
+        registry = data_cubby.class_registry
+    wanted = None if classes is None else {name.lower() for name in classes}
+
+    accountant = _Accountant()
+    seen_instances = set()
+    for class_name, instance in sorted(registry.items()):
+        if (wanted is not None and class_name.lower() not in wanted) or id(instance) in seen_instances:
+            continue
+        seen_instances.add(id(instance))
+        accountant.classes.setdefault(class_name, {})
+        for attribute, value in vars(instance).items():
+            accountant.walk(class_name, attribute, value)
+    accountant.account()
+
+    report_classes = {}
+    for class_name, components in accountant.classes.items():
+        report_classes[class_name] = {
+            'bytes': sum(entry['bytes'] for entry in components.values()),
+            'view_bytes': sum(entry['view_bytes'] for entry in components.values()),
+            'components': components,
+        }
+    return {
+        'total_bytes': sum(entry['bytes'] for entry in report_classes.values()),
+        'view_bytes': sum(entry['view_bytes'] for entry in report_classes.values()),
+        'classes': report_classes,
+        'duplicates': accountant.duplicates() if find_duplicates else [],
+    }
+
+def _format_bytes(n_bytes):
+    for unit in ('B', 'KB', 'MB', 'GB'):
+        if abs(n_bytes) < 1024 or unit == 'GB':
+            return f"{n_bytes:.0f} {unit}" if unit == 'B' else f"{n_bytes:.1f} {unit}"
+        n_bytes /= 1024
+
+def format_memory_report(report, top=10):
+    """Text summary of memory_report(): classes by size, their largest components, then duplicates."""
+    lines = [f"Total {_format_bytes(report['total_bytes'])} (views {_format_bytes(report['view_bytes'])})"]
+    for class_name, entry in sorted(report['classes'].items(), key=lambda item: -item[1]['bytes']):
+        lines.append(f"  {class_name:<24} {_format_bytes(entry['bytes']):>10}   (views {_format_bytes(entry['view_bytes'])})")
+        components = sorted(entry['components'].items(), key=lambda item: -item[1]['bytes'])
+        for component, values in components[:top]:
+            if values['bytes']:
+                lines.append(f"    {component:<30} {_format_bytes(values['bytes']):>10}")
+    for duplicate in report['duplicates']:
+        lines.append(f"  duplicate {_format_bytes(duplicate['bytes'])} x{len(duplicate['components'])}: "
+                     f"{', '.join(duplicate['components'])} (wastes {_format_bytes(duplicate['wasted_bytes'])})")
+    return '\n'.join(lines)
+
+#====================================================================
+# FUNCTION: track_peak, tracemalloc peak around a block of code
+#====================================================================
+_active_trackers = []  # Enclosing track_peak blocks; reset_peak() would otherwise hide their peaks
+
+@contextmanager
+def track_peak(label=None):
+    """
+    Measure Python (and numpy) allocations inside the block with tracemalloc.
+
+    Starts tracemalloc if it is not already tracing (and stops it afterwards).
+    Nested blocks each report their own peak.
+
+    Yields:
+        dict: Filled in when the block exits with 'label', 'peak_bytes' (highest
+        traced memory above the starting point), 'retained_bytes' (still
+        allocated at the end), 'start_bytes', 'end_bytes' and 'seconds'.
+    """
+    stats = {'label': label}
+    started = not tracemalloc.is_tracing()
+    if started:
+        tracemalloc.start()
+    current, peak = tracemalloc.get_traced_memory()
+    for outer in _active_trackers:
+        outer['carried_peak'] = max(outer['carried_peak'], peak)
+    tracemalloc.reset_peak()
+    frame = {'carried_peak': 0}
+    _active_trackers.append(frame)
+    start = time.perf_counter()
+    try:
+        yield stats
+    finally:
+        end_current, end_peak = tracemalloc.get_traced_memory()
+        _active_trackers.remove(frame)
+        peak = max(end_peak, frame['carried_peak'])
+        for outer in _active_trackers:
+            outer['carried_peak'] = max(outer['carried_peak'], peak)
+        if started:
+            tracemalloc.stop()
+        stats.update(start_bytes=current, end_bytes=end_current, peak_bytes=max(peak - current, 0),
+                     retained_bytes=end_current - current, seconds=time.perf_counter() - start)
+        print_manager.speed_test(f"[MEMORY] {label or 'block'}: peak +{_format_bytes(stats['peak_bytes'])}, "
+                                 f"retained {_format_bytes(stats['retained_bytes'])}")
+
+def peak_memory(func, *args, **kwargs):
+    """Call func(*args, **kwargs) inside track_peak; returns (result, stats)."""
+    with track_peak(getattr(func, '__name__', None)) as stats:
+        result = func(*args, **kwargs)
+    return result, stats
+
+__all__ = ['memory_report', 'format_memory_report', 'track_peak', 'peak_memory']
@@ -0,0 +1,98 @@
+#plotbot/metrics.py
+"""
+Per-data_type counters and timings for the plotbot pipeline.
+
+Every stage counts into one registry, keyed by data_type (lower-cased, so
+'mag_RTN_4sa' and the cubby key 'mag_rtn_4sa' share a row):
+
+    tracker_hits / tracker_misses   DataTracker lookups that found / did not find the range
+    files_downloaded / bytes_downloaded / download_failures
+    import, import_seconds, records_decoded
+    merge, merge_seconds, merge_bytes   (bytes in the merged arrays)
+    calculate, calculate_seconds        (calculate_variables / update())
+    clip, clip_seconds, clip_records    (plot_manager requested_trange clipping)
+
+    import plotbot
+    plotbot.metrics()                   # {'mag_rtn_4sa': {'tracker_misses': 1, 'import_seconds': 0.41, ...}, ...}
+    plotbot.metrics('mag_RTN_4sa')      # One data_type
+    print(plotbot.metrics.report())     # Table, one row per data_type
+    plotbot.metrics.reset()
+
+Counting is a dict update under a lock, cheap enough to stay on in long sessions.
+"""
+import time
+import threading
+from contextlib import contextmanager
+
+_UNKNOWN = 'unknown'
+
+def _key(data_type):
+    return str(data_type).lower() if data_type else _UNKNOWN
+
+class MetricsRegistry:
+    """Thread-safe per-data_type counters. Call the instance to read them."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counters = {}
+
+    def count(self, data_type, name, value=1):
+        """Add value to the data_type's counter name."""
+        key = _key(data_type)
+        with self._lock:
+            counters = self._counters.setdefault(key, {})
+            counters[name] = counters.get(name, 0) + value
+
+    def add_time(self, data_type, name, seconds):
+        """Count one call of name and add its duration to name + '_seconds'."""
+        key = _key(data_type)
+        with self._lock:
+            counters = self._counters.setdefault(key, {})
+            counters[name] = counters.get(name, 0) + 1
+            counters[f"{name}_seconds"] = counters.get(f"{name}_seconds", 0.0) + seconds
+
+    @contextmanager
+    def timed(self, data_type, name):
+        """Context manager form of add_time (the time is recorded even if the block raises)."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add_time(data_type, name, time.perf_counter() - start)
+
+    def snapshot(self, data_type=None):
+        """Copy of the counters: {data_type: {name: value}}, or one data_type's {name: value}."""
+        with self._lock:
+            if data_type is not None:
+                return dict(self._counters.get(_key(data_type), {}))
+            return {key: dict(counters) for key, counters in sorted(self._counters.items())}
+
+    __call__ = snapshot
+
+    def reset(self, data_type=None):
+        """Zero every counter, or only those of one data_type."""
+        with self._lock:
+            if data_type is None:
+                self._counters.clear()
+            else:
+                self._counters.pop(_key(data_type), None)
+
+    def report(self):
+        """Text table of the counters, one row per data_type and one column per counter seen."""
+        counters = self.snapshot()
+        if not counters:
+            return 'No metrics recorded.'
+        columns = sorted({name for values in counters.values() for name in values})
+        def cell(value):
+            return f"{value:.3f}" if isinstance(value, float) else str(value)
+        rows = [['data_type'] + columns]
+        rows += [[key] + [cell(values.get(name, '')) for name in columns] for key, values in counters.items()]
+        widths = [max(len(row[i]) for row in rows) for i in range(len(rows[0]))]
+        return '\n'.join('  '.join(value.rjust(width) if i else value.ljust(width)
+                                   for i, (value, width) in enumerate(zip(row, widths)))
+                         for row in rows)
+
+# Create global instance
+metrics = MetricsRegistry()
+
+__all__ = ['metrics', 'MetricsRegistry']
@@ -7,8 +7,10 @@ from .data_import import import_data_function
 from .print_manager import print_manager, format_datetime_for_log
 from .get_encounter import get_encounter_number
 from .plotbot_helpers import time_clip
+from .summary_pyramid import pyramid_cache, envelope_xy
+from .decimation import decimate_line, decimate_spectrogram, axes_pixel_width
 # Import specific functions from multiplot_helpers instead of using wildcard import
-from .multiplot_helpers import get_plot_colors, apply_panel_color, apply_bottom_axis_color, validate_log_scale_limits
+from .multiplot_helpers import get_plot_colors, apply_panel_color, apply_bottom_axis_color, validate_log_scale_limits, get_panel_trange
 from .multiplot_options import plt, MultiplotOptions
 from .ploptions import ploptions
 # Import get_data for custom variables
@@ -146,6 +148,88 @@ def compute_monotonic_degrees_mask(degrees_array, tolerance_factor=1.0):
     return mask
 
 
+def _merge_panel_windows(windows):
+    """Merge overlapping or touching (start, end) datetime windows into sorted disjoint runs."""
+    merged = []
+    for start, end in sorted(windows):
+        if merged and start <= merged[-1][1]:
+            merged[-1][1] = max(merged[-1][1], end)
+        else:
+            merged.append([start, end])
+    return merged
+
+# plot_config fields that belong to the loaded data rather than the user's styling
+_DATA_CONFIG_FIELDS = ('_time', '_datetime_array', 'additional_data', 'requested_trange')
+
+def _restore_plot_config(var, saved_config):
+    """Put back the styling saved before get_data, keeping the freshly loaded time axis and data fields."""
+    for name in _DATA_CONFIG_FIELDS:
+        setattr(saved_config, name, getattr(var.plot_config, name, None))
+    var.plot_config = saved_config
+
+def prefetch_panel_windows(plot_list, options):
+    """
+    Load the data for every panel before any panel is processed.
+
+    Panel windows are grouped by data class and merged where they overlap, so
+    each class is fetched once per contiguous run of panels instead of once per
+    panel. Custom variables are skipped (they are refreshed from their sources
+    in Loop 1 as before).
+
+    get_data resets plot_config, so each variable's styling is saved first and
+    restored afterwards, as the per-panel path does.
+
+    Returns:
+        dict: (class_name, subclass_name) -> variable from data_cubby. Panels
+        whose variables are missing here fall back to the per-panel path.
+    """
+    import copy
+    from .time_utils import TimeRangeTracker
+    time_format = '%Y-%m-%d/%H:%M:%S.%f'
+
+    windows_by_class = {}
+    vars_by_class = {}
+    for center_time, var in plot_list:
+        for single_var in (var if isinstance(var, list) else [var]):
+            if not (hasattr(single_var, 'data_type') and hasattr(single_var, 'class_name') and hasattr(single_var, 'subclass_name')):
+                continue
+            if single_var.data_type == 'custom_data_type':
+                continue
+            class_name = single_var.class_name
+            trange = get_panel_trange(center_time, options.window, options.position)
+            windows_by_class.setdefault(class_name, []).append(
+                (datetime.strptime(trange[0], time_format), datetime.strptime(trange[1], time_format)))
+            vars_by_class.setdefault(class_name, {})[single_var.subclass_name] = single_var
+
+    prefetched = {}
+    for class_name, windows in windows_by_class.items():
+        class_vars = list(vars_by_class[class_name].values())
+        # Save custom plot_configs BEFORE get_data (which resets them)
+        saved_configs = {subclass_name: copy.deepcopy(var.plot_config)
+                         for subclass_name, var in vars_by_class[class_name].items()}
+        runs = _merge_panel_windows(windows)
+        print_manager.status(f"📥 Prefetching {class_name}: {len(windows)} panel window(s) in {len(runs)} request(s)")
+        failed = False
+        try:
+            for start, end in runs:
+                trange = [start.strftime(time_format), end.strftime(time_format)]
+                TimeRangeTracker.set_current_trange(trange)
+                get_data(trange, *class_vars)
+        except Exception as e:
+            print_manager.warning(f"Prefetch for {class_name} failed ({e}); falling back to per-panel loading")
+            failed = True
+
+        class_instance = data_cubby.grab(class_name)
+        if class_instance is None:
+            continue
+        for subclass_name in vars_by_class[class_name]:
+            updated_var = class_instance.get_subclass(subclass_name)
+            if updated_var is not None:
+                _restore_plot_config(updated_var, saved_configs[subclass_name])  # Also after a failed prefetch
+                if not failed:
+                    prefetched[(class_name, subclass_name)] = updated_var
+    return prefetched
+
 def multiplot(plot_list, **kwargs):
     """
     Create multiple time-series plots centered around specific times.
@@ -355,6 +439,9 @@ def multiplot(plot_list, **kwargs):
     #==========================================================================
     # STEP 2: PROCESS VARIABLES AND ENSURE DATA AVAILABILITY
     #==========================================================================
+    # Fetch the union of all panel windows per data class once, up front
+    prefetched_vars = prefetch_panel_windows(plot_list, options)
+
     for i, (center_time, var) in enumerate(plot_list):
         # DEBUG - Consolidate variable inspection into a single line
         var_info = f"Variable {i}: type={type(var).__name__}"
@@ -494,6 +581,13 @@ def multiplot(plot_list, **kwargs):
             print_manager.custom_debug(f"Regular variable detected: {var_class_name}.{var_subclass_name} - fetching data for time range: {trange}")
             print_manager.time_tracking(f"Panel {i+1} regular variable {var_class_name}.{var_subclass_name} processing with trange: {trange[0]} to {trange[1]}")
 
+            prefetched_var = prefetched_vars.get((var_class_name, var_subclass_name))
+            if prefetched_var is not None:
+                # Already loaded by prefetch_panel_windows; clipping to this panel happens lazily in Loop 2
+                plot_list[i] = (center_time, prefetched_var)
+                print_manager.status(f"✅ ENCOUNTER {enc_num} (Panel {i+1}) DATA SUCCESSFULLY LOADED!")
+                continue
+
             try:
                 # Use get_data to handle loading for all regular types (including FITS)
 
@@ -756,37 +850,43 @@ def multiplot(plot_list, **kwargs):
         axis_options = getattr(options, f'ax{i+1}')
         
         if isinstance(var, list):
-            # Load data for this panel's time range
-            # print(f"DEBUG Loop 2: Panel {i+1} - Loading data for list of {len(var)} variables, trange {trange}")
-
-            # Save custom plot_configs BEFORE get_data (which resets them)
-            import copy
-            original_plot_configs = {single_var.subclass_name: copy.deepcopy(single_var.plot_config) for single_var in var}
-
             from .time_utils import TimeRangeTracker
             TimeRangeTracker.set_current_trange(trange)
-            get_data(trange, *var)
 
-            # Grab refreshed variables from data_cubby
-            refreshed_vars = []
-            for single_var in var:
-                original_plot_config = original_plot_configs[single_var.subclass_name]  # Get saved custom plot_config
-                class_instance = data_cubby.grab(single_var.class_name)
-                if class_instance:
-                    updated_var = class_instance.get_subclass(single_var.subclass_name)
-                    if updated_var is not None:
-                        updated_var.plot_config = original_plot_config  # Restore custom plot_config
-                        refreshed_vars.append(updated_var)
-                        has_dt = hasattr(updated_var, 'datetime_array') and updated_var.datetime_array is not None
-                        dt_len = len(updated_var.datetime_array) if has_dt else 0
-                        # print(f"DEBUG Loop 2: Panel {i+1}, {single_var.subclass_name}: datetime_array len={dt_len}")
+            # Prefetched lists need no get_data here: just clip lazily to this panel
+            all_prefetched = all((single_var.class_name, single_var.subclass_name) in prefetched_vars for single_var in var)
+            if all_prefetched:
+                var_list_to_plot = [prefetched_vars[(single_var.class_name, single_var.subclass_name)] for single_var in var]
+            else:
+                # Load data for this panel's time range
+                # print(f"DEBUG Loop 2: Panel {i+1} - Loading data for list of {len(var)} variables, trange {trange}")
+
+                # Save custom plot_configs BEFORE get_data (which resets them)
+                import copy
+                original_plot_configs = {single_var.subclass_name: copy.deepcopy(single_var.plot_config) for single_var in var}
+
+                get_data(trange, *var)
+
+                # Grab refreshed variables from data_cubby
+                refreshed_vars = []
+                for single_var in var:
+                    original_plot_config = original_plot_configs[single_var.subclass_name]  # Get saved custom plot_config
+                    class_instance = data_cubby.grab(single_var.class_name)
+                    if class_instance:
+                        updated_var = class_instance.get_subclass(single_var.subclass_name)
+                        if updated_var is not None:
+                            updated_var.plot_config = original_plot_config  # Restore custom plot_config
+                            refreshed_vars.append(updated_var)
+                            has_dt = hasattr(updated_var, 'datetime_array') and updated_var.datetime_array is not None
+                            dt_len = len(updated_var.datetime_array) if has_dt else 0
+                            # print(f"DEBUG Loop 2: Panel {i+1}, {single_var.subclass_name}: datetime_array len={dt_len}")
+                        else:
+                            refreshed_vars.append(single_var)
                     else:
                         refreshed_vars.append(single_var)
-                else:
-                    refreshed_vars.append(single_var)
 
-            # Use refreshed variables for plotting
-            var_list_to_plot = refreshed_vars
+                # Use refreshed variables for plotting
+                var_list_to_plot = refreshed_vars
 
             for idx, single_var in enumerate(var_list_to_plot):
                 # print(f"DEBUG Loop 2: Panel {i+1}, idx={idx}, var={single_var.subclass_name}, second_variable_on_right_axis={options.second_variable_on_right_axis}")
@@ -903,6 +1003,7 @@ def multiplot(plot_list, **kwargs):
                         # --- Use filtered x_data and data_slice ---
                         print(f"DEBUG: Panel {i+1} RIGHT AXIS - About to plot: len(x_data)={len(x_data) if hasattr(x_data, '__len__') else 'scalar'}, len(data_slice)={len(data_slice) if hasattr(data_slice, '__len__') else 'scalar'}")
                         print_manager.processing(f"[PLOT_DEBUG Panel {i}] x_data type: {type(x_data).__name__}, first 5: {x_data[:5] if hasattr(x_data, '__getitem__') else x_data}")
+                        x_data, data_slice = decimate_line(x_data, data_slice, axes_pixel_width(ax2), var=single_var)  # M4: only what is visible at this width
                         ax2.plot(x_data,
                                 data_slice, # Use filtered data_slice
                                 linewidth=options.magnetic_field_line_width if options.save_preset else single_var.line_width,
@@ -1026,6 +1127,7 @@ def multiplot(plot_list, **kwargs):
                         # --- Use filtered x_data and data_slice ---
                         print(f"DEBUG: Panel {i+1} LEFT AXIS - About to plot: len(x_data)={len(x_data) if hasattr(x_data, '__len__') else 'scalar'}, len(data_slice)={len(data_slice) if hasattr(data_slice, '__len__') else 'scalar'}")
                         print_manager.processing(f"[PLOT_DEBUG Panel {i}] x_data type: {type(x_data).__name__}, first 5: {x_data[:5] if hasattr(x_data, '__getitem__') else x_data}")
+                        x_data, data_slice = decimate_line(x_data, data_slice, axes_pixel_width(axs[i]), var=single_var)  # M4: only what is visible at this width
                         axs[i].plot(x_data,
                                 data_slice, # Use filtered data_slice
                                 linewidth=options.magnetic_field_line_width if options.save_preset else single_var.line_width,
@@ -1066,8 +1168,11 @@ def multiplot(plot_list, **kwargs):
             TimeRangeTracker.set_current_trange(trange)
 
             # Grab variable from data_cubby (Loop 1 loaded data, data_cubby preserved state via update())
-            class_instance = data_cubby.grab(var.class_name)
-            if class_instance:
+            prefetched_var = prefetched_vars.get((getattr(var, 'class_name', None), getattr(var, 'subclass_name', None)))
+            class_instance = data_cubby.grab(var.class_name) if prefetched_var is None else None
+            if prefetched_var is not None:
+                var = prefetched_var
+            elif class_instance:
                 refreshed_var = class_instance.get_subclass(var.subclass_name)
                 if refreshed_var is not None:
                     var = refreshed_var
@@ -1168,6 +1273,13 @@ def multiplot(plot_list, **kwargs):
                             x_data = time_slice # Default to time
                             valid_lon_mask = None # Initialize mask
 
+                            # Long windows on a time axis: draw the summary pyramid's min/max envelope instead of every sample
+                            if not using_positional_axis:
+                                summary = pyramid_cache.reduce_for_plot(var, raw_datetime_array, trange[0], trange[1], axs[i].bbox.width)
+                                if summary is not None and np.ndim(summary[1]) == 1:
+                                    time_slice, data_slice = envelope_xy(*summary)
+                                    x_data = time_slice
+
                             # --- Perihelion Degree Calculation ---
                             if current_panel_use_degrees and perihelion_time_str and positional_mapper:
                                 print_manager.debug(f"Panel {i+1} (Time Series): Calculating Degrees from Perihelion.")
@@ -1381,6 +1493,7 @@ def multiplot(plot_list, **kwargs):
                                     print_manager.debug(f"[DEBUG Perihelion Value Check - Panel {i+1} TimeSeries] Error during value check: {dbg_e}")
 
                             print_manager.processing(f"[PLOT_DEBUG Panel {i}] x_data type: {type(x_data).__name__}, first 5: {x_data[:5] if hasattr(x_data, '__getitem__') else x_data}")
+                            x_data, data_slice = decimate_line(x_data, data_slice, axes_pixel_width(axs[i]), var=var)  # M4: only what is visible at this width
                             axs[i].plot(x_data,
                                         data_slice, # Use potentially filtered data_slice
                                         linewidth=options.magnetic_field_line_width if options.save_preset else var.line_width,
@@ -1696,6 +1809,9 @@ def multiplot(plot_list, **kwargs):
                                 x_data = time_slice
                                 # data_slice remains original full spectral data
 
+                        # Average down to one time column per pixel (y axis here is 1-D, so only x and Z shrink)
+                        x_data, data_slice, _ = decimate_spectrogram(x_data, data_slice, axes_pixel_width(axs[i]), var=var)
+
                         # FIXED: Create properly shaped mesh grid for pcolormesh to avoid dimension mismatch
                         try:
                             # Remove the transpose - data should not be transposed
@@ -1907,6 +2023,7 @@ def multiplot(plot_list, **kwargs):
                                 print_manager.debug(f"[DEBUG Perihelion Value Check - Panel {i+1} TimeSeries] Error during value check: {dbg_e}")
                         
                         print_manager.processing(f"[PLOT_DEBUG Panel {i}] x_data type: {type(x_data).__name__}, first 5: {x_data[:5] if hasattr(x_data, '__getitem__') else x_data}")
+                        x_data, data_slice = decimate_line(x_data, data_slice, axes_pixel_width(axs[i]), var=var)  # M4: only what is visible at this width
                         axs[i].plot(x_data, 
                                     data_slice, # Use potentially filtered data_slice
                                     linewidth=options.magnetic_field_line_width if options.save_preset else var.line_width,
@@ -0,0 +1,224 @@
+#plotbot/multiplot_batch.py
+"""
+Batch export of many multiplot figures across a process pool.
+
+    multiplot_batch([plot_list_1, plot_list_2, ...], 'figures/', workers=8)
+
+The parent process loads the data for every panel of every figure once
+(using the normal get_data path), writes the populated data classes to a
+temporary data snapshot, and starts a pool of Agg-backend workers. Each worker
+loads that snapshot once when it starts, so figures are rendered from the
+parent's data instead of being re-imported from CDF files, and the tracker in
+each worker already knows the ranges are loaded.
+
+Variables are sent to the workers by reference (class_name, subclass_name)
+and looked up in the worker's data_cubby. Figures containing variables that
+only exist in the parent session (custom variables) are rendered in the
+parent after the pool finishes.
+"""
+import os
+import io
+import copy
+import time
+import shutil
+import tempfile
+import contextlib
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from .print_manager import print_manager
+from .tracing import tracer
+
+_CUSTOM_CLASS_NAMES = ('custom_class', 'custom_variables')
+
+def _var_ref(var):
+    """(class_name, subclass_name) for a data-class variable, a list of refs, or None."""
+    if isinstance(var, (list, tuple)):
+        refs = [_var_ref(v) for v in var]
+        return None if any(r is None for r in refs) else refs
+    class_name = getattr(var, 'class_name', None)
+    subclass_name = getattr(var, 'subclass_name', None)
+    if (class_name is None or subclass_name is None or class_name in _CUSTOM_CLASS_NAMES
+            or getattr(var, 'data_type', None) == 'custom_data_type'):
+        return None
+    return (class_name, subclass_name)
+
+def _resolve_ref(ref):
+    """Look a variable reference up in this process's data_cubby."""
+    from .data_cubby import data_cubby
+    if isinstance(ref, list):
+        return [_resolve_ref(r) for r in ref]
+    class_name, subclass_name = ref
+    instance = data_cubby.grab(class_name)
+    var = instance.get_subclass(subclass_name) if instance is not None else None
+    if var is None:
+        raise KeyError(f"{class_name}.{subclass_name} is not available in this worker")
+    return var
+
+def _batch_options(kwargs):
+    """Copy of plt.options with the batch's multiplot kwargs applied."""
+    from .multiplot_options import plt
+    options = copy.deepcopy(plt.options)
+    for key, value in kwargs.items():
+        if hasattr(options, key):
+            setattr(options, key, value)
+    return options
+
+def _render(plot_list, out_path, kwargs, dpi):
+    """Run multiplot for one figure and save it; returns elapsed seconds."""
+    from .multiplot import multiplot
+    from .multiplot_options import plt
+    from .ploptions import ploptions
+
+    start = time.perf_counter()
+    saved = (ploptions.display_figure, ploptions.return_figure)
+    ploptions.display_figure = False
+    ploptions.return_figure = True
+    try:
+        with tracer.span('figure', file=os.path.basename(out_path), panels=len(plot_list)):
+            fig = multiplot(list(plot_list), **dict(kwargs, save_output=False))
+            options = plt.options
+            with tracer.span('save', file=os.path.basename(out_path)):
+                fig.savefig(out_path, dpi=dpi or options.save_dpi or 300,
+                            bbox_inches=options.bbox_inches_save_crop_mode)
+            plt.close(fig)
+    finally:
+        ploptions.display_figure, ploptions.return_figure = saved
+    return time.perf_counter() - start
+
+def _init_worker(snapshot_path, snapshot_classes, tracker_ranges, options, trace=False):
+    """Process-pool initializer: Agg backend, parent's options, parent's data and tracker ranges (and tracing state)."""
+    import matplotlib
+    matplotlib.use('Agg', force=True)
+    from .multiplot_options import plt
+    from . import data_snapshot
+    print_manager.show_status = False
+    tracer.enabled = trace
+    plt.options = options
+    if snapshot_path:
+        with contextlib.redirect_stdout(io.StringIO()):
+            data_snapshot.load_data_snapshot(snapshot_path, classes=snapshot_classes)
+        # The snapshot restores the data; the parent's ranges tell get_data it is already loaded
+        from .data_tracker import global_tracker
+        imported_ranges, calculated_ranges = tracker_ranges
+        global_tracker.imported_ranges.update(imported_ranges)
+        global_tracker.calculated_ranges.update(calculated_ranges)
+
+def _render_in_worker(plot_refs, out_path, kwargs, dpi):
+    """Returns (elapsed seconds, span records for the parent's tracer)."""
+    plot_list = [(center_time, _resolve_ref(ref)) for center_time, ref in plot_refs]
+    elapsed = _render(plot_list, out_path, kwargs, dpi)
+    return elapsed, tracer.drain()
+
+def _prefetch(plot_lists, options):
+    """Load every panel window of every figure once in the parent; return the data-class instances used."""
+    from .data_cubby import data_cubby
+    from .multiplot import prefetch_panel_windows
+
+    panels = [panel for plot_list in plot_lists for panel in plot_list]
+    class_names = {class_name for class_name, _ in prefetch_panel_windows(panels, options)}
+    instances = [data_cubby.grab(class_name) for class_name in sorted(class_names)]
+    return [instance for instance in instances if instance is not None]
+
+def _tracker_ranges(data_types):
+    """The parent's (imported, calculated) tracker ranges for data_types, to hand to the workers."""
+    from .data_tracker import global_tracker
+    wanted = {data_type.lower() for data_type in data_types}
+    return tuple({key: list(ranges) for key, ranges in tracked.items() if key.lower() in wanted}
+                 for tracked in (global_tracker.imported_ranges, global_tracker.calculated_ranges))
+
+def _write_handover_snapshot(instances, snapshot_dir):
+    """Snapshot the instances into snapshot_dir; returns the absolute file path, or None if nothing was saved."""
+    from .data_snapshot import save_data_snapshot
+    with contextlib.redirect_stdout(io.StringIO()):
+        saved_path = save_data_snapshot(filename=os.path.join(snapshot_dir, 'multiplot_batch'),
+                                        classes=instances, auto_split=False)
+    return os.path.abspath(saved_path) if saved_path else None
+
+#====================================================================
+# FUNCTION: multiplot_batch, Render many multiplot figures in parallel
+#====================================================================
+def multiplot_batch(plot_lists, out_dir, workers=None, filenames=None, file_format='png', dpi=None, **kwargs):
+    """
+    Render and save one multiplot figure per plot list.
+
+    Args:
+        plot_lists (list): List of multiplot plot lists, each a list of
+            (center_time, variable) tuples exactly as passed to multiplot().
+        out_dir (str): Directory for the output images (created if needed).
+        workers (int, optional): Number of worker processes. Defaults to the
+            number of CPUs; 1 renders everything in this process.
+        filenames (list, optional): Base names for each figure. Defaults to
+            'multiplot_000', 'multiplot_001', ...
+        file_format (str): Image format / extension, e.g. 'png' or 'pdf'.
+        dpi (int, optional): Output DPI. Defaults to plt.options.save_dpi or 300.
+        **kwargs: MultiplotOptions overrides applied to every figure.
+
+    Returns:
+        list: Saved file path for each figure, or None where rendering failed.
+    """
+    plot_lists = [list(plot_list) for plot_list in plot_lists]
+    n_figures = len(plot_lists)
+    if filenames is not None and len(filenames) != n_figures:
+        raise ValueError(f"Got {len(filenames)} filenames for {n_figures} plot lists")
+    if n_figures == 0:
+        return []
+    os.makedirs(out_dir, exist_ok=True)
+    names = filenames or [f"multiplot_{i:03d}" for i in range(n_figures)]
+    out_paths = [os.path.join(out_dir, f"{name}.{file_format}") for name in names]
+    if workers is None:
+        workers = os.cpu_count() or 1
+    workers = max(1, min(int(workers), n_figures))
+
+    batch_start = time.perf_counter()
+    results = [None] * n_figures
+    completed = 0
+
+    def _report(index, elapsed=None, error=None):
+        nonlocal completed
+        completed += 1
+        if error is None:
+            results[index] = out_paths[index]
+            print_manager.status(f"🖼️ [{completed}/{n_figures}] Saved {out_paths[index]} ({elapsed:.1f}s)")
+        else:
+            print_manager.error(f"❌ [{completed}/{n_figures}] Figure {index} ({out_paths[index]}) failed: {error}")
+
+    refs = [[(center_time, _var_ref(var)) for center_time, var in plot_list] for plot_list in plot_lists]
+    pooled = [i for i in range(n_figures) if workers > 1 and all(ref is not None for _, ref in refs[i])]
+    local = sorted(set(range(n_figures)) - set(pooled))
+
+    if pooled:
+        options = _batch_options(kwargs)
+        print_manager.status(f"📦 multiplot_batch: loading data for {len(pooled)} figure(s) before starting {workers} workers...")
+        snapshot_dir = tempfile.mkdtemp(prefix='plotbot_multiplot_batch_')
+        try:
+            instances = _prefetch([plot_lists[i] for i in pooled], options)
+            snapshot_path = _write_handover_snapshot(instances, snapshot_dir)
+            snapshot_classes = [instance.data_type for instance in instances]
+            ctx = multiprocessing.get_context('spawn')
+            initargs = (snapshot_path, snapshot_classes, _tracker_ranges(snapshot_classes), options, tracer.enabled)
+            with ProcessPoolExecutor(max_workers=workers, mp_context=ctx,
+                                     initializer=_init_worker, initargs=initargs) as pool:
+                futures = {pool.submit(_render_in_worker, refs[i], out_paths[i], kwargs, dpi): i for i in pooled}
+                for future in as_completed(futures):
+                    try:
+                        elapsed, span_records = future.result()
+                        tracer.merge(span_records)
+                        _report(futures[future], elapsed=elapsed)
+                    except Exception as e:
+                        _report(futures[future], error=e)
+        finally:
+            shutil.rmtree(snapshot_dir, ignore_errors=True)
+
+    for i in local:
+        try:
+            _report(i, elapsed=_render(plot_lists[i], out_paths[i], kwargs, dpi))
+        except Exception as e:
+            _report(i, error=e)
+
+    n_saved = sum(path is not None for path in results)
+    print_manager.status(f"✅ multiplot_batch: saved {n_saved}/{n_figures} figures to {out_dir} "
+                         f"in {time.perf_counter() - batch_start:.1f}s")
+    return results
+
+__all__ = ['multiplot_batch']
@@ -180,4 +180,28 @@ def validate_log_scale_limits(y_limit, y_scale, axis_name):
     if validated_min != min_val or validated_max != max_val:
         return (validated_min, validated_max)
     else:
-        return y_limit
\ No newline at end of file
+        return y_limit
+
+def get_panel_trange(center_time, window, position='around'):
+    """
+    Time range covered by one multiplot panel.
+
+    Args:
+        center_time: Panel center time (string, datetime or Timestamp)
+        window (str): Panel width, e.g. '24h'
+        position (str): 'around', 'before' or 'after' the center time
+
+    Returns:
+        list: [start, end] formatted as '%Y-%m-%d/%H:%M:%S.%f'
+    """
+    import pandas as pd
+    center = pd.Timestamp(center_time)
+    width = pd.Timedelta(window)
+    if position == 'around':
+        start_time, end_time = center - width / 2, center + width / 2
+    elif position == 'before':
+        start_time, end_time = center - width, center
+    else:  # after
+        start_time, end_time = center, center + width
+    return [start_time.strftime('%Y-%m-%d/%H:%M:%S.%f'),
+            end_time.strftime('%Y-%m-%d/%H:%M:%S.%f')]
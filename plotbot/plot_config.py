@@ -35,6 +35,7 @@ class plot_config:
                  additional_data=None,
                  colorbar_label=None,
                  requested_trange=None,
+                 decimate=True,
                  # Add common font size attributes explicitly
                  title_fontsize=12,
                  y_label_size=10,
@@ -67,6 +68,7 @@ class plot_config:
         self.additional_data = additional_data
         self.colorbar_label = colorbar_label
         self.requested_trange = requested_trange
+        self.decimate = decimate  # False keeps every sample when rendering (see plotbot/decimation.py)
         # Set the explicit font sizes
         self.title_fontsize = title_fontsize
         self.y_label_size = y_label_size
@@ -26,6 +26,7 @@ class plot_config:
     colorbar_limits: Optional[Tuple[float, float]]
     additional_data: Any
     colorbar_label: Optional[str]
+    decimate: bool
     title_font_size: int | float # Corrected name
     y_axis_label_font_size: int | float # Corrected name
     x_axis_label_font_size: int | float # Corrected name
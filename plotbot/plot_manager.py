@@ -16,6 +16,8 @@ def _get_plt():
 
 from .plot_config import plot_config
 from .print_manager import print_manager
+from .tracing import tracer
+from .metrics import metrics
 from .data_classes.custom_variables import custom_variable  # UPDATED PATH
 
 class plot_manager(np.ndarray):
@@ -25,7 +27,7 @@ class plot_manager(np.ndarray):
         'y_label', 'legend_label', 'color', 'y_scale', 'y_limit', 'line_width',
         'line_style', 'colormap', 'colorbar_scale', 'colorbar_limits',
         'additional_data', 'colorbar_label', 'is_derived', 'source_var', 'operation',
-        'requested_trange',
+        'requested_trange', 'decimate',
 
         # Add missing attributes
         'marker', 'marker_size', 'alpha', 'marker_style' #, 'zorder', 'legend_label_override'
@@ -241,8 +243,16 @@ class plot_manager(np.ndarray):
 
         self._requested_trange = value
 
+        with tracer.span('clip', variable=f"{self.plot_config.class_name}.{self.plot_config.subclass_name}") as span, \
+                metrics.timed(self.plot_config.data_type, 'clip'):
+            self._clip_to_requested_trange(value)
+            records = len(self._clipped_data) if self._clipped_data is not None else 0
+            span.set(records=records)
+        metrics.count(self.plot_config.data_type, 'clip_records', records)
+
+    def _clip_to_requested_trange(self, value):
+        """Store the data, datetime_array and time clipped to value (called by the requested_trange setter)"""
         # 🚀 PERFORMANCE FIX: Clip ONCE when trange is set, not on every property access
-        from .print_manager import print_manager
         print_manager.debug(f"⚡ [CLIP_ONCE] Clipping data ONCE for trange: {value}")
 
         # Debug: Check sizes before clipping
@@ -251,6 +261,16 @@ class plot_manager(np.ndarray):
         print_manager.custom_debug(f"[CLIP]   Raw data size: {len(raw_data)}")
         print_manager.custom_debug(f"[CLIP]   datetime_array size: {len(self.plot_config.datetime_array) if self.plot_config.datetime_array is not None else 0}")
 
+        # Sorted datetime64 axis: clip with a binary search and keep views into the full arrays
+        time_slice = self._sorted_trange_slice(self.plot_config.datetime_array, value)
+        if time_slice is not None and len(raw_data) == len(self.plot_config.datetime_array):
+            self._clipped_data = raw_data[time_slice]
+            self._clipped_datetime_array = self.plot_config.datetime_array[time_slice]
+            time_array = self.plot_config.time
+            self._clipped_time = time_array[time_slice] if time_array is not None and len(time_array) == len(raw_data) else None
+            print_manager.custom_debug(f"[CLIP]   Sliced (zero-copy) to {len(self._clipped_data)} points")
+            return
+
         # Perform clipping once and store results
         self._clipped_data = self.clip_to_original_trange(raw_data, value)
         print_manager.custom_debug(f"[CLIP]   Clipped data size: {len(self._clipped_data) if self._clipped_data is not None else 0}")
@@ -297,6 +317,26 @@ class plot_manager(np.ndarray):
         """Return all the unclipped numpy array data for internal use"""
         return np.array(self)
     
+    @staticmethod
+    def _sorted_trange_slice(datetime_array, original_trange):
+        """Slice selecting original_trange from a sorted datetime64 array, or None if not applicable."""
+        from dateutil.parser import parse
+
+        if datetime_array is None or not np.issubdtype(np.asarray(datetime_array).dtype, np.datetime64):
+            return None
+        times = datetime_array[:, 0] if datetime_array.ndim == 2 else datetime_array
+        if times.ndim != 1 or len(times) == 0:
+            return None
+        times_ns = times.astype('datetime64[ns]', copy=False).view(np.int64)
+        if np.any(times_ns[1:] < times_ns[:-1]):
+            return None  # Unsorted: fall back to the boolean mask
+
+        # Same semantics as the mask path: naive datetime64 is UTC, bounds are inclusive
+        start_time = np.datetime64(parse(original_trange[0]).replace(tzinfo=None), 'ns').view(np.int64)
+        end_time = np.datetime64(parse(original_trange[1]).replace(tzinfo=None), 'ns').view(np.int64)
+        return slice(np.searchsorted(times_ns, start_time, side='left'),
+                     np.searchsorted(times_ns, end_time, side='right'))
+
     def _clip_datetime_array(self, datetime_array, original_trange):
         """Helper method to clip datetime array without circular dependency"""
         from dateutil.parser import parse
@@ -619,6 +659,15 @@ class plot_manager(np.ndarray):
         self._plot_state['line_style'] = value
         self.plot_config.line_style = value
         
+    @property
+    def decimate(self):
+        return getattr(self.plot_config, 'decimate', True)
+
+    @decimate.setter
+    def decimate(self, value):
+        self._plot_state['decimate'] = value
+        self.plot_config.decimate = value
+        
     @property
     def colormap(self):
         return self.plot_config.colormap
@@ -120,6 +120,10 @@ class plot_manager(np.ndarray):
     @line_style.setter
     def line_style(self, value: Optional[Union[str, List[str]]]) -> None: ...
     @property
+    def decimate(self) -> bool: ...
+    @decimate.setter
+    def decimate(self, value: bool) -> None: ...
+    @property
     def colormap(self) -> Optional[str]: ...
     @colormap.setter
     def colormap(self, value: Optional[str]) -> None: ...
@@ -13,6 +13,10 @@ import threading
 import webbrowser
 from .print_manager import print_manager
 from .vdyes import vdyes
+from .decimation import decimate_line, decimate_spectrogram
+
+# Plotly figures are sized by the browser; decimate for a wide screen so zooming still shows detail
+DASH_PIXEL_WIDTH = 2000
 
 def create_spectral_heatmap(fig, var, axis_num):
     """
@@ -43,6 +47,9 @@ def create_spectral_heatmap(fig, var, axis_num):
         else:
             x_data = np.arange(z_data.shape[0])
         
+        # Average down to the browser's resolution before serialising to JSON
+        x_data, z_data, _ = decimate_spectrogram(x_data, z_data, DASH_PIXEL_WIDTH, var=var)
+        
         # Get y-axis coordinates (e.g., pitch angles, energies)
         # FIX: Use indices for heatmap, store actual values for labels
         y_indices = np.arange(z_data.shape[1])  # Always use indices 0, 1, 2, 3...
@@ -306,6 +313,9 @@ def create_dash_app(plot_vars, trange):
                     else:
                         times = np.arange(len(var.data))
                     
+                    # LTTB keeps the trace small enough for the browser to stay responsive
+                    times, y_values = decimate_line(times, np.asarray(var.data), DASH_PIXEL_WIDTH, method='lttb', var=var)
+                    
                     # Get variable name for legend with proper formatting
                     var_name = getattr(var, 'y_label', getattr(var, 'subclass_name', 'Variable'))
                     
@@ -325,7 +335,7 @@ def create_dash_app(plot_vars, trange):
                     # Create trace
                     trace = go.Scatter(
                         x=times,
-                        y=var.data,
+                        y=y_values,
                         mode='lines',
                         name=var_name,
                         line=dict(color=colors[color_index % len(colors)], width=1),
@@ -13,54 +13,10 @@ import webbrowser
 import time
 from scipy.spatial import Delaunay
 from .print_manager import print_manager
+from .vdf_processing import process_vdf_cdf
 
-# Numba optimization for C++ speed
-try:
-    import numba
-    from numba import jit
-    NUMBA_AVAILABLE = True
-    print_manager.status("🚀 Numba available - VDF processing will be optimized!")
-except ImportError:
-    NUMBA_AVAILABLE = False
-    print_manager.status("⚠️ Numba not available - using standard Python")
-
-# Import proven VDF processing functions
-import sys
-import os
-
-# Try to import VDF processing functions
-VDF_FUNCTIONS_AVAILABLE = False
-
-# Define placeholder functions first with proper type hints
-def extract_and_process_vdf_timeslice_EXACT(*args, **kwargs):
-    """Placeholder function that raises ImportError."""
-    if not VDF_FUNCTIONS_AVAILABLE:  # This will always be False initially
-        raise ImportError("VDF processing functions not available")
-    return {}  # Dummy return to satisfy type checker
-
-def jaye_exact_theta_plane_processing(*args, **kwargs):
-    """Placeholder function that raises ImportError."""
-    if not VDF_FUNCTIONS_AVAILABLE:
-        raise ImportError("VDF processing functions not available")
-    return None, None, None  # Dummy return to satisfy type checker
-    
-def jaye_exact_phi_plane_processing(*args, **kwargs):
-    """Placeholder function that raises ImportError."""  
-    if not VDF_FUNCTIONS_AVAILABLE:
-        raise ImportError("VDF processing functions not available")
-    return None, None, None  # Dummy return to satisfy type checker
-
-try:
-    sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'tests'))
-    from test_VDF_smart_bounds_debug import (  # type: ignore
-        extract_and_process_vdf_timeslice_EXACT,
-        jaye_exact_theta_plane_processing,
-        jaye_exact_phi_plane_processing
-    )
-    VDF_FUNCTIONS_AVAILABLE = True
-except ImportError:
-    print_manager.warning("Could not import VDF processing functions from tests")
-    VDF_FUNCTIONS_AVAILABLE = False
+# Kept for callers that check it; processing now lives in plotbot.vdf_processing
+VDF_FUNCTIONS_AVAILABLE = True
 
 def create_vdf_dash_app(dat, available_times, available_indices, trange):
     """
@@ -88,49 +44,27 @@ def create_vdf_dash_app(dat, available_times, available_indices, trange):
     # Get VDF parameters from global instance for defaults
     from plotbot.data_classes.psp_span_vdf import psp_span_vdf
     
-    print_manager.status("🚀 Using smart on-demand computation for instant startup...")
-    
-    # Apply Numba optimization if available (use object mode for CDF compatibility)
-    if NUMBA_AVAILABLE:
-        try:
-            # Use object mode (not nopython) for CDF compatibility
-            extract_and_process_vdf_timeslice_EXACT_jit = jit(extract_and_process_vdf_timeslice_EXACT, forceobj=True)
-            jaye_exact_theta_plane_processing_jit = jit(jaye_exact_theta_plane_processing, forceobj=True) 
-            jaye_exact_phi_plane_processing_jit = jit(jaye_exact_phi_plane_processing, forceobj=True)
-            print_manager.status("✅ VDF functions compiled with Numba JIT (object mode)!")
-        except Exception as e:
-            print_manager.status(f"⚠️ Numba compilation failed, using standard functions")
-            extract_and_process_vdf_timeslice_EXACT_jit = extract_and_process_vdf_timeslice_EXACT
-            jaye_exact_theta_plane_processing_jit = jaye_exact_theta_plane_processing
-            jaye_exact_phi_plane_processing_jit = jaye_exact_phi_plane_processing
-    else:
-        extract_and_process_vdf_timeslice_EXACT_jit = extract_and_process_vdf_timeslice_EXACT
-        jaye_exact_theta_plane_processing_jit = jaye_exact_theta_plane_processing
-        jaye_exact_phi_plane_processing_jit = jaye_exact_phi_plane_processing
-    
-    # SMART CACHING: Only compute first slice + cache on-demand
+    # Process every available slice in one batched pass; the cache then only holds views into it
+    start_time = time.time()
+    vdf_slices = process_vdf_cdf(dat, available_indices)
     vdf_data_cache = {}
-    print_manager.status("⚡ Pre-computing ONLY first time slice for instant startup...")
     
-    # Pre-compute just the first time slice for immediate display using fast processing
-    start_time = time.time()
-    print("🔍 DEBUG: About to call fast_vdf_processing...")
-    vdf_data, theta_data, phi_data = fast_vdf_processing(dat, available_indices[0])
-    print(f"🔍 DEBUG: VDF processing complete. Theta shape: {theta_data[2].shape}, Phi shape: {phi_data[2].shape}")  # type: ignore
-    
-    vdf_data_cache[0] = {
-        'vdf_data': vdf_data,
-        'theta': theta_data,
-        'phi': phi_data,
-        'time': available_times[0]
-    }
+    def cached_slice(time_index):
+        if time_index not in vdf_data_cache:
+            vdf_data, theta_data, phi_data = vdf_slices.timeslice(time_index)
+            vdf_data_cache[time_index] = {
+                'vdf_data': vdf_data,
+                'theta': theta_data,
+                'phi': phi_data,
+                'time': available_times[time_index]
+            }
+        return vdf_data_cache[time_index]
     
     elapsed = time.time() - start_time
-    print_manager.status(f"✅ First VDF slice computed in {elapsed:.2f}s - ready for instant startup!")
-    print_manager.status("💡 Additional slices will be computed on-demand when you move the slider")
+    print_manager.status(f"✅ {len(vdf_slices)} VDF slices computed in {elapsed:.2f}s")
     
     # Create initial VDF plot using first cached slice with new Mesh3d approach
-    initial_fig = create_vdf_plotly_figure_mesh3d(vdf_data_cache[0], 'mesh3d')
+    initial_fig = create_vdf_plotly_figure_mesh3d(cached_slice(0), 'mesh3d')
     
     # Define app layout
     app.layout = html.Div([
@@ -347,35 +281,8 @@ def create_vdf_dash_app(dat, available_times, available_indices, trange):
             if time_index < 0 or time_index >= len(available_times):
                 time_index = 0
             
-            # Smart caching: compute on-demand if not cached
-            if time_index not in vdf_data_cache:
-                print_manager.status(f"⚡ Computing VDF for time slice {time_index}...")
-                start_time = time.time()
-                
-                try:
-                    vdf_data, theta_data, phi_data = fast_vdf_processing(dat, available_indices[time_index])
-                    
-                    vdf_data_cache[time_index] = {
-                        'vdf_data': vdf_data,
-                        'theta': theta_data,
-                        'phi': phi_data,
-                        'time': available_times[time_index]
-                    }
-                    
-                    elapsed = time.time() - start_time
-                    print_manager.status(f"✅ VDF slice {time_index} computed in {elapsed:.3f}s")
-                    
-                except Exception as e:
-                    error_msg = f"❌ Failed to compute VDF slice {time_index}: {e}"
-                    print_manager.error(error_msg)
-                    print(f"ERROR in VDF processing: {e}")
-                    import traceback
-                    traceback.print_exc()
-                    # Use first cached slice as fallback
-                    time_index = 0
-            
             # Create updated figure using new Mesh3d approach
-            fig = create_vdf_plotly_figure_mesh3d(vdf_data_cache[time_index], viz_mode)
+            fig = create_vdf_plotly_figure_mesh3d(cached_slice(time_index), viz_mode)
             
             # Update time display
             current_time = available_times[time_index].strftime("%Y-%m-%d %H:%M:%S")
@@ -459,13 +366,8 @@ def create_vdf_plotly_figure(dat, available_indices, time_index, selected_time):
     # Get the actual CDF index for this time slice
     actual_cdf_index = available_indices[time_index]
     
-    # Process VDF data using proven functions (same as vdyes())
-    if not VDF_FUNCTIONS_AVAILABLE:
-        raise ImportError("VDF processing functions not available - cannot create VDF plot")
-    
-    vdf_data = extract_and_process_vdf_timeslice_EXACT(dat, actual_cdf_index)
-    vx_theta, vz_theta, df_theta = jaye_exact_theta_plane_processing(vdf_data)
-    vx_phi, vy_phi, df_phi = jaye_exact_phi_plane_processing(vdf_data)
+    # Process VDF data (same processing as vdyes())
+    vdf_data, (vx_theta, vz_theta, df_theta), (vx_phi, vy_phi, df_phi) = process_vdf_cdf(dat, [actual_cdf_index]).timeslice(0)
     
     # Create subplot structure
     fig = make_subplots(
@@ -545,25 +447,11 @@ def test_vdf_imports():
     return VDF_FUNCTIONS_AVAILABLE
 
 def fast_vdf_processing(dat, time_idx):
-    """Ultra-fast VDF processing using imported functions."""
-    if not VDF_FUNCTIONS_AVAILABLE:
-        raise ImportError("VDF processing functions not available")
-        
-    try:
-        # Use pre-imported functions
-        start_time = time.time()
-        vdf_data = extract_and_process_vdf_timeslice_EXACT(dat, time_idx)
-        vx_theta, vz_theta, df_theta = jaye_exact_theta_plane_processing(vdf_data)
-        vx_phi, vy_phi, df_phi = jaye_exact_phi_plane_processing(vdf_data)
-        
-        elapsed = time.time() - start_time
-        print(f"VDF processing: {elapsed:.3f}s")
-        
-        return vdf_data, (vx_theta, vz_theta, df_theta), (vx_phi, vy_phi, df_phi)
-        
-    except Exception as e:
-        print(f"VDF processing failed: {e}")
-        raise
+    """VDF processing for one CDF record: (vdf_data, theta plane, phi plane)."""
+    start_time = time.time()
+    result = process_vdf_cdf(dat, [time_idx]).timeslice(0)
+    print(f"VDF processing: {time.time() - start_time:.3f}s")
+    return result
 
 def create_vdf_plotly_figure_cached(cached_data, viz_mode='interpolate'):
     """
@@ -14,7 +14,6 @@ from .multiplot_options import plt  # Import our enhanced plt with options
 import cdflib
 import os
 import warnings
-from scipy import interpolate
 #-----Plotbot Helper Functions-----\
 
 def time_clip(datetime_array, start_time, end_time):
@@ -135,6 +134,7 @@ def parse_axis_spec(spec):
     return num, is_right
     
 def resample(data, times, new_times): #Currently unused
+    from scipy import interpolate  # Imported on use: scipy.interpolate adds ~0.4s to import plotbot
     ###interpolate data to times from data2
     interpol_f = interpolate.interp1d(times, data,fill_value="extrapolate")
     new_data1 = interpol_f(new_times)    
@@ -171,6 +171,7 @@ def debug_plot_variable(var, request, print_manager):
 
 #FITS Code Functions (currently unused)
 def resample(data, times, new_times):
+    from scipy import interpolate  # Imported on use: scipy.interpolate adds ~0.4s to import plotbot
     ###interpolate data to times from data2
     interpol_f = interpolate.interp1d(times, data,fill_value="extrapolate")
     new_data1 = interpol_f(new_times)    
@@ -1,20 +1,8 @@
 #plotbot_main.py
 
 import time as timer
-from functools import wraps
-
-def timer_decorator(timer_name):
-    def decorator(func):
-        @wraps(func)
-        def wrapper(*args, **kwargs):
-            start_time = timer.perf_counter()
-            result = func(*args, **kwargs)
-            end_time = timer.perf_counter()
-            duration_ms = (end_time - start_time) * 1000
-            print_manager.speed_test(f"⏱️ [{timer_name}] {func.__name__}: {duration_ms:.2f}ms")
-            return result
-        return wrapper
-    return decorator
+
+from .tracing import tracer, timer_decorator # Spans (and speed_test timings) for decorated functions
 
 print("\nImporting libraries, this may take a moment. Hold tight... \n")
 
@@ -69,14 +57,11 @@ from .multiplot_options import plt, MultiplotOptions
 from .get_data import get_data  # Add get_data import
 
 from .data_classes.data_types import data_types
-from . import mag_rtn_4sa, mag_rtn, mag_sc_4sa, mag_sc
-from .data_classes.psp_electron_classes import epad, epad_hr
-from .data_classes.psp_proton import proton
-from .data_classes.psp_proton_hr import proton_hr
-from .data_classes.psp_qtn_classes import psp_qtn
 from .get_encounter import get_encounter_number
 from .time_utils import get_needed_6hour_blocks, daterange
 from .plotbot_helpers import time_clip, parse_axis_spec, resample, debug_plot_variable
+from .summary_pyramid import pyramid_cache, envelope_xy
+from .decimation import decimate_line, decimate_spectrogram, axes_pixel_width
 
 #====================================================================
 # FUNCTION: plotbot - Core plotting function for time series data
@@ -443,6 +428,7 @@ def plotbot(trange, *args):
     # PLOT VARIABLES ON APPROPRIATE AXES
     #====================================================================
     timer_start = timer.perf_counter()
+    render_span = tracer.start_span('render', panels=num_subplots)
     if args and hasattr(args[0], 'data_type'):
         if args[0].data_type == 'mag_RTN_4sa':
             print_manager.speed_test(f'[TIMER_MAG_6] Plotting section: {(timer.perf_counter() - timer_entry)*1000:.2f}ms')
@@ -530,10 +516,15 @@ def plotbot(trange, *args):
                     if not empty_plot:
                         # Use raw datetime array for clipping to match time_indices calculation
                         datetime_clipped = raw_datetime_array[time_indices]  # Get timestamps within range
+
+                        # Long ranges: draw the min/max envelope from the summary pyramid when one pixel spans more than the native cadence
+                        summary = pyramid_cache.reduce_for_plot(var, raw_datetime_array, plot_start_time, plot_end_time, plot_ax.bbox.width)
+                        if summary is not None:
+                            datetime_clipped, data_envelope = envelope_xy(*summary)
                         
                         # Handle scalar quantities (single line)
                         if data.ndim == 1:
-                            data_clipped = data[time_indices]  # Slice data for time range
+                            data_clipped = data_envelope if summary is not None else data[time_indices]  # Slice data for time range
                             print_manager.status(f"🔍 DATA_CLIP_DEBUG for {var.class_name}.{var.subclass_name}:")
                             print_manager.status(f"   data.shape={data.shape}, time_indices.shape={time_indices.shape}")
                             print_manager.status(f"   data_clipped.shape={data_clipped.shape}, has_nans={np.isnan(data_clipped).any()}, all_nans={np.all(np.isnan(data_clipped))}")
@@ -541,6 +532,8 @@ def plotbot(trange, *args):
                                 empty_plot = True
                                 print_manager.status(f"❌ SKIPPING PLOT - All {len(data_clipped)} data points are NaN for {var.class_name}.{var.subclass_name}")
                                 continue
+                            if summary is None:  # Keep only the points that can be seen at this width (M4)
+                                datetime_clipped, data_clipped = decimate_line(datetime_clipped, data_clipped, axes_pixel_width(plot_ax), var=var)
                                 
                             line, = plot_ax.plot(  # Create single line plot
                                 datetime_clipped,
@@ -554,7 +547,9 @@ def plotbot(trange, *args):
                             legend_labels.append(var.legend_label)  # Store label for legend
                             
                         else:  # Handle vector quantities (e.g., 3D magnetic field)
-                            data_clipped = data[:,time_indices]  # Slice data for time range
+                            data_clipped = data_envelope if summary is not None else data[:,time_indices]  # Slice data for time range
+                            if summary is None:  # Shared M4 indices keep all components on one time axis
+                                datetime_clipped, data_clipped = decimate_line(datetime_clipped, data_clipped, axes_pixel_width(plot_ax), var=var)
                             
                             for i in range(data_clipped.shape[0]):  # Plot each vector component
                                 if np.all(np.isnan(data_clipped[i])):  # Skip components that are all NaN
@@ -688,6 +683,10 @@ def plotbot(trange, *args):
                         else:
                             additional_data_clipped = None
 
+                        # Average down to one time column per pixel before pcolormesh
+                        datetime_clipped, data_clipped, additional_data_clipped = decimate_spectrogram(
+                            datetime_clipped, data_clipped, axes_pixel_width(ax), additional_data_clipped, var=var)
+
                         ax.set_ylabel(var.y_label)  # Set y-axis properties
                         ax.set_yscale(var.y_scale)
                         if var.y_limit:
@@ -833,6 +832,7 @@ def plotbot(trange, *args):
         print_manager.warning(f"Could not parse date from trange[0] ('{trange[0]}') for annotation: {e}")
 
     timer_end = timer.perf_counter()
+    render_span.end()
     duration_ms = (timer_end - timer_start) * 1000
     print_manager.speed_test(f"[TIMER_PLOTTING] Plotting section: {duration_ms:.2f}ms")
     
@@ -883,7 +883,8 @@ def plotbot(trange, *args):
     
     # Handle figure display and return based on ploptions
     if ploptions.display_figure:
-        plt.show()                                                # Display the complete figure
+        with tracer.span('show'):
+            plt.show()                                            # Display the complete figure
     
     if ploptions.return_figure:
         return fig                                                # Return figure object
@@ -0,0 +1,302 @@
+#plotbot/prefetch.py
+"""
+Bulk prefetch of the data files for a time range, ahead of the plotting.
+
+    plotbot.prefetch(['2020-01-26', '2020-02-04'], ['mag_RTN', 'spi_sf00_l3_mom', 'spe_sf0_pad'], workers=8)
+
+get_data only downloads what a call needs when it needs it, so a batch job on
+a node without internet fails part way through and interactive sessions stall
+on the first access to each day. prefetch() works out every file the data
+types need for the whole range (daily or 6-hour files, from the data_types.py
+entries), checks them against the local file index, and downloads only the
+missing ones before anything is plotted:
+
+- Berkeley files are looked up once per remote directory (listing cache),
+  sized with HEAD requests and downloaded concurrently by download_engine,
+  optionally under a bandwidth cap. The total size and an ETA are printed.
+- SPDF files go through pyspedas (one call per data type covering the missing
+  dates), as download_spdf_data does; in 'dynamic' mode anything SPDF could
+  not provide falls back to Berkeley.
+
+The data source follows config.data_server the same way get_data does. With
+build_caches=True every data type is then loaded once with get_data, so its
+on-disk caches (FITS sidecars, summary pyramids, CDF metadata) are built and
+later sessions run from local storage alone.
+"""
+import os
+import time
+from datetime import timezone, timedelta
+from concurrent.futures import ThreadPoolExecutor
+
+from dateutil.parser import parse
+
+from .print_manager import print_manager
+from .config import config
+from .time_utils import daterange, get_needed_6hour_blocks
+from .data_classes.data_types import data_types, get_data_type_config, get_local_path
+from .local_file_index import local_file_index
+
+DOWNLOAD_SOURCES = ('berkeley', 'spdf')
+CUBBY_KEYS = {'spe_sf0_pad': 'epad', 'spe_af0_pad': 'epad_hr', 'psp_orbit_data': 'psp_orbit'}  # As in get_data
+
+def _format_bytes(n_bytes):
+    for unit in ('B', 'KB', 'MB', 'GB'):
+        if n_bytes < 1024 or unit == 'GB':
+            return f"{n_bytes:.1f} {unit}" if unit != 'B' else f"{int(n_bytes)} B"
+        n_bytes /= 1024.0
+
+def _format_duration(seconds):
+    seconds = int(round(seconds))
+    hours, rest = divmod(seconds, 3600)
+    return f"{hours}h{rest // 60:02d}m" if hours else f"{rest // 60}m{rest % 60:02d}s"
+
+def _parse_trange(trange):
+    """UTC start/end as download_berkeley_data reads them (a midnight end excludes that day)."""
+    start_time = parse(trange[0].replace('/', ' ')).replace(tzinfo=timezone.utc)
+    end_time = parse(trange[1].replace('/', ' ')).replace(tzinfo=timezone.utc)
+    if end_time == end_time.replace(hour=0, minute=0, second=0, microsecond=0):
+        end_time -= timedelta(microseconds=1)
+    return start_time, end_time
+
+def _source_for(data_type_config, server_mode):
+    """Server get_data would use first for a data type, or None if it is not downloaded."""
+    sources = [s for s in data_type_config.get('data_sources', []) if s in DOWNLOAD_SOURCES]
+    if not sources:
+        return None
+    if server_mode in ('berkeley', 'berkley'):
+        return 'berkeley' if 'berkeley' in sources else None
+    if server_mode in ('spdf', 'dynamic'):
+        return 'spdf' if 'spdf' in sources else ('berkeley' if server_mode == 'dynamic' else None)
+    return 'berkeley' if 'berkeley' in sources else None  # get_data defaults to Berkeley
+
+def _file_slots(data_type_config, start_time, end_time):
+    """date_info dicts (as download_berkeley_data builds them) for every file covering the range."""
+    if data_type_config['file_time_format'] == '6-hour':
+        for block_date, block in get_needed_6hour_blocks(start_time, end_time):
+            yield {'date_str': block_date.strftime('%Y%m%d'), 'is_hourly': True,
+                   'hour_str': f"{block * 6:02d}", 'year': block_date.year, 'month': block_date.month}
+    elif data_type_config['file_time_format'] == 'daily':
+        for single_date in daterange(start_time.date(), end_time.date()):
+            yield {'date_str': single_date.strftime('%Y%m%d'), 'is_hourly': False,
+                   'hour_str': None, 'year': single_date.year, 'month': single_date.month}
+
+def _slot_format_args(data_type_config, date_info):
+    if date_info['is_hourly']:
+        return {'data_level': data_type_config['data_level'],
+                'date_hour_str': date_info['date_str'] + date_info['hour_str']}
+    return {'data_level': data_type_config['data_level'], 'date_str': date_info['date_str']}
+
+#====================================================================
+# FUNCTION: plan_prefetch, Expand data types into a file manifest
+#====================================================================
+def plan_prefetch(trange, data_type_keys, server_mode=None):
+    """
+    File manifest for the data types over trange, checked against local storage.
+
+    Args:
+        trange (list): Time range [start, end].
+        data_type_keys (list): Keys of data_types.py (case-insensitive).
+        server_mode (str, optional): 'dynamic', 'spdf' or 'berkeley'; defaults to config.data_server.
+
+    Returns:
+        list: One dict per distinct file with keys data_type, source, date_info,
+        local_dir, local_pattern, local_files (already on disk) and status
+        ('local' or 'missing'). Data types sharing files (e.g. spi_sf00_8dx32ex8a
+        and psp_span_vdf) appear once.
+    """
+    server_mode = (server_mode or config.data_server).lower()
+    start_time, end_time = _parse_trange(trange)
+    manifest = []
+    seen = set()
+    for key in data_type_keys:
+        data_type_config = get_data_type_config(key)
+        if data_type_config is None:
+            print_manager.warning(f"prefetch: data type {key} is not recognized, skipping")
+            continue
+        data_type = next(name for name, entry in data_types.items() if entry is data_type_config)
+        source = _source_for(data_type_config, server_mode)
+        if source is None or 'local_path' not in data_type_config or 'file_pattern_import' not in data_type_config:
+            print_manager.status(f"prefetch: {data_type} is not downloaded from a server, skipping")
+            continue
+        base_path = get_local_path(data_type).format(data_level=data_type_config['data_level'])
+        for date_info in _file_slots(data_type_config, start_time, end_time):
+            local_dir = os.path.join(base_path, str(date_info['year']))
+            local_pattern = data_type_config['file_pattern_import'].format(**_slot_format_args(data_type_config, date_info))
+            identity = (os.path.abspath(local_dir), local_pattern.lower())
+            if identity in seen:
+                continue
+            seen.add(identity)
+            local_files = local_file_index.find(local_dir, local_pattern, latest_only=True)
+            manifest.append({'data_type': data_type, 'source': source, 'date_info': date_info,
+                             'local_dir': local_dir, 'local_pattern': local_pattern,
+                             'local_files': local_files, 'status': 'local' if local_files else 'missing'})
+    return manifest
+
+def _remote_sizes(session, urls, workers):
+    """Content-Length of each URL from HEAD requests (None where the server does not say)."""
+    def _head(url):
+        try:
+            response = session.head(url, allow_redirects=True, timeout=30)
+            length = response.headers.get('Content-Length')
+            return int(length) if response.status_code == 200 and length and length.isdigit() else None
+        except Exception as e:
+            print_manager.debug(f"HEAD {url} failed: {e}")
+            return None
+    if not urls:
+        return []
+    with ThreadPoolExecutor(max_workers=max(1, min(workers, len(urls)))) as pool:
+        return list(pool.map(_head, urls))
+
+def _prefetch_berkeley(items, workers, per_host, max_bytes_per_sec, dry_run):
+    """Resolve, size and download missing Berkeley files; updates each item's status."""
+    from .server_access import server_access
+    from .data_download_helpers import resolve_download, create_pattern_string
+    from .download_engine import download_files
+
+    by_password = {}
+    for item in items:
+        by_password.setdefault(data_types[item['data_type']]['password_type'], []).append(item)
+
+    # One password type at a time: the session holds a single set of credentials
+    for password_type, group in by_password.items():
+        server_access.password_type = password_type
+        jobs, job_items = [], []
+        for item in group:
+            data_type_config = data_types[item['data_type']]
+            date_info = item['date_info']
+            dir_url = (f"{data_type_config['url'].format(data_level=data_type_config['data_level'])}"
+                       f"{date_info['year']}/{date_info['month']:02d}/")
+            pattern_str = create_pattern_string(data_type_config['file_pattern'], data_type_config['data_level'], date_info)
+            job = resolve_download(dir_url, pattern_str, date_info,
+                                   get_local_path(item['data_type']).format(data_level=data_type_config['data_level']))
+            if job is None:
+                item['status'] = 'unavailable'
+                continue
+            item['url'], item['local_path'] = job
+            jobs.append(job)
+            job_items.append(item)
+        if not jobs:
+            continue
+
+        sizes = _remote_sizes(server_access.session, [url for url, _ in jobs], workers)
+        for item, size in zip(job_items, sizes):
+            item['size'] = size
+        total_bytes = sum(size or 0 for size in sizes)
+        estimate = f"{len(jobs)} Berkeley files, {_format_bytes(total_bytes)}"
+        if None in sizes:
+            estimate += f" (+{sizes.count(None)} of unknown size)"
+        if max_bytes_per_sec:
+            estimate += f", ETA {_format_duration(total_bytes / max_bytes_per_sec)} at {_format_bytes(max_bytes_per_sec)}/s"
+        print_manager.status(f"📦 prefetch: {estimate}")
+        if dry_run:
+            continue
+
+        start = time.perf_counter()
+        done = {'files': 0, 'bytes': 0}
+
+        def _progress(index, success):
+            done['files'] += 1
+            done['bytes'] += job_items[index].get('size') or 0
+            elapsed = time.perf_counter() - start
+            message = f"📥 prefetch: {done['files']}/{len(jobs)} files, {_format_bytes(done['bytes'])}/{_format_bytes(total_bytes)}"
+            if done['bytes'] and elapsed > 0 and done['bytes'] < total_bytes:
+                message += f", ETA {_format_duration((total_bytes - done['bytes']) * elapsed / done['bytes'])}"
+            print_manager.status(message)
+
+        results = download_files(server_access.session, jobs, workers=workers, per_host=per_host,
+                                 max_bytes_per_sec=max_bytes_per_sec, progress=_progress,
+                                 data_type=[item['data_type'] for item in job_items])
+        for item, success in zip(job_items, results):
+            item['status'] = 'downloaded' if success else 'failed'
+
+def _prefetch_spdf(items):
+    """Fetch missing SPDF files with one pyspedas call per data type; updates each item's status."""
+    from .data_download_pyspedas import SmartCheckResult, _download_missing_dates
+
+    by_type = {}
+    for item in items:
+        by_type.setdefault(item['data_type'], []).append(item)
+    for data_type, group in by_type.items():
+        missing_dates = sorted({item['date_info']['date_str'] for item in group})
+        print_manager.status(f"📦 prefetch: {len(group)} {data_type} files from SPDF ({len(missing_dates)} days)")
+        try:
+            _download_missing_dates(data_type, SmartCheckResult(found_files=[], missing_dates=missing_dates, all_present=False))
+        except Exception as e:
+            print_manager.warning(f"prefetch: SPDF download for {data_type} failed: {e}")
+        for item in group:
+            found = local_file_index.find(item['local_dir'], item['local_pattern'], latest_only=True)
+            if found:
+                item['local_files'] = found
+            item['status'] = 'downloaded' if found else 'failed'
+
+#====================================================================
+# FUNCTION: prefetch, Download everything a time range needs up front
+#====================================================================
+def prefetch(trange, data_types_to_fetch, workers=None, per_host=None, max_bytes_per_sec=None,
+             dry_run=False, build_caches=False):
+    """
+    Download every missing data file the data types need for trange, in parallel.
+
+    Args:
+        trange (list): Time range [start, end], e.g. an encounter.
+        data_types_to_fetch (list or str): data_types.py keys (e.g. 'mag_RTN', 'spi_sf00_l3_mom').
+        workers (int, optional): Concurrent Berkeley transfers; defaults to config.download_workers.
+        per_host (int, optional): Concurrent transfers per host; defaults to config.download_per_host.
+        max_bytes_per_sec (float, optional): Combined bandwidth cap for the Berkeley downloads.
+        dry_run (bool): Only plan and print the size estimate; download nothing.
+        build_caches (bool): Afterwards load each data type once with get_data to build its caches.
+
+    Returns:
+        list: The manifest from plan_prefetch, each status now 'local', 'downloaded',
+        'failed', 'unavailable' (not on the server) or 'missing' (dry run).
+    """
+    if isinstance(data_types_to_fetch, str):
+        data_types_to_fetch = [data_types_to_fetch]
+    workers = workers or config.download_workers
+    per_host = per_host or config.download_per_host
+    server_mode = config.data_server.lower()
+
+    batch_start = time.perf_counter()
+    manifest = plan_prefetch(trange, data_types_to_fetch, server_mode)
+    missing = [item for item in manifest if item['status'] == 'missing']
+    print_manager.status(f"🗂️ prefetch: {len(manifest)} files needed, {len(manifest) - len(missing)} already local, "
+                         f"{len(missing)} to fetch")
+
+    spdf_items = [item for item in missing if item['source'] == 'spdf']
+    if spdf_items:
+        if dry_run:
+            print_manager.status(f"📦 prefetch: {len(spdf_items)} files from SPDF (size unknown until pyspedas fetches them)")
+        else:
+            _prefetch_spdf(spdf_items)
+            if server_mode == 'dynamic':
+                # As get_data does, anything SPDF could not provide comes from Berkeley
+                for item in spdf_items:
+                    if item['status'] == 'failed' and 'berkeley' in data_types[item['data_type']].get('data_sources', []):
+                        item['source'] = 'berkeley'
+                        item['status'] = 'missing'
+
+    berkeley_items = [item for item in missing if item['source'] == 'berkeley' and item['status'] == 'missing']
+    if berkeley_items:
+        _prefetch_berkeley(berkeley_items, workers, per_host, max_bytes_per_sec, dry_run)
+
+    if build_caches and not dry_run:
+        from .data_cubby import data_cubby
+        from .get_data import get_data
+        from .summary_pyramid import pyramid_cache
+        for data_type in dict.fromkeys(item['data_type'] for item in manifest):
+            instance = data_cubby.grab(CUBBY_KEYS.get(data_type, data_type.lower()))
+            if instance is None:
+                print_manager.warning(f"prefetch: no data class registered for {data_type}, caches not built")
+                continue
+            print_manager.status(f"🧱 prefetch: loading {data_type} to build its caches")
+            get_data(trange, instance)
+            pyramid_cache.build_for_instance(data_type, instance)  # Otherwise built on the first long-range plot
+
+    counts = {}
+    for item in manifest:
+        counts[item['status']] = counts.get(item['status'], 0) + 1
+    summary = ', '.join(f"{n} {status}" for status, n in sorted(counts.items()))
+    print_manager.status(f"✅ prefetch: {summary} in {time.perf_counter() - batch_start:.1f}s")
+    return manifest
+
+__all__ = ['prefetch', 'plan_prefetch']
@@ -14,6 +14,7 @@ from .data_cubby import data_cubby
 from .get_data import get_data
 from .print_manager import print_manager as global_pm
 from .get_encounter import get_encounter_number
+from .hole_catalogue import load_hole_catalogue, times_in_intervals
 
 # Placeholder for print_manager if it's not readily available as a module import
 # This is a common pattern if print_manager is instantiated elsewhere.
@@ -135,6 +136,7 @@ def _plot_single_hodogram_panel(
     y_data_req,
     marker_filepath: str,
     pm, # Pass print_manager instance
+    hole_catalogue=None, # HoleCatalogue or .npz path; used instead of marker_filepath when given
     # Optional kwargs for customization, get with defaults
     title: str = "Hodogram Panel", # Default title for a panel
     x_label: str = None, 
@@ -163,11 +165,22 @@ def _plot_single_hodogram_panel(
         pm.error(f"Panel: Could not parse trange_plot: {trange_plot}. Error: {e}")
         return False
 
-    # 2. Load Marker Data
-    hole_intervals = _parse_marker_file(marker_filepath, pm)
-    if not hole_intervals:
-        pm.error(f"Panel: Failed for marker file {marker_filepath}")
-        return False # Error already printed by _parse_marker_file
+    # 2. Load Hole Intervals (catalogue, or the marker file export)
+    if hole_catalogue is not None:
+        try:
+            catalogue = load_hole_catalogue(hole_catalogue)
+        except Exception as e:
+            pm.error(f"Panel: Could not load hole catalogue {hole_catalogue}: {e}")
+            return False
+        hole_starts, hole_ends = catalogue.intervals()
+        pm.status(f"Panel: {len(catalogue.between(plot_start_time, plot_end_time))} catalogue holes in plot range.")
+    else:
+        hole_intervals = _parse_marker_file(marker_filepath, pm)
+        if not hole_intervals:
+            pm.error(f"Panel: Failed for marker file {marker_filepath}")
+            return False # Error already printed by _parse_marker_file
+        hole_starts = np.array([start.replace(tzinfo=None) for start, _ in hole_intervals], dtype='datetime64[ns]')
+        hole_ends = np.array([end.replace(tzinfo=None) for _, end in hole_intervals], dtype='datetime64[ns]')
 
     # 3. Load X and Y Data using get_data (or assume pre-loaded)
     required_data_objects = []
@@ -294,26 +307,19 @@ def _plot_single_hodogram_panel(
         return False
 
     # 6. Assign Colors & Sizes
-    colors_array = [outside_color] * len(common_times_for_coloring)
-    sizes_array = [outside_size] * len(common_times_for_coloring)
-    for i, current_pd_time in enumerate(common_times_for_coloring):
-        # Pandas Timestamps can be timezone-aware or naive.
-        # hole_intervals contain timezone-aware (UTC) datetimes.
-        # Comparison needs consistent awareness.
-        current_dt_time_utc = current_pd_time.tz_convert('UTC') if current_pd_time.tz is not None else current_pd_time.tz_localize('UTC')
-        
-        for hole_start, hole_end in hole_intervals:
-            # Ensure hole_start and hole_end are also UTC (should be from _parse_marker_file)
-            if hole_start <= current_dt_time_utc <= hole_end:
-                colors_array[i] = inside_color
-                sizes_array[i] = inside_size
-                break
-    num_inside = colors_array.count(inside_color)
+    # Hole intervals are naive UTC datetime64; bring the resampled index to the same
+    times_utc = pd.DatetimeIndex(common_times_for_coloring)
+    if times_utc.tz is not None:
+        times_utc = times_utc.tz_convert('UTC').tz_localize(None)
+    inside = times_in_intervals(times_utc.values, hole_starts, hole_ends)
+    num_inside = int(inside.sum())
     pm.status(f"Panel: {num_inside} points inside holes.")
 
     # 7. Plot Hodogram onto the provided 'ax'
     try:
-        ax.scatter(x_resampled, y_resampled, c=colors_array, s=sizes_array, alpha=alpha, edgecolors='none')
+        # One scatter per group, so a color may be a name or an RGB(A) tuple
+        ax.scatter(x_resampled[~inside], y_resampled[~inside], color=outside_color, s=outside_size, alpha=alpha, edgecolors='none')
+        ax.scatter(x_resampled[inside], y_resampled[inside], color=inside_color, s=inside_size, alpha=alpha, edgecolors='none')
 
         # Attempt to get labels from data object, fall back to subclass name
         final_x_label = x_label if x_label is not None else getattr(x_data_obj, 'legend_label', x_data_req.subclass_name)
@@ -325,7 +331,7 @@ def _plot_single_hodogram_panel(
 
         legend_elements = [
             Line2D([0], [0], marker='o', color='w', label=f'In ({num_inside})', markerfacecolor=inside_color, markersize=np.sqrt(inside_size)), # Shorter legend labels
-            Line2D([0], [0], marker='o', color='w', label=f'Out ({len(colors_array) - num_inside})', markerfacecolor=outside_color, markersize=np.sqrt(outside_size))
+            Line2D([0], [0], marker='o', color='w', label=f'Out ({len(inside) - num_inside})', markerfacecolor=outside_color, markersize=np.sqrt(outside_size))
         ]
         ax.legend(handles=legend_elements, loc='best', fontsize=base_fontsize - 1)
         ax.grid(True, linestyle=':', alpha=0.6)
@@ -344,6 +350,7 @@ def showda_holes(
     x_data_req=None,      # Now optional if panel_definitions is used
     y_data_req=None,      # Now optional if panel_definitions is used
     marker_filepath=None, # Now optional if panel_definitions is used
+    hole_catalogue=None,  # HoleCatalogue or .npz path, instead of marker_filepath
     panel_definitions: list = None, # New argument for multi-panel definitions
     main_title: str = None, # New argument for main figure title
     main_title_fontsize: int = None, # New: Specific fontsize for main title
@@ -353,13 +360,13 @@ def showda_holes(
 ):
     """
     Generates a hodogram (or a grid of hodograms) where points are colored 
-    based on magnetic hole intervals from marker file(s).
+    based on magnetic hole intervals from a hole catalogue or marker file(s).
 
     Can be called in two ways:
 
     1. Single Plot Mode:
-       Provide trange_plot, x_data_req, y_data_req, marker_filepath, and optional 
-       keyword arguments (title, labels, colors, sizes, alpha, figsize, base_fontsize).
+       Provide trange_plot, x_data_req, y_data_req, marker_filepath (or 
+       hole_catalogue), and optional keyword arguments (title, labels, colors, sizes, alpha, figsize, base_fontsize).
     
     2. Multi-Panel Mode:
        Provide trange_plot and panel_definitions. Ignore x_data_req, y_data_req, 
@@ -367,7 +374,8 @@ def showda_holes(
        dictionaries, where each dictionary defines a panel and must contain:
          - 'x_data': Data request object for the x-axis.
          - 'y_data': Data request object for the y-axis.
-         - 'marker_file': Path to the marker file for this panel.
+         - 'marker_file': Path to the marker file for this panel, or
+         - 'hole_catalogue': HoleCatalogue (or .npz path) for this panel.
        Each dictionary can optionally contain arguments like 'title', 'x_label', 
        'y_label', 'inside_color', etc., to override defaults for that specific panel.
        General kwargs passed to showda_holes (like figsize, base_fontsize) will 
@@ -378,6 +386,8 @@ def showda_holes(
         x_data_req: Data request object for x-axis (Single Plot Mode).
         y_data_req: Data request object for y-axis (Single Plot Mode).
         marker_filepath (str): Path to marker file (Single Plot Mode).
+        hole_catalogue (HoleCatalogue or str, optional): Hole catalogue (or its .npz
+            path) to take the hole intervals from instead of a marker file.
         panel_definitions (list, optional): List of dicts defining panels (Multi-Panel Mode).
         main_title (str, optional): Overrides the default main title (Encounter + Time Range).
         main_title_fontsize (int, optional): Specific font size for the main title. Defaults to base_fontsize + 4.
@@ -452,8 +462,9 @@ def showda_holes(
             pm.status(f"--- Processing Panel {i+1}/{num_panels} ---")
             
             # Check for required keys in panel definition
-            required_keys = ['x_data', 'y_data', 'marker_file']
-            if not all(key in panel_def for key in required_keys):
+            required_keys = ['x_data', 'y_data', 'marker_file or hole_catalogue']
+            has_holes = 'marker_file' in panel_def or 'hole_catalogue' in panel_def
+            if not (has_holes and 'x_data' in panel_def and 'y_data' in panel_def):
                 pm.error(f"Panel {i+1} definition is missing required keys: {required_keys}. Found: {list(panel_def.keys())}")
                 all_panels_success = False
                 ax.text(0.5, 0.5, f'Panel {i+1}\nConfig Error', ha='center', va='center', transform=ax.transAxes, color='red')
@@ -462,7 +473,8 @@ def showda_holes(
             # Extract data and customizations for this panel
             panel_x_req = panel_def['x_data']
             panel_y_req = panel_def['y_data']
-            panel_marker = panel_def['marker_file']
+            panel_marker = panel_def.get('marker_file')
+            panel_catalogue = panel_def.get('hole_catalogue')
             
             # Combine global kwargs with panel-specific kwargs (panel overrides global)
             panel_kwargs = kwargs.copy()
@@ -472,6 +484,7 @@ def showda_holes(
             panel_kwargs.pop('x_data', None)
             panel_kwargs.pop('y_data', None)
             panel_kwargs.pop('marker_file', None)
+            panel_kwargs.pop('hole_catalogue', None)
             
             # Call the helper to plot on this panel's axis
             success = _plot_single_hodogram_panel(
@@ -481,6 +494,7 @@ def showda_holes(
                 y_data_req=panel_y_req,
                 marker_filepath=panel_marker,
                 pm=pm,
+                hole_catalogue=panel_catalogue,
                 # Pass remaining relevant kwargs
                 title=panel_kwargs.get('title', f'Panel {i+1}'), # Default panel title
                 x_label=panel_kwargs.get('x_label', None),
@@ -513,8 +527,8 @@ def showda_holes(
         pm.status("🚀 Initiating single-panel showda_holes.")
         
         # Check if required arguments for single plot mode are provided
-        if x_data_req is None or y_data_req is None or marker_filepath is None:
-            pm.error("Single plot mode requires x_data_req, y_data_req, and marker_filepath arguments.")
+        if x_data_req is None or y_data_req is None or (marker_filepath is None and hole_catalogue is None):
+            pm.error("Single plot mode requires x_data_req, y_data_req, and marker_filepath (or hole_catalogue) arguments.")
             return None, None
             
         # Get figure settings from kwargs
@@ -538,6 +552,7 @@ def showda_holes(
             y_data_req=y_data_req,
             marker_filepath=marker_filepath,
             pm=pm,
+            hole_catalogue=hole_catalogue,
             # Pass all optional kwargs directly
             **kwargs 
         )
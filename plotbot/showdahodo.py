@@ -9,12 +9,10 @@ from .multiplot_options import plt  # Import our enhanced plt with options
 from .get_data import get_data  # Import get_data function
 
 from matplotlib.colors import Normalize
-from scipy import stats
 import matplotlib.dates as mdates
 import numpy as np
 from dateutil.parser import parse
 import pandas as pd
-import scipy.signal as signal
 import matplotlib.colors as colors
 from datetime import datetime, timezone, timedelta
 #%matplotlib notebook
@@ -485,6 +483,7 @@ def showdahodo(trange, var1, var2, var3 = None, color_var = None, norm_ = None,
         else:
             # Linear correlation
             if np.sum(valid_mask) > 1:
+                from scipy import stats  # Imported on use to keep import plotbot fast
                 correlation, p_value = stats.pearsonr(values1[valid_mask], values2[valid_mask])
                 # Calculate trend line
                 z = np.polyfit(values1[valid_mask], values2[valid_mask], 1)
@@ -0,0 +1,314 @@
+#plotbot/summary_pyramid.py
+"""
+Multi-resolution min/max/mean summaries ("pyramids") for long-range plotting.
+
+For data types listed in ``config.summary_pyramid_data_types`` a pyramid is
+built for a time-series variable the first time it is plotted over a long
+range, at the cadences in ``config.summary_pyramid_cadences`` (seconds); plain
+get_data calls and zoomed-in plots never pay for it. Each level stores,
+per time bin, the minimum, maximum, NaN-free sum and sample count, so the mean
+can be recovered and coarser levels are built from finer ones without touching
+the native data again.
+
+When a plot covers so much time that one pixel spans more than the native
+cadence, plotbot() asks the cache for the coarsest level that still has at
+least one bin per pixel and draws the min/max envelope of that level instead
+of every native sample. Zoomed-in plots fall back to native data automatically.
+
+Pyramids are persisted under ``<config.data_dir>/summary_pyramids/``, one
+file per variable that is replaced whenever the data changes. Each pyramid
+records a content digest of the times and values it summarises; a pyramid
+(in memory or on disk) is only used while the digest still matches, so a
+later session with the same data skips the build step.
+"""
+import os
+import hashlib
+import numpy as np
+
+from .print_manager import print_manager
+
+NS_PER_SECOND = 1_000_000_000
+CADENCE_ESTIMATE_SAMPLES = 10_000  # Leading samples used to guess the native cadence before building
+
+def content_digest(times, values):
+    """Hex digest of sample times (as ns) and values (as float64), shape included."""
+    times_ns = np.ascontiguousarray(np.asarray(times).astype('datetime64[ns]').astype(np.int64))
+    values = np.ascontiguousarray(values, dtype=np.float64)
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(str(values.shape).encode())
+    digest.update(times_ns)
+    digest.update(values)
+    return digest.hexdigest()
+
+class SummaryPyramid:
+    """Min/max/sum/count summaries of one variable at several cadences."""
+
+    def __init__(self, native_cadence_s, n_samples, first_ns, last_ns, levels, digest=None):
+        self.native_cadence_s = native_cadence_s
+        self.n_samples = n_samples
+        self.first_ns = first_ns
+        self.last_ns = last_ns
+        self.levels = levels  # cadence_s -> dict(times, min, max, sum, count)
+        self.digest = digest  # content_digest of the source times and values
+
+    @staticmethod
+    def _reduce(bin_ids, vmin, vmax, vsum, vcount):
+        """Reduce consecutive samples that share a bin id (input must be sorted)."""
+        starts = np.concatenate(([0], np.flatnonzero(np.diff(bin_ids)) + 1))
+        return (
+            bin_ids[starts],
+            np.fmin.reduceat(vmin, starts, axis=-1),
+            np.fmax.reduceat(vmax, starts, axis=-1),
+            np.add.reduceat(vsum, starts, axis=-1),
+            np.add.reduceat(vcount, starts, axis=-1),
+        )
+
+    @classmethod
+    def build(cls, times, values, cadences_s):
+        """
+        Build a pyramid from sorted times and values.
+
+        Args:
+            times: datetime64 (or int64 ns) array of sample times, ascending.
+            values: 1-D array (n,) or 2-D array (components, n).
+            cadences_s: Iterable of bin widths in seconds, any order.
+
+        Returns:
+            SummaryPyramid, or None if the input cannot be summarised.
+        """
+        times_ns = np.asarray(times).astype('datetime64[ns]').astype(np.int64)
+        values = np.asarray(values, dtype=np.float64)
+        if times_ns.size < 2 or values.shape[-1] != times_ns.size:
+            return None
+        if np.any(np.diff(times_ns) < 0):
+            print_manager.debug("Summary pyramid skipped: times are not sorted")
+            return None
+
+        native_cadence_s = float(np.median(np.diff(times_ns))) / NS_PER_SECOND
+        valid = ~np.isnan(values)
+        vsum = np.where(valid, values, 0.0)
+        vcount = valid.astype(np.int64)
+        vmin = vmax = values
+        bin_times = times_ns
+
+        levels = {}
+        for cadence_s in sorted(cadences_s):
+            cadence_ns = int(cadence_s * NS_PER_SECOND)
+            bin_ids = bin_times // cadence_ns
+            bin_ids, vmin, vmax, vsum, vcount = cls._reduce(bin_ids, vmin, vmax, vsum, vcount)
+            bin_times = bin_ids * cadence_ns
+            levels[cadence_s] = {'times': bin_times, 'min': vmin, 'max': vmax,
+                                 'sum': vsum, 'count': vcount}
+        return cls(native_cadence_s, times_ns.size, int(times_ns[0]), int(times_ns[-1]), levels,
+                   digest=content_digest(times_ns, values))
+
+    def matches(self, times, values, digest=None):
+        """
+        True if this pyramid was built from exactly these times and values.
+
+        The sample count and end times are checked first so most mismatches
+        skip hashing; pass ``digest`` when it is already known.
+        """
+        if times is None or len(times) != self.n_samples or self.digest is None:
+            return False
+        ends = np.asarray(times[[0, -1]]).astype('datetime64[ns]').astype(np.int64)
+        if int(ends[0]) != self.first_ns or int(ends[1]) != self.last_ns:
+            return False
+        return (digest or content_digest(times, values)) == self.digest
+
+    def select_cadence(self, span_s, pixel_width):
+        """
+        Pick the coarsest level with at least one bin per pixel.
+
+        Returns None when one pixel covers no more than the native cadence, or
+        no level is both coarser than native data and fine enough for the plot.
+        """
+        if pixel_width <= 0:
+            return None
+        seconds_per_pixel = span_s / pixel_width
+        if seconds_per_pixel <= self.native_cadence_s:
+            return None
+        usable = [c for c in self.levels if self.native_cadence_s < c <= seconds_per_pixel]
+        return max(usable) if usable else None
+
+    def query(self, start_ns, end_ns, cadence_s):
+        """Return (times datetime64[ns], min, max, mean) for bins overlapping [start, end]."""
+        level = self.levels[cadence_s]
+        cadence_ns = int(cadence_s * NS_PER_SECOND)
+        i0 = np.searchsorted(level['times'], start_ns - cadence_ns, side='right')
+        i1 = np.searchsorted(level['times'], end_ns, side='right')
+        with np.errstate(invalid='ignore', divide='ignore'):
+            mean = level['sum'][..., i0:i1] / level['count'][..., i0:i1]
+        return (level['times'][i0:i1].astype('datetime64[ns]'),
+                level['min'][..., i0:i1], level['max'][..., i0:i1], mean)
+
+    def save(self, path):
+        arrays = {'meta': np.array([self.native_cadence_s, self.n_samples], dtype=np.float64),
+                  'first_last': np.array([self.first_ns, self.last_ns], dtype=np.int64),
+                  'digest': np.array(self.digest or '')}
+        for cadence_s, level in self.levels.items():
+            for key, arr in level.items():
+                arrays[f'{cadence_s}__{key}'] = arr
+        tmp_path = path + '.tmp'
+        with open(tmp_path, 'wb') as f:
+            np.savez(f, **arrays)
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path, allow_pickle=False) as f:
+            native_cadence_s, n_samples = float(f['meta'][0]), int(f['meta'][1])
+            first_ns, last_ns = (int(v) for v in f['first_last'])
+            digest = str(f['digest']) if 'digest' in f.files else None
+            levels = {}
+            for name in f.files:
+                if '__' not in name:
+                    continue
+                cadence_str, key = name.split('__', 1)
+                cadence_s = float(cadence_str)
+                cadence_s = int(cadence_s) if cadence_s.is_integer() else cadence_s
+                levels.setdefault(cadence_s, {})[key] = f[name]
+        return cls(native_cadence_s, n_samples, first_ns, last_ns, levels, digest=digest or None)
+
+def envelope_xy(times, vmin, vmax):
+    """
+    Interleave per-bin minima and maxima into a drawable line.
+
+    Each bin contributes two vertices at its start time (min then max), so the
+    line traces the full vertical extent of the data inside every bin.
+    """
+    x = np.repeat(times, 2)
+    y = np.stack((vmin, vmax), axis=-1).reshape(*np.shape(vmin)[:-1], -1)
+    return x, y
+
+class SummaryPyramidCache:
+    """Keeps the pyramids for the current session, keyed by class and subclass name."""
+
+    def __init__(self):
+        self._pyramids = {}
+
+    def clear(self):
+        self._pyramids.clear()
+
+    def _cache_path(self, data_type, class_name, subclass_name):
+        from .config import config
+        cache_dir = os.path.join(config.data_dir, 'summary_pyramids', str(data_type))
+        return os.path.join(cache_dir, f"{class_name}.{subclass_name}.npz")
+
+    def is_enabled_for(self, data_type):
+        from .config import config
+        enabled = config.summary_pyramid_data_types or []
+        return data_type in enabled or str(data_type).lower() in [str(d).lower() for d in enabled]
+
+    def get(self, var, times):
+        """
+        Return the pyramid for a time-series plot_manager, building it if needed.
+
+        A pyramid from memory or from disk is only used if its digest matches
+        the current times and values; otherwise it is rebuilt and the file on
+        disk is replaced. Returns None if the variable cannot be summarised.
+        """
+        from .config import config
+        pc = getattr(var, 'plot_config', None)
+        if pc is None or pc.plot_type != 'time_series' or times is None or len(times) < 2 or np.ndim(times) != 1:
+            return None
+        values = var.view(np.ndarray)
+        if np.shape(values)[-1:] != (len(times),):
+            return None
+
+        key = (pc.class_name, pc.subclass_name)
+        digest = content_digest(times, values)
+        pyramid = self._pyramids.get(key)
+        if pyramid is not None and pyramid.matches(times, values, digest):
+            return pyramid
+
+        path = self._cache_path(pc.data_type, pc.class_name, pc.subclass_name)
+        pyramid = None
+        if os.path.exists(path):
+            try:
+                pyramid = SummaryPyramid.load(path)
+            except Exception as e:
+                print_manager.debug(f"Ignoring unreadable summary pyramid {path}: {e}")
+            if pyramid is not None and not pyramid.matches(times, values, digest):
+                pyramid = None  # Built from other data; replaced below
+            elif pyramid is not None:
+                print_manager.debug(f"Loaded summary pyramid for {pc.class_name}.{pc.subclass_name}")
+        if pyramid is None:
+            pyramid = SummaryPyramid.build(times, values, config.summary_pyramid_cadences)
+            if pyramid is None:
+                self._pyramids.pop(key, None)
+                return None
+            try:
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                pyramid.save(path)
+            except OSError as e:
+                print_manager.debug(f"Could not persist summary pyramid {path}: {e}")
+            print_manager.debug(f"Built summary pyramid for {pc.class_name}.{pc.subclass_name}")
+        self._pyramids[key] = pyramid
+        return pyramid
+
+    def build_for_instance(self, data_type, class_instance):
+        """Build (or load from disk) pyramids for every time-series variable of a data class ahead of plotting."""
+        from .plot_manager import plot_manager
+        if class_instance is None or not self.is_enabled_for(data_type):
+            return 0
+
+        built = 0
+        for attr in list(vars(class_instance).values()):
+            if isinstance(attr, plot_manager) and self.get(attr, getattr(attr.plot_config, 'datetime_array', None)):
+                built += 1
+        if built:
+            print_manager.debug(f"Summary pyramids ready for {built} variable(s) of {data_type}")
+        return built
+
+    def reduce_for_plot(self, var, raw_datetime_array, trange_start, trange_end, pixel_width):
+        """
+        Return (times, min, max) for drawing ``var`` over the given range, or
+        None if native data should be drawn instead.
+
+        The pyramid is only built (or loaded) when one pixel spans more than
+        the native cadence, so zoomed-in plots never trigger a build.
+        """
+        pc = getattr(var, 'plot_config', None)
+        if pc is None or pixel_width <= 0 or not self.is_enabled_for(pc.data_type):
+            return None
+        if raw_datetime_array is None or len(raw_datetime_array) < 2 or np.ndim(raw_datetime_array) != 1:
+            return None
+        start_ns, end_ns = (_to_ns(t) for t in (trange_start, trange_end))
+        span_s = (end_ns - start_ns) / NS_PER_SECOND
+        if span_s / pixel_width <= _estimate_cadence_s(raw_datetime_array):
+            return None
+
+        pyramid = self.get(var, raw_datetime_array)
+        if pyramid is None:
+            return None
+        cadence_s = pyramid.select_cadence(span_s, pixel_width)
+        if cadence_s is None:
+            return None
+        times, vmin, vmax, _ = pyramid.query(start_ns, end_ns, cadence_s)
+        if len(times) == 0:
+            return None
+        print_manager.debug(f"Using {cadence_s}s summary level for {_var_name(var)}: {len(times)} bins")
+        return times, vmin, vmax
+
+def _estimate_cadence_s(times):
+    """Median sample spacing of the leading samples, in seconds."""
+    head = np.asarray(times[:CADENCE_ESTIMATE_SAMPLES + 1]).astype('datetime64[ns]').astype(np.int64)
+    return float(np.median(np.diff(head))) / NS_PER_SECOND
+
+def _to_ns(t):
+    """Convert a trange entry (string, datetime or datetime64) to int64 ns."""
+    if isinstance(t, str):
+        from dateutil.parser import parse
+        t = parse(t)
+    if getattr(t, 'tzinfo', None) is not None:
+        t = t.replace(tzinfo=None)
+    return int(np.datetime64(t, 'ns').astype(np.int64))
+
+def _var_name(var):
+    pc = var.plot_config
+    return f"{pc.class_name}.{pc.subclass_name}"
+
+pyramid_cache = SummaryPyramidCache()
+
+__all__ = ['SummaryPyramid', 'SummaryPyramidCache', 'pyramid_cache', 'envelope_xy', 'content_digest']
@@ -0,0 +1,362 @@
+#plotbot/tracing.py
+"""
+Structured tracing spans for the plotbot pipeline.
+
+A span is a named, timed section of work with attributes (data_type, trange,
+records, bytes, ...). Spans nest per thread, record the process and thread
+that ran them, and export to Chrome trace-event JSON (chrome://tracing,
+Perfetto) or speedscope:
+
+    from plotbot import tracer
+    tracer.enabled = True
+    plotbot(trange, mag_rtn_4sa.br, 1)
+    print(tracer.format_tree())                 # get_data > download > import > merge > ... > render
+    tracer.save('plotbot_trace.json')           # Chrome trace events
+    tracer.save('plotbot.speedscope.json')      # speedscope
+
+    with tracer.span('my_step', data_type='mag_RTN_4sa') as span:
+        ...
+        span.set(records=n)
+
+    @traced('load_catalogue')
+    def load_catalogue(path): ...
+
+Tracing is off by default (set PLOTBOT_TRACE=1 to start with it on). While
+disabled, tracer.span() returns a shared no-op span and traced functions cost
+one attribute check, so the instrumentation can stay in hot paths.
+
+Timestamps are wall-clock nanoseconds (measured with perf_counter_ns), so
+spans recorded in worker processes can be returned with tracer.drain() and
+added to the parent's trace with tracer.merge().
+"""
+import os
+import json
+import time
+import itertools
+import threading
+from functools import wraps
+
+from .print_manager import print_manager
+
+def _plain(value):
+    """Attribute value as something json.dump accepts; large objects are summarised, not kept alive."""
+    if value is None or isinstance(value, (bool, int, float, str)):
+        return value
+    if isinstance(value, (list, tuple)) and len(value) <= 16:
+        return [_plain(item) for item in value]
+    if hasattr(value, 'item') and getattr(value, 'ndim', None) == 0:
+        return value.item()  # numpy scalar
+    try:
+        return f"<{type(value).__name__} len={len(value)}>"
+    except TypeError:
+        return f"<{type(value).__name__}>"
+
+class _NullSpan:
+    """Returned while tracing is disabled: accepts the Span calls and does nothing."""
+    __slots__ = ()
+
+    def set(self, **attributes):
+        return self
+
+    def end(self, **attributes):
+        return 0.0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+    def __bool__(self):
+        return False
+
+NULL_SPAN = _NullSpan()
+
+class Span:
+    """One timed section. Use as a context manager, or end() it explicitly."""
+    __slots__ = ('tracer', 'name', 'attributes', 'id', 'parent_id', 'start_ns', 'end_ns',
+                 'pid', 'tid', 'thread_name')
+
+    def __init__(self, tracer, name, attributes, parent_id):
+        self.tracer = tracer
+        self.name = name
+        self.attributes = {key: _plain(value) for key, value in attributes.items() if value is not None}
+        self.id = next(tracer._ids)
+        self.parent_id = parent_id
+        self.pid = os.getpid()
+        thread = threading.current_thread()
+        self.tid = thread.ident
+        self.thread_name = thread.name
+        self.end_ns = None
+        self.start_ns = time.perf_counter_ns() + tracer._epoch_offset_ns
+
+    def set(self, **attributes):
+        """Add or replace attributes."""
+        for key, value in attributes.items():
+            self.attributes[key] = _plain(value)
+        return self
+
+    def end(self, **attributes):
+        """Finish the span (once); returns its duration in seconds."""
+        if attributes:
+            self.set(**attributes)
+        if self.end_ns is None:
+            self.tracer._finish(self)
+        return (self.end_ns - self.start_ns) / 1e9
+
+    @property
+    def duration(self):
+        return None if self.end_ns is None else (self.end_ns - self.start_ns) / 1e9
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is not None:
+            self.attributes['error'] = exc_type.__name__
+        self.end()
+        return False
+
+    def __bool__(self):
+        return True
+
+    def __repr__(self):
+        duration = 'open' if self.end_ns is None else f"{self.duration * 1e3:.2f}ms"
+        return f"Span({self.name}, {duration}, {self.attributes})"
+
+    def to_record(self):
+        """Plain dict (picklable, JSON-serialisable) form used by drain()/merge() and the exporters."""
+        return {'name': self.name, 'id': self.id, 'parent_id': self.parent_id, 'start_ns': self.start_ns,
+                'end_ns': self.end_ns, 'pid': self.pid, 'tid': self.tid, 'thread_name': self.thread_name,
+                'attributes': dict(self.attributes)}
+
+class Tracer:
+    """Collects spans from every thread of this process (plus any merged from other processes)."""
+
+    def __init__(self):
+        self.enabled = os.environ.get('PLOTBOT_TRACE', '').lower() in ('1', 'true', 'yes')
+        self._epoch_offset_ns = time.time_ns() - time.perf_counter_ns()
+        self._ids = itertools.count(1)
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._finished = []  # Span objects from this process
+        self._merged = []  # Records from other processes
+
+    def _stack(self):
+        stack = getattr(self._local, 'stack', None)
+        if stack is None:
+            stack = self._local.stack = []
+        return stack
+
+    def start_span(self, name, parent=None, **attributes):
+        """
+        Open a span; end it with span.end() or use it as a context manager.
+
+        The parent is this thread's current span unless one is passed, which
+        links work handed to a thread pool to the span that submitted it.
+        """
+        if not self.enabled:
+            return NULL_SPAN
+        stack = self._stack()
+        if not parent:
+            parent = stack[-1] if stack else None
+        span = Span(self, name, attributes, parent.id if parent else None)
+        stack.append(span)
+        return span
+
+    span = start_span  # `with tracer.span(...)` reads better; spans are context managers
+
+    def _finish(self, span):
+        span.end_ns = time.perf_counter_ns() + self._epoch_offset_ns
+        stack = self._stack()
+        if span in stack:
+            # Children left open (an early return skipped their end) close with their parent
+            while stack:
+                top = stack.pop()
+                if top is span:
+                    break
+                top.end_ns = span.end_ns
+                top.attributes['unfinished'] = True
+                self._record(top)
+        self._record(span)
+
+    def _record(self, span):
+        with self._lock:
+            self._finished.append(span)
+
+    def end_span(self, span, **attributes):
+        """Finish a span returned by start_span (no-op for the disabled span); returns seconds."""
+        return span.end(**attributes)
+
+    def current(self):
+        """Innermost open span on this thread, or the no-op span."""
+        stack = getattr(self._local, 'stack', None)
+        return stack[-1] if stack else NULL_SPAN
+
+    def annotate(self, **attributes):
+        """Set attributes on the current span (e.g. records counted deep inside a traced call)."""
+        if self.enabled:
+            self.current().set(**attributes)
+
+    def traced(self, name=None, **attributes):
+        """Decorator running the function inside a span (named after the function by default)."""
+        def decorator(func):
+            span_name = name or func.__name__
+
+            @wraps(func)
+            def wrapper(*args, **kwargs):
+                if not self.enabled:
+                    return func(*args, **kwargs)
+                with self.start_span(span_name, **attributes):
+                    return func(*args, **kwargs)
+            return wrapper
+        return decorator
+
+    def records(self):
+        """Finished spans (this process and merged) as dicts, ordered by start time."""
+        with self._lock:
+            records = [span.to_record() for span in self._finished] + list(self._merged)
+        return sorted(records, key=lambda record: (record['start_ns'], -record['end_ns']))
+
+    def drain(self):
+        """Return this process's finished span records and forget them (for worker processes)."""
+        with self._lock:
+            finished, self._finished = self._finished, []
+        return [span.to_record() for span in finished]
+
+    def merge(self, records):
+        """Add span records from another process (see drain())."""
+        with self._lock:
+            self._merged.extend(records)
+
+    def clear(self):
+        """Forget all finished spans. Open spans keep running."""
+        with self._lock:
+            self._finished = []
+            self._merged = []
+
+    def to_chrome_trace(self):
+        """Chrome trace-event format: one complete ('X') event per span plus process/thread names."""
+        records = self.records()
+        origin_ns = records[0]['start_ns'] if records else 0
+        events = []
+        seen_processes, seen_threads = set(), set()
+        for record in records:
+            pid, tid = record['pid'], record['tid']
+            if pid not in seen_processes:
+                seen_processes.add(pid)
+                label = 'plotbot' if pid == os.getpid() else f'plotbot worker {pid}'
+                events.append({'ph': 'M', 'name': 'process_name', 'pid': pid, 'tid': tid, 'args': {'name': label}})
+            if (pid, tid) not in seen_threads:
+                seen_threads.add((pid, tid))
+                events.append({'ph': 'M', 'name': 'thread_name', 'pid': pid, 'tid': tid,
+                               'args': {'name': record['thread_name']}})
+            events.append({'ph': 'X', 'name': record['name'], 'cat': 'plotbot', 'pid': pid, 'tid': tid,
+                           'ts': (record['start_ns'] - origin_ns) / 1e3,
+                           'dur': (record['end_ns'] - record['start_ns']) / 1e3,
+                           'args': record['attributes']})
+        return {'traceEvents': events, 'displayTimeUnit': 'ms',
+                'otherData': {'origin_unix_ns': origin_ns}}
+
+    def to_speedscope(self, name='plotbot'):
+        """speedscope evented profiles, one per process/thread."""
+        records = self.records()
+        origin_ns = records[0]['start_ns'] if records else 0
+        frames, frame_index = [], {}
+        by_thread = {}
+        for record in records:
+            by_thread.setdefault((record['pid'], record['tid']), []).append(record)
+
+        profiles = []
+        for (pid, tid), thread_records in by_thread.items():
+            events, open_stack = [], []
+            for record in thread_records:  # Sorted by start, longest first
+                start = record['start_ns'] - origin_ns
+                end = record['end_ns'] - origin_ns
+                while open_stack and open_stack[-1][1] <= start:
+                    frame, closing = open_stack.pop()
+                    events.append({'type': 'C', 'frame': frame, 'at': closing / 1e3})
+                if open_stack:
+                    end = min(end, open_stack[-1][1])  # Keep events well nested
+                frame = frame_index.setdefault(record['name'], len(frames))
+                if frame == len(frames):
+                    frames.append({'name': record['name']})
+                events.append({'type': 'O', 'frame': frame, 'at': start / 1e3})
+                open_stack.append((frame, end))
+            while open_stack:
+                frame, closing = open_stack.pop()
+                events.append({'type': 'C', 'frame': frame, 'at': closing / 1e3})
+            profiles.append({'type': 'evented', 'name': f"{thread_records[0]['thread_name']} (pid {pid})",
+                             'unit': 'microseconds', 'startValue': events[0]['at'], 'endValue': events[-1]['at'],
+                             'events': events})
+        return {'$schema': 'https://www.speedscope.app/file-format-schema.json', 'name': name,
+                'shared': {'frames': frames}, 'profiles': profiles, 'exporter': 'plotbot.tracing'}
+
+    def save(self, path, format=None):
+        """
+        Write the trace to path.
+
+        Args:
+            path (str): Output file.
+            format (str, optional): 'chrome' or 'speedscope'; defaults to speedscope
+                for names containing 'speedscope', Chrome trace events otherwise.
+
+        Returns:
+            str: The path written.
+        """
+        format = format or ('speedscope' if 'speedscope' in os.path.basename(path).lower() else 'chrome')
+        if format not in ('chrome', 'speedscope'):
+            raise ValueError(f"Unknown trace format '{format}' (use 'chrome' or 'speedscope')")
+        document = self.to_speedscope() if format == 'speedscope' else self.to_chrome_trace()
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        with open(path, 'w') as f:
+            json.dump(document, f)
+        return path
+
+    def format_tree(self, min_ms=0.0):
+        """Indented text tree of the finished spans with durations and attributes."""
+        records = self.records()
+        children = {}
+        ids = {(record['pid'], record['id']) for record in records}
+        for record in records:
+            parent = (record['pid'], record['parent_id'])
+            children.setdefault(parent if parent in ids else None, []).append(record)
+
+        lines = []
+        def walk(record, depth):
+            duration_ms = (record['end_ns'] - record['start_ns']) / 1e6
+            if duration_ms < min_ms:
+                return
+            attributes = ', '.join(f"{key}={value}" for key, value in record['attributes'].items())
+            process = '' if record['pid'] == os.getpid() else f" [pid {record['pid']}]"
+            lines.append(f"{'  ' * depth}{record['name']}: {duration_ms:.2f}ms{process}"
+                         + (f"  ({attributes})" if attributes else ''))
+            for child in children.get((record['pid'], record['id']), []):
+                walk(child, depth + 1)
+        for root in children.get(None, []):
+            walk(root, 0)
+        return '\n'.join(lines)
+
+def timer_decorator(timer_name):
+    """
+    Time a function as a span named after it and print the duration through
+    print_manager.speed_test, tagged with timer_name.
+    """
+    def decorator(func):
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            start_time = time.perf_counter()
+            with tracer.start_span(func.__name__, timer=timer_name):
+                result = func(*args, **kwargs)
+            duration_ms = (time.perf_counter() - start_time) * 1000
+            print_manager.speed_test(f"⏱️ [{timer_name}] {func.__name__}: {duration_ms:.2f}ms")
+            return result
+        return wrapper
+    return decorator
+
+# Create global instance
+tracer = Tracer()
+traced = tracer.traced
+
+__all__ = ['tracer', 'traced', 'Tracer', 'Span', 'timer_decorator']
@@ -0,0 +1,282 @@
+#plotbot/vdf_batch.py
+"""
+Batch rendering of vdyes VDF frames across a process pool.
+
+    slices = process_vdf_cdf(dat, available_indices)
+    render_vdf_frames(slices, available_times, 'vdf_plots/', workers=8, movie='vdf_plots/day.mp4')
+
+The parent process works out everything that needs psp_span_vdf (axis limits,
+colormap, figure size) for every frame from the already processed slices, then
+hands contiguous chunks of frames to Agg-backend workers. Each worker builds
+the 3-panel figure once and only swaps the line data, contours and colorbar
+between frames, instead of building a new figure per frame.
+
+With movie set, each frame is also rasterized at a fixed size and streamed in
+order into an encoder: ffmpeg (matplotlib's animation.ffmpeg_path) for .mp4 and
+other video formats, Pillow for .gif.
+"""
+import os
+import time
+import shutil
+import subprocess
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from .print_manager import print_manager
+
+FRAMES_PER_CHUNK = 25  # Frames one worker renders on its figure per task
+
+def vdf_frame_filename(time_obj):
+    """PNG name vdyes uses for a saved VDF frame."""
+    return f"VDF_{time_obj.strftime('%Y-%m-%d_%Hh_%Mm_%Ss')}.png"
+
+def _frame_settings(vdf_class):
+    return {'figsize': (vdf_class.vdf_figure_width, vdf_class.vdf_figure_height),
+            'colormap': vdf_class.vdf_colormap}
+
+def _build_frames(vdf_slices, times, vdf_class):
+    """Per-frame plot inputs (plain arrays and tuples, cheap to pickle)."""
+    frames = []
+    for i, time_obj in enumerate(times):
+        _, (vx_theta, vz_theta, df_theta), (vx_phi, vy_phi, df_phi) = vdf_slices.timeslice(i)
+        frames.append({
+            'title': f'PSP SPAN-I VDF - {time_obj.strftime("%Y-%m-%d %H:%M:%S")}',
+            'line': (vdf_slices.vel_1d[i], vdf_slices.collapsed[i]),
+            'theta': (vx_theta, vz_theta, df_theta),
+            'phi': (vx_phi, vy_phi, df_phi),
+            'theta_limits': vdf_class.get_theta_square_bounds(vx_theta, vz_theta, df_theta),
+            'phi_limits': vdf_class.get_axis_limits('phi', vx_phi, vy_phi, df_phi),
+        })
+    return frames
+
+class _FrameFigure:
+    """The vdyes 'Save All' 3-panel layout on a reusable Agg figure."""
+
+    def __init__(self, figsize, colormap):
+        from matplotlib.figure import Figure
+        from matplotlib.backends.backend_agg import FigureCanvasAgg
+        import matplotlib.gridspec as gridspec
+
+        self.colormap = colormap
+        self.fig = Figure(figsize=figsize, facecolor='white')
+        FigureCanvasAgg(self.fig)
+        self.fig.subplots_adjust(top=0.85)  # Room for the suptitle inside the fixed-size movie frames
+        gs = gridspec.GridSpec(1, 4, figure=self.fig, width_ratios=[1, 1, 1, 0.05], wspace=0.4)
+        self.ax1 = self.fig.add_subplot(gs[0], facecolor='white')  # 1D line plot
+        self.ax2 = self.fig.add_subplot(gs[1], facecolor='white')  # θ-plane
+        self.ax3 = self.fig.add_subplot(gs[2], facecolor='white')  # φ-plane
+        self.cax = self.fig.add_subplot(gs[3], facecolor='white')  # colorbar
+
+        self.line, = self.ax1.plot([], [], 'b-', linewidth=2)
+        self.ax1.set_yscale('log')
+        self.ax1.set_xlim(0, 1000)
+        self.ax1.set_xlabel('Velocity (km/s)')
+        self.ax1.set_ylabel(f'f $(cm^2 \\ s \\ sr \\ eV)^{-1}$')
+        for ax, ylabel, title in ((self.ax2, '$v_z$ km/s', '$\\theta$-plane'), (self.ax3, '$v_y$ km/s', '$\\phi$-plane')):
+            ax.set_xlabel('$v_x$ km/s')
+            ax.set_ylabel(ylabel)
+            ax.set_title(title)
+        self.contours = []
+
+    def draw(self, frame):
+        import matplotlib.ticker as ticker
+
+        self.line.set_data(*frame['line'])
+        self.ax1.relim()
+        self.ax1.autoscale_view(scalex=False)
+
+        for contour in self.contours:
+            contour.remove()
+        self.contours = []
+        for ax, plane, (xlim, ylim) in ((self.ax2, frame['theta'], frame['theta_limits']),
+                                        (self.ax3, frame['phi'], frame['phi_limits'])):
+            self.contours.append(ax.contourf(*plane, locator=ticker.LogLocator(), cmap=self.colormap))
+            ax.set_xlim(xlim)
+            ax.set_ylim(ylim)
+
+        self.cax.cla()
+        cbar = self.fig.colorbar(self.contours[0], cax=self.cax)
+        cbar.set_label(f'f $(cm^2 \\ s \\ sr \\ eV)^{-1}$')
+        self.fig.suptitle(frame['title'], y=0.98, fontsize=14)
+
+    def save(self, path, dpi):
+        self.fig.savefig(path, dpi=dpi, bbox_inches='tight')
+
+    def rgba(self, dpi):
+        """Fixed-size RGBA raster of the current frame (movie frames must all match)."""
+        self.fig.set_dpi(dpi)
+        self.fig.canvas.draw()
+        return np.asarray(self.fig.canvas.buffer_rgba()).copy()
+
+_WORKER_FIGURE = None
+
+def _init_worker(settings):
+    """Process-pool initializer: quiet output and one reusable figure per worker."""
+    global _WORKER_FIGURE
+    print_manager.show_status = False
+    _WORKER_FIGURE = _FrameFigure(**settings)
+
+def _render_chunk(frames, paths, dpi, movie_dpi, figure=None):
+    """Render a run of frames; returns a list of (saved path or None, RGBA frame or None, error or None)."""
+    figure = figure or _WORKER_FIGURE
+    results = []
+    for frame, path in zip(frames, paths):
+        try:
+            figure.draw(frame)
+            if path is not None:
+                figure.save(path, dpi)
+            results.append((path, figure.rgba(movie_dpi) if movie_dpi else None, None))
+        except Exception as e:
+            results.append((None, None, f"{type(e).__name__}: {e}"))
+    return results
+
+class _MovieEncoder:
+    """Append equally sized RGBA frames to an .mp4 (ffmpeg) or .gif (Pillow) file as they arrive."""
+
+    def __init__(self, path, fps):
+        self.path = path
+        self.fps = fps
+        self.is_gif = path.lower().endswith('.gif')
+        self._gif = None
+        self._proc = None
+        self.n_frames = 0
+        if not self.is_gif:
+            import matplotlib
+            self._ffmpeg = shutil.which(matplotlib.rcParams['animation.ffmpeg_path'])
+            if self._ffmpeg is None:
+                raise RuntimeError(f"ffmpeg not found (animation.ffmpeg_path = "
+                                   f"{matplotlib.rcParams['animation.ffmpeg_path']!r}); use a .gif movie instead")
+
+    def write(self, rgba):
+        if self.is_gif:
+            from PIL import Image, GifImagePlugin
+            # Each frame is written with its own palette, so no frame is held in memory
+            frame = Image.fromarray(rgba, 'RGBA').convert('RGB').quantize()
+            duration = int(1000 / self.fps)
+            if self._gif is None:
+                self._gif = open(self.path, 'wb')
+                header, _ = GifImagePlugin.getheader(frame, info={'loop': 0, 'duration': duration})
+                self._gif.writelines(header)
+            self._gif.writelines(GifImagePlugin.getdata(frame, duration=duration, include_color_table=True))
+        else:
+            if self._proc is None:
+                height, width = rgba.shape[:2]
+                self._proc = subprocess.Popen(
+                    [self._ffmpeg, '-y', '-loglevel', 'error', '-f', 'rawvideo', '-pix_fmt', 'rgba',
+                     '-s', f'{width}x{height}', '-r', str(self.fps), '-i', '-',
+                     '-vf', 'pad=ceil(iw/2)*2:ceil(ih/2)*2', '-pix_fmt', 'yuv420p', self.path],
+                    stdin=subprocess.PIPE)
+            self._proc.stdin.write(rgba.tobytes())
+        self.n_frames += 1
+
+    def close(self):
+        if self.is_gif:
+            if self._gif is not None:
+                self._gif.write(b';')  # GIF trailer
+                self._gif.close()
+                self._gif = None
+        elif self._proc is not None:
+            self._proc.stdin.close()
+            if self._proc.wait() != 0:
+                raise RuntimeError(f"ffmpeg failed writing {self.path}")
+            self._proc = None
+
+#====================================================================
+# FUNCTION: render_vdf_frames, Render many VDF frames in parallel
+#====================================================================
+def render_vdf_frames(vdf_slices, times, out_dir=None, workers=None, dpi=300, movie=None, fps=10,
+                      movie_dpi=100, save_frames=True, progress=None):
+    """
+    Render the vdyes 3-panel VDF plot for every processed time slice.
+
+    Args:
+        vdf_slices (VDFSlices): Slices from plotbot.vdf_processing.process_vdf_cdf.
+        times (list): datetime for each slice (used for titles and filenames).
+        out_dir (str, optional): Directory for the PNG frames (created if needed).
+        workers (int, optional): Worker processes. Defaults to the number of CPUs;
+            1 renders everything in this process.
+        dpi (int): PNG resolution.
+        movie (str, optional): .mp4 (needs ffmpeg) or .gif path to stream the frames into.
+        fps (int): Movie frame rate.
+        movie_dpi (int): Resolution of the movie frames.
+        save_frames (bool): Write the PNG frames (set False for a movie only).
+        progress (callable, optional): Called as progress(done, total) as frames finish.
+
+    Returns:
+        list: Saved PNG path for each frame, or None where it was not saved.
+    """
+    from .data_classes.psp_span_vdf import psp_span_vdf
+
+    times = list(times)
+    n_frames = len(times)
+    if len(vdf_slices) != n_frames:
+        raise ValueError(f"Got {n_frames} times for {len(vdf_slices)} VDF slices")
+    if save_frames and out_dir is None:
+        raise ValueError("out_dir is required when save_frames is True")
+    if n_frames == 0:
+        return []
+    if save_frames:
+        os.makedirs(out_dir, exist_ok=True)
+    paths = [os.path.join(out_dir, vdf_frame_filename(t)) if save_frames else None for t in times]
+    if workers is None:
+        workers = os.cpu_count() or 1
+    chunk_size = max(1, min(FRAMES_PER_CHUNK, -(-n_frames // max(1, int(workers)))))
+    chunks = [(start, min(start + chunk_size, n_frames)) for start in range(0, n_frames, chunk_size)]
+    workers = max(1, min(int(workers), len(chunks)))
+
+    batch_start = time.perf_counter()
+    settings = _frame_settings(psp_span_vdf)
+    frames = _build_frames(vdf_slices, times, psp_span_vdf)
+    encoder = _MovieEncoder(movie, fps) if movie else None
+    results = [None] * n_frames
+    done = 0
+
+    def _collect(start, chunk_results):
+        nonlocal done
+        for offset, (path, rgba, error) in enumerate(chunk_results):
+            index = start + offset
+            results[index] = path
+            if error is not None:
+                print_manager.error(f"❌ VDF frame {index} ({times[index]}) failed: {error}")
+            elif encoder is not None:
+                encoder.write(rgba)
+        done += len(chunk_results)
+        if progress is not None:
+            progress(done, n_frames)
+
+    def _task(start, end):
+        return (frames[start:end], paths[start:end], dpi, movie_dpi if movie else None)
+
+    try:
+        if workers == 1:
+            figure = _FrameFigure(**settings)
+            for start, end in chunks:
+                _collect(start, _render_chunk(*_task(start, end), figure=figure))
+        else:
+            print_manager.status(f"🎬 Rendering {n_frames} VDF frames on {workers} workers...")
+            ctx = multiprocessing.get_context('spawn')
+            with ProcessPoolExecutor(max_workers=workers, mp_context=ctx,
+                                     initializer=_init_worker, initargs=(settings,)) as pool:
+                # Chunks are collected in order (the movie needs it) with a bounded number in flight
+                pending = []
+                for start, end in chunks:
+                    pending.append((start, pool.submit(_render_chunk, *_task(start, end))))
+                    if len(pending) >= 2 * workers:
+                        first, future = pending.pop(0)
+                        _collect(first, future.result())
+                for start, future in pending:
+                    _collect(start, future.result())
+    finally:
+        if encoder is not None:
+            encoder.close()
+
+    n_saved = sum(path is not None for path in results)
+    summary = f"{n_saved}/{n_frames} frames saved to {out_dir}" if save_frames else f"{n_frames} frames rendered"
+    if encoder is not None:
+        summary += f", {encoder.n_frames} written to {movie}"
+    print_manager.status(f"✅ render_vdf_frames: {summary} in {time.perf_counter() - batch_start:.1f}s")
+    return results
+
+__all__ = ['render_vdf_frames', 'vdf_frame_filename']
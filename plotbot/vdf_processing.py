@@ -0,0 +1,147 @@
+"""
+plotbot/vdf_processing.py
+
+Batched PSP SPAN-I VDF processing shared by vdyes(), its widget and the Dash
+VDF app. Every requested time slice goes through Jaye's steps in one numpy
+pass: reshape to the 8x32x8 (phi x energy x theta) grid, VDF from energy flux,
+velocity grids on the theta cut (first phi row) and the phi cut (middle theta
+bin), and the plane sums. Keep dependencies minimal (numpy only).
+
+SPAN-I L2 stores THETA/PHI/ENERGY/EFLUX as CDF floats, so float32 keeps the
+precision of the input while halving memory against float64.
+"""
+
+from __future__ import annotations
+
+import numpy as np
+from datetime import datetime, timezone
+from typing import Dict, Sequence, Tuple
+
+MASS_P = 0.010438870    # Proton mass in eV/c^2 (Jaye's constant)
+CHARGE_P = 1            # Proton charge in eV (Jaye's constant)
+VDF_SHAPE = (8, 32, 8)  # phi x energy x theta
+THETA_PLANE_CUT = 0     # Phi row whose angles give the theta-plane coordinates
+PHI_PLANE_CUT = 4       # Middle theta bin whose angles give the phi-plane coordinates
+VDF_VARIABLES = ('THETA', 'PHI', 'ENERGY', 'EFLUX')
+
+
+def _datetime64_ns(value):
+    if isinstance(value, str):
+        from dateutil.parser import parse
+        value = parse(value.replace('/', ' '))
+    if isinstance(value, datetime) and value.tzinfo is not None:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    return np.datetime64(value, 'ns')
+
+
+def to_epoch_ns(times):
+    """int64 ns since 1970 (UTC) for a time string, datetime, datetime64, or a sequence/array of them."""
+    scalar = isinstance(times, (str, datetime, np.datetime64)) or np.ndim(times) == 0
+    values = np.asarray([times] if scalar else times)
+    if values.dtype.kind == 'M':
+        epoch_ns = values.astype('datetime64[ns]').astype(np.int64)
+    elif values.dtype.kind in 'iu':
+        epoch_ns = values.astype(np.int64)  # Already ns
+    else:
+        epoch_ns = np.array([_datetime64_ns(t) for t in values.ravel()], dtype='datetime64[ns]').astype(np.int64)
+    return epoch_ns[0] if scalar else epoch_ns
+
+
+def nearest_time_indices(epoch_ns, targets_ns):
+    """Index of the closest sorted epoch for each target; ties go to the later slice, as bisect lookup did."""
+    epoch_ns = np.asarray(epoch_ns, dtype=np.int64)
+    if epoch_ns.size == 0:
+        raise ValueError("No VDF time slices to search")
+    targets_ns = np.asarray(targets_ns, dtype=np.int64)
+    right = np.searchsorted(epoch_ns, targets_ns, side='left')
+    hi = np.minimum(right, len(epoch_ns) - 1)
+    lo = np.maximum(right - 1, 0)
+    use_previous = (right > 0) & (right < len(epoch_ns)) & (targets_ns - epoch_ns[lo] < epoch_ns[hi] - targets_ns)
+    return np.where(use_previous, lo, hi)
+
+
+def read_vdf_records(dat, indices: Sequence[int]) -> Dict[str, np.ndarray]:
+    """Read the VDF variables for the given CDF record indices, shape (n, 2048) each.
+
+    One varget per variable over the covered record span, rather than one per slice.
+    """
+    indices = np.asarray(indices, dtype=np.int64)
+    if indices.size == 0:
+        return {name: np.empty((0, int(np.prod(VDF_SHAPE))), dtype=np.float32) for name in VDF_VARIABLES}
+    first, last = int(indices.min()), int(indices.max())
+    records = {}
+    for name in VDF_VARIABLES:
+        block = np.asarray(dat.varget(name, startrec=first, endrec=last))
+        block = block.reshape(last - first + 1, -1)
+        records[name] = block[indices - first]
+    return records
+
+
+class VDFSlices:
+    """Processed VDF grids for a batch of time slices (first axis = slice).
+
+    Attributes:
+        vdf, vel: (n, 8, 32, 8) VDF and speed.
+        theta_plane: (vx, vz, df) with shape (n, 32, 8) each.
+        phi_plane: (vx, vy, df) with shape (n, 8, 32) each.
+        collapsed: (n, 32) VDF summed over both angles; vel_1d: (n, 32) matching speeds.
+    """
+
+    def __init__(self, vdf, vel, theta_plane, phi_plane):
+        self.vdf = vdf
+        self.vel = vel
+        self.theta_plane = theta_plane
+        self.phi_plane = phi_plane
+        self.collapsed = np.sum(vdf, axis=(1, 3))
+        self.vel_1d = vel[:, 0, :, 0]
+
+    def __len__(self):
+        return len(self.vdf)
+
+    def timeslice(self, i: int) -> Tuple[dict, Tuple[np.ndarray, ...], Tuple[np.ndarray, ...]]:
+        """(vdf_data, (vx_theta, vz_theta, df_theta), (vx_phi, vy_phi, df_phi)) for slice i, as views."""
+        vdf_data = {'vdf': self.vdf[i], 'vel': self.vel[i]}
+        return (vdf_data,
+                tuple(plane[i] for plane in self.theta_plane),
+                tuple(plane[i] for plane in self.phi_plane))
+
+
+def process_vdf_slices(theta, phi, energy, eflux, dtype=np.float32) -> VDFSlices:
+    """Process (n, 2048) SPAN-I arrays (or already reshaped (n, 8, 32, 8)) for all n slices at once."""
+    n_times = len(energy)
+    dtype = np.dtype(dtype).type
+    theta, phi, energy, eflux = (np.asarray(a, dtype=dtype).reshape((n_times,) + VDF_SHAPE)
+                                 for a in (theta, phi, energy, eflux))
+
+    # VDF following Jaye's formula
+    number_flux = eflux / energy
+    vdf = number_flux * dtype(MASS_P ** 2) / (dtype(2E-5) * energy)
+    vel = np.sqrt(dtype(2 * CHARGE_P / MASS_P) * energy)
+
+    # Theta plane: coordinates from the first phi row, VDF summed over phi
+    theta_cut = np.radians(theta[:, THETA_PLANE_CUT])
+    phi_cut = np.radians(phi[:, THETA_PLANE_CUT])
+    vel_cut = vel[:, THETA_PLANE_CUT]
+    theta_plane = (vel_cut * np.cos(phi_cut) * np.cos(theta_cut),
+                   vel_cut * np.sin(theta_cut),
+                   np.nansum(vdf, axis=1))
+
+    # Phi plane: coordinates from the middle theta bin, VDF summed over theta
+    theta_cut = np.radians(theta[..., PHI_PLANE_CUT])
+    phi_cut = np.radians(phi[..., PHI_PLANE_CUT])
+    vel_cut = vel[..., PHI_PLANE_CUT]
+    phi_plane = (vel_cut * np.cos(phi_cut) * np.cos(theta_cut),
+                 vel_cut * np.sin(phi_cut) * np.cos(theta_cut),
+                 np.nansum(vdf, axis=3))
+
+    return VDFSlices(vdf, vel, theta_plane, phi_plane)
+
+
+def process_vdf_cdf(dat, indices: Sequence[int], dtype=np.float32) -> VDFSlices:
+    """Read and process the given records of an open SPAN-I L2 cdflib.CDF."""
+    records = read_vdf_records(dat, indices)
+    return process_vdf_slices(records['THETA'], records['PHI'], records['ENERGY'], records['EFLUX'], dtype=dtype)
+
+
+__all__ = ['VDFSlices', 'process_vdf_slices', 'process_vdf_cdf', 'read_vdf_records',
+           'to_epoch_ns', 'nearest_time_indices', 'MASS_P', 'CHARGE_P', 'VDF_SHAPE']
@@ -84,17 +84,6 @@ def vdyes(trange, *variables, force_static=False):
     
     print_manager.status("📊 VDF-only mode: Creating standard VDF plot")
     
-    # Import our proven working VDF processing functions
-    sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'tests'))
-    try:
-        from test_VDF_smart_bounds_debug import (
-            extract_and_process_vdf_timeslice_EXACT,
-            jaye_exact_theta_plane_processing, 
-            jaye_exact_phi_plane_processing
-        )
-    except ImportError:
-        raise ImportError("Cannot import proven VDF processing functions from test_VDF_smart_bounds_debug.py")
-    
     print_manager.status("📡 Downloading PSP SPAN-I data using proven pyspedas approach...")
     
     # Convert single timestamp to download range for pyspedas (which requires 2-element trange)
@@ -179,8 +168,8 @@ def vdyes(trange, *variables, force_static=False):
         target_dt = parse(trange[0].replace('/', ' '))
         
         # Find the closest time point
-        time_diffs = [abs((t - target_dt).total_seconds()) for t in epoch]
-        closest_index = time_diffs.index(min(time_diffs))
+        from .vdf_processing import to_epoch_ns, nearest_time_indices
+        closest_index = int(nearest_time_indices(to_epoch_ns(epoch_dt64), to_epoch_ns(target_dt)))
         
         available_times = [epoch[closest_index]]
         available_indices = [closest_index]
@@ -216,20 +205,10 @@ def _create_static_vdf_plot(dat, time_index, epoch):
     from .print_manager import print_manager
     from .data_classes.psp_span_vdf import psp_span_vdf
     
-    # Import VDF processing functions
-    sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'tests'))
-    from test_VDF_smart_bounds_debug import (
-        extract_and_process_vdf_timeslice_EXACT,
-        jaye_exact_theta_plane_processing, 
-        jaye_exact_phi_plane_processing
-    )
-    
-    # Process VDF data using EXACT working functions
-    vdf_data = extract_and_process_vdf_timeslice_EXACT(dat, time_index)
+    from .vdf_processing import process_vdf_cdf
     
-    # Get theta and phi plane data using EXACT working functions
-    vx_theta, vz_theta, df_theta = jaye_exact_theta_plane_processing(vdf_data)
-    vx_phi, vy_phi, df_phi = jaye_exact_phi_plane_processing(vdf_data)
+    # Process VDF data and get theta and phi plane grids for this slice
+    vdf_data, (vx_theta, vz_theta, df_theta), (vx_phi, vy_phi, df_phi) = process_vdf_cdf(dat, [time_index]).timeslice(0)
     
     print_manager.status(f"✅ VDF processing complete")
     print_manager.status(f"   Time: {epoch[time_index]}")
@@ -326,13 +305,10 @@ def _create_vdf_widget(dat, available_times, available_indices, trange):
     
     print_manager.status(f"🎛️ Creating VDF widget with {len(available_times)} time points...")
     
-    # Import VDF processing functions
-    sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'tests'))
-    from test_VDF_smart_bounds_debug import (
-        extract_and_process_vdf_timeslice_EXACT,
-        jaye_exact_theta_plane_processing, 
-        jaye_exact_phi_plane_processing
-    )
+    # Process every slice in one batch; the slider and "Render All" then only index into it
+    from .vdf_processing import process_vdf_cdf
+    vdf_slices = process_vdf_cdf(dat, available_indices)
+    print_manager.status(f"✅ VDF processing complete for {len(vdf_slices)} time slices")
     
     # Create output widget for plots - remove all default styling
     vdf_output = widgets.Output()
@@ -385,9 +361,7 @@ def _create_vdf_widget(dat, available_times, available_indices, trange):
             vdf_output.clear_output(wait=True)
             
             # Process VDF data
-            vdf_data = extract_and_process_vdf_timeslice_EXACT(dat, available_indices[time_index])
-            vx_theta, vz_theta, df_theta = jaye_exact_theta_plane_processing(vdf_data)
-            vx_phi, vy_phi, df_phi = jaye_exact_phi_plane_processing(vdf_data)
+            vdf_data, (vx_theta, vz_theta, df_theta), (vx_phi, vy_phi, df_phi) = vdf_slices.timeslice(time_index)
             
             # Use global VDF instance (Plotbot pattern)
             vdf_class = psp_span_vdf
@@ -487,9 +461,7 @@ def _create_vdf_widget(dat, available_times, available_indices, trange):
         
         # Create plot and save
         time_index = time_slider.value
-        vdf_data = extract_and_process_vdf_timeslice_EXACT(dat, available_indices[time_index])
-        vx_theta, vz_theta, df_theta = jaye_exact_theta_plane_processing(vdf_data)
-        vx_phi, vy_phi, df_phi = jaye_exact_phi_plane_processing(vdf_data)
+        vdf_data, (vx_theta, vz_theta, df_theta), (vx_phi, vy_phi, df_phi) = vdf_slices.timeslice(time_index)
         
         vdf_class = psp_span_vdf
         theta_xlim, theta_ylim = vdf_class.get_theta_square_bounds(vx_theta, vz_theta, df_theta)
@@ -553,71 +525,13 @@ def _create_vdf_widget(dat, available_times, available_indices, trange):
         """Render and save all time slices"""
         setup_default_save_directory()
         status_label.value = f"Status: 🎬 Rendering {len(available_times)} VDF images..."
-        for i, time_obj in enumerate(available_times):
-            filename = f"VDF_{time_obj.strftime('%Y-%m-%d_%Hh_%Mm_%Ss')}.png"
-            filepath = os.path.join(save_directory[0], filename)
-            
-            status_label.value = f"Status: 🎬 Saving {filepath} ({i+1}/{len(available_times)})"
-            
-            # Process and save each time slice
-            vdf_data = extract_and_process_vdf_timeslice_EXACT(dat, available_indices[i])
-            vx_theta, vz_theta, df_theta = jaye_exact_theta_plane_processing(vdf_data)
-            vx_phi, vy_phi, df_phi = jaye_exact_phi_plane_processing(vdf_data)
-            
-            vdf_class = psp_span_vdf
-            theta_xlim, theta_ylim = vdf_class.get_theta_square_bounds(vx_theta, vz_theta, df_theta)
-            phi_xlim, phi_ylim = vdf_class.get_axis_limits('phi', vx_phi, vy_phi, df_phi)
-            
-            # Create complete 3-panel plot for each time slice with explicit white backgrounds
-            fig = plt.figure(figsize=(vdf_class.vdf_figure_width, vdf_class.vdf_figure_height), facecolor='white')
-            fig.patch.set_facecolor('white')  # Ensure figure background is white
-            gs = gridspec.GridSpec(1, 4, width_ratios=[1, 1, 1, 0.05], wspace=0.4)
-            
-            ax1 = fig.add_subplot(gs[0], facecolor='white')  # 1D line plot
-            ax2 = fig.add_subplot(gs[1], facecolor='white')  # θ-plane
-            ax3 = fig.add_subplot(gs[2], facecolor='white')  # φ-plane
-            cax = fig.add_subplot(gs[3], facecolor='white')  # colorbar
-            
-            # 1D collapsed VDF (left panel)
-            vdf_allAngles = np.sum(vdf_data['vdf'], axis=(0,2))
-            vel_1d = vdf_data['vel'][0,:,0]
-            ax1.plot(vel_1d, vdf_allAngles, 'b-', linewidth=2)
-            ax1.set_yscale('log')
-            ax1.set_xlim(0, 1000)
-            ax1.set_xlabel('Velocity (km/s)')
-            ax1.set_ylabel(f'f $(cm^2 \\ s \\ sr \\ eV)^{-1}$')
-            
-            # 2D Theta plane (middle panel)
-            cs2 = ax2.contourf(vx_theta, vz_theta, df_theta, 
-                              locator=ticker.LogLocator(), cmap=vdf_class.vdf_colormap)
-            ax2.set_xlim(theta_xlim)
-            ax2.set_ylim(theta_ylim)
-            ax2.set_xlabel('$v_x$ km/s')
-            ax2.set_ylabel('$v_z$ km/s')
-            ax2.set_title('$\\theta$-plane')
-            
-            # 2D Phi plane (right panel)
-            cs3 = ax3.contourf(vx_phi, vy_phi, df_phi,
-                              locator=ticker.LogLocator(), cmap=vdf_class.vdf_colormap)
-            ax3.set_xlim(phi_xlim)
-            ax3.set_ylim(phi_ylim)
-            ax3.set_xlabel('$v_x$ km/s')
-            ax3.set_ylabel('$v_y$ km/s')
-            ax3.set_title('$\\phi$-plane')
-            
-            # Colorbar
-            cbar = fig.colorbar(cs2, cax=cax)
-            cbar.set_label(f'f $(cm^2 \\ s \\ sr \\ eV)^{-1}$')
-            
-            # Title with time
-            time_str = time_obj.strftime("%Y-%m-%d %H:%M:%S")
-            fig.suptitle(f'PSP SPAN-I VDF - {time_str}', y=1.02, fontsize=14)
-            
-            plt.savefig(filepath, dpi=300, bbox_inches='tight')
-            plt.close(fig)
-            
-            if (i + 1) % 10 == 0:
-                status_label.value = f"Status: 🎬 Progress: {i + 1}/{len(available_times)} images saved"
+        from .vdf_batch import render_vdf_frames
+        
+        def report_progress(done, total):
+            status_label.value = f"Status: 🎬 Progress: {done}/{total} images saved"
+        
+        # Frames come from the already processed slices and render across a process pool
+        render_vdf_frames(vdf_slices, available_times, save_directory[0], progress=report_progress)
         
         status_label.value = f"Status: ✅ Complete! All {len(available_times)} images saved to {save_directory[0]}"
     
@@ -0,0 +1,12 @@
+"""
+Performance benchmarks for the Plotbot data pipeline.
+
+Every benchmark reads synthetic PSP-shaped CDFs (tests/synthetic_cdf.py)
+from a temporary data directory, so the suite runs offline:
+- CDF import (import_data_function)
+- Array merging (UltimateMergeEngine.merge_arrays)
+- plot_manager time clipping
+- Custom variable evaluation
+- multiplot rendering (Agg)
+- Snapshot save/load
+"""
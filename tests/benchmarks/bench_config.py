@@ -0,0 +1,15 @@
+#tests/benchmarks/bench_config.py
+"""
+Settings shared by the benchmark fixtures (conftest.py) and the benchmarks.
+
+PLOTBOT_BENCH_MINUTES sets the synthetic data duration (default 10 minutes)
+and PLOTBOT_BENCH_ROUNDS the rounds timed without pytest-benchmark (default 3).
+"""
+
+import os
+from datetime import datetime
+
+BENCHMARK_START = datetime(2021, 4, 29, 6, 0, 0)
+BENCHMARK_MINUTES = float(os.environ.get('PLOTBOT_BENCH_MINUTES', '10'))
+BENCHMARK_ROUNDS = int(os.environ.get('PLOTBOT_BENCH_ROUNDS', '3'))
+BENCHMARK_DATA_TYPES = ['mag_RTN', 'spi_sf00_l3_mom', 'spe_sf0_pad', 'dfb_ac_spec_dv12hg']
@@ -0,0 +1,111 @@
+"""
+Fixtures for the benchmark suite.
+
+- synthetic_trange: writes synthetic CDFs for BENCHMARK_DATA_TYPES (bench_config.py) into a
+  temporary data directory (config.data_server = 'berkeley', so get_data finds
+  them locally and never goes online) and returns the time range they cover.
+  PLOTBOT_BENCH_MINUTES sets the duration (default 10 minutes; 293 Hz mag_RTN
+  makes about 176k records per 10 minutes). The trackers (including the
+  current TimeRangeTracker range) and the benchmark data classes are reset
+  before the first benchmark and after the last.
+- benchmark: provided by pytest-benchmark when it is installed. Otherwise a
+  minimal stand-in with the same call styles (benchmark(func, *args) and
+  benchmark.pedantic(...)) times PLOTBOT_BENCH_ROUNDS rounds (default 3) and
+  prints min/mean per test.
+"""
+
+import os
+import sys
+import time
+import statistics
+from datetime import timedelta
+
+import pytest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+from plotbot.config import config
+from tests.synthetic_cdf import write_synthetic_cdfs
+from plotbot.time_utils import TimeRangeTracker
+from tests.benchmarks.bench_config import BENCHMARK_START, BENCHMARK_MINUTES, BENCHMARK_ROUNDS, BENCHMARK_DATA_TYPES
+
+def _trange_str(moment):
+    return moment.strftime('%Y-%m-%d/%H:%M:%S.%f')[:-3]
+
+def _reset_loaded_instances():
+    """Empty the trackers and the data classes the benchmarks fill, so neither earlier nor later tests see stale state."""
+    from plotbot.data_cubby import data_cubby
+    from plotbot.data_tracker import global_tracker
+
+    TimeRangeTracker.clear_trange()
+    global_tracker.imported_ranges.clear()
+    global_tracker.calculated_ranges.clear()
+    # Snapshot loads may stash a second instance under the data_type key; reset each one once
+    instances = {id(instance): instance for instance in data_cubby.class_registry.values()
+                 if getattr(instance, 'data_type', None) in BENCHMARK_DATA_TYPES}
+    for instance in instances.values():
+        instance.__init__(None)
+
+@pytest.fixture(scope='package')
+def synthetic_trange(tmp_path_factory):
+    """Time range covered by synthetic files for every BENCHMARK_DATA_TYPES entry."""
+    trange = [_trange_str(BENCHMARK_START), _trange_str(BENCHMARK_START + timedelta(minutes=BENCHMARK_MINUTES))]
+    data_dir = str(tmp_path_factory.mktemp('synthetic_psp'))
+    original_data_dir, original_server = config._data_dir, config.data_server
+    original_trange = (TimeRangeTracker._current_trange, TimeRangeTracker._last_updated)
+    config._data_dir = data_dir  # Skip the data_dir setter's side effects
+    config.data_server = 'berkeley'
+    try:
+        for data_type in BENCHMARK_DATA_TYPES:
+            write_synthetic_cdfs(trange, data_type, whole_files=False)
+        _reset_loaded_instances()  # Earlier tests may have loaded other ranges or set the current trange
+        yield trange
+    finally:
+        config._data_dir, config.data_server = original_data_dir, original_server
+        _reset_loaded_instances()
+        TimeRangeTracker._current_trange, TimeRangeTracker._last_updated = original_trange
+
+try:
+    import pytest_benchmark  # noqa: F401 (provides the real `benchmark` fixture)
+except ImportError:
+    class _FallbackBenchmark:
+        """Times a callable for a few rounds; covers the pytest-benchmark calls used in this suite."""
+
+        def __init__(self, name, rounds):
+            self.name = name
+            self.rounds = rounds
+            self.times = []
+            self.extra_info = {}
+
+        def _run(self, target, args, kwargs, setup, rounds, iterations):
+            result = None
+            for _ in range(rounds):
+                if setup is not None:
+                    prepared = setup()
+                    if prepared is not None:
+                        args, kwargs = prepared
+                start = time.perf_counter()
+                for _ in range(iterations):
+                    result = target(*args, **kwargs)
+                self.times.append((time.perf_counter() - start) / iterations)
+            return result
+
+        def __call__(self, target, *args, **kwargs):
+            return self._run(target, args, kwargs, None, self.rounds, 1)
+
+        def pedantic(self, target, args=(), kwargs=None, setup=None, rounds=1, iterations=1, warmup_rounds=0):
+            if warmup_rounds:
+                self._run(target, args, kwargs or {}, setup, warmup_rounds, iterations)
+                self.times.clear()
+            return self._run(target, args, kwargs or {}, setup, rounds, iterations)
+
+        def report(self):
+            if self.times:
+                print(f"\n[benchmark] {self.name}: min {min(self.times) * 1e3:.2f} ms, "
+                      f"mean {statistics.mean(self.times) * 1e3:.2f} ms over {len(self.times)} rounds {self.extra_info or ''}")
+
+    @pytest.fixture
+    def benchmark(request):
+        bench = _FallbackBenchmark(request.node.name, BENCHMARK_ROUNDS)
+        yield bench
+        bench.report()
@@ -0,0 +1,219 @@
+#tests/benchmarks/startup_benchmark.py
+"""
+Cold-process startup and first-call latency benchmarks.
+
+Each measurement runs in a fresh Python process, so nothing is warm:
+
+- import_plotbot: `import plotbot`, with ImportTimer enabled to attribute the
+  time to the time_block sections of plotbot/__init__.py (and lazy loads)
+- first_get_data / second_get_data: get_data for one hour of mag_RTN_4sa
+- first_plotbot: the first plotbot() render of the same variable (Agg backend)
+
+get_data and plotbot() read synthetic CDFs (tests/synthetic_cdf.py) from a
+temporary data directory with config.data_server = 'berkeley', so no network
+is used. Every benchmark runs `repeat` times and the fastest run counts.
+
+Results are appended to a JSON history in the user cache directory
+($XDG_CACHE_HOME/plotbot, default ~/.cache/plotbot) and compared with the
+median of the previous runs on the same machine and Python; a metric slower
+than that by more than `threshold` (and by more than MIN_DELTA seconds) is a
+regression:
+
+    python -m tests.benchmarks.startup_benchmark             # run, compare, save
+    python -m tests.benchmarks.startup_benchmark --repeat 5 --threshold 0.15
+    python -m tests.benchmarks.startup_benchmark --no-save --history /tmp/history.json
+
+The command exits with status 1 when a regression is found.
+"""
+import os
+import sys
+import json
+import platform
+import argparse
+import tempfile
+import statistics
+import subprocess
+from datetime import datetime
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, PROJECT_ROOT)
+
+CACHE_DIR = os.path.join(os.environ.get('XDG_CACHE_HOME') or os.path.expanduser(os.path.join('~', '.cache')), 'plotbot')
+DEFAULT_HISTORY = os.path.join(CACHE_DIR, 'startup_benchmark_history.json')
+DEFAULT_THRESHOLD = 0.25  # Fractional slowdown against the baseline that counts as a regression
+MIN_DELTA = 0.05  # Seconds; smaller differences are noise
+BASELINE_RUNS = 5  # Previous runs the baseline median is taken over
+BENCHMARK_TRANGE = ['2020-01-29/01:00:00', '2020-01-29/02:00:00']
+
+# Run in the child process: prints one "RESULT {json}" line
+_CHILD_SCRIPT = r'''
+import importlib.util, json, os, sys, time
+project_root, mode, data_dir = sys.argv[1:4]
+sys.path.insert(0, project_root)
+
+# Install an enabled ImportTimer as plotbot.import_timer before plotbot imports it
+spec = importlib.util.spec_from_file_location('plotbot.import_timer', os.path.join(project_root, 'plotbot', 'import_timer.py'))
+import_timer = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(import_timer)
+import_timer.timer.enabled = True
+sys.modules['plotbot.import_timer'] = import_timer
+
+start = time.perf_counter()
+import plotbot
+result = {'import_plotbot': time.perf_counter() - start,
+          'blocks': {name: sum(times) for name, times in import_timer.timer.block_times.items()},
+          'version': plotbot.__version__}
+import_timer.timer.enabled = False
+
+if mode != 'import':
+    plotbot.print_manager.show_status = False
+    plotbot.config.data_dir = data_dir
+    plotbot.config.data_server = 'berkeley'
+    trange = json.loads(sys.argv[4])
+    if mode == 'get_data':
+        start = time.perf_counter()
+        plotbot.get_data(trange, plotbot.mag_rtn_4sa.br)
+        result['first_get_data'] = time.perf_counter() - start
+        start = time.perf_counter()
+        plotbot.get_data(trange, plotbot.mag_rtn_4sa.br)
+        result['second_get_data'] = time.perf_counter() - start
+    elif mode == 'plotbot':
+        start = time.perf_counter()
+        plotbot.plotbot(trange, plotbot.mag_rtn_4sa.br, 1)
+        result['first_plotbot'] = time.perf_counter() - start
+print('RESULT ' + json.dumps(result))
+'''
+
+# Benchmark name -> child mode that measures it
+BENCHMARKS = {
+    'import_plotbot': 'import',
+    'first_get_data': 'get_data',
+    'second_get_data': 'get_data',
+    'first_plotbot': 'plotbot',
+}
+
+def _run_child(mode, data_dir, timeout=600):
+    env = dict(os.environ, MPLBACKEND='Agg')
+    completed = subprocess.run([sys.executable, '-c', _CHILD_SCRIPT, PROJECT_ROOT, mode, data_dir,
+                                json.dumps(BENCHMARK_TRANGE)],
+                               capture_output=True, text=True, timeout=timeout, env=env, cwd=PROJECT_ROOT)
+    if completed.returncode != 0 or 'RESULT ' not in completed.stdout:
+        raise RuntimeError(f"Benchmark process ({mode}) failed:\n{completed.stderr[-2000:]}")
+    return json.loads(completed.stdout.rsplit('RESULT ', 1)[1])
+
+def run_benchmarks(repeat=3, benchmarks=None):
+    """
+    Run the cold-process benchmarks.
+
+    Args:
+        repeat (int): Fresh processes per mode; the fastest value of each metric counts.
+        benchmarks (list, optional): Names from BENCHMARKS; defaults to all of them.
+
+    Returns:
+        dict: Record with metrics (seconds), import_blocks (seconds per time_block
+        of the fastest import), version, machine details and a timestamp.
+    """
+    from plotbot.config import config
+    from tests.synthetic_cdf import write_synthetic_cdfs
+
+    names = list(benchmarks or BENCHMARKS)
+    modes = sorted({BENCHMARKS[name] for name in names} | {'import'})
+    metrics = {}
+    blocks = {}
+    version = None
+    with tempfile.TemporaryDirectory(prefix='plotbot_bench_') as data_dir:
+        if modes != ['import']:
+            original_data_dir = config._data_dir
+            config._data_dir = data_dir  # Write the fixtures without the data_dir setter's side effects
+            try:
+                write_synthetic_cdfs(BENCHMARK_TRANGE, 'mag_RTN_4sa')
+            finally:
+                config._data_dir = original_data_dir
+        for mode in modes:
+            for _ in range(repeat):
+                result = _run_child(mode, data_dir)
+                version = result['version']
+                if mode == 'import' and result['import_plotbot'] < metrics.get('import_plotbot', float('inf')):
+                    blocks = result['blocks']
+                for name, mode_of_name in BENCHMARKS.items():
+                    if mode_of_name == mode and name in result:
+                        metrics[name] = min(metrics.get(name, float('inf')), result[name])
+    return {
+        'timestamp': datetime.now().isoformat(timespec='seconds'),
+        'version': version,
+        'machine': machine_id(),
+        'repeat': repeat,
+        'metrics': {name: metrics[name] for name in names if name in metrics},
+        'import_blocks': dict(sorted(blocks.items(), key=lambda item: -item[1])),
+    }
+
+def machine_id():
+    """Runs are only compared with earlier runs from the same host and Python."""
+    return f"{platform.node()}|{platform.machine()}|python{platform.python_version()}"
+
+def load_history(path=DEFAULT_HISTORY):
+    """Previous benchmark records (oldest first); empty if there is no history yet."""
+    if not os.path.exists(path):
+        return []
+    with open(path) as f:
+        return json.load(f)
+
+def save_history(history, path=DEFAULT_HISTORY):
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    with open(path, 'w') as f:
+        json.dump(history, f, indent=2)
+
+def compare(record, history, threshold=DEFAULT_THRESHOLD, min_delta=MIN_DELTA, baseline_runs=BASELINE_RUNS):
+    """
+    Compare a record with the median of the last baseline_runs records from the same machine.
+
+    Returns:
+        list: One dict per metric with name, current, baseline (None without
+        history), change (fraction) and regression (bool).
+    """
+    same_machine = [past for past in history if past.get('machine') == record['machine']][-baseline_runs:]
+    rows = []
+    for name, current in record['metrics'].items():
+        previous = [past['metrics'][name] for past in same_machine if name in past.get('metrics', {})]
+        baseline = statistics.median(previous) if previous else None
+        change = (current - baseline) / baseline if baseline else None
+        regression = baseline is not None and current - baseline > min_delta and change > threshold
+        rows.append({'name': name, 'current': current, 'baseline': baseline, 'change': change, 'regression': regression})
+    return rows
+
+def format_report(record, rows):
+    lines = [f"Plotbot startup benchmarks ({record['version']}, best of {record['repeat']})"]
+    for row in rows:
+        if row['baseline'] is None:
+            lines.append(f"  {row['name']:<16} {row['current']:8.3f}s  (no baseline)")
+        else:
+            flag = '  REGRESSION' if row['regression'] else ''
+            lines.append(f"  {row['name']:<16} {row['current']:8.3f}s  baseline {row['baseline']:.3f}s "
+                         f"({row['change']:+.0%}){flag}")
+    lines.append("  import_plotbot by block:")
+    for name, seconds in list(record['import_blocks'].items())[:10]:
+        lines.append(f"    {name:<32} {seconds:8.3f}s")
+    return '\n'.join(lines)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--repeat', type=int, default=3, help='fresh processes per benchmark (best counts)')
+    parser.add_argument('--threshold', type=float, default=DEFAULT_THRESHOLD, help='allowed fractional slowdown')
+    parser.add_argument('--history', default=DEFAULT_HISTORY, help='JSON history file')
+    parser.add_argument('--no-save', action='store_true', help='do not append this run to the history')
+    parser.add_argument('benchmarks', nargs='*', help=f"benchmarks to run (default: all of {', '.join(BENCHMARKS)})")
+    args = parser.parse_args(argv)
+    unknown = [name for name in args.benchmarks if name not in BENCHMARKS]
+    if unknown:
+        parser.error(f"unknown benchmarks: {', '.join(unknown)}")
+
+    record = run_benchmarks(repeat=args.repeat, benchmarks=args.benchmarks or None)
+    history = load_history(args.history)
+    rows = compare(record, history, threshold=args.threshold)
+    print(format_report(record, rows))
+    if not args.no_save:
+        save_history(history + [record], args.history)
+    return 1 if any(row['regression'] for row in rows) else 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,138 @@
+#tests/benchmarks/test_pipeline_benchmarks.py
+# To run tests from the project root directory and see print output in the console:
+# conda run -n plotbot_env python -m pytest tests/benchmarks/test_pipeline_benchmarks.py -vv -s
+
+"""
+End-to-end pipeline benchmarks on synthetic PSP data (see conftest.py): CDF
+import for each synthetic product, UltimateMergeEngine merges, plot_manager
+clipping, custom variable evaluation, multiplot rendering and snapshot
+save/load. Each benchmark also checks its result, so a fast wrong answer
+fails. Use PLOTBOT_BENCH_MINUTES to scale the data and PLOTBOT_BENCH_ROUNDS
+(without pytest-benchmark) to change the rounds.
+"""
+
+import os
+import sys
+import numpy as np
+import pytest
+import matplotlib
+matplotlib.use('Agg')
+import matplotlib.pyplot as mpl_plt
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+import plotbot
+from plotbot.data_import import import_data_function
+from plotbot.data_cubby import data_cubby, ultimate_merger
+from plotbot.data_tracker import global_tracker
+from tests.synthetic_cdf import SYNTHETIC_DATA_TYPES
+from plotbot.data_snapshot import save_data_snapshot, load_data_snapshot
+from tests.benchmarks.bench_config import BENCHMARK_DATA_TYPES
+
+def _inner_trange(trange, start_fraction, end_fraction):
+    """Sub-range of trange between two fractions of its length."""
+    start, end = np.datetime64(trange[0].replace('/', 'T')), np.datetime64(trange[1].replace('/', 'T'))
+    span = end - start
+    return [str(start + span * start_fraction).replace('T', '/'), str(start + span * end_fraction).replace('T', '/')]
+
+def _remove_custom_variable(name):
+    """Unregister a custom variable so later tests never see it."""
+    container = data_cubby.grab('custom_variables')
+    for registry in (container.variables, container.sources, container.operations, getattr(container, 'callables', {})):
+        registry.pop(name, None)
+    global_tracker.clear_calculation_cache('custom_data_type', name)
+    if hasattr(plotbot, name):
+        delattr(plotbot, name)
+
+@pytest.mark.parametrize('data_type', BENCHMARK_DATA_TYPES)
+def test_import_data_function(benchmark, synthetic_trange, data_type):
+    result = benchmark(import_data_function, synthetic_trange, data_type)
+    assert len(result.times) > 0 and np.all(np.diff(result.times) > 0)
+    assert set(SYNTHETIC_DATA_TYPES[data_type]['variables']) <= set(result.data)
+
+def test_merge_arrays_with_overlap(benchmark, synthetic_trange):
+    plotbot.get_data(synthetic_trange, plotbot.mag_rtn.br)
+    times = np.asarray(plotbot.mag_rtn.time)
+    raw_data = {key: np.asarray(value) for key, value in plotbot.mag_rtn.raw_data.items()
+                if key != 'all' and value is not None and len(value) == len(times)}
+    split = len(times) * 3 // 5
+    overlap = len(times) // 5
+    existing = (times[:split], {key: value[:split] for key, value in raw_data.items()})
+    new = (times[split - overlap:], {key: value[split - overlap:] for key, value in raw_data.items()})
+
+    merged_times, merged_data = benchmark(ultimate_merger.merge_arrays, existing[0], existing[1], new[0], new[1])
+    np.testing.assert_array_equal(merged_times, times)
+    np.testing.assert_array_equal(merged_data['br'], raw_data['br'])
+
+@pytest.mark.parametrize('method', ['requested_trange', 'clip_to_original_trange'])
+def test_plot_manager_clipping(benchmark, synthetic_trange, method):
+    plotbot.get_data(synthetic_trange, plotbot.mag_rtn.br)
+    br = plotbot.mag_rtn.br
+    first, second = _inner_trange(synthetic_trange, 0.1, 0.5), _inner_trange(synthetic_trange, 0.4, 0.9)
+    full = br.view(np.ndarray)
+
+    if method == 'requested_trange':
+        def clip_twice():  # Alternate ranges so the setter never short-circuits
+            br.requested_trange = first
+            n_first = len(br.data)
+            br.requested_trange = second
+            return n_first, len(br.data)
+    else:
+        def clip_twice():
+            return len(br.clip_to_original_trange(full, first)), len(br.clip_to_original_trange(full, second))
+
+    try:
+        n_first, n_second = benchmark(clip_twice)
+    finally:
+        br.requested_trange = None
+    rate_hz = SYNTHETIC_DATA_TYPES['mag_RTN']['rate_hz']
+    assert abs(n_first - 0.4 * len(full)) <= rate_hz and abs(n_second - 0.5 * len(full)) <= rate_hz
+
+def test_custom_variable_evaluation(benchmark, synthetic_trange):
+    name = 'bench_phi_B'
+    plotbot.get_data(synthetic_trange, plotbot.mag_rtn.br)
+    plotbot.custom_variable(name, lambda: np.degrees(np.arctan2(plotbot.mag_rtn.br, plotbot.mag_rtn.bn)) + 180)
+
+    def evaluate():
+        global_tracker.clear_calculation_cache('custom_data_type', name)  # Force re-evaluation each round
+        plotbot.get_data(synthetic_trange, getattr(plotbot, name))
+        return getattr(plotbot, name)
+
+    try:
+        phi_b = benchmark(evaluate)
+        expected = np.degrees(np.arctan2(plotbot.mag_rtn.br.data, plotbot.mag_rtn.bn.data)) + 180
+        np.testing.assert_allclose(np.asarray(phi_b.data), expected)
+    finally:
+        _remove_custom_variable(name)
+
+def test_multiplot_render(benchmark, synthetic_trange):
+    center = _inner_trange(synthetic_trange, 0.5, 0.5)[0]
+    plot_list = [(center, plotbot.mag_rtn.br), (center, plotbot.proton.anisotropy),
+                 (center, plotbot.epad.strahl), (center, plotbot.psp_dfb.ac_spec_dv12)]
+    plotbot.plt.options.reset()
+    plotbot.plt.options.window = '00:06:00.000'  # Stays inside the synthetic files
+
+    def render():
+        fig, axs = plotbot.multiplot(plot_list)
+        fig.canvas.draw()
+        mpl_plt.close('all')
+        return axs
+
+    try:
+        axs = benchmark(render)
+    finally:
+        plotbot.plt.options.reset()
+    assert len(axs) == len(plot_list)
+
+def test_snapshot_save_and_load(benchmark, synthetic_trange, tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)  # save_data_snapshot creates data_snapshots/ in the working directory
+    plotbot.get_data(synthetic_trange, plotbot.mag_rtn.br, plotbot.proton.anisotropy)
+    n_records = len(plotbot.mag_rtn.datetime_array)
+    path = str(tmp_path / 'bench_snapshot.pkl')
+
+    def save_and_load():
+        assert save_data_snapshot(path, classes=[plotbot.mag_rtn, plotbot.proton])
+        return load_data_snapshot(path, classes=['mag_RTN', 'spi_sf00_l3_mom'])
+
+    assert benchmark(save_and_load)
+    assert len(plotbot.mag_rtn.datetime_array) == n_records
@@ -73,7 +73,51 @@ def reset_plot_config():
     
     # Restore debug setting only
     plot_config.debug = original_debug
-    
+
+@pytest.fixture
+def synthetic_data_trange(request, tmp_path, monkeypatch):
+    """
+    Offline data for one test: synthetic CDFs in tmp_path/data with
+    config.data_server = 'berkeley', so get_data never goes online.
+
+    Yields the time range the files cover (default 10 minutes of mag_RTN_4sa
+    from 2021-04-29 06:00). Override with indirect parametrization:
+
+        @pytest.mark.parametrize('synthetic_data_trange',
+                                 [{'trange': [...], 'data_type': 'mag_RTN'}], indirect=True)
+
+    The trackers, the current TimeRangeTracker range and the data class
+    instances of that data type are reset before the test and after it.
+    """
+    from plotbot.config import config
+    from plotbot.data_cubby import data_cubby
+    from plotbot.data_tracker import global_tracker
+    from plotbot.time_utils import TimeRangeTracker
+    from tests.synthetic_cdf import write_synthetic_cdfs
+
+    options = getattr(request, 'param', {})
+    trange = options.get('trange', ['2021-04-29/06:00:00.000', '2021-04-29/06:10:00.000'])
+    data_type = options.get('data_type', 'mag_RTN_4sa')
+
+    def reset():
+        global_tracker.imported_ranges.clear()
+        global_tracker.calculated_ranges.clear()
+        instances = {id(instance): instance for instance in data_cubby.class_registry.values()
+                     if getattr(instance, 'data_type', None) == data_type}
+        for instance in instances.values():
+            instance.__init__(None)
+
+    monkeypatch.setattr(config, '_data_dir', str(tmp_path / 'data'))  # Skip the data_dir setter's side effects
+    monkeypatch.setattr(config, 'data_server', 'berkeley')
+    monkeypatch.setattr(TimeRangeTracker, '_current_trange', TimeRangeTracker._current_trange)
+    monkeypatch.setattr(TimeRangeTracker, '_last_updated', TimeRangeTracker._last_updated)
+    write_synthetic_cdfs(trange, data_type, whole_files=False)
+    reset()
+    try:
+        yield trange
+    finally:
+        reset()
+
 # Register the write_test_report fixture to run for the whole session
 pytest.main.write_test_report = write_test_report 
 
@@ -0,0 +1,184 @@
+#tests/synthetic_cdf.py
+"""
+Synthetic PSP-shaped CDF files for benchmarks and offline tests.
+
+Files are written with cdflib's writer under config.data_dir, with the
+directory layout, file names and variable names import_data_function expects
+from data_types.py, so get_data and plotbot() load them like downloaded data
+(config.data_server = 'berkeley' finds them locally and never goes online):
+
+    config.data_dir = '/tmp/bench_data'
+    write_synthetic_cdfs(['2020-01-29/00:00', '2020-01-29/06:00'], 'mag_RTN_4sa')
+
+Every file covering the time range is written whole (a day, or a 6-hour block
+for 6-hour data types) unless whole_files=False, which writes only the records
+inside the time range; that keeps 293 Hz mag_RTN fixtures small when a
+benchmark needs minutes rather than days. Values are seeded random noise
+around plausible magnitudes; only the shapes, cadences and types match the
+real products:
+
+    mag_RTN_4sa           4 samples/cycle MAG RTN          (daily)
+    mag_RTN               293 Hz MAG RTN                   (6-hour)
+    spi_sf00_l3_mom       SPAN-i moments and flux spectra  (daily)
+    spe_sf0_pad           SPAN-e pitch angle distributions (daily)
+    dfb_ac_spec_dv12hg    FIELDS DFB AC spectra            (daily)
+"""
+import os
+import math
+from datetime import datetime, timedelta
+
+import numpy as np
+import cdflib
+from cdflib.cdfwrite import CDF as CDFWriter
+from dateutil.parser import parse
+
+from plotbot.print_manager import print_manager
+from plotbot.prefetch import plan_prefetch
+
+CDF_FLOAT = 21
+CDF_TIME_TT2000 = 33
+
+def _mag_vectors(rng, n_records):
+    """RTN field in nT: a steady radial field with fluctuations."""
+    return (rng.normal(0.0, 5.0, (n_records, 3)) + np.array([-40.0, 5.0, 0.0])).astype(np.float32)
+
+def _normal(mean, sigma):
+    """Generator for Gaussian noise around mean (a scalar, or one row for per-record vectors)."""
+    mean = np.asarray(mean, dtype=np.float64)
+    return lambda rng, n_records: (rng.normal(0.0, sigma, (n_records,) + mean.shape) + mean).astype(np.float32)
+
+def _flux(*dims, level=8.0):
+    """Generator for positive log-normal fluxes of shape (n_records, *dims)."""
+    return lambda rng, n_records: rng.lognormal(level, 1.0, (n_records,) + dims).astype(np.float32)
+
+def _bins(values):
+    """Generator repeating one row of bin centres for every record, as the L2/L3 files store them."""
+    row = np.asarray(values, dtype=np.float32)
+    return lambda rng, n_records: np.broadcast_to(row, (n_records,) + row.shape).copy()
+
+# data_types.py key -> cadence, epoch variable and generated data variables
+SYNTHETIC_DATA_TYPES = {
+    'mag_RTN_4sa': {
+        'rate_hz': 4 / 0.8738,  # 4 samples per ~0.874 s cycle
+        'epoch_var': 'epoch_mag_RTN_4_Sa_per_Cyc',
+        'variables': {'psp_fld_l2_mag_RTN_4_Sa_per_Cyc': _mag_vectors},
+    },
+    'mag_RTN': {
+        'rate_hz': 256 / 0.8738,  # ~293 Hz
+        'epoch_var': 'epoch_mag_RTN',
+        'variables': {'psp_fld_l2_mag_RTN': _mag_vectors},
+    },
+    'spi_sf00_l3_mom': {
+        'rate_hz': 1 / 3.5,
+        'epoch_var': 'Epoch',
+        'variables': {
+            'VEL_RTN_SUN': _normal([350.0, 20.0, 0.0], 20.0),  # km/s
+            'DENS': _normal(100.0, 10.0),  # cm^-3
+            'TEMP': _normal(30.0, 3.0),  # eV
+            'MAGF_INST': _mag_vectors,
+            'T_TENSOR_INST': _normal([30.0, 30.0, 30.0, 0.0, 0.0, 0.0], 1.0),  # xx, yy, zz, xy, xz, yz
+            'EFLUX_VS_ENERGY': _flux(32),
+            'EFLUX_VS_THETA': _flux(8),
+            'EFLUX_VS_PHI': _flux(8),
+            'ENERGY_VALS': _bins(np.geomspace(20000.0, 50.0, 32)),  # eV, descending like the sweep
+            'THETA_VALS': _bins(np.linspace(-52.5, 52.5, 8)),
+            'PHI_VALS': _bins(np.linspace(101.25, 185.25, 8)),
+            'SUN_DIST': _normal(1.5e7, 1.0e3),  # km
+        },
+    },
+    'spe_sf0_pad': {
+        'rate_hz': 1 / 7.0,
+        'epoch_var': 'Epoch',
+        'variables': {
+            'EFLUX_VS_PA_E': _flux(12, 32),  # pitch angle x energy
+            'PITCHANGLE': _bins(np.linspace(7.5, 172.5, 12)),
+        },
+    },
+    'dfb_ac_spec_dv12hg': {
+        'rate_hz': 1 / 0.8738,  # One spectrum per cycle
+        'epoch_var': 'epoch',
+        'variables': {
+            'psp_fld_l2_dfb_ac_spec_dV12hg': _flux(56, level=-20.0),  # V^2/Hz
+            'psp_fld_l2_dfb_ac_spec_dV12hg_frequency_bins': _bins(np.geomspace(10.0, 7.5e4, 56)),
+        },
+    },
+}
+
+def write_cdf(path, epoch_var, epochs, variables, global_attrs=None):
+    """
+    Write a CDF with one TT2000 epoch variable and record-varying data variables.
+
+    Args:
+        path (str): Output file (replaced if it exists).
+        epoch_var (str): Name of the epoch variable.
+        epochs (np.ndarray): int64 TT2000 nanoseconds, one per record.
+        variables (dict): Name -> array with len(epochs) records (float32).
+        global_attrs (dict, optional): Global attribute name -> value.
+    """
+    writer = CDFWriter(path, cdf_spec={'Majority': 'Row_major'}, delete=True)
+    try:
+        writer.write_globalattrs({name: {0: value} for name, value in (global_attrs or {}).items()})
+        writer.write_var({'Variable': epoch_var, 'Data_Type': CDF_TIME_TT2000, 'Num_Elements': 1,
+                          'Rec_Vary': True, 'Dim_Sizes': []},
+                         var_attrs={}, var_data=np.asarray(epochs, dtype=np.int64))
+        for name, values in variables.items():
+            writer.write_var({'Variable': name, 'Data_Type': CDF_FLOAT, 'Num_Elements': 1,
+                              'Rec_Vary': True, 'Dim_Sizes': list(values.shape[1:])},
+                             var_attrs={'DEPEND_0': epoch_var}, var_data=values)
+    finally:
+        writer.close()
+
+def _slot_span(date_info):
+    """Start and length of the file covering a manifest slot."""
+    start = datetime.strptime(date_info['date_str'], '%Y%m%d')
+    if date_info['is_hourly']:
+        return start + timedelta(hours=int(date_info['hour_str'])), timedelta(hours=6)
+    return start, timedelta(days=1)
+
+def _record_range(start, span, rate_hz, trange_bounds):
+    """First and end record index of a file, limited to trange_bounds (start, end) when given."""
+    first, end = 0, int(span.total_seconds() * rate_hz)
+    if trange_bounds is not None:
+        first = max(first, math.ceil((trange_bounds[0] - start).total_seconds() * rate_hz))
+        end = min(end, math.floor((trange_bounds[1] - start).total_seconds() * rate_hz) + 1)
+    return first, max(first, end)
+
+def write_synthetic_cdfs(trange, data_type, rate_hz=None, version=1, seed=0, whole_files=True):
+    """
+    Write synthetic files for data_type covering trange under config.data_dir.
+
+    Args:
+        trange (list): Time range [start, end].
+        data_type (str): A key of SYNTHETIC_DATA_TYPES.
+        rate_hz (float, optional): Sample rate; defaults to the product's cadence.
+        version (int): _vNN written into the file names.
+        seed (int): Random seed, so repeated runs write identical files.
+        whole_files (bool): Write every overlapping file whole; if False, only the
+            records inside trange (files that would be empty are skipped).
+
+    Returns:
+        list: Paths of the files written.
+    """
+    spec = SYNTHETIC_DATA_TYPES[data_type]
+    rate_hz = rate_hz or spec['rate_hz']
+    trange_bounds = None if whole_files else tuple(parse(t).replace(tzinfo=None) for t in trange)
+    rng = np.random.default_rng(seed)
+    paths = []
+    for item in plan_prefetch(trange, [data_type], server_mode='berkeley'):
+        start, span = _slot_span(item['date_info'])
+        first, end = _record_range(start, span, rate_hz, trange_bounds)
+        n_records = end - first
+        if n_records == 0:
+            continue
+        start_tt2000 = cdflib.cdfepoch.compute_tt2000([start.year, start.month, start.day, start.hour, 0, 0, 0, 0, 0])
+        epochs = start_tt2000 + (np.arange(first, end) * (1e9 / rate_hz)).astype(np.int64)
+        variables = {name: make(rng, n_records) for name, make in spec['variables'].items()}
+        os.makedirs(item['local_dir'], exist_ok=True)
+        path = os.path.join(item['local_dir'], item['local_pattern'].replace('_v*', f'_v{version:02d}'))
+        write_cdf(path, spec['epoch_var'], epochs, variables,
+                  {'Project': 'PSP (synthetic)', 'Logical_source': data_type})
+        print_manager.debug(f"Wrote synthetic {data_type} file {path} ({n_records} records)")
+        paths.append(path)
+    return paths
+
+__all__ = ['write_synthetic_cdfs', 'write_cdf', 'SYNTHETIC_DATA_TYPES']
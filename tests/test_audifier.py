@@ -390,3 +390,262 @@ def test_audify_uses_existing_encounter_dir(): # No monkeypatch needed
             shutil.rmtree(base_temp_dir)
         except Exception as e:
             print(f"Error cleaning up base temp dir {base_temp_dir}: {e}")
+
+# --- Streaming mode (synthetic chunks, no downloads) ---
+
+def _synthetic_component_data(n=50_000, seed=3):
+    rng = np.random.default_rng(seed)
+    times = np.datetime64('2023-09-28T06:00:00', 'ns') + (np.arange(n) * 1e9 / 292.9).astype('timedelta64[ns]')
+    left = np.cumsum(rng.standard_normal(n)) * 0.3 + 40
+    right = np.sin(np.arange(n) * 0.01) * 5
+    for data in (left, right):
+        data[:7] = np.nan                   # leading gap
+        data[9_990:10_020] = np.nan         # gap across a chunk edge
+        data[20_000:30_000:997] = np.nan    # scattered samples
+        data[-13:] = np.nan                 # trailing gap
+    right[25_000:35_000] = np.nan           # gap longer than a chunk
+    return times, left, right
+
+def _chunks(times, arrays, size=4_000):
+    return [(times[i:i + size], [a[i:i + size] for a in arrays]) for i in range(0, len(times), size)]
+
+def _stream_wav(path, times, arrays, channels, fade_samples, sample_rate=44100):
+    from plotbot.audio_stream import StreamingWavWriter, NanFiller, scan_ranges, normalize_chunk_to_int16
+    ranges = scan_ranges(_chunks(times, arrays))
+    fillers = [NanFiller() for _ in arrays]
+    with StreamingWavWriter(path, sample_rate, channels, fade_samples) as wav:
+        for _, chunk in _chunks(times, arrays):
+            wav.write(*(normalize_chunk_to_int16(f.push(x), *r) for f, x, r in zip(fillers, chunk, ranges)))
+        wav.write(*(normalize_chunk_to_int16(f.flush(), *r) for f, r in zip(fillers, ranges)))
+
+@pytest.mark.parametrize('fade_samples', [0, 500])
+def test_streaming_wav_matches_in_memory_mono(tmp_path, fade_samples):
+    times, left, _ = _synthetic_component_data()
+    audifier = Audifier()
+    audifier.fade_samples = fade_samples
+    expected = audifier.apply_fade(audifier.normalize_to_int16(left))
+    wavfile.write(str(tmp_path / 'memory.wav'), 44100, expected)
+    _stream_wav(str(tmp_path / 'stream.wav'), times, [left], 1, fade_samples)
+    with open(tmp_path / 'memory.wav', 'rb') as a, open(tmp_path / 'stream.wav', 'rb') as b:
+        assert a.read() == b.read()
+
+def test_streaming_wav_matches_in_memory_stereo_with_fade(tmp_path):
+    times, left, right = _synthetic_component_data()
+    audifier = Audifier()
+    audifier.fade_samples = 300
+    expected = audifier.apply_fade(np.column_stack((audifier.normalize_to_int16(left), audifier.normalize_to_int16(right))))
+    _stream_wav(str(tmp_path / 'stream.wav'), times, [left, right], 2, 300)
+    rate, data = wavfile.read(str(tmp_path / 'stream.wav'))
+    assert rate == 44100 and data.shape == expected.shape
+    np.testing.assert_array_equal(data, expected)
+
+def test_audify_streaming_writes_same_files_and_markers(tmp_path, monkeypatch):
+    from plotbot.time_utils import TimeRangeTracker
+    times, left, right = _synthetic_component_data()
+
+    class _Component:
+        def __init__(self, subclass_name):
+            self.class_name, self.data_type, self.subclass_name = 'mag_rtn', 'mag_RTN', subclass_name
+
+    audifier = Audifier()
+    audifier.set_save_dir(str(tmp_path))
+    audifier.channels, audifier.fade_samples, audifier.markers_per_hour = 1, 0, 60
+    components = {'br': left, 'bt': right}
+    monkeypatch.setattr(Audifier, '_stream_chunks', lambda self, trange, group: iter(
+        _chunks(times, [components[c.subclass_name] for c in group])))
+    monkeypatch.setattr('plotbot.audifier.show_directory_button', lambda directory: None)
+    monkeypatch.setattr('plotbot.audifier.show_file_buttons', lambda file_paths: None)
+    # audify sets the global current trange; put it back for the tests that follow
+    monkeypatch.setattr(TimeRangeTracker, '_current_trange', TimeRangeTracker._current_trange)
+    monkeypatch.setattr(TimeRangeTracker, '_last_updated', TimeRangeTracker._last_updated)
+    trange = ['2023-09-28/06:00:00.000', '2023-09-28/06:03:00.000']
+
+    files = audifier.audify(trange, _Component('br'), _Component('bt'), stream=True)
+
+    for name, data in components.items():
+        rate, audio = wavfile.read(files[name])
+        np.testing.assert_array_equal(audio, audifier.normalize_to_int16(data))
+    streamed_markers = open(files['markers']).read()
+    os.remove(files['markers'])
+    assert audifier.generate_markers(times, trange, os.path.dirname(files['br'])) == files['markers']
+    assert open(files['markers']).read() == streamed_markers
+
+def test_stream_chunks_yield_each_sample_once(tmp_path, monkeypatch):
+    import plotbot
+    from plotbot.config import config
+    from plotbot.data_cubby import data_cubby
+    from plotbot.data_import import import_data_function
+    from tests.synthetic_cdf import write_synthetic_cdfs
+
+    monkeypatch.setattr(config, '_data_dir', str(tmp_path / 'data'))
+    monkeypatch.setattr(config, 'data_server', 'berkeley')
+    # Data on both sides of trange, as a whole-file import returns for every chunk; at 4 Hz
+    # there is a sample exactly on every chunk edge
+    file_trange = ['2021-04-29/05:50:00.000', '2021-04-29/06:20:00.000']
+    write_synthetic_cdfs(file_trange, 'mag_RTN_4sa', rate_hz=4, whole_files=False)
+    data_obj = import_data_function(file_trange, 'mag_RTN_4sa')
+    requested = []
+    monkeypatch.setattr('plotbot.audifier.download_berkeley_data', lambda trange, data_type: requested.append(trange))
+    monkeypatch.setattr('plotbot.audifier.import_data_function', lambda trange, data_type: data_obj)
+
+    cubby_instance = data_cubby.grab('mag_rtn_4sa')
+    cubby_state = dict(vars(cubby_instance))
+    audifier = Audifier()
+    audifier.stream_chunk_hours = 3 / 60  # 06:00-06:10 in chunks of 3, 3, 3 and 1 minutes
+    trange = ['2021-04-29/06:00:00.000', '2021-04-29/06:10:00.000']
+    chunks = list(audifier._stream_chunks(trange, [cubby_instance.br, cubby_instance.bt]))
+
+    whole = type(cubby_instance)(data_obj)
+    keep = (whole.datetime_array >= np.datetime64('2021-04-29T06:00')) & (whole.datetime_array <= np.datetime64('2021-04-29T06:10'))
+    assert [r[0][14:19] for r in requested] == ['00:00', '03:00', '06:00', '09:00']
+    assert all(len(chunk_times) for chunk_times, _ in chunks)
+    times = np.concatenate([chunk_times for chunk_times, _ in chunks])
+    np.testing.assert_array_equal(times, whole.datetime_array[keep])  # Nothing dropped or repeated at the edges
+    for k, name in enumerate(['br', 'bt']):
+        np.testing.assert_array_equal(np.concatenate([arrays[k] for _, arrays in chunks]),
+                                      np.asarray(whole.get_subclass(name))[keep])
+    assert data_cubby.grab('mag_rtn_4sa') is cubby_instance
+    assert all(vars(cubby_instance)[key] is value for key, value in cubby_state.items())
+
+# --- Vectorised markers and batch audification ---
+
+def _loop_marker_times(audifier, start, stop):
+    """Marker times as the old per-marker timedelta loop built them."""
+    marker_times = []
+    if audifier.quantize_markers:
+        current = start.replace(hour=0, minute=0, second=0, microsecond=0)
+        while current <= stop:
+            if current >= start:
+                marker_times.append(current)
+            current += timedelta(hours=1.0 / audifier.markers_per_hour)
+    else:
+        interval = (stop - start).total_seconds() / 3600.0 / audifier.markers_per_hour
+        current = start
+        while current <= stop:
+            marker_times.append(current)
+            current += timedelta(hours=interval)
+    return marker_times
+
+@pytest.mark.parametrize('quantize', [True, False])
+@pytest.mark.parametrize('markers_per_hour', [0.25, 1, 7, 60])
+def test_marker_times_match_loop(quantize, markers_per_hour):
+    audifier = Audifier()
+    audifier.quantize_markers, audifier.markers_per_hour = quantize, markers_per_hour
+    for trange in (['2023-09-28/06:00:00.000', '2023-09-28/06:03:00.000'],
+                   ['2023-09-28/05:17:31.250', '2023-09-30/02:00:00.000']):
+        time_info = audifier._parse_and_format_trange(trange)
+        expected = _loop_marker_times(audifier, time_info['start_dt'], time_info['end_dt'])
+        assert list(audifier._marker_times(time_info).to_pydatetime()) == expected
+
+class _BatchComponent:
+    """Stand-in for a loaded plotbot component: indexable data plus its raw time array."""
+
+    def __init__(self, subclass_name, times, data):
+        self.class_name, self.data_type, self.subclass_name = 'mag_rtn', 'mag_RTN', subclass_name
+        self.datetime_array = times
+        self.plot_config = type('plot_config', (), {'datetime_array': times})()
+        self._data = data
+
+    def __getitem__(self, index):
+        return self._data[index]
+
+def test_audify_batch_writes_each_range(tmp_path, monkeypatch):
+    times, left, right = _synthetic_component_data()
+    loads = []
+
+    def fake_load(self, trange, time_info, components):
+        loads.append(trange)
+        data = {'br': left, 'bt': right}
+        return [_BatchComponent(c.subclass_name, times, data[c.subclass_name]) for c in components]
+
+    monkeypatch.setattr(Audifier, '_load_components', fake_load)
+    audifier = Audifier()
+    audifier.set_save_dir(str(tmp_path))
+    audifier.channels, audifier.fade_samples, audifier.markers_per_hour = 2, 100, 60
+    tranges = [['2023-09-28/06:00:00.000', '2023-09-28/06:01:00.000'],
+               ['2023-09-28/06:01:00.000', '2023-09-28/06:02:00.000'],
+               ['2023-09-29/06:00:00.000', '2023-09-29/06:01:00.000']]  # no data
+    components = [_BatchComponent('br', None, None), _BatchComponent('bt', None, None)]
+
+    from plotbot.time_utils import TimeRangeTracker
+    monkeypatch.setattr(TimeRangeTracker, '_current_trange', ['2020-01-01/00:00:00', '2020-01-02/00:00:00'])
+    monkeypatch.setattr(TimeRangeTracker, '_last_updated', None)
+
+    manifest = audifier.audify_batch(tranges, *components, workers=3)
+
+    assert TimeRangeTracker.get_current_trange() == ['2020-01-01/00:00:00', '2020-01-02/00:00:00']
+    assert loads == tranges
+    assert [entry['trange'] for entry in manifest] == tranges
+    assert manifest[2]['error'] and not manifest[2]['files']
+    for entry in manifest[:2]:
+        assert entry['error'] is None
+        assert set(entry['files']) == {'markers', 'stereo_Br_Bt'}
+        indices = audifier.clip_data_to_range([_BatchComponent('br', times, left)], entry['trange'])
+        expected = audifier.apply_fade(np.column_stack((audifier.normalize_to_int16(left[indices]),
+                                                        audifier.normalize_to_int16(right[indices]))))
+        rate, audio = wavfile.read(entry['files']['stereo_Br_Bt'])
+        np.testing.assert_array_equal(audio, expected)
+        assert os.path.dirname(entry['files']['markers']) == entry['output_dir']
+    assert os.path.dirname(manifest[0]['output_dir']) == os.path.dirname(manifest[1]['output_dir'])
+
+def test_audify_batch_caps_ranges_in_flight(tmp_path, monkeypatch):
+    import time
+    times, left, _ = _synthetic_component_data()
+    events = []
+
+    def fake_load(self, trange, time_info, components):
+        events.append(('load', trange[0]))
+        return [_BatchComponent(c.subclass_name, times, left) for c in components]
+
+    def slow_write(self, filename, arrays):
+        time.sleep(0.05)
+        events.append(('written', filename))
+        return filename
+
+    monkeypatch.setattr(Audifier, '_load_components', fake_load)
+    monkeypatch.setattr(Audifier, '_write_audio_job', slow_write)
+    audifier = Audifier()
+    audifier.set_save_dir(str(tmp_path))
+    audifier.channels, audifier.markers_per_hour = 1, 60
+    tranges = [[f'2023-09-28/06:0{i}:00.000', f'2023-09-28/06:0{i + 1}:00.000'] for i in range(3)]
+
+    manifest = audifier.audify_batch(tranges, _BatchComponent('br', None, None), _BatchComponent('bt', None, None),
+                                     workers=4, max_in_flight=1)
+
+    assert all(entry['error'] is None and set(entry['files']) == {'markers', 'br', 'bt'} for entry in manifest)
+    # With one range in flight, a range's WAV files are written before the next range is fetched
+    assert [kind for kind, _ in events] == ['load', 'written', 'written'] * 3
+
+def test_audify_batch_uses_the_streaming_writer(tmp_path, monkeypatch):
+    from plotbot.time_utils import TimeRangeTracker
+    times, left, right = _synthetic_component_data()
+    components = {'br': left, 'bt': right}
+    streamed = []
+
+    def fake_chunks(self, trange, group):
+        streamed.append(trange)
+        first, last = np.searchsorted(times, [np.datetime64(t.replace('/', 'T')) for t in trange])
+        return iter(_chunks(times[first:last], [components[c.subclass_name][first:last] for c in group]))
+
+    monkeypatch.setattr(Audifier, '_stream_chunks', fake_chunks)
+    monkeypatch.setattr(Audifier, '_load_components', lambda *args: pytest.fail("loaded in memory"))
+    monkeypatch.setattr('plotbot.audifier.show_directory_button', lambda directory: pytest.fail("button shown"))
+    monkeypatch.setattr(TimeRangeTracker, '_current_trange', None)
+    monkeypatch.setattr(TimeRangeTracker, '_last_updated', None)
+    audifier = Audifier()
+    audifier.set_save_dir(str(tmp_path))
+    audifier.channels, audifier.fade_samples, audifier.markers_per_hour = 1, 0, 60
+    audifier.streaming = True
+    tranges = [['2023-09-28/06:00:00.000', '2023-09-28/06:01:00.000'],
+               ['2023-09-28/06:01:00.000', '2023-09-28/06:02:00.000']]
+
+    manifest = audifier.audify_batch(tranges, _BatchComponent('br', None, None), _BatchComponent('bt', None, None))
+
+    assert TimeRangeTracker.get_current_trange() is None
+    assert len(streamed) == 4  # Range scan and write pass per range
+    for entry in manifest:
+        assert entry['error'] is None and set(entry['files']) == {'markers', 'br', 'bt'}
+        assert all(os.path.dirname(path) == entry['output_dir'] for path in entry['files'].values())
+        first, last = np.searchsorted(times, [np.datetime64(t.replace('/', 'T')) for t in entry['trange']])
+        rate, audio = wavfile.read(entry['files']['br'])
+        np.testing.assert_array_equal(audio, audifier.normalize_to_int16(left[first:last]))
@@ -0,0 +1,131 @@
+#tests/test_decimation.py
+# To run tests from the project root directory and see print output in the console:
+# conda run -n plotbot_env python -m pytest tests/test_decimation.py -vv -s
+
+"""
+Tests for pixel-aware M4/LTTB line decimation and spectrogram time-binning.
+Uses synthetic arrays only (no downloaded data).
+"""
+
+import os
+import sys
+import numpy as np
+import pytest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from plotbot.decimation import (decimate_line, decimate_spectrogram, m4_indices,
+                                lttb_indices, MIN_POINTS_PER_PIXEL)
+from plotbot.plot_manager import plot_manager
+from plotbot.plot_config import plot_config
+from plotbot.config import config
+
+T0 = np.datetime64('2024-03-01T00:00:00', 'ns')
+
+def _synthetic(n=200_000):
+    rng = np.random.default_rng(0)
+    times = T0 + np.arange(n) * np.timedelta64(10, 'ms')
+    values = np.cumsum(rng.standard_normal(n))
+    values[n // 7] = 1e4   # spike that must survive
+    values[n // 2:n // 2 + 10] = np.nan
+    return times, values
+
+def test_m4_keeps_extremes_and_endpoints_of_every_pixel():
+    times, values = _synthetic()
+    width = 500
+    keep = m4_indices(times, values, width)
+    assert keep[0] == 0 and keep[-1] == len(values) - 1
+    assert np.all(np.diff(keep) > 0)
+    assert len(keep) <= 4 * width
+
+    x = times.astype(np.int64).astype(np.float64)
+    bins = np.minimum(((x - x[0]) * width // (x[-1] - x[0])).astype(np.int64), width - 1)
+    for b in (0, 17, 250, width - 1):
+        in_bin = np.flatnonzero(bins == b)
+        kept = keep[bins[keep] == b]
+        assert np.nanmin(values[kept]) == np.nanmin(values[in_bin])
+        assert np.nanmax(values[kept]) == np.nanmax(values[in_bin])
+    assert 1e4 in values[keep]
+
+@pytest.mark.parametrize('use_numba', [True, False])
+def test_m4_keeps_a_nan_inside_every_gap(monkeypatch, use_numba):
+    from plotbot import decimation
+    if use_numba and not decimation.NUMBA_AVAILABLE:
+        pytest.skip('numba not installed')
+    monkeypatch.setattr(decimation, 'NUMBA_AVAILABLE', use_numba)
+    times, values = _synthetic()
+    gaps = [(1_000, 1_003), (20_000, 20_950), (77_777, 77_778), (150_399, 150_402)]  # Short, multi-bin and at a bin edge
+    for start, stop in gaps:
+        values[start:stop] = np.nan
+    gaps.append((100_000, 100_010))  # From _synthetic
+
+    keep = m4_indices(times, values, 500)
+    assert np.all(np.diff(keep) > 0)
+    for start, stop in gaps:
+        assert np.any((keep >= start) & (keep < stop)), f"line drawn across the gap at {start}"
+    # Kept neighbours of every drawn segment have no NaN between them in the full data
+    t_out, v_out = decimate_line(times, values, 500)
+    drawn = np.flatnonzero(~np.isnan(v_out[:-1]) & ~np.isnan(v_out[1:]))
+    nan_before = np.concatenate(([0], np.cumsum(np.isnan(values))))
+    assert np.all(nan_before[keep[drawn + 1]] == nan_before[keep[drawn] + 1])
+
+def test_vector_components_share_one_x_axis():
+    times, values = _synthetic(n=50_000)
+    vector = np.vstack([values, -values, values[::-1]])
+    t_out, v_out = decimate_line(times, vector, 300)
+    assert v_out.shape == (3, len(t_out))
+    assert len(t_out) < len(times)
+    for comp in range(3):
+        assert np.nanmax(v_out[comp]) == np.nanmax(vector[comp])
+        assert np.nanmin(v_out[comp]) == np.nanmin(vector[comp])
+
+def test_lttb_point_budget_and_endpoints():
+    times, values = _synthetic(n=20_000)
+    keep = lttb_indices(times, values, 400)
+    assert keep[0] == 0 and keep[-1] == len(values) - 1
+    assert len(keep) <= 400
+    t_out, v_out = decimate_line(times, values, 200, method='lttb')
+    assert len(t_out) == len(v_out) <= 400
+
+def test_short_or_non_monotonic_input_is_untouched():
+    times, values = _synthetic(n=MIN_POINTS_PER_PIXEL * 100)
+    t_out, v_out = decimate_line(times, values, 100)
+    assert t_out is times and v_out is values
+
+    x = np.concatenate([np.linspace(0, 360, 5000), np.linspace(0, 360, 5000)])
+    y = np.sin(np.radians(x))
+    x_out, y_out = decimate_line(x, y, 100)
+    assert x_out is x and y_out is y
+
+def test_per_variable_and_global_opt_out(monkeypatch):
+    times, values = _synthetic(n=50_000)
+    var = plot_manager(values, plot_config=plot_config(
+        data_type='synthetic', class_name='synthetic', subclass_name='b',
+        plot_type='time_series', datetime_array=times))
+    assert len(decimate_line(times, values, 100, var=var)[0]) < len(times)
+
+    var.decimate = False
+    assert var.plot_config.decimate is False
+    assert len(decimate_line(times, values, 100, var=var)[0]) == len(times)
+
+    var.decimate = True
+    monkeypatch.setattr(config, 'decimation', False)
+    assert len(decimate_line(times, values, 100, var=var)[0]) == len(times)
+
+def test_spectrogram_is_nan_aware_time_mean():
+    n, n_freq = 10_000, 8
+    times = T0 + np.arange(n) * np.timedelta64(1, 's')
+    data = np.tile(np.arange(n, dtype=float)[:, None], (1, n_freq))
+    data[:5, 0] = np.nan
+    freqs = np.tile(np.arange(n_freq, dtype=float), (n, 1))
+
+    t_out, d_out, f_out = decimate_spectrogram(times, data, 100, additional_data=freqs)
+    assert d_out.shape == (100, n_freq)
+    assert f_out.shape == (100, n_freq)
+    assert t_out[0] == times[0]
+    assert d_out[0, 1] == pytest.approx(np.mean(np.arange(100)))
+    assert d_out[0, 0] == pytest.approx(np.mean(np.arange(5, 100)))
+
+    # Already within budget: unchanged
+    short = data[:150]
+    assert decimate_spectrogram(times[:150], short, 100)[1] is short
@@ -0,0 +1,184 @@
+#tests/test_download_engine.py
+# To run tests from the project root directory and see print output in the console:
+# conda run -n plotbot_env python -m pytest tests/test_download_engine.py -vv -s
+
+"""
+Tests for the streaming download engine against a local http.server that
+serves synthetic CDF bytes (with Range support) under an Apache-style index
+page: concurrent downloads, resume from a leftover .part file, servers that
+ignore Range, truncated transfers and the per-host connection limit, plus the
+Berkeley directory lookup (latest version) feeding download_file.
+"""
+
+import os
+import sys
+import time
+import threading
+import pytest
+import requests
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from plotbot.download_engine import download_files, stream_to_file, DownloadSizeError
+from plotbot.data_download_helpers import download_file, resolve_download
+
+DIR = '/data/2020/01/'
+FILES = {
+    f'psp_fld_l2_mag_rtn_202001{day:02d}_v{version:02d}.cdf': os.urandom(300_000 + 1000 * day + version)
+    for day in range(1, 7) for version in (1, 2)
+}
+
+class _Handler(BaseHTTPRequestHandler):
+    server_version = 'Apache'
+
+    def log_message(self, *args):
+        pass
+
+    def do_GET(self):
+        state = self.server.state
+        state['requests'].append((self.path, self.headers.get('Range')))
+        if self.path == DIR:
+            rows = ''.join(f'<tr><td><a href="{name}">{name}</a></td><td>{len(data)}</td></tr>\n'
+                           for name, data in sorted(FILES.items()))
+            body = (f'<html><head><title>Index of {DIR}</title></head><body><h1>Index of {DIR}</h1>'
+                    f'<table><tr><th><a href="?C=N;O=D">Name</a></th></tr>\n'
+                    f'<tr><td><a href="/data/2020/">Parent Directory</a></td></tr>\n{rows}</table></body></html>').encode()
+            self._send(200, body, {'Content-Type': 'text/html'})
+            return
+        name = self.path[len(DIR):]
+        if not self.path.startswith(DIR) or name not in FILES:
+            self._send(404, b'Not Found')
+            return
+        data = FILES[name]
+        with state['lock']:
+            state['active'] += 1
+            state['peak'] = max(state['peak'], state['active'])
+        try:
+            time.sleep(state['delay'])
+            range_header = self.headers.get('Range')
+            if range_header and state['ranges']:
+                start = int(range_header.split('=')[1].split('-')[0])
+                if start >= len(data):
+                    self._send(416, b'', {'Content-Range': f'bytes */{len(data)}'})
+                    return
+                self._send(206, data[start:], {'Content-Range': f'bytes {start}-{len(data) - 1}/{len(data)}'})
+            elif state['truncate']:
+                # Announce the full length but close the connection half way through
+                self.send_response(200)
+                self.send_header('Content-Length', str(len(data)))
+                self.end_headers()
+                self.wfile.write(data[:len(data) // 2])
+                self.close_connection = True
+            else:
+                self._send(200, data)
+        finally:
+            with state['lock']:
+                state['active'] -= 1
+
+    def _send(self, status, body, headers=None):
+        self.send_response(status)
+        for key, value in (headers or {}).items():
+            self.send_header(key, value)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+@pytest.fixture
+def server():
+    httpd = ThreadingHTTPServer(('127.0.0.1', 0), _Handler)
+    httpd.state = {'requests': [], 'lock': threading.Lock(), 'active': 0, 'peak': 0,
+                   'delay': 0.0, 'ranges': True, 'truncate': False}
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    yield httpd, f'http://127.0.0.1:{httpd.server_address[1]}'
+    httpd.shutdown()
+    httpd.server_close()
+
+def _latest(day):
+    return f'psp_fld_l2_mag_rtn_202001{day:02d}_v02.cdf'
+
+def test_concurrent_downloads_with_per_host_limit(server, tmp_path):
+    httpd, base = server
+    httpd.state['delay'] = 0.2
+    jobs = [(base + DIR + _latest(day), str(tmp_path / _latest(day))) for day in range(1, 7)]
+    start = time.perf_counter()
+    results = download_files(requests.Session(), jobs, workers=6, per_host=3, chunk_size=64 * 1024)
+    assert results == [True] * 6
+    for _, path in jobs:
+        assert open(path, 'rb').read() == FILES[os.path.basename(path)]
+        assert not os.path.exists(path + '.part')
+    assert httpd.state['peak'] == 3
+    assert time.perf_counter() - start < 6 * 0.2  # Overlapping transfers, not one after another
+
+def test_resume_from_part_file(server, tmp_path):
+    httpd, base = server
+    name = _latest(3)
+    path = str(tmp_path / name)
+    with open(path + '.part', 'wb') as f:
+        f.write(FILES[name][:123_456])
+    assert stream_to_file(requests.Session(), base + DIR + name, path) == len(FILES[name])
+    assert open(path, 'rb').read() == FILES[name]
+    assert httpd.state['requests'][-1] == (DIR + name, 'bytes=123456-')
+
+    # A .part that already holds the whole file is just renamed
+    os.replace(path, path + '.part')
+    stream_to_file(requests.Session(), base + DIR + name, path)
+    assert open(path, 'rb').read() == FILES[name]
+
+def test_server_ignoring_range_restarts(server, tmp_path):
+    httpd, base = server
+    httpd.state['ranges'] = False
+    name = _latest(4)
+    path = str(tmp_path / name)
+    with open(path + '.part', 'wb') as f:
+        f.write(b'stale bytes')
+    stream_to_file(requests.Session(), base + DIR + name, path)
+    assert open(path, 'rb').read() == FILES[name]
+
+def test_truncated_transfer_keeps_part_and_fails(server, tmp_path):
+    httpd, base = server
+    httpd.state['truncate'] = True
+    httpd.state['ranges'] = False
+    name = _latest(5)
+    path = str(tmp_path / name)
+    with pytest.raises((DownloadSizeError, requests.RequestException)):
+        stream_to_file(requests.Session(), base + DIR + name, path)
+    assert not os.path.exists(path)
+
+    assert download_files(requests.Session(), [(base + DIR + name, path)], workers=1, retries=1) == [False]
+    assert not os.path.exists(path)
+
+    # The next run resumes from what was kept once the server is healthy again
+    httpd.state['truncate'] = False
+    httpd.state['ranges'] = True
+    assert download_file(requests.Session(), base + DIR + name, path)
+    assert open(path, 'rb').read() == FILES[name]
+
+def test_missing_file_returns_false(server, tmp_path):
+    _, base = server
+    assert download_file(requests.Session(), base + DIR + 'nope.cdf', str(tmp_path / 'nope.cdf')) is False
+
+def test_resolve_download_picks_latest_version(server, tmp_path, monkeypatch):
+    from plotbot.server_access import server_access
+    _, base = server
+    monkeypatch.setattr(server_access, '_session', requests.Session())
+    date_info = {'date_str': '20200102', 'is_hourly': False, 'hour_str': None, 'year': 2020}
+    job = resolve_download(base + DIR, r'psp_fld_l2_mag_rtn_20200102_v(\d+)\.cdf', date_info, str(tmp_path))
+    assert job == (base + DIR + _latest(2), str(tmp_path / '2020' / _latest(2)))
+    assert download_files(server_access.session, [job]) == [True]
+    assert resolve_download(base + DIR, r'psp_fld_l2_mag_rtn_20200102_v(\d+)\.cdf', date_info, str(tmp_path)) is None
+
+def test_downloads_are_counted_per_data_type(server, tmp_path):
+    from plotbot.metrics import metrics
+    httpd, base = server
+    metrics.reset('mag_RTN')
+    metrics.reset('mag_SC')
+    jobs = [(base + DIR + _latest(day), str(tmp_path / _latest(day))) for day in (1, 2)]
+    jobs.append((base + DIR + 'missing.cdf', str(tmp_path / 'missing.cdf')))
+    assert download_files(requests.Session(), jobs, workers=3, data_type=['mag_RTN', 'mag_RTN', 'mag_SC']) == [True, True, False]
+    assert metrics('mag_RTN') == {'files_downloaded': 2,
+                                  'bytes_downloaded': len(FILES[_latest(1)]) + len(FILES[_latest(2)])}
+    assert metrics('mag_SC') == {'download_failures': 1}
+    metrics.reset('mag_RTN')
+    metrics.reset('mag_SC')
@@ -0,0 +1,106 @@
+#tests/test_fits_csv_cache.py
+# To run tests from the project root directory and see print output in the console:
+# conda run -n plotbot_env python -m pytest tests/test_fits_csv_cache.py -vv -s
+
+"""
+Tests for the binary sidecar cache used when loading FITS (sf00/sf01) CSVs.
+
+Uses small synthetic CSVs written to a temporary directory, so no downloaded
+PSP data is required.
+"""
+
+import os
+import sys
+import time
+import numpy as np
+import pandas as pd
+import pytest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from plotbot.fits_csv_cache import (get_sidecar_path, read_fits_csv,
+                                    read_fits_csvs_parallel, unix_seconds_to_tt2000)
+
+DAY_START = pd.Timestamp('2024-03-01', tz='UTC').timestamp()
+
+def _write_fits_csv(path, n=200, start=DAY_START, shuffle=False):
+    rng = np.random.default_rng(0)
+    times = start + np.arange(n) * 7.0
+    df = pd.DataFrame({
+        'time': times,
+        'np1': rng.random(n),
+        'Tperp1': rng.random(n),
+        'label': ['x'] * n,  # non-numeric columns are ignored by the cache
+    })
+    if shuffle:
+        df = df.sample(frac=1.0, random_state=1)
+    df.to_csv(path, index=False)
+    return df
+
+def test_tt2000_conversion_matches_per_row_cdflib():
+    """The vectorised conversion should equal the old per-row component conversion."""
+    import cdflib
+    unix = DAY_START + np.array([0.0, 1.2345, 86399.999])
+    expected = cdflib.cdfepoch.compute_tt2000([
+        [d.year, d.month, d.day, d.hour, d.minute, d.second, int(d.microsecond / 1000)]
+        for d in pd.to_datetime(unix, unit='s', utc=True)
+    ])
+    np.testing.assert_array_equal(unix_seconds_to_tt2000(unix), expected)
+
+def test_sidecar_created_and_reused(tmp_path):
+    csv_path = str(tmp_path / 'spp_swp_spi_sf00_2024-03-01_v00.csv')
+    df = _write_fits_csv(csv_path, shuffle=True)
+
+    times, data = read_fits_csv(csv_path, ['time', 'np1'])
+    assert os.path.exists(get_sidecar_path(csv_path))
+    assert set(data) == {'np1'}
+    assert np.all(np.diff(times) > 0), "Rows must come back sorted by time"
+    np.testing.assert_allclose(data['np1'], df.sort_values('time')['np1'].to_numpy())
+
+    # Second read comes from the sidecar and must be identical
+    times_2, data_2 = read_fits_csv(csv_path, ['np1'])
+    np.testing.assert_array_equal(times, times_2)
+    np.testing.assert_array_equal(data['np1'], data_2['np1'])
+
+def test_time_range_selects_rows(tmp_path):
+    csv_path = str(tmp_path / 'spp_swp_spi_sf00_2024-03-01_v00.csv')
+    _write_fits_csv(csv_path, n=100)
+    all_times, _ = read_fits_csv(csv_path, ['np1'])
+
+    times, data = read_fits_csv(csv_path, ['np1'], tt2000_range=(all_times[10], all_times[19]))
+    assert len(times) == 10
+    assert len(data['np1']) == 10
+    assert times[0] == all_times[10] and times[-1] == all_times[19]
+
+def test_sidecar_invalidated_when_csv_changes(tmp_path):
+    csv_path = str(tmp_path / 'spp_swp_spi_sf00_2024-03-01_v00.csv')
+    _write_fits_csv(csv_path, n=50)
+    times, _ = read_fits_csv(csv_path, ['np1'])
+    assert len(times) == 50
+
+    time.sleep(0.01)
+    _write_fits_csv(csv_path, n=80)
+    os.utime(csv_path, ns=(time.time_ns(), time.time_ns()))
+    times, _ = read_fits_csv(csv_path, ['np1'])
+    assert len(times) == 80
+
+def test_missing_column_raises_keyerror(tmp_path):
+    csv_path = str(tmp_path / 'spp_swp_spi_sf00_2024-03-01_v00.csv')
+    _write_fits_csv(csv_path)
+    with pytest.raises(KeyError):
+        read_fits_csv(csv_path, ['np1', 'chi'])
+    # Same answer once the sidecar exists
+    with pytest.raises(KeyError):
+        read_fits_csv(csv_path, ['np1', 'chi'])
+
+def test_parallel_read_preserves_order_and_reports_errors(tmp_path):
+    paths = []
+    for day in range(3):
+        path = str(tmp_path / f'spp_swp_spi_sf00_2024-03-0{day + 1}_v00.csv')
+        _write_fits_csv(path, n=10 + day, start=DAY_START + day * 86400)
+        paths.append(path)
+    paths.append(str(tmp_path / 'does_not_exist.csv'))
+
+    results = read_fits_csvs_parallel(paths, ['np1'], max_workers=4)
+    assert [len(r[0]) for r in results[:3]] == [10, 11, 12]
+    assert isinstance(results[3], FileNotFoundError)
@@ -0,0 +1,136 @@
+#tests/test_hole_catalogue.py
+# To run tests from the project root directory and see print output in the console:
+# conda run -n plotbot_env python -m pytest tests/test_hole_catalogue.py -vv -s
+
+"""
+Tests for the columnar magnetic hole catalogue: building it from hole finder
+details and sharded records, npz round trips, indexed filtering, the interval
+membership used by showda_holes, a hodogram panel with RGB tuple colours, and
+the marker file export. Synthetic holes only (no downloaded data).
+"""
+
+import os
+import sys
+import numpy as np
+import pytest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from plotbot.hole_catalogue import HoleCatalogue, load_hole_catalogue, times_in_intervals
+from plotbot.showda_holes import _parse_marker_file
+from plotbot.print_manager import print_manager
+
+RATE = 100.0
+T0 = np.datetime64('2023-09-28T06:00:00', 'ns')
+TIMES = T0 + (np.arange(100_000) * 1e9 / RATE).astype('timedelta64[ns]')
+
+def _details(left_idx, min_idx, right_idx, left=50.0, minimum=20.0, right=50.0, complex_hole=False):
+    return {'L_threshold_cross': left_idx + 5, 'R_threshold_cross': right_idx - 5, 'min_idx': min_idx,
+            'min_value': minimum, 'left_max_value': left, 'left_max_value_idx': left_idx,
+            'right_max_value': right, 'right_max_value_idx': right_idx, 'W_angle': 12.5,
+            'tS': None, 'tE': None, 'zero_crossings': 3,
+            'asymmetrical_initial_peaks_flag': False, 'complex_hole_flag': complex_hole}
+
+def _catalogue():
+    details = [_details(9000, 9100, 9300, right=60.0),            # 3 s wide, 45% deep, asymmetric
+               _details(1000, 1050, 1100),                        # 1 s wide, 60% deep
+               _details(50000, 50200, 50500, minimum=45.0, complex_hole=True)]  # shallow, complex
+    return HoleCatalogue.from_details(details, TIMES, encounter='E17', sampling_rate=RATE)
+
+def test_from_details_sorts_by_minimum_and_derives_columns():
+    cat = _catalogue()
+    assert len(cat) == 3
+    np.testing.assert_array_equal(cat['min_idx'], [1050, 9100, 50200])
+    assert cat['min_idx_time'][0] == TIMES[1050]
+    np.testing.assert_allclose(cat['depth_percent'], [60.0, (1 - 20 / 55) * 100, 10.0])
+    np.testing.assert_allclose(cat['width_s'], [1.0, 3.0, 5.0])
+    np.testing.assert_array_equal(cat['width_samples'], [100, 300, 500])
+    np.testing.assert_allclose(cat['asymmetry'], [0.0, 0.2, 0.0])
+    assert np.isnat(cat['tS_time']).all() and (cat['tS'] == -1).all()
+    assert list(cat['encounter']) == ['E17'] * 3
+
+def test_save_load_round_trip_and_cache(tmp_path):
+    cat = _catalogue()
+    path = str(tmp_path / 'magnetic_hole_catalogue.npz')
+    cat.save(path)
+    loaded = HoleCatalogue.load(path)
+    assert set(loaded.columns) == set(cat.columns)
+    for name, column in cat.columns.items():
+        np.testing.assert_array_equal(loaded[name], column)
+    assert load_hole_catalogue(path) is load_hole_catalogue(path)
+    assert load_hole_catalogue(cat) is cat
+
+def test_filter_by_time_depth_width_asymmetry_and_encounter():
+    cat = HoleCatalogue.concat([_catalogue(), HoleCatalogue.from_details([_details(90000, 90010, 90020)], TIMES, encounter='E18')])
+    assert len(cat) == 4
+    assert list(cat.filter(min_depth=40)['min_idx']) == [1050, 9100, 90010]
+    assert list(cat.filter(min_width=2, max_width=4)['min_idx']) == [9100]
+    assert list(cat.filter(max_asymmetry=0.1, complex_hole=False)['min_idx']) == [1050, 90010]
+    assert list(cat.filter(encounters='E18')['min_idx']) == [90010]
+    trange = ['2023-09-28/06:00:05', '2023-09-28/06:08:30']
+    assert list(cat.filter(trange=trange)['min_idx']) == [1050, 9100, 50200]
+    assert list(cat.filter(trange=trange, min_depth=40, encounters=['E17'])['min_idx']) == [1050, 9100]
+    assert list(cat.to_dataframe().index) == list(cat['min_idx_time'])
+
+def test_times_in_intervals_matches_loop():
+    rng = np.random.default_rng(1)
+    starts = np.sort(rng.choice(len(TIMES) - 500, 40, replace=False))
+    ends = starts + rng.integers(0, 500, 40)
+    points = TIMES[rng.integers(0, len(TIMES), 5000)]
+    expected = [any(TIMES[s] <= t <= TIMES[e] for s, e in zip(starts, ends)) for t in points]
+    np.testing.assert_array_equal(times_in_intervals(points, TIMES[starts], TIMES[ends]), expected)
+    assert not times_in_intervals(points, TIMES[:0], TIMES[:0]).any()
+
+def test_from_sharded_records():
+    records = [{'shard': 0, 'min_idx_time': '2023-09-28/06:00:10.500000', 'left_max_value_idx_time': '2023-09-28/06:00:10.000000',
+                'right_max_value_idx_time': '2023-09-28/06:00:11.000000', 'min_value': 10.0,
+                'left_max_value': 40.0, 'right_max_value': 40.0, 'complex_hole_flag': False}]
+    cat = HoleCatalogue.from_records(records)
+    assert cat['min_idx_time'][0] == T0 + np.timedelta64(10_500, 'ms')
+    np.testing.assert_allclose(cat['width_s'], [1.0])
+    assert cat['width_samples'][0] == -1
+
+def test_marker_file_export_parses_back(tmp_path):
+    cat = _catalogue()
+    path = str(tmp_path / 'markers.txt')
+    cat.to_marker_file(path, ['2023-09-28/06:00:00.000', '2023-09-28/06:16:40.000'], RATE)
+    intervals = _parse_marker_file(path, print_manager)
+    starts, ends = cat.intervals()
+    assert [(s.replace(tzinfo=None), e.replace(tzinfo=None)) for s, e in intervals] == [
+        (s.astype('datetime64[us]').item(), e.astype('datetime64[us]').item()) for s, e in zip(starts, ends)]
+
+def test_hodogram_panel_accepts_rgb_tuple_colors(monkeypatch):
+    import matplotlib
+    matplotlib.use('Agg')
+    import matplotlib.pyplot as mpl_plt
+    import importlib
+    showda_holes = importlib.import_module('plotbot.showda_holes')  # plotbot.showda_holes is rebound to the function
+    from plotbot.plot_manager import plot_manager
+    from plotbot.plot_config import plot_config
+    from plotbot.time_utils import TimeRangeTracker
+
+    times = TIMES[:2000]  # 20 s; the 06:00:10-06:00:11 hole covers 101 samples
+    rng = np.random.default_rng(2)
+    variables = {name: plot_manager(rng.normal(size=len(times)), plot_config=plot_config(
+        data_type='synthetic', class_name='synthetic', subclass_name=name, datetime_array=times))
+        for name in ('vr', 'br')}
+
+    class FakeInstance:
+        def get_subclass(self, name):
+            return variables[name]
+
+    monkeypatch.setattr(showda_holes.data_cubby, 'grab', lambda name: FakeInstance())
+    # plot_manager clips lazily to the current range, so don't inherit another test's
+    monkeypatch.setattr(TimeRangeTracker, '_current_trange', None)
+    fig, ax = mpl_plt.subplots()
+    try:
+        assert showda_holes._plot_single_hodogram_panel(
+            ax, ['2023-09-28/06:00:00', '2023-09-28/06:00:20'], variables['vr'], variables['br'], None,
+            print_manager, hole_catalogue=_catalogue(),
+            inside_color=(1.0, 0.0, 0.0), outside_color=(0.0, 0.0, 1.0, 0.5))
+        outside, inside = ax.collections
+        assert len(inside.get_offsets()) == 101 and len(outside.get_offsets()) == 1899
+        np.testing.assert_allclose(inside.get_facecolors()[0][:3], [1.0, 0.0, 0.0])
+        np.testing.assert_allclose(outside.get_facecolors()[0][:3], [0.0, 0.0, 1.0])
+    finally:
+        mpl_plt.close(fig)
@@ -0,0 +1,96 @@
+#tests/test_import_budget.py
+# To run tests from the project root directory and see print output in the console:
+# conda run -n plotbot_env python -m pytest tests/test_import_budget.py -vv -s
+
+"""
+Startup budget for `import plotbot`. A fresh interpreter times the import with
+ImportTimer and must stay within a fixed allowance on top of the third-party
+libraries plotbot needs at import (numpy, pandas, matplotlib, numba, ...), and
+must not import the data classes or the heavy plotting modules, which load on
+first access. Also checks that lazily loaded names resolve to the same
+singletons data_cubby hands out.
+"""
+
+import os
+import sys
+import json
+import subprocess
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+
+# Seconds `import plotbot` may take beyond importing its required libraries
+# (about 0.15s measured; eager data classes and scipy took it to about 1.1s)
+PLOTBOT_IMPORT_BUDGET = 0.75
+
+# Loaded on first access, never by `import plotbot`
+LAZY_MODULES = [
+    'plotbot.data_classes.psp_mag_rtn_4sa',
+    'plotbot.data_classes.psp_proton',
+    'plotbot.data_classes.psp_span_vdf',
+    'plotbot.data_classes.wind_mfi_classes',
+    'plotbot.data_classes.custom_classes.psp_waves_auto',
+    'plotbot.multiplot',
+    'plotbot.vdyes',
+    'plotbot.plotbot_dash',
+    'plotbot.audifier',
+    'pyspedas',
+    'scipy.stats',
+    'scipy.interpolate',
+]
+
+_TIMED_IMPORT = """
+import importlib.util, json, sys
+spec = importlib.util.spec_from_file_location('import_timer', 'plotbot/import_timer.py')
+import_timer = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(import_timer)
+timer = import_timer.ImportTimer()
+timer.start_session('import_budget')
+modules = {modules!r}
+for name in modules:
+    timer.time_import(name)
+print('RESULT ' + json.dumps({{'seconds': sum(timer.import_times[name] for name in modules),
+                              'loaded': sorted(sys.modules)}}))
+"""
+
+def _timed_import(modules):
+    """Best of three fresh interpreters importing modules, timed with ImportTimer."""
+    best = None
+    for _ in range(3):
+        output = subprocess.run([sys.executable, '-c', _TIMED_IMPORT.format(modules=modules)], cwd=PROJECT_ROOT,
+                                capture_output=True, text=True, timeout=300, check=True).stdout
+        result = json.loads(output.rsplit('RESULT ', 1)[1])
+        if best is None or result['seconds'] < best['seconds']:
+            best = result
+    return best
+
+def test_import_within_budget_and_defers_heavy_modules():
+    dependencies = _timed_import(['numpy', 'pandas', 'matplotlib.pyplot', 'numba', 'requests', 'cdflib'])
+    plotbot_import = _timed_import(['plotbot'])
+    overhead = plotbot_import['seconds'] - dependencies['seconds']
+    print(f"import plotbot: {plotbot_import['seconds']:.3f}s, "
+          f"required libraries: {dependencies['seconds']:.3f}s, plotbot itself: {overhead:.3f}s")
+    assert overhead < PLOTBOT_IMPORT_BUDGET
+    assert [name for name in LAZY_MODULES if name in plotbot_import['loaded']] == []
+
+def test_lazy_names_resolve_to_cubby_singletons():
+    import plotbot
+    from plotbot.data_cubby import data_cubby
+    from plotbot.data_classes.psp_mag_rtn_4sa import mag_rtn_4sa, mag_rtn_4sa_class
+
+    assert plotbot.mag_rtn_4sa is mag_rtn_4sa
+    assert data_cubby.grab('mag_rtn_4sa') is mag_rtn_4sa
+    assert plotbot.mag_rtn_4sa_class is mag_rtn_4sa_class
+    # Individual DFB data types share the psp_dfb instance
+    assert data_cubby.grab('dfb_ac_spec_dv34hg') is plotbot.psp_dfb
+    assert plotbot.CLASS_NAME_MAPPING['mag_rtn_4sa']['class_type'] is mag_rtn_4sa_class
+    assert 'proton_hr' in dir(plotbot) and 'multiplot' in plotbot.__all__
+
+def test_submodule_import_does_not_shadow_lazy_function():
+    import plotbot
+    import plotbot.multiplot_batch  # Imports the plotbot.multiplot submodule as well
+    import plotbot.vdyes
+    assert callable(plotbot.multiplot) and plotbot.multiplot.__name__ == 'multiplot'
+    assert callable(plotbot.vdyes) and plotbot.vdyes.__name__ == 'vdyes'
+    assert callable(plotbot.multiplot_batch)
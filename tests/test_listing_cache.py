@@ -0,0 +1,116 @@
+#tests/test_listing_cache.py
+# To run tests from the project root directory and see print output in the console:
+# conda run -n plotbot_env python -m pytest tests/test_listing_cache.py -vv -s
+
+"""
+Tests for the Berkeley directory listing cache against a local http.server
+with ETag / Last-Modified support: one listing request per directory for a
+multi-day lookup, conditional revalidation after the TTL (304 keeps the
+listing, a changed index replaces it) and listings reused from disk.
+"""
+
+import os
+import sys
+import threading
+import pytest
+import requests
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from plotbot.config import config
+from plotbot.server_access import server_access
+from plotbot.listing_cache import listing_cache
+from plotbot.data_download_helpers import resolve_download
+
+DIR = '/data/2020/01/'
+LAST_MODIFIED = 'Wed, 01 Jan 2020 00:00:00 GMT'
+
+class _Handler(BaseHTTPRequestHandler):
+    def log_message(self, *args):
+        pass
+
+    def do_GET(self):
+        state = self.server.state
+        state['requests'].append(dict(self.headers))
+        if self.path != DIR:
+            self._send(404, b'Not Found')
+            return
+        etag = f'"v{state["version"]}"'
+        if self.headers.get('If-None-Match') == etag:
+            self._send(304, b'', {'ETag': etag})
+            return
+        names = [f'psp_fld_l2_mag_rtn_202001{day:02d}_v{state["version"]:02d}.cdf' for day in range(1, 32)]
+        body = ('<html><body><h1>Index of /data/2020/01</h1><table>'
+                + ''.join(f'<tr><td><a href="{n}">{n}</a></td></tr>' for n in names)
+                + '</table></body></html>').encode()
+        self._send(200, body, {'ETag': etag, 'Last-Modified': LAST_MODIFIED, 'Content-Type': 'text/html'})
+
+    def _send(self, status, body, headers=None):
+        self.send_response(status)
+        for key, value in (headers or {}).items():
+            self.send_header(key, value)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+@pytest.fixture
+def server(monkeypatch, tmp_path):
+    httpd = ThreadingHTTPServer(('127.0.0.1', 0), _Handler)
+    httpd.state = {'requests': [], 'version': 1}
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    monkeypatch.setattr(server_access, '_session', requests.Session())
+    monkeypatch.setattr(config, 'listing_cache_ttl', 300)
+    monkeypatch.setattr(config, 'listing_cache_on_disk', False)
+    monkeypatch.setattr(config, '_data_dir', str(tmp_path / 'data'))
+    listing_cache.clear()
+    yield httpd, f'http://127.0.0.1:{httpd.server_address[1]}'
+    listing_cache.clear()
+    httpd.shutdown()
+    httpd.server_close()
+
+def _resolve_days(base, tmp_path, days):
+    jobs = []
+    for day in days:
+        date_info = {'date_str': f'202001{day:02d}', 'is_hourly': False, 'hour_str': None, 'year': 2020}
+        jobs.append(resolve_download(base + DIR, rf'psp_fld_l2_mag_rtn_202001{day:02d}_v(\d+)\.cdf',
+                                     date_info, str(tmp_path / 'local')))
+    return jobs
+
+def test_one_listing_request_per_directory(server, tmp_path):
+    httpd, base = server
+    jobs = _resolve_days(base, tmp_path, range(1, 15))
+    assert len(httpd.state['requests']) == 1
+    assert [os.path.basename(path) for _, path in jobs] == [f'psp_fld_l2_mag_rtn_202001{d:02d}_v01.cdf' for d in range(1, 15)]
+
+def test_revalidation_after_ttl(server, tmp_path, monkeypatch):
+    httpd, base = server
+    monkeypatch.setattr(config, 'listing_cache_ttl', 0)
+    _resolve_days(base, tmp_path, [1])
+    _resolve_days(base, tmp_path, [2])
+    assert len(httpd.state['requests']) == 2
+    assert httpd.state['requests'][1]['If-None-Match'] == '"v1"'
+    assert httpd.state['requests'][1]['If-Modified-Since'] == LAST_MODIFIED
+    assert listing_cache.not_modified >= 1
+
+    # A new file version on the server replaces the cached listing
+    httpd.state['version'] = 2
+    (_, path), = _resolve_days(base, tmp_path, [3])
+    assert path.endswith('_v02.cdf')
+
+def test_listing_reused_from_disk(server, tmp_path, monkeypatch):
+    httpd, base = server
+    monkeypatch.setattr(config, 'listing_cache_on_disk', True)
+    _resolve_days(base, tmp_path, [1])
+    assert os.listdir(tmp_path / 'data' / 'listing_cache')
+    listing_cache.clear()  # New session: memory is empty, disk is not
+    _resolve_days(base, tmp_path, [2])
+    assert len(httpd.state['requests']) == 1
+
+def test_missing_directory_is_not_cached(server, tmp_path):
+    httpd, base = server
+    date_info = {'date_str': '20200101', 'is_hourly': False, 'hour_str': None, 'year': 2020}
+    for _ in range(2):
+        assert resolve_download(base + '/data/2020/02/', r'x_v(\d+)\.cdf', date_info, str(tmp_path)) is None
+    assert len(httpd.state['requests']) == 2
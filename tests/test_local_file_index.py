@@ -0,0 +1,101 @@
+#tests/test_local_file_index.py
+# To run tests from the project root directory and see print output in the console:
+# conda run -n plotbot_env python -m pytest tests/test_local_file_index.py -vv -s
+
+"""
+Tests for the SQLite local file index: lookups agree with the directory scans
+they replace (case-insensitive prefix search, glob with highest version),
+directories are rescanned only when their mtime changes, finished downloads
+are added without a rescan, and .part files are never returned. Uses empty
+placeholder files in a temporary data directory (no downloads).
+"""
+
+import os
+import sys
+import pytest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from plotbot.config import config
+from plotbot.local_file_index import LocalFileIndex, local_file_index, latest_versions
+
+NAMES = ([f'psp_fld_l2_mag_RTN_4_Sa_per_Cyc_202001{day:02d}_v{v:02d}.cdf' for day in range(1, 11) for v in (1, 2)]
+         + ['psp_fld_l2_mag_rtn_4_sa_per_cyc_20200111_v03.cdf', 'notes.txt',
+            'psp_fld_l2_mag_RTN_4_Sa_per_Cyc_20200112_v01.cdf.part'])
+
+@pytest.fixture
+def year_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(config, 'local_file_index', True)
+    directory = tmp_path / 'mag' / '2020'
+    directory.mkdir(parents=True)
+    for name in NAMES:
+        (directory / name).touch()
+    index = local_file_index  # The shared instance the download and lookup code use
+    index.close()
+    monkeypatch.setattr(index, '_db_path', str(tmp_path / 'file_index.sqlite'))
+    yield index, str(directory)
+    index.close()
+
+def _scans(index, monkeypatch):
+    calls = []
+    original = index._scan
+    monkeypatch.setattr(index, '_scan', lambda *args: (calls.append(args[1]), original(*args)))
+    return calls
+
+def test_find_matches_glob_case_insensitive_and_latest(year_dir):
+    index, directory = year_dir
+    pattern = 'psp_fld_l2_mag_RTN_4_Sa_per_Cyc_20200103_v*.cdf'
+    assert [os.path.basename(p) for p in index.find(directory, pattern)] == [
+        'psp_fld_l2_mag_RTN_4_Sa_per_Cyc_20200103_v01.cdf', 'psp_fld_l2_mag_RTN_4_Sa_per_Cyc_20200103_v02.cdf']
+    assert index.find(directory, pattern, latest_only=True) == [
+        os.path.join(directory, 'psp_fld_l2_mag_RTN_4_Sa_per_Cyc_20200103_v02.cdf')]
+    # Lowercase pattern finds the mixed-case files, and the other way round
+    assert len(index.find(directory, pattern.lower())) == 2
+    assert len(index.find(directory, 'PSP_FLD_L2_MAG_RTN_4_SA_PER_CYC_20200111_v*.cdf')) == 1
+    assert index.find(directory, 'psp_fld_l2_mag_RTN_4_Sa_per_Cyc_20200112_v*.cdf') == []  # Only a .part
+    assert index.find(os.path.join(directory, 'missing'), pattern) == []
+
+def test_index_agrees_with_direct_scan(year_dir, monkeypatch):
+    index, directory = year_dir
+    patterns = ['psp_fld_l2_mag_rtn_4_sa_per_cyc_2020010*_v*.cdf', '*.cdf', 'notes*', 'psp_*_20200111_v*.cdf']
+    indexed = [(index.find(directory, p), index.find(directory, p, latest_only=True)) for p in patterns]
+    monkeypatch.setattr(config, 'local_file_index', False)
+    assert indexed == [(index.find(directory, p), index.find(directory, p, latest_only=True)) for p in patterns]
+    assert indexed[1][1] == latest_versions(indexed[1][0])
+
+def test_rescan_only_on_directory_change(year_dir, monkeypatch):
+    index, directory = year_dir
+    calls = _scans(index, monkeypatch)
+    for day in range(1, 11):
+        index.find(directory, f'psp_fld_l2_mag_rtn_4_sa_per_cyc_202001{day:02d}_v*.cdf')
+    assert len(calls) == 1
+
+    new_file = os.path.join(directory, 'psp_fld_l2_mag_RTN_4_Sa_per_Cyc_20200103_v03.cdf')
+    open(new_file, 'w').close()
+    os.utime(directory, ns=(0, os.stat(directory).st_mtime_ns + 1_000_000))  # Coarse-mtime filesystems
+    assert index.find(directory, 'psp_fld_l2_mag_rtn_4_sa_per_cyc_20200103_v*.cdf', latest_only=True) == [new_file]
+    assert len(calls) == 2
+
+    # The index persists: a new instance on the same database needs no scan
+    fresh = LocalFileIndex(db_path=index.db_path)
+    fresh_calls = _scans(fresh, monkeypatch)
+    assert fresh.find(directory, 'psp_*_20200103_v*.cdf', latest_only=True) == [new_file]
+    assert fresh_calls == []
+    fresh.close()
+
+def test_download_added_without_rescan(year_dir, monkeypatch):
+    from plotbot.download_engine import _move_into_place
+    index, directory = year_dir
+    index.find(directory, '*.cdf')
+    calls = _scans(index, monkeypatch)
+    final = os.path.join(directory, 'psp_fld_l2_mag_RTN_4_Sa_per_Cyc_20200112_v01.cdf')
+    _move_into_place(final + '.part', final)
+    assert index.find(directory, 'psp_fld_l2_mag_rtn_4_sa_per_cyc_20200112_v*.cdf') == [final]
+    assert calls == []
+
+def test_case_insensitive_file_search_uses_index(year_dir):
+    from plotbot.data_download_helpers import case_insensitive_file_search
+    _, directory = year_dir
+    found = case_insensitive_file_search(directory, 'psp_fld_l2_mag_rtn_4_sa_per_cyc_20200105_v*.cdf')
+    assert sorted(os.path.basename(p) for p in found) == [
+        'psp_fld_l2_mag_RTN_4_Sa_per_Cyc_20200105_v01.cdf', 'psp_fld_l2_mag_RTN_4_Sa_per_Cyc_20200105_v02.cdf']
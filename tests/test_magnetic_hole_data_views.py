@@ -0,0 +1,79 @@
+#tests/test_magnetic_hole_data_views.py
+# To run tests from the project root directory and see print output in the console:
+# conda run -n plotbot_env python -m pytest tests/test_magnetic_hole_data_views.py -vv -s
+
+"""
+Tests for how the magnetic hole finder clips plotbot's MAG arrays: one binary
+search on the time array gives the same samples as the old boolean-mask clip,
+as views rather than copies, and repeated preparation of a cached range does
+no new loading. Uses synthetic arrays and a stand-in mag_rtn instance.
+"""
+
+import os
+import sys
+import numpy as np
+import pytest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from magnetic_hole_finder.time_management import time_slice, clip_time_views, clip_to_original_time_range
+
+RATE = 292.9
+TIMES = np.datetime64('2023-09-28T06:00:00', 'ns') + (np.arange(200_000) * 1e9 / RATE).astype('timedelta64[ns]')
+TRANGES = [['2023-09-28/06:01:00', '2023-09-28/06:05:00.5'],
+           ['2023-09-28/05:00:00', '2023-09-28/06:00:00'],            # ends exactly on the first sample
+           ['2023-09-28/06:11:22.500', '2023-09-28/09:00:00'],        # runs past the data
+           ['2023-09-28/03:00:00', '2023-09-28/04:00:00']]            # no overlap
+
+def _mask_clip(times, data, trange):
+    import pandas as pd
+    start, end = pd.Timestamp(trange[0].replace('/', ' ')), pd.Timestamp(trange[1].replace('/', ' '))
+    mask = (times >= start) & (times <= end)
+    return times[mask], data[mask]
+
+@pytest.mark.parametrize('trange', TRANGES)
+def test_slice_matches_mask_clip(trange):
+    data = np.sin(np.arange(len(TIMES)) * 0.01)
+    expected_times, expected_data = _mask_clip(TIMES, data, trange)
+    assert isinstance(time_slice(TIMES, trange), slice)
+    times, clipped = clip_to_original_time_range(TIMES, data, trange)
+    np.testing.assert_array_equal(times, expected_times)
+    np.testing.assert_array_equal(clipped, expected_data)
+
+def test_clip_time_views_share_memory():
+    br, bmag = np.arange(len(TIMES), dtype=float), np.ones(len(TIMES))
+    times, (br_clipped, bmag_clipped, missing) = clip_time_views(TIMES, [br, bmag, None], TRANGES[0])
+    assert len(times) == len(br_clipped) == len(bmag_clipped) > 0
+    assert np.shares_memory(br_clipped, br) and np.shares_memory(times, TIMES)
+    assert missing is None
+
+def test_unsorted_times_fall_back_to_mask():
+    times = TIMES[::-1]
+    index = time_slice(times, TRANGES[0])
+    assert index.dtype == bool
+    assert index.sum() == len(_mask_clip(TIMES, TIMES, TRANGES[0])[0])
+
+def test_overlapping_merged_times_fall_back_to_mask():
+    # Endpoints in order but the middle is not: a slice from searchsorted would be wrong
+    times = np.concatenate([TIMES[:120_000], TIMES[60_000:]])
+    index = time_slice(times, TRANGES[0])
+    assert index.dtype == bool
+    np.testing.assert_array_equal(times[index], _mask_clip(times, times, TRANGES[0])[0])
+
+def test_prepare_reuses_plotbot_instance(monkeypatch):
+    data_management = pytest.importorskip('magnetic_hole_finder.data_management')
+
+    class _Mag:
+        datetime_array = TIMES
+        raw_data = {'br': np.zeros(len(TIMES)), 'bt': np.zeros(len(TIMES)), 'bn': np.zeros(len(TIMES)),
+                    'bmag': np.ones(len(TIMES))}
+
+    calls = []
+    monkeypatch.setattr(data_management, 'global_plotbot_mag_rtn', _Mag())
+    monkeypatch.setattr(data_management, 'plotbot_get_data', lambda trange, instance: calls.append(trange))
+    first = data_management.download_and_prepare_high_res_mag_data(TRANGES[0])
+    second = data_management.download_and_prepare_high_res_mag_data(TRANGES[0])
+    assert len(calls) == 2
+    for a, b in zip(first, second):
+        np.testing.assert_array_equal(a, b)
+    assert np.shares_memory(first[4], _Mag.raw_data['bmag']) and not first[4].flags.writeable
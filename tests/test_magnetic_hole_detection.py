@@ -0,0 +1,139 @@
+#tests/test_magnetic_hole_detection.py
+# To run tests from the project root directory and see print output in the console:
+# conda run -n plotbot_env python -m pytest tests/test_magnetic_hole_detection.py -vv -s
+
+"""
+Regression tests for the vectorised magnetic hole candidate detection.
+
+The run-length encoded lookups and the refinement kernel are checked against
+the sample-by-sample loops they replaced, and the full detection pass is
+checked against the hole list the loop-based implementation produced for a
+synthetic interval. Uses synthetic arrays only (no downloaded data).
+"""
+
+import io
+import os
+import sys
+import contextlib
+import numpy as np
+import pytest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from magnetic_hole_finder.hole_candidate_detection import HoleCandidateScanner, refine_hole, _refine_hole_numpy
+
+RATE = 292.9
+
+def _synthetic(seed, n=60_000):
+    """Random-walk |B| with 60 Gaussian dips; odd seeds also get a short NaN gap."""
+    rng = np.random.default_rng(seed)
+    t0 = np.datetime64('2024-03-01T00:00:00', 'ns')
+    times = t0 + (np.arange(n) / RATE * 1e9).astype('int64').astype('timedelta64[ns]')
+    bmag = 50 + np.cumsum(rng.standard_normal(n)) * 0.05 + rng.standard_normal(n) * 0.8
+    x = np.arange(n)
+    for c in rng.integers(2000, n - 2000, 60):
+        w = rng.uniform(50, 600)
+        d = rng.uniform(0.1, 0.8)
+        bmag *= 1 - d * np.exp(-0.5 * ((x - c) / w) ** 2)
+    ang = np.cumsum(rng.standard_normal(n)) * 0.002
+    br = bmag * np.cos(ang)
+    bt = bmag * np.sin(ang) * 0.7
+    bn = bmag * np.sin(ang) * 0.71
+    if seed % 2:
+        bmag[n // 3: n // 3 + 5] = np.nan
+    return times, br, bt, bn, bmag
+
+# Reference implementations: the loops previously inlined in _detect_magnetic_holes_logic
+def _loop_candidate(bmag, slow, i):
+    start = i
+    while start < len(bmag) and bmag[start] >= slow[start]:
+        start += 1
+    if start >= len(bmag):
+        return None
+    end = start
+    while end < len(bmag) - 1 and bmag[end] < slow[end]:
+        end += 1
+    return start, end
+
+def _loop_left_plateau(fast, L):
+    while L > 0 and fast[L - 1] > fast[L]:
+        L -= 1
+    return L
+
+def _loop_right_plateau(fast, R):
+    while R < len(fast) - 1 and fast[R + 1] > fast[R]:
+        R += 1
+    return R
+
+def test_scanner_matches_sample_loops():
+    rng = np.random.default_rng(7)
+    n = 3000
+    bmag = rng.standard_normal(n)
+    slow = np.convolve(bmag, np.ones(25) / 25, mode='same')
+    fast = np.round(np.convolve(bmag, np.ones(5) / 5, mode='same'), 1)  # rounding makes flat steps
+    bmag[[0, 400, 401, 1500, n - 1]] = np.nan
+    slow[[900, 2000]] = np.nan
+    fast[[50, 1200]] = np.nan
+
+    scanner = HoleCandidateScanner(bmag, slow, fast)
+    with np.errstate(invalid='ignore'):
+        for i in range(n):
+            assert scanner.next_candidate(i) == _loop_candidate(bmag, slow, i), i
+            assert scanner.left_plateau(i) == _loop_left_plateau(fast, i), i
+            assert scanner.right_plateau(i) == _loop_right_plateau(fast, i), i
+
+def test_scanner_all_above_threshold_has_no_candidates():
+    bmag = np.full(100, 10.0)
+    scanner = HoleCandidateScanner(bmag, bmag * 0.8, bmag)
+    assert scanner.next_candidate(0) is None
+
+@pytest.mark.parametrize('refine', [refine_hole, _refine_hole_numpy])
+def test_refine_hole_matches_numpy_argmin_argmax(refine):
+    rng = np.random.default_rng(3)
+    bmag = rng.standard_normal(500)
+    bmag[250] = np.nan
+    for L, R, L_avg, R_avg in [(10, 40, 0, 60), (240, 260, 200, 300), (251, 251, 251, 251), (100, 120, 90, 110)]:
+        expected = (
+            int(np.argmin(bmag[L:R + 1]) + L),
+            int(np.argmax(bmag[L_avg:L + 1]) + L_avg),
+            int(np.argmax(bmag[R:R_avg + 1]) + R) if R_avg >= R else -1,
+        )
+        assert refine(bmag, L, R, L_avg, R_avg) == expected
+
+# Output of the loop-based _detect_magnetic_holes_logic for _synthetic(0) with default settings
+EXPECTED_HOLES = [
+    (1987, 2010), (2011, 3013), (4809, 4833), (4824, 5556), (6474, 7226), (7342, 7458), (17865, 18479),
+    (20045, 20070), (20062, 20084), (20076, 21271), (21263, 21288), (25993, 26387), (28490, 28848),
+    (30605, 31108), (32245, 32922), (32913, 32936), (35232, 35255), (35249, 35275), (35276, 36126),
+    (36127, 36151), (38320, 39957), (39958, 39989), (39980, 40004), (39995, 40020), (40016, 40039),
+    (40044, 40065), (41433, 43207), (43198, 43220), (44370, 44494), (44485, 44507), (44925, 44951),
+    (44945, 45864), (45855, 45881), (47687, 48187), (48178, 48201), (51198, 51225), (51216, 51245),
+    (51237, 51263), (51254, 51279), (51280, 52115), (56735, 57579), (57570, 57596), (57588, 57610),
+]
+EXPECTED_MINIMA = [
+    2009, 2687, 4828, 5182, 6689, 7406, 18007, 20069, 20080, 20250, 21268, 26187, 28695, 30887, 32557,
+    32916, 35242, 35274, 35582, 36140, 39013, 39961, 39980, 39996, 40030, 40054, 41555, 43204, 44438,
+    44485, 44950, 45424, 45858, 47914, 48178, 51224, 51229, 51258, 51275, 51770, 56897, 57575, 57591,
+]
+EXPECTED_COUNTS = {'potential': 107, 'small_threshold_cross': 90, 'asymmetric_initial': 74,
+                   'complex_holes_flagged': 74, 'confirmed': 43, 'shallow': 64}
+
+def test_detection_matches_previous_hole_list():
+    core = pytest.importorskip('magnetic_hole_finder.magnetic_hole_finder_core')
+    from magnetic_hole_finder.time_management import efficient_moving_average
+
+    times, br, bt, bn, bmag = _synthetic(0)
+    settings = core.HoleFinderSettings()
+    settings.search_in_progress_output = False
+    with contextlib.redirect_stdout(io.StringIO()):
+        slow = efficient_moving_average(times, bmag, settings.smoothing_window_seconds, RATE, settings.mean_threshold)
+        fast = efficient_moving_average(times, bmag, settings.min_max_finding_smooth_window, RATE, settings.mean_threshold)
+        core.hole_counter_core.clear()
+        holes, minima, _, _, _, details, counter = core._detect_magnetic_holes_logic(
+            ['2024-03-01/00:00:00', '2024-03-01/00:03:25'], settings, RATE,
+            times, br, bt, bn, bmag, times, bmag, slow, fast)
+
+    assert [tuple(int(v) for v in h) for h in holes] == EXPECTED_HOLES
+    assert [int(m) for m in minima] == EXPECTED_MINIMA
+    assert dict(counter) == EXPECTED_COUNTS
+    assert len(details) == len(EXPECTED_HOLES)
@@ -0,0 +1,160 @@
+#tests/test_magnetic_hole_sharding.py
+# To run tests from the project root directory and see print output in the console:
+# conda run -n plotbot_env python -m pytest tests/test_magnetic_hole_sharding.py -vv -s
+
+"""
+Tests for the time-sharded magnetic hole scan: shard/halo layout, ownership
+and de-duplication of holes seen by two shards, and the merged outputs.
+Per-shard detection is replaced by canned results (no downloaded data),
+except in the 2-worker run, which scans synthetic mag_RTN files offline and
+must give the same catalogue as running the shards in this process.
+"""
+
+import os
+import sys
+import json
+import pytest
+import numpy as np
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from magnetic_hole_finder import sharded_scan
+from magnetic_hole_finder.sharded_scan import (split_trange_into_shards, merge_shard_holes, scan_magnetic_holes_sharded,
+                                               hole_records, hole_details)
+
+class _Settings:
+    def __init__(self):
+        self.smoothing_window_seconds = 8.0
+        self.Bave_window_seconds = 20.0
+        self.depth_percentage_threshold = 0.25
+
+def _hole(shard, left, minimum, right):
+    return {'shard': shard, 'L_threshold_cross_time': f"2023-09-23/{left}.000000",
+            'min_idx_time': f"2023-09-23/{minimum}.000000", 'R_threshold_cross_time': f"2023-09-23/{right}.000000"}
+
+def test_split_adds_halo_but_stays_inside_trange():
+    shards = split_trange_into_shards(['2023-09-22/00:00:00', '2023-09-24/12:00:00'], 86400, 28)
+    assert [core for core, _ in shards] == [
+        ['2023-09-22/00:00:00.000000', '2023-09-23/00:00:00.000000'],
+        ['2023-09-23/00:00:00.000000', '2023-09-24/00:00:00.000000'],
+        ['2023-09-24/00:00:00.000000', '2023-09-24/12:00:00.000000'],
+    ]
+    assert shards[0][1] == ['2023-09-22/00:00:00.000000', '2023-09-23/00:00:28.000000']
+    assert shards[1][1] == ['2023-09-22/23:59:32.000000', '2023-09-24/00:00:28.000000']
+    assert shards[2][1] == ['2023-09-23/23:59:32.000000', '2023-09-24/12:00:00.000000']
+    with pytest.raises(ValueError):
+        split_trange_into_shards(['2023-09-22/00:00:00', '2023-09-21/00:00:00'], 86400, 28)
+
+def test_merge_keeps_each_hole_once():
+    results = [
+        {'index': 0, 'core_trange': ['2023-09-23/00:00:00', '2023-09-23/12:00:00'],
+         'holes': [_hole(0, '06:00:00', '06:00:01', '06:00:02'),
+                   _hole(0, '11:59:58', '11:59:59', '12:00:03'),    # straddles the edge, min in shard 0
+                   _hole(0, '12:00:05', '12:00:06', '12:00:07')]},  # halo only, owned by shard 1
+        {'index': 1, 'core_trange': ['2023-09-23/12:00:00', '2023-09-23/23:59:59'],
+         'holes': [_hole(1, '11:59:58', '12:00:00', '12:00:03'),    # same hole, min shifted past the edge
+                   _hole(1, '12:00:05', '12:00:06', '12:00:07'),
+                   _hole(1, '23:59:58', '23:59:59', '23:59:59')]},  # end of the last shard is inclusive
+    ]
+    catalogue = merge_shard_holes(results)
+    assert [(h['shard'], h['min_idx_time'][11:19]) for h in catalogue] == [
+        (0, '06:00:01'), (0, '11:59:59'), (1, '12:00:06'), (1, '23:59:59')]
+
+def test_hole_details_round_trip_through_records():
+    times = np.datetime64('2023-09-23T06:00:00', 'ns') + np.arange(1000) * np.timedelta64(3413, 'us')
+    details = [{'L_threshold_cross': 10, 'R_threshold_cross': 40, 'min_idx': 25, 'left_max_value_idx': 5,
+                'right_max_value_idx': 45, 'tS': None, 'tE': 999, 'depth': 0.4, 'complex_hole_flag': False}]
+    records = hole_records(times, details, shard_index=3)
+    assert records[0]['shard'] == 3 and records[0]['min_idx_time'] == '2023-09-23/06:00:00.085325'
+    assert hole_details(times, records) == details
+    # Indices into a later, shorter array: shifted, and clamped at its ends
+    shifted = hole_details(times[20:900], records)[0]
+    assert (shifted['L_threshold_cross'], shifted['min_idx'], shifted['tE']) == (0, 5, 879)
+
+def test_driver_writes_merged_catalogue_and_summary(tmp_path, monkeypatch):
+    def fake_run_shard(index, core_trange, detect_trange, base_save_dir, settings):
+        if index == 2:
+            raise RuntimeError("no data")
+        minimum = core_trange[0][:11] + '06:00:00.000000'
+        hole = {'shard': index, 'L_threshold_cross_time': minimum, 'min_idx_time': minimum,
+                'R_threshold_cross_time': minimum}
+        halo_minimum = detect_trange[0]  # Seen in the halo of shard 1, owned by shard 0
+        halo_hole = {'shard': index, 'L_threshold_cross_time': halo_minimum, 'min_idx_time': halo_minimum,
+                     'R_threshold_cross_time': halo_minimum}
+        return {'index': index, 'core_trange': core_trange, 'detect_trange': detect_trange,
+                'hole_counts': {'potential': 3, 'confirmed': 1},
+                'summary': {'status': 'OK'}, 'holes': [hole, halo_hole] if index else [hole]}
+    written = {}
+    def fake_write_shard_outputs(core_trange, base_save_dir, settings, records, summary):
+        written[core_trange[0]] = [record['min_idx_time'] for record in records]
+        return str(tmp_path / core_trange[0][:10])
+    monkeypatch.setattr(sharded_scan, '_run_shard', fake_run_shard)
+    monkeypatch.setattr(sharded_scan, '_write_shard_outputs', fake_write_shard_outputs)
+
+    catalogue, summary = scan_magnetic_holes_sharded(
+        ['2023-09-22/00:00:00', '2023-09-25/00:00:00'], str(tmp_path), _Settings(),
+        workers=1, batch_save_dir=str(tmp_path / 'merged'))
+
+    assert len(catalogue) == 2
+    assert summary['hole_counts'] == {'potential': 6, 'confirmed': 2}
+    assert summary['failed_shards'] == [2]
+    assert summary['shard_halo_seconds'] == 28.0
+    assert [s['holes_in_catalogue'] for s in summary['shards']] == [1, 1, 0]
+    # Outputs come after the merge: one call per successful shard, with only the holes it owns
+    assert written == {'2023-09-22/00:00:00.000000': ['2023-09-22/06:00:00.000000'],
+                       '2023-09-23/00:00:00.000000': ['2023-09-23/06:00:00.000000']}
+    assert [s['sub_save_dir'] for s in summary['shards']] == [str(tmp_path / '2023-09-22'), str(tmp_path / '2023-09-23'), None]
+    with open(tmp_path / 'merged' / 'run_settings_and_summary.json') as f:
+        assert json.load(f)['holes_in_catalogue'] == 2
+    with open(tmp_path / 'merged' / 'magnetic_hole_catalogue.json') as f:
+        assert len(json.load(f)) == 2
+    from plotbot.hole_catalogue import HoleCatalogue
+    assert len(HoleCatalogue.load(str(tmp_path / 'merged' / 'magnetic_hole_catalogue.npz'))) == 2
+
+def _write_mag_rtn_with_dips(trange, dip_seconds):
+    """Rewrite the synthetic mag_RTN files for trange with |B| dropped by 60% for ~1 s at each offset in dip_seconds."""
+    import cdflib
+    from tests.synthetic_cdf import write_synthetic_cdfs, write_cdf
+    from dateutil.parser import parse
+    t0 = parse(trange[0])
+    start = cdflib.cdfepoch.compute_tt2000([t0.year, t0.month, t0.day, t0.hour, t0.minute, t0.second, 0, 0, 0])
+    for path in write_synthetic_cdfs(trange, 'mag_RTN', whole_files=False):
+        cdf = cdflib.CDF(path)
+        epochs = cdf.varget('epoch_mag_RTN')
+        field = cdf.varget('psp_fld_l2_mag_RTN').astype(np.float64)
+        seconds = (epochs - start) / 1e9
+        depth = np.ones(len(seconds))
+        for offset in dip_seconds:
+            depth -= 0.6 * np.exp(-0.5 * ((seconds - offset) / 0.5) ** 2)
+        write_cdf(path, 'epoch_mag_RTN', epochs, {'psp_fld_l2_mag_RTN': (field * depth[:, None]).astype(np.float32)})
+
+@pytest.mark.parametrize('synthetic_data_trange',
+                         [{'trange': ['2021-04-29/06:00:00.000', '2021-04-29/06:30:00.000'], 'data_type': 'mag_RTN'}],
+                         indirect=True)
+def test_two_workers_match_one_worker_on_synthetic_data(synthetic_data_trange, tmp_path):
+    pytest.importorskip('magnetic_hole_finder.magnetic_hole_finder_core')  # Needs pytplot
+    from magnetic_hole_finder.magnetic_hole_finder_core import HoleFinderSettings
+
+    # The workers only see the synthetic files if the fixture's data settings reach them
+    trange = synthetic_data_trange
+    _write_mag_rtn_with_dips(trange, [150.0, 359.0, 720.5, 1500.0])  # 359 s sits 1 s before a shard edge
+
+    settings = HoleFinderSettings()
+    settings.search_in_progress_output = False
+    settings.OUTPUT_MAIN_PLOT = settings.SAVE_MAIN_PLOT = False
+    settings.IZOTOPE_MARKER_FILE_OUTPUT_MAX_AND_MIN = False
+    settings.EXPORT_AUDIO_FILES = False
+
+    serial, serial_summary = scan_magnetic_holes_sharded(
+        trange, str(tmp_path / 'serial'), settings, shard_hours=0.1, workers=1,
+        batch_save_dir=str(tmp_path / 'serial_merged'))
+    pooled, pooled_summary = scan_magnetic_holes_sharded(
+        trange, str(tmp_path / 'pooled'), settings, shard_hours=0.1, workers=2,
+        batch_save_dir=str(tmp_path / 'pooled_merged'))
+
+    assert serial_summary['failed_shards'] == pooled_summary['failed_shards'] == []
+    assert len(pooled_summary['shards']) == 5
+    assert pooled == serial
+    assert pooled_summary['hole_counts'] == serial_summary['hole_counts']
+    with open(tmp_path / 'pooled_merged' / 'magnetic_hole_catalogue.json') as f:
+        assert len(json.load(f)) == len(serial)
@@ -0,0 +1,90 @@
+#tests/test_memory_inspector.py
+# To run tests from the project root directory and see print output in the console:
+# conda run -n plotbot_env python -m pytest tests/test_memory_inspector.py -vv -s
+
+"""
+Tests for the memory inspector: buffers shared through views are counted once
+and charged to the owning array, equal copies are reported as duplicates,
+lists of scalars are estimated, tracemalloc peaks (including nested blocks),
+and a report for mag_RTN_4sa loaded offline from synthetic CDFs.
+"""
+
+import os
+import sys
+from datetime import datetime, timedelta
+import numpy as np
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from plotbot.memory_inspector import memory_report, format_memory_report, track_peak, peak_memory
+
+class _FakeClass:
+    pass
+
+def _fake_class(n=10_000):
+    instance = _FakeClass()
+    field = np.random.default_rng(0).normal(size=(n, 3))
+    instance.field = field
+    instance.raw_data = {'br': field[:, 0], 'bt': field[:, 1], 'all': [field[:, 0], field[:, 1]]}
+    instance.time = np.arange(n, dtype=np.int64)
+    instance.time_copy = instance.time.copy()  # Wasted duplicate
+    instance.datetime = [datetime(2021, 4, 29) + timedelta(seconds=i) for i in range(n)]
+    instance.empty = None
+    return instance
+
+def test_views_are_counted_once_against_the_owner():
+    n = 10_000
+    report = memory_report(registry={'fake': _fake_class(n)})
+    components = report['classes']['fake']['components']
+    assert components['field']['bytes'] == n * 3 * 8
+    assert components['raw_data.br']['bytes'] == 0 and components['raw_data.br']['shared_with'] == ['fake.field']
+    assert components['raw_data.all[1]']['view_bytes'] == n * 8
+    assert components['time']['bytes'] == components['time_copy']['bytes'] == n * 8
+    assert components['datetime']['bytes'] > n * 40  # List of datetime objects, estimated
+    assert report['view_bytes'] > report['total_bytes']
+    assert report['total_bytes'] == sum(entry['bytes'] for entry in components.values())
+
+    assert report['duplicates'] == [{'components': ['fake.time', 'fake.time_copy'], 'bytes': n * 8, 'wasted_bytes': n * 8}]
+    text = format_memory_report(report)
+    assert 'fake' in text and 'duplicate' in text and 'time_copy' in text
+
+def test_shared_buffers_across_classes_and_filtering():
+    first, second = _fake_class(), _FakeClass()
+    second.field_view = first.field[::2]
+    report = memory_report(registry={'first': first, 'second': second, 'alias_of_first': first})
+    assert set(report['classes']) == {'alias_of_first', 'second'}  # The same instance is walked once
+    assert report['classes']['second']['bytes'] == 0
+    assert report['classes']['second']['components']['field_view']['shared_with'] == ['alias_of_first.field']
+    assert set(memory_report(classes=['SECOND'], registry={'first': first, 'second': second})['classes']) == {'second'}
+
+def test_track_peak_reports_transient_and_retained_allocations():
+    with track_peak('outer') as outer:
+        kept = np.ones(1_000_000)  # 8 MB kept
+        with track_peak('inner') as inner:
+            transient = np.ones(4_000_000)  # 32 MB freed before the end
+            del transient
+    assert inner['peak_bytes'] >= 32e6 and inner['retained_bytes'] < 1e6
+    assert outer['peak_bytes'] >= 40e6  # The inner peak counts towards the outer block
+    assert 8e6 <= outer['retained_bytes'] < 9e6
+    del kept
+
+    result, stats = peak_memory(np.zeros, 2_000_000)
+    assert result.shape == (2_000_000,) and stats['label'] == 'zeros' and stats['peak_bytes'] >= 16e6
+
+def test_report_for_synthetic_mag_rtn_4sa(synthetic_data_trange):
+    import plotbot
+
+    trange = synthetic_data_trange
+    with track_peak('get_data') as peak:
+        plotbot.get_data(trange, plotbot.mag_rtn_4sa.br)
+    plotbot.mag_rtn_4sa.br.requested_trange = ['2021-04-29/06:01:00.000', '2021-04-29/06:02:00.000']
+    n = len(plotbot.mag_rtn_4sa.datetime_array)
+    report = memory_report(classes=['mag_rtn_4sa'])
+
+    entry = report['classes']['mag_rtn_4sa']
+    components = entry['components']
+    assert peak['peak_bytes'] > 0 and peak['retained_bytes'] > 0
+    assert components['datetime_array']['bytes'] == n * 8
+    assert components['br']['bytes'] == 0 and components['br']['shared_with']  # A view of the field data
+    assert components['br._clipped_data']['bytes'] == 0  # Sorted-time clipping keeps views
+    assert entry['bytes'] < entry['view_bytes']
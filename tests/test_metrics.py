@@ -0,0 +1,85 @@
+#tests/test_metrics.py
+# To run tests from the project root directory and see print output in the console:
+# conda run -n plotbot_env python -m pytest tests/test_metrics.py -vv -s
+
+"""
+Tests for the per-data_type metrics registry: counters and timings keyed
+case-insensitively by data_type, reset of one or every data_type, the report
+table, and an offline get_data on synthetic mag_RTN_4sa files filling the
+tracker, import, merge, calculate and clip counters. Download counters are
+covered in test_download_engine.py.
+"""
+
+import os
+import sys
+import threading
+import pytest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from plotbot.metrics import MetricsRegistry, metrics
+
+def test_counts_and_timings_per_data_type():
+    registry = MetricsRegistry()
+    registry.count('mag_RTN_4sa', 'records_decoded', 100)
+    registry.count('mag_rtn_4sa', 'records_decoded', 50)  # Cubby keys are lower case
+    registry.add_time('mag_RTN_4sa', 'merge', 0.25)
+    with pytest.raises(RuntimeError):
+        with registry.timed('spi_sf00_l3_mom', 'calculate'):
+            raise RuntimeError('recorded anyway')
+    registry.count(None, 'files_downloaded')
+
+    assert registry('mag_RTN_4sa') == {'records_decoded': 150, 'merge': 1, 'merge_seconds': 0.25}
+    snapshot = registry()
+    assert list(snapshot) == ['mag_rtn_4sa', 'spi_sf00_l3_mom', 'unknown']
+    assert snapshot['spi_sf00_l3_mom']['calculate'] == 1 and snapshot['spi_sf00_l3_mom']['calculate_seconds'] >= 0
+    snapshot['mag_rtn_4sa']['records_decoded'] = 0  # A copy, not the live counters
+    assert registry('mag_rtn_4sa')['records_decoded'] == 150
+
+    registry.reset('MAG_RTN_4SA')
+    assert registry('mag_RTN_4sa') == {} and 'unknown' in registry()
+    registry.reset()
+    assert registry() == {} and registry.report() == 'No metrics recorded.'
+
+def test_counting_from_threads_is_exact():
+    registry = MetricsRegistry()
+    def work():
+        for _ in range(1000):
+            registry.count('mag_SC', 'clip')
+    threads = [threading.Thread(target=work) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert registry('mag_SC') == {'clip': 8000}
+
+def test_report_has_a_row_per_data_type():
+    registry = MetricsRegistry()
+    registry.add_time('mag_RTN', 'import', 1.5)
+    registry.count('epad', 'tracker_hits', 3)
+    lines = registry.report().splitlines()
+    assert lines[0].split() == ['data_type', 'import', 'import_seconds', 'tracker_hits']
+    assert lines[1].split() == ['epad', '3']
+    assert lines[2].split() == ['mag_rtn', '1', '1.500']
+
+def test_offline_get_data_fills_the_pipeline_counters(synthetic_data_trange):
+    import plotbot
+
+    trange = synthetic_data_trange
+    metrics.reset('mag_RTN_4sa')
+    try:
+        plotbot.get_data(trange, plotbot.mag_rtn_4sa.br)
+        first_records = len(plotbot.mag_rtn_4sa.datetime_array)
+        plotbot.get_data(trange, plotbot.mag_rtn_4sa.br)  # Served by the tracker
+        plotbot.get_data(['2021-04-29/06:05:00.000', '2021-04-29/06:15:00.000'], plotbot.mag_rtn_4sa.br)
+        clips_before = plotbot.metrics('mag_RTN_4sa').get('clip', 0)  # Custom variables from other tests may clip too
+        plotbot.mag_rtn_4sa.br.requested_trange = ['2021-04-29/06:01:00.000', '2021-04-29/06:02:00.000']
+        counters = plotbot.metrics('mag_RTN_4sa')
+    finally:
+        metrics.reset('mag_RTN_4sa')
+
+    assert counters['tracker_hits'] >= 1 and counters['tracker_misses'] >= 2
+    assert counters['import'] == 2 and counters['records_decoded'] > first_records
+    assert counters['calculate'] == 2 and counters['calculate_seconds'] > 0
+    assert counters['merge'] == 1 and counters['merge_bytes'] > 0
+    assert counters['clip'] == clips_before + 1 and counters['clip_records'] > 0
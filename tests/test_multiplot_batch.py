@@ -0,0 +1,107 @@
+#tests/test_multiplot_batch.py
+# To run tests from the project root directory and see print output in the console:
+# conda run -n plotbot_env python -m pytest tests/test_multiplot_batch.py -vv -s
+
+"""
+Tests for multiplot_batch bookkeeping: panel windows, variable references and
+the in-process rendering path, where multiplot itself is replaced by a trivial
+figure so no data needs to be downloaded. The 2-worker test renders real
+figures from synthetic mag_RTN_4sa files handed to the workers in a snapshot.
+"""
+
+import os
+import sys
+import numpy as np
+import pytest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import matplotlib
+matplotlib.use('Agg')
+import matplotlib.pyplot as mpl_plt
+
+from plotbot.multiplot_batch import multiplot_batch, _var_ref
+from plotbot.multiplot_helpers import get_panel_trange
+from plotbot.plot_manager import plot_manager
+from plotbot.plot_config import plot_config
+from plotbot.ploptions import ploptions
+
+# plotbot/__init__ rebinds plotbot.multiplot to the function (on first access), so fetch the module itself
+import importlib
+multiplot_module = importlib.import_module('plotbot.multiplot')
+
+def _var(class_name, subclass_name, data_type='mag_RTN_4sa'):
+    return plot_manager(np.zeros(3), plot_config=plot_config(
+        data_type=data_type, class_name=class_name, subclass_name=subclass_name))
+
+def test_get_panel_trange_positions():
+    assert get_panel_trange('2024-03-01 12:00', '2h', 'around') == \
+        ['2024-03-01/11:00:00.000000', '2024-03-01/13:00:00.000000']
+    assert get_panel_trange('2024-03-01 12:00', '2h', 'before')[0] == '2024-03-01/10:00:00.000000'
+    assert get_panel_trange('2024-03-01 12:00', '2h', 'after')[1] == '2024-03-01/14:00:00.000000'
+
+def test_var_refs_for_pool_and_local_rendering():
+    br = _var('mag_rtn_4sa', 'br')
+    bt = _var('mag_rtn_4sa', 'bt')
+    custom = _var('custom_variables', 'br_norm', data_type='custom_data_type')
+    assert _var_ref(br) == ('mag_rtn_4sa', 'br')
+    assert _var_ref([br, bt]) == [('mag_rtn_4sa', 'br'), ('mag_rtn_4sa', 'bt')]
+    assert _var_ref(custom) is None
+    assert _var_ref([br, custom]) is None
+
+def test_in_process_batch_saves_every_figure(tmp_path, monkeypatch):
+    calls = []
+
+    def fake_multiplot(plot_list, **kwargs):
+        calls.append((len(plot_list), kwargs))
+        if plot_list[0][0] == 'bad':
+            raise ValueError("no data")
+        fig, _ = mpl_plt.subplots(figsize=(1, 1))
+        return fig
+
+    monkeypatch.setattr(multiplot_module, 'multiplot', fake_multiplot)
+    display_before = ploptions.display_figure
+    br = _var('mag_rtn_4sa', 'br')
+    plot_lists = [[('2024-03-01 12:00', br)], [('bad', br)], [('2024-03-02 12:00', br)] * 2]
+
+    results = multiplot_batch(plot_lists, str(tmp_path / 'out'), workers=1,
+                              filenames=['a', 'b', 'c'], dpi=50, window='1h')
+    assert results[0] == str(tmp_path / 'out' / 'a.png')
+    assert results[1] is None
+    assert os.path.exists(results[0]) and os.path.exists(results[2])
+    assert [n for n, _ in calls] == [1, 1, 2]
+    assert all(kw['save_output'] is False and kw['window'] == '1h' for _, kw in calls)
+    assert ploptions.display_figure == display_before
+
+def test_filenames_must_match_plot_lists(tmp_path):
+    with pytest.raises(ValueError):
+        multiplot_batch([[], []], str(tmp_path), filenames=['only_one'])
+
+@pytest.mark.parametrize('synthetic_data_trange',
+                         [{'trange': ['2021-04-29/06:00:00.000', '2021-04-29/08:00:00.000']}], indirect=True)
+def test_pool_renders_from_handover_snapshot(synthetic_data_trange, tmp_path, monkeypatch):
+    import tempfile
+    import plotbot
+    from plotbot.tracing import tracer
+
+    # Only the parent reads the synthetic files; the workers get a handover snapshot
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(tempfile, 'tempdir', str(tmp_path / 'tmp'))  # Where the handover snapshot goes
+    os.makedirs(tmp_path / 'tmp')
+
+    monkeypatch.setattr(tracer, 'enabled', True)  # Worker spans show whether a worker went to get the data itself
+    tracer.clear()
+    try:
+        plot_lists = [[('2021-04-29 06:30', plotbot.mag_rtn_4sa.br)],
+                      [('2021-04-29 07:00', plotbot.mag_rtn_4sa.bmag), ('2021-04-29 07:30', plotbot.mag_rtn_4sa.bt)]]
+        results = multiplot_batch(plot_lists, str(tmp_path / 'out'), workers=2, dpi=30, window='30m')
+        worker_spans = [record['name'] for record in tracer.records() if record['pid'] != os.getpid()]
+    finally:
+        tracer.clear()
+
+    assert results == [str(tmp_path / 'out' / 'multiplot_000.png'), str(tmp_path / 'out' / 'multiplot_001.png')]
+    assert all(os.path.getsize(path) > 0 for path in results)
+    assert worker_spans.count('figure') == 2
+    assert 'Download data' not in worker_spans  # Served from the snapshot and the parent's tracker ranges
+    assert os.listdir(tmp_path / 'tmp') == []  # Snapshot directory removed
+    assert not os.path.exists(tmp_path / 'data_snapshots')  # Nothing written to the working directory
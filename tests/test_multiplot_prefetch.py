@@ -0,0 +1,109 @@
+#tests/test_multiplot_prefetch.py
+# To run tests from the project root directory and see print output in the console:
+# conda run -n plotbot_env python -m pytest tests/test_multiplot_prefetch.py -vv -s
+
+"""
+Tests for multiplot's up-front prefetch of panel windows and the zero-copy
+per-panel clipping in plot_manager, including the user's plot_config styling
+surviving the prefetch. get_data is replaced by a recorder, so no data is
+downloaded.
+"""
+
+import os
+import sys
+from datetime import datetime
+import numpy as np
+import pytest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from plotbot.multiplot import _merge_panel_windows, prefetch_panel_windows
+from plotbot.multiplot_options import MultiplotOptions
+from plotbot.plot_manager import plot_manager
+from plotbot.plot_config import plot_config
+from plotbot.time_utils import TimeRangeTracker
+
+multiplot_module = sys.modules['plotbot.multiplot']
+
+T0 = np.datetime64('2024-03-01T00:00:00', 'ns')
+
+def _var(class_name, subclass_name, n=0, data_type='mag_RTN_4sa'):
+    times = T0 + np.arange(n) * np.timedelta64(1, 's') if n else None
+    return plot_manager(np.arange(n, dtype=float), plot_config=plot_config(
+        data_type=data_type, class_name=class_name, subclass_name=subclass_name,
+        plot_type='time_series', datetime_array=times))
+
+def test_merge_panel_windows():
+    d = lambda h: datetime(2024, 3, 1, h)
+    merged = _merge_panel_windows([(d(10), d(12)), (d(0), d(2)), (d(1), d(3)), (d(3), d(4))])
+    assert merged == [[d(0), d(4)], [d(10), d(12)]]
+
+def test_prefetch_fetches_each_class_once_per_merged_run(monkeypatch):
+    calls = []
+    br, bt = _var('mag_rtn_4sa', 'br'), _var('mag_rtn_4sa', 'bt')
+    vr = _var('proton', 'vr', data_type='spi_sf00_l3_mom')
+    custom = _var('custom_variables', 'thing', data_type='custom_data_type')
+
+    refreshed = {}
+    class FakeInstance:
+        def get_subclass(self, name):
+            return refreshed.setdefault(name, _var('mag_rtn_4sa', name))
+
+    monkeypatch.setattr(multiplot_module, 'get_data', lambda trange, *vars: calls.append(
+        (tuple(trange), sorted(v.subclass_name for v in vars))))
+    monkeypatch.setattr(multiplot_module.data_cubby, 'grab', lambda name: FakeInstance())
+
+    options = MultiplotOptions()
+    options.window = '2h'
+    options.position = 'around'
+    plot_list = [('2024-03-01 12:00', br), ('2024-03-01 13:00', [br, bt]),
+                 ('2024-03-05 12:00', vr), ('2024-03-01 12:30', custom)]
+    prefetched = prefetch_panel_windows(plot_list, options)
+
+    mag_calls = [c for c in calls if c[1] == ['br', 'bt']]
+    assert mag_calls == [(('2024-03-01/11:00:00.000000', '2024-03-01/14:00:00.000000'), ['br', 'bt'])]
+    assert len(calls) == 2, "one request for mag (overlapping windows merged) and one for proton"
+    assert prefetched[('mag_rtn_4sa', 'bt')] is refreshed['bt']
+    assert ('custom_variables', 'thing') not in prefetched
+
+def test_prefetch_keeps_custom_styling(monkeypatch):
+    br = _var('mag_rtn_4sa', 'br')
+    br.plot_config.color = 'crimson'
+    br.plot_config.y_label = 'custom label'
+    fresh = _var('mag_rtn_4sa', 'br', n=10)  # get_data leaves a default plot_config with the new data
+
+    class FakeInstance:
+        def get_subclass(self, name):
+            return fresh
+
+    monkeypatch.setattr(multiplot_module, 'get_data', lambda trange, *vars: None)
+    monkeypatch.setattr(multiplot_module.data_cubby, 'grab', lambda name: FakeInstance())
+    options = MultiplotOptions()
+    options.window = '2h'
+    prefetched = prefetch_panel_windows([('2024-03-01 12:00', br)], options)
+
+    var = prefetched[('mag_rtn_4sa', 'br')]
+    assert var.plot_config.color == 'crimson' and var.plot_config.y_label == 'custom label'
+    assert var.plot_config.datetime_array is not None and len(var.plot_config.datetime_array) == 10
+    assert br.plot_config.color == 'crimson'
+
+def test_panel_clip_is_a_view_matching_the_mask_path():
+    var = _var('mag_rtn_4sa', 'br', n=1000)
+    trange = ['2024-03-01/00:01:00.000000', '2024-03-01/00:02:00.000000']
+    try:
+        TimeRangeTracker.set_current_trange(trange)
+        data, times = var.data, var.datetime_array
+    finally:
+        TimeRangeTracker.set_current_trange(None)
+    assert np.shares_memory(data, var.view(np.ndarray))
+    assert np.shares_memory(times, var.plot_config.datetime_array)
+    np.testing.assert_array_equal(data, var.clip_to_original_trange(var.view(np.ndarray), trange))
+    assert len(data) == 61 and times[0] == T0 + np.timedelta64(60, 's')
+
+def test_unsorted_times_use_the_mask_path():
+    var = _var('mag_rtn_4sa', 'br', n=100)
+    var.plot_config.datetime_array = var.plot_config.datetime_array[::-1].copy()
+    trange = ['2024-03-01/00:00:10.000000', '2024-03-01/00:00:19.000000']
+    var.requested_trange = trange
+    assert len(var._clipped_data) == 10
+    assert not np.shares_memory(var._clipped_data, var.view(np.ndarray))
@@ -0,0 +1,143 @@
+#tests/test_prefetch.py
+# To run tests from the project root directory and see print output in the console:
+# conda run -n plotbot_env python -m pytest tests/test_prefetch.py -vv -s
+
+"""
+Tests for plotbot.prefetch: data_types.py entries expand into a deduplicated
+daily / 6-hour file manifest diffed against local storage, and a Berkeley
+prefetch downloads only the missing files (latest version, one listing per
+directory) from a local http.server with Apache-style index pages. Also
+checks the shared bandwidth cap. No real servers are contacted.
+"""
+
+import os
+import sys
+import time
+import threading
+import pytest
+import requests
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from plotbot.config import config
+from plotbot.server_access import server_access
+from plotbot.listing_cache import listing_cache
+from plotbot.data_classes.data_types import data_types
+from plotbot.prefetch import prefetch, plan_prefetch
+from plotbot.download_engine import RateLimiter
+
+TRANGE = ['2020-01-30/12:00:00', '2020-02-02/00:00:00']  # Jan 30 12h .. Feb 1 (midnight end excluded)
+
+def _remote_files():
+    files = {}
+    for day in ('20200130', '20200131', '20200201'):
+        month = day[4:6]
+        for version in (1, 2):
+            files[f'/mag4/2020/{month}/psp_fld_l2_mag_RTN_4_Sa_per_Cyc_{day}_v{version:02d}.cdf'] = os.urandom(20_000 + version)
+    return files
+
+class _Handler(BaseHTTPRequestHandler):
+    def log_message(self, *args):
+        pass
+
+    def _lookup(self):
+        files = self.server.files
+        if self.path.endswith('/'):
+            names = sorted(p[len(self.path):] for p in files if p.startswith(self.path))
+            if not names:
+                return 404, b''
+            rows = ''.join(f'<tr><td><a href="{n}">{n}</a></td></tr>' for n in names)
+            return 200, f'<html><body><h1>Index of {self.path}</h1><table>{rows}</table></body></html>'.encode()
+        return (200, files[self.path]) if self.path in files else (404, b'')
+
+    def do_HEAD(self):
+        self.server.log.append(('HEAD', self.path))
+        status, body = self._lookup()
+        self.send_response(status)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+
+    def do_GET(self):
+        self.server.log.append(('GET', self.path))
+        status, body = self._lookup()
+        self.send_response(status)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+@pytest.fixture
+def berkeley(monkeypatch, tmp_path):
+    httpd = ThreadingHTTPServer(('127.0.0.1', 0), _Handler)
+    httpd.files = _remote_files()
+    httpd.log = []
+    threading.Thread(target=httpd.serve_forever, daemon=True).start()
+    base = f'http://127.0.0.1:{httpd.server_address[1]}'
+    monkeypatch.setitem(data_types['mag_RTN_4sa'], 'url', base + '/mag4/')
+    monkeypatch.setattr(server_access, '_session', requests.Session())
+    monkeypatch.setattr(config, 'data_server', 'berkeley')
+    monkeypatch.setattr(config, '_data_dir', str(tmp_path / 'data'))
+    monkeypatch.setattr(config, 'local_file_index', False)  # Plain scans of the temporary tree
+    listing_cache.clear()
+    yield httpd
+    listing_cache.clear()
+    httpd.shutdown()
+    httpd.server_close()
+
+def _local_dir(tmp_path, data_type, year=2020):
+    from plotbot.data_classes.data_types import get_local_path
+    return os.path.join(get_local_path(data_type).format(data_level=data_types[data_type]['data_level']), str(year))
+
+def test_plan_expands_daily_and_6hour_files(berkeley, tmp_path):
+    local_dir = _local_dir(tmp_path, 'mag_RTN_4sa')
+    os.makedirs(local_dir)
+    open(os.path.join(local_dir, 'psp_fld_l2_mag_rtn_4_sa_per_cyc_20200131_v03.cdf'), 'w').close()
+
+    manifest = plan_prefetch(TRANGE, ['mag_rtn_4sa', 'mag_RTN', 'spi_sf00_8dx32ex8a', 'psp_span_vdf', 'proton_fits'])
+    daily = [m for m in manifest if m['data_type'] == 'mag_RTN_4sa']
+    assert [m['date_info']['date_str'] for m in daily] == ['20200130', '20200131', '20200201']
+    assert [m['status'] for m in daily] == ['missing', 'local', 'missing']
+    six_hour = [m for m in manifest if m['data_type'] == 'mag_RTN']
+    assert [m['date_info']['date_str'] + m['date_info']['hour_str'] for m in six_hour][:3] == ['2020013012', '2020013018', '2020013100']
+    assert len(six_hour) == 2 + 4 + 4
+    # psp_span_vdf reads the same files as spi_sf00_8dx32ex8a; proton_fits is local CSV only
+    assert {m['data_type'] for m in manifest} == {'mag_RTN_4sa', 'mag_RTN', 'spi_sf00_8dx32ex8a'}
+    assert all(m['source'] == 'berkeley' for m in manifest)
+
+def test_berkeley_prefetch_downloads_only_missing(berkeley, tmp_path):
+    local_dir = _local_dir(tmp_path, 'mag_RTN_4sa')
+    os.makedirs(local_dir)
+    open(os.path.join(local_dir, 'psp_fld_l2_mag_RTN_4_Sa_per_Cyc_20200131_v01.cdf'), 'w').close()
+
+    dry = prefetch(TRANGE, 'mag_RTN_4sa', dry_run=True)
+    assert [m['status'] for m in dry] == ['missing', 'local', 'missing']
+    assert not any(method == 'GET' and path.endswith('.cdf') for method, path in berkeley.log)
+
+    manifest = prefetch(TRANGE, 'mag_RTN_4sa', workers=3)
+    assert [m['status'] for m in manifest] == ['downloaded', 'local', 'downloaded']
+    for item in (manifest[0], manifest[2]):
+        remote = [p for p in berkeley.files if p.endswith(os.path.basename(item['local_path']))][0]
+        assert item['local_path'].endswith('_v02.cdf')
+        assert open(item['local_path'], 'rb').read() == berkeley.files[remote]
+        assert item['size'] == len(berkeley.files[remote])
+    listings = [path for method, path in berkeley.log if method == 'GET' and path.endswith('/')]
+    assert sorted(set(listings)) == ['/mag4/2020/01/', '/mag4/2020/02/'] and len(listings) == 2
+
+    # Everything is local now: nothing more to fetch
+    assert {m['status'] for m in prefetch(TRANGE, 'mag_RTN_4sa')} == {'local'}
+
+def test_missing_remote_file_is_unavailable(berkeley):
+    del berkeley.files['/mag4/2020/02/psp_fld_l2_mag_RTN_4_Sa_per_Cyc_20200201_v01.cdf']
+    del berkeley.files['/mag4/2020/02/psp_fld_l2_mag_RTN_4_Sa_per_Cyc_20200201_v02.cdf']
+    statuses = [m['status'] for m in prefetch(TRANGE, 'mag_RTN_4sa')]
+    assert statuses == ['downloaded', 'downloaded', 'unavailable']
+
+def test_rate_limiter_caps_combined_rate():
+    limiter = RateLimiter(200_000)
+    start = time.perf_counter()
+    threads = [threading.Thread(target=lambda: [limiter.consume(10_000) for _ in range(5)]) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert time.perf_counter() - start >= 0.9  # 200 KB at 200 KB/s
@@ -0,0 +1,90 @@
+#tests/test_rolling_stats.py
+# To run tests from the project root directory and see print output in the console:
+# conda run -n plotbot_env python -m pytest tests/test_rolling_stats.py -vv -s
+
+"""
+Tests for the shared centred rolling mean/std kernels used by the
+magnetic_hole_finder smoothing helpers, against pandas rolling windows and a
+direct per-window reference. Uses synthetic arrays only.
+"""
+
+import os
+import sys
+import numpy as np
+import pandas as pd
+import pytest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from magnetic_hole_finder import rolling_stats
+from magnetic_hole_finder.rolling_stats import rolling_mean, rolling_mean_std, window_samples
+
+WINDOWS = [1, 2, 3, 4, 7, 10, 64, 65, 999, 5000]
+
+def _bmag(n=3000):
+    rng = np.random.default_rng(0)
+    data = 50 + np.cumsum(rng.standard_normal(n)) * 0.1
+    data[100:110] = np.nan
+    data[n // 2] = np.nan
+    return data
+
+def _direct(data, window, ddof=1):
+    """Mean/std of each centred window computed one window at a time."""
+    n = len(data)
+    offset = (window - 1) // 2
+    means, stds = np.full(n, np.nan), np.full(n, np.nan)
+    for i in range(n):
+        values = data[max(i + 1 + offset - window, 0):min(i + 1 + offset, n)]
+        values = values[~np.isnan(values)]
+        if len(values) >= 1:
+            means[i] = values.mean()
+        if len(values) > ddof:
+            stds[i] = values.std(ddof=ddof)
+    return means, stds
+
+@pytest.fixture(params=[True, False], ids=['numba', 'numpy'])
+def kernel(request, monkeypatch):
+    if request.param and not rolling_stats.NUMBA_AVAILABLE:
+        pytest.skip("numba not installed")
+    monkeypatch.setattr(rolling_stats, 'NUMBA_AVAILABLE', request.param)
+
+def test_mean_matches_pandas_rolling(kernel):
+    data = _bmag()
+    means = rolling_mean(data, WINDOWS)
+    assert means.shape == (len(WINDOWS), len(data))
+    for k, window in enumerate(WINDOWS):
+        expected = pd.Series(data).rolling(window=window, center=True, min_periods=1).mean().to_numpy()
+        np.testing.assert_allclose(means[k], expected, rtol=1e-12)
+
+def test_std_matches_direct_windows(kernel):
+    data = _bmag(800)
+    means, stds = rolling_mean_std(data, [2, 5, 64, 1000])
+    for k, window in enumerate([2, 5, 64, 1000]):
+        expected_mean, expected_std = _direct(data, window)
+        np.testing.assert_allclose(means[k], expected_mean, rtol=1e-12)
+        np.testing.assert_allclose(stds[k], expected_std, rtol=1e-8, atol=1e-12)
+
+def test_scalar_window_and_min_periods():
+    data = _bmag(500)
+    mean, std = rolling_mean_std(data, 11, min_periods=8)
+    assert mean.shape == std.shape == (500,)
+    expected = pd.Series(data).rolling(window=11, center=True, min_periods=8)
+    np.testing.assert_allclose(mean, expected.mean().to_numpy(), rtol=1e-12)
+    np.testing.assert_allclose(std, expected.std().to_numpy(), rtol=1e-7)
+    with pytest.raises(ValueError):
+        rolling_mean(data, 0)
+
+def test_window_samples_rounding():
+    assert window_samples(0.2, 292.9) == 58
+    assert window_samples(0.2, 292.9, 'round') == 59
+    assert window_samples(0.001, 292.9, 'ceil') == 1
+    assert window_samples(0.001, 292.9) == 0
+
+def test_heatmap_windows_match_single_window_calls():
+    from magnetic_hole_finder.time_management import (
+        efficient_moving_average_for_heatmap, efficient_moving_average_for_heatmap_windows)
+    data = _bmag()
+    seconds = [0.1, 1.0, 4.0]
+    heatmap = efficient_moving_average_for_heatmap_windows(None, data, seconds, 292.9)
+    for k, window_seconds in enumerate(seconds):
+        np.testing.assert_array_equal(heatmap[k], efficient_moving_average_for_heatmap(None, data, window_seconds, 292.9))
@@ -0,0 +1,64 @@
+#tests/test_startup_benchmark.py
+# To run tests from the project root directory and see print output in the console:
+# conda run -n plotbot_env python -m pytest tests/test_startup_benchmark.py -vv -s
+
+"""
+Tests for the cold-process startup benchmark harness: synthetic mag_RTN_4sa
+CDFs load through get_data without a network, one real cold run reports the
+import and first-call metrics with ImportTimer block attribution, and the
+history comparison flags only slowdowns beyond the threshold on the same
+machine.
+"""
+
+import os
+import sys
+import numpy as np
+import cdflib
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from plotbot.config import config
+from tests.synthetic_cdf import write_synthetic_cdfs
+from tests.benchmarks.startup_benchmark import run_benchmarks, compare, load_history, save_history, machine_id
+
+def test_synthetic_files_match_the_data_type_layout(tmp_path, monkeypatch):
+    monkeypatch.setattr(config, '_data_dir', str(tmp_path))
+    paths = write_synthetic_cdfs(['2020-01-29/22:00:00', '2020-01-30/02:00:00'], 'mag_RTN_4sa', rate_hz=1.0)
+    assert [os.path.basename(p) for p in paths] == ['psp_fld_l2_mag_RTN_4_Sa_per_Cyc_20200129_v01.cdf',
+                                                    'psp_fld_l2_mag_RTN_4_Sa_per_Cyc_20200130_v01.cdf']
+    assert paths[0].startswith(os.path.join(str(tmp_path), 'psp', 'fields', 'l2'))
+    with cdflib.CDF(paths[0]) as cdf:
+        epochs = cdf.varget('epoch_mag_RTN_4_Sa_per_Cyc')
+        field = cdf.varget('psp_fld_l2_mag_RTN_4_Sa_per_Cyc')
+    assert field.shape == (86400, 3) and field.dtype == np.float32
+    assert np.all(np.diff(epochs) == 1_000_000_000)
+    assert str(cdflib.cdfepoch.to_datetime(epochs[:1])[0])[:19] == '2020-01-29T00:00:00'
+
+def test_cold_run_reports_metrics_and_import_blocks():
+    record = run_benchmarks(repeat=1, benchmarks=['import_plotbot', 'first_get_data', 'second_get_data'])
+    metrics = record['metrics']
+    assert set(metrics) == {'import_plotbot', 'first_get_data', 'second_get_data'}
+    assert all(seconds > 0 for seconds in metrics.values())
+    assert metrics['second_get_data'] < metrics['first_get_data']  # Served from the tracker
+    assert 'core_components' in record['import_blocks']
+    assert record['machine'] == machine_id() and record['version']
+
+def _record(**metrics):
+    return {'machine': machine_id(), 'metrics': metrics}
+
+def test_compare_flags_regressions_against_recent_median(tmp_path):
+    history = [_record(import_plotbot=1.0, first_plotbot=2.0) for _ in range(4)]
+    history.append(dict(_record(import_plotbot=9.0), machine='elsewhere'))  # Other machines never count
+    path = str(tmp_path / 'history.json')
+    save_history(history, path)
+    assert load_history(path) == history
+    assert load_history(str(tmp_path / 'missing.json')) == []
+
+    rows = {row['name']: row for row in compare(_record(import_plotbot=1.4, first_plotbot=2.1, first_get_data=0.2),
+                                                load_history(path), threshold=0.25)}
+    assert rows['import_plotbot']['regression'] and rows['import_plotbot']['baseline'] == 1.0
+    assert not rows['first_plotbot']['regression']  # +5%
+    assert rows['first_get_data']['baseline'] is None and not rows['first_get_data']['regression']
+    # Differences under MIN_DELTA are noise even when large relative to the baseline
+    tiny = compare(_record(second_get_data=0.004), [_record(second_get_data=0.001)])
+    assert not tiny[0]['regression']
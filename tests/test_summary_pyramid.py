@@ -0,0 +1,137 @@
+#tests/test_summary_pyramid.py
+# To run tests from the project root directory and see print output in the console:
+# conda run -n plotbot_env python -m pytest tests/test_summary_pyramid.py -vv -s
+
+"""
+Tests for the multi-resolution min/max/mean summary pyramid used for
+long-range plotting. Uses synthetic arrays only (no downloaded data).
+"""
+
+import os
+import sys
+import numpy as np
+import pytest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from plotbot.summary_pyramid import SummaryPyramid, SummaryPyramidCache, envelope_xy
+from plotbot.plot_manager import plot_manager
+from plotbot.plot_config import plot_config
+from plotbot.config import config
+
+T0 = np.datetime64('2024-03-01T00:00:00', 'ns')
+
+def _synthetic(n=36_000, step_ms=100):
+    """One hour at 10 Hz with a spike and a NaN gap."""
+    times = T0 + np.arange(n) * np.timedelta64(step_ms, 'ms')
+    values = np.sin(np.arange(n) / 500.0)
+    values[n // 3] = 50.0
+    values[n // 2:n // 2 + 5] = np.nan
+    return times, values
+
+def test_levels_match_direct_binning():
+    times, values = _synthetic()
+    pyramid = SummaryPyramid.build(times, values, (1, 10, 60))
+    assert pyramid.native_cadence_s == pytest.approx(0.1)
+
+    for cadence in (1, 10, 60):
+        level = pyramid.levels[cadence]
+        per_bin = int(cadence / 0.1)
+        reshaped = values.reshape(-1, per_bin)
+        np.testing.assert_allclose(level['min'], np.nanmin(reshaped, axis=1))
+        np.testing.assert_allclose(level['max'], np.nanmax(reshaped, axis=1))
+        np.testing.assert_array_equal(level['count'], np.sum(~np.isnan(reshaped), axis=1))
+    assert np.nanmax(pyramid.levels[60]['max']) == 50.0, "Coarse levels must keep spikes"
+
+def test_select_cadence_falls_back_to_native_when_zoomed():
+    times, values = _synthetic()
+    pyramid = SummaryPyramid.build(times, values, (1, 10, 60, 600))
+    # 1 hour over 2000 px = 1.8 s per pixel -> 1 s level
+    assert pyramid.select_cadence(3600, 2000) == 1
+    # 1 hour over 50 px = 72 s per pixel -> 60 s level
+    assert pyramid.select_cadence(3600, 50) == 60
+    # 60 s over 2000 px = 0.03 s per pixel -> finer than native, use native data
+    assert pyramid.select_cadence(60, 2000) is None
+
+def test_vector_values_and_envelope_shape():
+    times, values = _synthetic(n=6000)
+    vector = np.vstack([values, 2 * values, -values])
+    pyramid = SummaryPyramid.build(times, vector, (10,))
+    t, vmin, vmax, mean = pyramid.query(int(times[0].astype(np.int64)), int(times[-1].astype(np.int64)), 10)
+    assert vmin.shape == (3, len(t))
+    x, y = envelope_xy(t, vmin, vmax)
+    assert x.shape == (2 * len(t),) and y.shape == (3, 2 * len(t))
+    np.testing.assert_array_equal(y[:, 0::2], vmin)
+    np.testing.assert_array_equal(y[:, 1::2], vmax)
+
+def test_save_load_roundtrip(tmp_path):
+    times, values = _synthetic(n=6000)
+    pyramid = SummaryPyramid.build(times, values, (1, 10))
+    path = str(tmp_path / 'pyr.npz')
+    pyramid.save(path)
+    loaded = SummaryPyramid.load(path)
+    assert loaded.matches(times, values)
+    assert not loaded.matches(times, values + 1.0)  # Same coverage, different content
+    assert set(loaded.levels) == {1, 10}
+    np.testing.assert_array_equal(loaded.levels[10]['max'], pyramid.levels[10]['max'])
+
+def _synthetic_variable(times, values):
+    return plot_manager(values, plot_config=plot_config(
+        data_type='synthetic_type', class_name='synthetic', subclass_name='bmag',
+        plot_type='time_series', datetime_array=times))
+
+def test_cache_builds_lazily_persists_and_reduces(tmp_path, monkeypatch):
+    monkeypatch.setattr(config, '_data_dir', str(tmp_path))
+    monkeypatch.setattr(config, 'summary_pyramid_data_types', ['synthetic_type'])
+    cache_dir = os.path.join(str(tmp_path), 'summary_pyramids', 'synthetic_type')
+    times, values = _synthetic()
+    bmag = _synthetic_variable(times, values)
+
+    cache = SummaryPyramidCache()
+    # Zoomed in: native data, and nothing is built
+    assert cache.reduce_for_plot(bmag, times, '2024-03-01/00:00:00', '2024-03-01/00:01:00', 1000) is None
+    assert not os.path.exists(cache_dir)
+
+    summary = cache.reduce_for_plot(bmag, times, '2024-03-01/00:00:00', '2024-03-01/01:00:00', 100)
+    assert summary is not None
+    assert len(summary[0]) == 360  # 36 s per pixel -> 10 s bins over one hour
+    assert os.listdir(cache_dir) == ['synthetic.bmag.npz']
+    # Data changed since the build: pyramid must not be used
+    assert cache.reduce_for_plot(bmag, times[:-1], '2024-03-01/00:00:00', '2024-03-01/01:00:00', 100) is None
+
+    # A fresh session loads the persisted pyramid instead of rebuilding
+    fresh = SummaryPyramidCache()
+    monkeypatch.setattr(SummaryPyramid, 'build', classmethod(lambda *a, **k: pytest.fail("rebuilt")))
+    assert fresh.reduce_for_plot(bmag, times, '2024-03-01/00:00:00', '2024-03-01/01:00:00', 100) is not None
+
+def test_changed_values_rebuild_and_replace_the_file(tmp_path, monkeypatch):
+    monkeypatch.setattr(config, '_data_dir', str(tmp_path))
+    monkeypatch.setattr(config, 'summary_pyramid_data_types', ['synthetic_type'])
+    cache_dir = os.path.join(str(tmp_path), 'summary_pyramids', 'synthetic_type')
+    times, values = _synthetic()
+    long_range = ('2024-03-01/00:00:00', '2024-03-01/01:00:00', 100)
+
+    SummaryPyramidCache().reduce_for_plot(_synthetic_variable(times, values), times, *long_range)
+    # Same times, sample count and end points, different values (e.g. a reprocessed file version)
+    changed = values.copy()
+    changed[100] = 99.0
+    for cache in (SummaryPyramidCache(), SummaryPyramidCache()):  # Stale file on disk, then the replacement
+        _, _, vmax = cache.reduce_for_plot(_synthetic_variable(times, changed), times, *long_range)
+        assert np.nanmax(vmax) == 99.0
+    assert os.listdir(cache_dir) == ['synthetic.bmag.npz']
+
+def test_build_for_instance_warms_the_cache(tmp_path, monkeypatch):
+    monkeypatch.setattr(config, '_data_dir', str(tmp_path))
+    monkeypatch.setattr(config, 'summary_pyramid_data_types', ['synthetic_type'])
+    times, values = _synthetic()
+
+    class FakeInstance:
+        pass
+    instance = FakeInstance()
+    instance.bmag = _synthetic_variable(times, values)
+    assert SummaryPyramidCache().build_for_instance('synthetic_type', instance) == 1
+    assert os.listdir(os.path.join(str(tmp_path), 'summary_pyramids', 'synthetic_type')) == ['synthetic.bmag.npz']
+
+def test_disabled_data_type_is_ignored():
+    cache = SummaryPyramidCache()
+    assert cache.build_for_instance('definitely_not_enabled', object()) == 0
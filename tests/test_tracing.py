@@ -0,0 +1,138 @@
+#tests/test_tracing.py
+# To run tests from the project root directory and see print output in the console:
+# conda run -n plotbot_env python -m pytest tests/test_tracing.py -vv -s
+
+"""
+Tests for plotbot.tracing: span nesting and attributes, the disabled no-op
+path, thread-pool parent links, spans left open by early returns, worker
+drain/merge, the Chrome trace and speedscope exports, and an offline
+get_data on synthetic mag_RTN_4sa files producing the pipeline spans.
+"""
+
+import os
+import sys
+import json
+import threading
+import pytest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from plotbot.tracing import Tracer, NULL_SPAN, tracer
+
+@pytest.fixture
+def local_tracer():
+    t = Tracer()
+    t.enabled = True
+    return t
+
+def _by_name(records):
+    return {record['name']: record for record in records}
+
+def test_spans_nest_and_carry_attributes(local_tracer):
+    with local_tracer.span('get_data', data_type='mag_RTN_4sa') as outer:
+        with local_tracer.span('import') as inner:
+            inner.set(records=42)
+        local_tracer.annotate(trange=['2021-04-29/06:00', '2021-04-29/06:10'])
+    records = _by_name(local_tracer.records())
+    assert records['import']['parent_id'] == records['get_data']['id']
+    assert records['get_data']['parent_id'] is None
+    assert records['import']['attributes'] == {'records': 42}
+    assert records['get_data']['attributes']['trange'] == ['2021-04-29/06:00', '2021-04-29/06:10']
+    assert outer.duration >= inner.duration > 0
+    assert local_tracer.current() is NULL_SPAN
+
+def test_disabled_tracer_records_nothing():
+    t = Tracer()
+    t.enabled = False
+
+    @t.traced('work')
+    def work():
+        with t.span('inner') as span:
+            span.set(records=1)
+            return 3
+
+    assert work() == 3
+    assert not t.span('x') and t.records() == []
+
+def test_exceptions_and_unfinished_children(local_tracer):
+    with pytest.raises(ValueError):
+        with local_tracer.span('failing'):
+            raise ValueError('boom')
+    parent = local_tracer.start_span('parent')
+    local_tracer.start_span('left_open')  # An early return skipped its end()
+    parent.end()
+    records = _by_name(local_tracer.records())
+    assert records['failing']['attributes']['error'] == 'ValueError'
+    assert records['left_open']['attributes']['unfinished'] is True
+    assert records['left_open']['end_ns'] == records['parent']['end_ns']
+
+def test_thread_spans_link_to_the_submitting_span(local_tracer):
+    barrier = threading.Barrier(3)  # Keep all three alive so their thread ids differ
+
+    def transfer():
+        with local_tracer.span('download_file', parent=parent):
+            barrier.wait()
+
+    with local_tracer.span('download') as parent:
+        threads = [threading.Thread(target=transfer) for _ in range(3)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+    records = local_tracer.records()
+    files = [record for record in records if record['name'] == 'download_file']
+    assert len(files) == 3 and all(record['parent_id'] == parent.id for record in files)
+    assert len({record['tid'] for record in files}) == 3
+
+def test_drain_and_merge_move_spans_between_tracers(local_tracer):
+    worker = Tracer()
+    worker.enabled = True
+    with worker.span('figure', file='a.png'):
+        pass
+    records = worker.drain()
+    assert worker.records() == []
+    records = [dict(record, pid=record['pid'] + 1) for record in records]  # As if from another process
+    local_tracer.merge(records)
+    assert '[pid' in local_tracer.format_tree() and 'figure' in local_tracer.format_tree()
+    local_tracer.clear()
+    assert local_tracer.records() == []
+
+def test_chrome_and_speedscope_exports(local_tracer, tmp_path):
+    with local_tracer.span('render', panels=2):
+        with local_tracer.span('show'):
+            pass
+    chrome = json.load(open(local_tracer.save(str(tmp_path / 'trace.json'))))
+    complete = [event for event in chrome['traceEvents'] if event['ph'] == 'X']
+    assert [event['name'] for event in complete] == ['render', 'show']
+    assert complete[0]['ts'] == 0 and complete[0]['dur'] >= complete[1]['dur']
+    assert complete[0]['args'] == {'panels': 2}
+    assert {event['name'] for event in chrome['traceEvents'] if event['ph'] == 'M'} == {'process_name', 'thread_name'}
+
+    speedscope = json.load(open(local_tracer.save(str(tmp_path / 'run.speedscope.json'))))
+    assert [frame['name'] for frame in speedscope['shared']['frames']] == ['render', 'show']
+    events = speedscope['profiles'][0]['events']
+    assert [(event['type'], event['frame']) for event in events] == [('O', 0), ('O', 1), ('C', 1), ('C', 0)]
+    assert all(a['at'] <= b['at'] for a, b in zip(events, events[1:]))
+    with pytest.raises(ValueError):
+        local_tracer.save(str(tmp_path / 'trace.txt'), format='text')
+
+def test_offline_get_data_produces_pipeline_spans(synthetic_data_trange, monkeypatch):
+    import plotbot
+
+    monkeypatch.setattr(tracer, 'enabled', True)
+    tracer.clear()
+    try:
+        plotbot.get_data(synthetic_data_trange, plotbot.mag_rtn_4sa.br)
+        plotbot.get_data(['2021-04-29/06:05:00.000', '2021-04-29/06:15:00.000'], plotbot.mag_rtn_4sa.br)
+        records = tracer.records()
+    finally:
+        tracer.clear()
+
+    names = [record['name'] for record in records]
+    assert names.count('get_data') == 2
+    assert {'import_data_function', 'calculate', 'merge'} <= set(names)
+    imports = [record for record in records if record['name'] == 'Import/refresh data']
+    assert imports[0]['attributes']['records'] > 0
+    merge = _by_name(records)['merge']
+    assert merge['attributes']['records'] > imports[1]['attributes']['records']
+    assert merge['attributes']['bytes'] > 0
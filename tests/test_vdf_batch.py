@@ -0,0 +1,79 @@
+#tests/test_vdf_batch.py
+# To run tests from the project root directory and see print output in the console:
+# conda run -n plotbot_env python -m pytest tests/test_vdf_batch.py -vv -s
+
+"""
+Tests for render_vdf_frames: PNG frames for every processed slice in process
+and across a worker pool, failures reported per frame, and frames streamed
+into a GIF movie. Uses synthetic SPAN-I-shaped slices (no downloads).
+"""
+
+import os
+import sys
+import numpy as np
+import pytest
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from plotbot.vdf_processing import process_vdf_slices
+from plotbot.vdf_batch import render_vdf_frames, vdf_frame_filename
+
+def _slices(n, seed=2):
+    rng = np.random.default_rng(seed)
+    phi = np.broadcast_to(np.linspace(100, 190, 8)[:, None, None], (n, 8, 32, 8))
+    energy = np.broadcast_to(np.geomspace(20000, 100, 32)[None, :, None], (n, 8, 32, 8))
+    theta = np.broadcast_to(np.linspace(-50, 50, 8)[None, None, :], (n, 8, 32, 8))
+    eflux = rng.lognormal(18, 1.5, (n, 8, 32, 8))
+    return process_vdf_slices(theta, phi, energy, eflux)
+
+def _times(n):
+    return [datetime(2020, 1, 29, 18) + timedelta(seconds=7 * i) for i in range(n)]
+
+def test_frames_render_in_process_with_reused_figure(tmp_path):
+    times = _times(4)
+    done = []
+    paths = render_vdf_frames(_slices(4), times, str(tmp_path), workers=1, dpi=40,
+                              progress=lambda n, total: done.append((n, total)))
+    assert paths == [str(tmp_path / vdf_frame_filename(t)) for t in times]
+    assert all(os.path.getsize(p) > 0 for p in paths)
+    assert done[-1] == (4, 4)
+
+def test_failed_frame_is_reported_and_others_saved(tmp_path):
+    slices = _slices(3)
+    slices.theta_plane[2][1] = np.nan  # All-NaN VDF plane: no log contour levels for this frame
+    slices.phi_plane[2][1] = np.nan
+    paths = render_vdf_frames(slices, _times(3), str(tmp_path), workers=1, dpi=40)
+    assert paths[1] is None and paths[0] and paths[2]
+
+def test_gif_movie_without_frames(tmp_path):
+    from PIL import Image
+    movie = str(tmp_path / 'vdf.gif')
+    paths = render_vdf_frames(_slices(3), _times(3), workers=1, movie=movie, movie_dpi=30, save_frames=False)
+    assert paths == [None, None, None]
+    with Image.open(movie) as gif:
+        assert gif.n_frames == 3 and gif.info['loop'] == 0
+        frames = []
+        for index in range(3):
+            gif.seek(index)
+            assert gif.info['duration'] == 100  # 10 fps
+            frames.append(np.asarray(gif.convert('RGB')))
+    assert len({frame.tobytes() for frame in frames}) == 3
+    assert all(frame.min() < 100 for frame in frames)  # Frames carry their own palettes, not a blank one
+
+def test_movie_frame_keeps_the_title_inside():
+    from plotbot.vdf_batch import _FrameFigure, _build_frames, _frame_settings
+    from plotbot.data_classes.psp_span_vdf import psp_span_vdf
+    figure = _FrameFigure(**_frame_settings(psp_span_vdf))
+    figure.draw(_build_frames(_slices(1), _times(1), psp_span_vdf)[0])
+    rgba = figure.rgba(30)
+    title = figure.fig._suptitle.get_window_extent()
+    height = rgba.shape[0]
+    assert 0 <= title.y0 and title.y1 <= height  # Movie frames are not cropped with bbox_inches='tight'
+    assert all(ax.get_window_extent().y1 < title.y0 for ax in (figure.ax2, figure.ax3))
+
+def test_pool_matches_frame_names(tmp_path):
+    times = _times(6)
+    paths = render_vdf_frames(_slices(6), times, str(tmp_path), workers=2, dpi=30)
+    assert sorted(os.listdir(tmp_path)) == sorted(vdf_frame_filename(t) for t in times)
+    assert all(p is not None for p in paths)
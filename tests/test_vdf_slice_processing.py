@@ -0,0 +1,133 @@
+#tests/test_vdf_slice_processing.py
+# To run tests from the project root directory and see print output in the console:
+# conda run -n plotbot_env python -m pytest tests/test_vdf_slice_processing.py -vv -s
+
+"""
+Tests for the batched VDF processing module: theta/phi plane grids for many
+time slices at once match the per-slice grids of psp_span_vdf_class, records
+are read from the CDF in one span, and the class's ns time index and slice LRU
+cache agree with the old bisect lookup and uncached grids. Synthetic
+SPAN-I-shaped arrays and a stand-in CDF object only (no downloads).
+"""
+
+import os
+import sys
+import numpy as np
+import pytest
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from plotbot.vdf_processing import process_vdf_slices, process_vdf_cdf, read_vdf_records
+
+N_TIMES = 12
+
+def _span_arrays(n=N_TIMES, seed=5):
+    """SPAN-I-like (n, 2048) THETA/PHI/ENERGY/EFLUX arrays on the 8 phi x 32 energy x 8 theta grid."""
+    rng = np.random.default_rng(seed)
+    phi = np.broadcast_to(np.linspace(100, 190, 8)[:, None, None], (8, 32, 8))
+    energy = np.broadcast_to(np.geomspace(20000, 100, 32)[None, :, None], (8, 32, 8))
+    theta = np.broadcast_to(np.linspace(-50, 50, 8)[None, None, :], (8, 32, 8))
+    arrays = {name: np.repeat(grid.reshape(1, -1), n, axis=0) + rng.normal(0, 0.1, (n, 2048))
+              for name, grid in (('THETA', theta), ('PHI', phi), ('ENERGY', energy))}
+    eflux = rng.lognormal(18, 2, (n, 2048))
+    eflux[rng.random((n, 2048)) < 0.05] = np.nan
+    arrays['EFLUX'] = eflux
+    return {name: a.astype(np.float32) for name, a in arrays.items()}
+
+class _FakeCDF:
+    def __init__(self, arrays):
+        self.arrays = arrays
+        self.calls = []
+
+    def varget(self, name, startrec=0, endrec=None):
+        self.calls.append((name, startrec, endrec))
+        return self.arrays[name][startrec:endrec + 1]
+
+def test_batched_planes_match_per_slice_class_grids():
+    from plotbot.data_classes.psp_span_vdf import psp_span_vdf_class
+    arrays = _span_arrays()
+    epoch = [datetime(2020, 1, 29, 18) + timedelta(seconds=7 * i) for i in range(N_TIMES)]
+    vdf_class = psp_span_vdf_class({'Epoch': epoch, **{k: v.astype(np.float64) for k, v in arrays.items()}})
+
+    slices = process_vdf_slices(arrays['THETA'], arrays['PHI'], arrays['ENERGY'], arrays['EFLUX'])
+    assert len(slices) == N_TIMES and slices.vdf.dtype == np.float32
+    for i in range(N_TIMES):
+        vdf_data, theta_plane, phi_plane = slices.timeslice(i)
+        for got, expected in zip(theta_plane, vdf_class.generate_velocity_grids(i, 'theta')):
+            np.testing.assert_allclose(got, expected, rtol=2e-5, atol=1e-3)
+        for got, expected in zip(phi_plane, vdf_class.generate_velocity_grids(i, 'phi')):
+            np.testing.assert_allclose(got, expected, rtol=2e-5, atol=1e-3)
+        np.testing.assert_allclose(vdf_data['vdf'], vdf_class.raw_data['vdf'][i], rtol=2e-5)
+        np.testing.assert_allclose(slices.vel_1d[i], vdf_data['vel'][0, :, 0])
+    assert slices.theta_plane[0].shape == (N_TIMES, 32, 8) and slices.phi_plane[0].shape == (N_TIMES, 8, 32)
+
+def test_float64_batch_matches_float32_batch():
+    arrays = _span_arrays()
+    single = process_vdf_slices(arrays['THETA'], arrays['PHI'], arrays['ENERGY'], arrays['EFLUX'])
+    double = process_vdf_slices(arrays['THETA'], arrays['PHI'], arrays['ENERGY'], arrays['EFLUX'], dtype=np.float64)
+    assert double.vdf.dtype == np.float64
+    np.testing.assert_allclose(single.phi_plane[2], double.phi_plane[2], rtol=1e-5)
+    np.testing.assert_allclose(single.collapsed, double.collapsed, rtol=1e-5)
+
+def test_cdf_records_read_once_per_variable():
+    arrays = _span_arrays()
+    dat = _FakeCDF(arrays)
+    indices = [3, 4, 9]
+    records = read_vdf_records(dat, indices)
+    assert sorted(dat.calls) == sorted((name, 3, 9) for name in arrays)
+    for name, data in arrays.items():
+        np.testing.assert_array_equal(records[name], data[indices])
+
+    slices = process_vdf_cdf(_FakeCDF(arrays), indices)
+    expected = process_vdf_slices(*(arrays[name][indices] for name in ('THETA', 'PHI', 'ENERGY', 'EFLUX')))
+    np.testing.assert_array_equal(slices.theta_plane[2], expected.theta_plane[2])
+    assert len(process_vdf_cdf(_FakeCDF(arrays), [])) == 0
+
+def _bisect_reference(datetimes, target):
+    """The list/bisect lookup psp_span_vdf_class used before the ns index."""
+    import bisect
+    index = bisect.bisect_left(datetimes, target)
+    if index >= len(datetimes):
+        return len(datetimes) - 1
+    if index > 0 and abs((datetimes[index - 1] - target).total_seconds()) < abs((datetimes[index] - target).total_seconds()):
+        return index - 1
+    return index
+
+def _loaded_class(n=N_TIMES):
+    from plotbot.data_classes.psp_span_vdf import psp_span_vdf_class
+    arrays = _span_arrays(n)
+    epoch = [datetime(2020, 1, 29, 18) + timedelta(seconds=7 * i, microseconds=250 * i) for i in range(n)]
+    return psp_span_vdf_class({'Epoch': epoch, **{k: v.astype(np.float64) for k, v in arrays.items()}}), epoch
+
+def test_vectorised_timeslice_lookup_matches_bisect():
+    vdf_class, epoch = _loaded_class()
+    rng = np.random.default_rng(0)
+    targets = [epoch[0] + timedelta(microseconds=int(us)) for us in rng.integers(-20_000_000, 110_000_000, 500)]
+    targets += [epoch[3], epoch[-1] + timedelta(hours=1), epoch[0] - timedelta(hours=1),
+                epoch[4] + (epoch[5] - epoch[4]) / 2]  # exact hit, past the end, before the start, tie
+    expected = [_bisect_reference(epoch, t) for t in targets]
+    np.testing.assert_array_equal(vdf_class.find_closest_timeslices(targets), expected)
+    np.testing.assert_array_equal(vdf_class.find_closest_timeslices(np.array(targets, dtype='datetime64[ns]')), expected)
+    assert vdf_class.find_closest_timeslice('2020-01-29/18:00:21.000') == 3
+    assert vdf_class.find_closest_timeslice('2020/01/29 18:00:20') == 3
+    assert vdf_class._current_timeslice_index == 3
+
+def test_timeslice_lookup_on_empty_class_raises():
+    from plotbot.data_classes.psp_span_vdf import psp_span_vdf_class
+    with pytest.raises(ValueError):
+        psp_span_vdf_class(None).find_closest_timeslice('2020-01-29/18:10:02.000')
+
+def test_slice_products_lru_cache():
+    vdf_class, _ = _loaded_class()
+    vdf_class.vdf_slice_cache_size = 2
+    first = vdf_class.get_slice_products(0)
+    assert vdf_class.get_slice_products(0) is first
+    np.testing.assert_array_equal(first['phi'][2], vdf_class.generate_velocity_grids(0, 'phi')[2])
+    assert first['theta_limits'] == vdf_class.get_axis_limits('theta', *first['theta'])
+
+    vdf_class.theta_smart_padding = 300  # Bounds parameters are part of the key
+    assert vdf_class.get_slice_products(0) is not first
+    vdf_class.get_slice_products(1)
+    vdf_class.get_slice_products(2)
+    assert len(vdf_class._slice_cache) == 2